@@ -0,0 +1,311 @@
+"""
+Optional DuckDB analytics engine over Parquet exports of events and daily_metrics.
+
+History-wide questions (the severity distribution of every daily row in a
+year, the category mix of a year of events, Day 2's rolling baselines over
+all history) are column scans, aggregations and window functions. DuckDB runs
+them over Parquet far faster than SQLite can hand rows to pandas. Enabled with
+ANALYTICS_ENGINE=duckdb when the duckdb and pyarrow packages are installed;
+without them every caller keeps its SQLite path.
+
+Layout (ANALYTICS_PARQUET_DIR, default data/processed/analytics):
+
+    daily_metrics.parquet   every daily_metrics column except reasons_json
+    events_live/date=YYYY-MM-DD.parquet
+                            narrow (no text) columns of the events still in the table
+    manifest.json           export time, archive horizon and a fingerprint per event date
+
+The `events` view is events_live plus the retention archive (archive.py) for
+dates before the horizon recorded at export time, so an archive run between
+two exports never counts an event twice. Pipelines re-export as their last
+stage, rewriting only the event dates that changed; for an existing database run:
+
+    python -m backend.app.analytics_engine
+
+Day 2 does not read the export (daily_metrics is rewritten in the same run):
+rolling_baseline() ships the narrow columns to DuckDB as Arrow instead.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import archive
+from .config import config
+from .models import DailyMetric, Event
+from .pipeline.retention import archive_horizon
+from .pipeline_config import ANALYTICS_ENGINE, ANALYTICS_PARQUET_DIR
+
+try:
+    import duckdb
+
+    HAS_DUCKDB = True
+except ImportError:
+    duckdb = None
+    HAS_DUCKDB = False
+
+logger = logging.getLogger("events-risk-dashboard.analytics_engine")
+
+ANALYTICS_DIR: Path = Path(ANALYTICS_PARQUET_DIR) if ANALYTICS_PARQUET_DIR else config.processed_data_dir / "analytics"
+MANIFEST_FILE = "manifest.json"
+DAILY_METRICS_FILE = "daily_metrics.parquet"
+EVENTS_DIR = "events_live"
+EXPORT_BATCH_SIZE = 50_000
+
+# What aggregations read; titles, content and entities stay in the database
+EVENT_COLUMNS: Tuple[str, ...] = (
+    "id", "ts", "date", "country", "category", "source", "event_code", "quad_class",
+    "goldstein", "avg_tone", "severity_index", "threat_level", "sentiment_score",
+)
+DAILY_METRIC_COLUMNS: Tuple[str, ...] = tuple(
+    c.name for c in DailyMetric.__table__.columns if c.name != "reasons_json"
+)
+
+# Same bins as the SQLite path of GET /analytics/risk-distribution (np.histogram: last bin closed)
+SEVERITY_BIN_EDGES = (0, 20, 40, 60, 80, 100)
+
+
+class EngineUnavailable(RuntimeError):
+    """duckdb/pyarrow is not installed, the engine is off, or nothing has been exported yet."""
+
+
+def enabled() -> bool:
+    """ANALYTICS_ENGINE=duckdb and both packages are importable."""
+    return ANALYTICS_ENGINE == "duckdb" and HAS_DUCKDB and archive.HAS_PYARROW
+
+
+def _root(root: Optional[Path]) -> Path:
+    return Path(root) if root is not None else ANALYTICS_DIR
+
+
+def read_manifest(root: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads((_root(root) / MANIFEST_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def available(root: Optional[Path] = None) -> bool:
+    """The engine is enabled and an export exists to query."""
+    return enabled() and read_manifest(root) is not None
+
+
+# ── Export ───────────────────────────────────────────────────────────────
+
+def _export_table(session: Session, table, columns: Sequence[str], path: Path, where=None) -> int:
+    """Stream `columns` of `table` (optionally filtered) into a Parquet file in batches; replaced atomically."""
+    cols = [table.c[name] for name in columns]
+    schema = archive.arrow_schema(cols)
+    stmt = select(*cols)
+    if where is not None:
+        stmt = stmt.where(where)
+    tmp = path.with_suffix(".parquet.tmp")
+    n = 0
+    with archive.pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+        for rows in session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)).partitions():
+            arrays = [archive.pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_batch(archive.pa.record_batch(arrays, schema=schema))
+            n += len(rows)
+    os.replace(tmp, path)
+    return n
+
+
+def _event_fingerprints(session: Session) -> Dict[str, List[Any]]:
+    """(events, latest ts) per live date; read from ix_events_date_ts_id alone."""
+    rows = session.execute(select(Event.date, func.count(), func.max(Event.ts)).group_by(Event.date))
+    return {d.isoformat(): [int(n), str(ts)] for d, n, ts in rows}
+
+
+def export_parquet(
+    session: Session,
+    root: Optional[Path] = None,
+    dates: Optional[Iterable[date]] = None,
+) -> Dict[str, int]:
+    """
+    Write daily_metrics and the live events to Parquet. daily_metrics is
+    rewritten whole; an event date is rewritten when its (count, latest ts)
+    changed since the last export or it is in `dates` (events updated in place,
+    e.g. by re-enrichment). Returns rows written per table.
+    """
+    if not archive.HAS_PYARROW:
+        raise EngineUnavailable("pyarrow is not installed; install it to export analytics Parquet")
+    base = _root(root)
+    live = base / EVENTS_DIR
+    live.mkdir(parents=True, exist_ok=True)
+
+    previous = (read_manifest(base) or {}).get("event_dates", {})
+    current = _event_fingerprints(session)
+    forced = {d.isoformat() for d in dates or ()}
+    events = 0
+    for d, fingerprint in current.items():
+        path = live / f"date={d}.parquet"
+        if d in forced or previous.get(d) != fingerprint or not path.exists():
+            events += _export_table(session, Event.__table__, EVENT_COLUMNS, path, Event.date == date.fromisoformat(d))
+    for path in live.glob("date=*.parquet"):
+        if path.stem[len("date="):] not in current:
+            path.unlink()  # archived or deleted since the last export
+
+    counts = {
+        "daily_metrics": _export_table(session, DailyMetric.__table__, DAILY_METRIC_COLUMNS, base / DAILY_METRICS_FILE),
+        "events": events,
+    }
+    horizon = archive_horizon(session)
+    manifest = {
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        "horizon": horizon.isoformat() if horizon else None,
+        "rows": counts,
+        "event_dates": current,
+    }
+    tmp = base / (MANIFEST_FILE + ".tmp")
+    tmp.write_text(json.dumps(manifest))
+    os.replace(tmp, base / MANIFEST_FILE)
+    logger.info("analytics parquet exported", extra={**counts, "event_dates": len(current)})
+    return counts
+
+
+# ── Queries ──────────────────────────────────────────────────────────────
+
+def _sql_str(value: Any) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def connect(root: Optional[Path] = None):
+    """In-memory DuckDB connection with `events` and `daily_metrics` views over the export."""
+    if not enabled():
+        raise EngineUnavailable("analytics engine is off (ANALYTICS_ENGINE=duckdb, needs duckdb and pyarrow)")
+    base = _root(root)
+    manifest = read_manifest(base)
+    if manifest is None:
+        raise EngineUnavailable("no analytics export yet; run python -m backend.app.analytics_engine")
+    con = duckdb.connect()
+    con.execute(f"CREATE VIEW daily_metrics AS SELECT * FROM read_parquet({_sql_str(base / DAILY_METRICS_FILE)})")
+    cols = ", ".join(f'"{c}"' for c in EVENT_COLUMNS)
+    # An empty source keeps the view's columns when there are no partitions at all
+    con.register("events_empty", archive.arrow_schema([Event.__table__.c[c] for c in EVENT_COLUMNS]).empty_table())
+    sources = [f"SELECT {cols} FROM events_empty"]
+    if any((base / EVENTS_DIR).glob("date=*.parquet")):
+        pattern = base / EVENTS_DIR / "date=*.parquet"
+        sources.append(f"SELECT {cols} FROM read_parquet({_sql_str(pattern)}, hive_partitioning = false)")
+    horizon = manifest.get("horizon")
+    if horizon and archive.archived_dates():
+        pattern = archive.ARCHIVE_DIR / "date=*" / archive.PARTITION_FILE
+        sources.append(
+            f"SELECT {cols} FROM read_parquet({_sql_str(pattern)}, hive_partitioning = false)"
+            f' WHERE "date" < DATE {_sql_str(horizon)}'
+        )
+    con.execute("CREATE VIEW events AS " + " UNION ALL ".join(sources))
+    return con
+
+
+def query(sql: str, params: Sequence[Any] = (), root: Optional[Path] = None) -> List[Tuple]:
+    """Run one query against the export views."""
+    con = connect(root)
+    try:
+        return con.execute(sql, list(params)).fetchall()
+    finally:
+        con.close()
+
+
+def severity_distribution(since: date, root: Optional[Path] = None) -> Tuple[List[int], Dict[str, Any]]:
+    """Histogram counts over SEVERITY_BIN_EDGES and summary stats of daily severity_index since `since`."""
+    edges = SEVERITY_BIN_EDGES
+    bins = ", ".join(
+        f"count(*) FILTER (WHERE s >= {lo} AND s {'<=' if i == len(edges) - 2 else '<'} {hi})"
+        for i, (lo, hi) in enumerate(zip(edges, edges[1:]))
+    )
+    (row,) = query(
+        "SELECT count(s), avg(s), median(s), stddev_pop(s), min(s), max(s), " + bins
+        + ' FROM (SELECT severity_index AS s FROM daily_metrics WHERE severity_index IS NOT NULL AND "date" >= ?)',
+        [since], root,
+    )
+    count, mean, median, std, lo, hi = row[:6]
+    if not count:
+        return [], {}
+    stats = {
+        "mean": round(float(mean), 2),
+        "median": round(float(median), 2),
+        "std": round(float(std), 2),
+        "min": round(float(lo), 2),
+        "max": round(float(hi), 2),
+        "count": int(count),
+    }
+    return [int(c) for c in row[6:]], stats
+
+
+def category_counts(since: date, root: Optional[Path] = None) -> List[Tuple[str, int]]:
+    """(category, events) since `since`, live and archived, most frequent first."""
+    return query(
+        'SELECT category, count(*) AS cnt FROM events WHERE "date" >= ? AND category IS NOT NULL'
+        " GROUP BY category ORDER BY cnt DESC, category",
+        [since], root,
+    )
+
+
+def rolling_baseline(
+    rows: Sequence[Tuple[int, str, str, date, Optional[float]]],
+    window: int,
+    min_periods: int,
+    method: str = "robust",
+    value_sql: str = "value",
+) -> pd.DataFrame:
+    """
+    Rolling center and dispersion per (country, category) ordered by date, with the
+    row window of pandas rolling(window, min_periods): median + MAD for "robust",
+    mean + sample std for "standard". `rows` are (id, country, category, date, value);
+    `value_sql` may transform `value`. Returns a DataFrame with id, value,
+    n_in_window, rolling_center and rolling_dispersion.
+    """
+    if not (HAS_DUCKDB and archive.HAS_PYARROW):
+        raise EngineUnavailable("duckdb and pyarrow are needed for rolling baselines in DuckDB")
+    pa = archive.pa
+    names = ("id", "country", "category", "date", "value")
+    types = (pa.int64(), pa.string(), pa.string(), pa.date32(), pa.float64())
+    columns = list(zip(*rows)) if rows else [[] for _ in names]
+    dm = pa.table([pa.array(list(v), type=t) for v, t in zip(columns, types)], names=list(names))
+
+    frame = f"PARTITION BY country, category ORDER BY \"date\" ROWS BETWEEN {int(window) - 1} PRECEDING AND CURRENT ROW"
+    if method == "robust":
+        sql = f"""
+            WITH src AS (SELECT id, country, category, "date", {value_sql} AS value FROM dm),
+            centered AS (
+                SELECT *, count(value) OVER w AS n,
+                       CASE WHEN count(value) OVER w >= {int(min_periods)} THEN median(value) OVER w END AS rolling_center
+                FROM src WINDOW w AS ({frame})
+            )
+            SELECT id, value, n AS n_in_window, rolling_center,
+                   CASE WHEN count(dev) OVER w >= {int(min_periods)} THEN median(dev) OVER w END AS rolling_dispersion
+            FROM (SELECT *, abs(value - rolling_center) AS dev FROM centered)
+            WINDOW w AS ({frame})
+        """
+    else:
+        sql = f"""
+            WITH src AS (SELECT id, country, category, "date", {value_sql} AS value FROM dm)
+            SELECT id, value, count(value) OVER w AS n_in_window,
+                   CASE WHEN count(value) OVER w >= {int(min_periods)} THEN avg(value) OVER w END AS rolling_center,
+                   CASE WHEN count(value) OVER w >= {int(min_periods)} THEN stddev_samp(value) OVER w END AS rolling_dispersion
+            FROM src WINDOW w AS ({frame})
+        """
+    con = duckdb.connect()
+    try:
+        con.register("dm", dm)
+        return con.execute(sql).df()
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    from .db import Base, engine, get_db_session
+    from .logging_config import setup_logging
+
+    setup_logging()
+    Base.metadata.create_all(bind=engine)
+    with get_db_session() as session:
+        print(f"analytics parquet rows exported: {export_parquet(session)}")
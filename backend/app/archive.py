@@ -0,0 +1,179 @@
+"""
+Events archive: date-partitioned Parquet files for events moved out of the
+events table by the retention pipeline (pipeline/retention.py).
+
+Layout (one partition per event date, Hive-style so other tools can read it):
+
+    <EVENTS_ARCHIVE_DIR or data/processed/events>/date=YYYY-MM-DD/events.parquet
+
+A partition holds every events column plus the event_text columns (flat, one
+row per event), sorted newest first by (ts, id), the
+order GET /events pages in. Writing a partition that already exists merges
+by id, so archiving the same date twice (e.g. after a crash between writing
+the file and deleting the rows) never duplicates events.
+
+Parquet needs the optional pyarrow package; without it nothing is archived
+and reads see an empty archive.
+"""
+from __future__ import annotations
+
+import os
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, DateTime, Float, Integer
+
+from .config import config
+from .models import EVENT_TEXT_COLUMNS, Event, EventText
+from .pipeline_config import EVENTS_ARCHIVE_DIR
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    HAS_PYARROW = True
+except ImportError:
+    pa = None
+    pq = None
+    HAS_PYARROW = False
+
+ARCHIVE_DIR: Path = Path(EVENTS_ARCHIVE_DIR) if EVENTS_ARCHIVE_DIR else config.processed_data_dir / "events"
+PARTITION_FILE = "events.parquet"
+_PREFIX = "date="
+
+_TABLE_COLUMNS = [*Event.__table__.columns, *(EventText.__table__.c[name] for name in EVENT_TEXT_COLUMNS)]
+COLUMNS: List[str] = [c.name for c in _TABLE_COLUMNS]
+_CORE_COLUMNS = [c.name for c in Event.__table__.columns]
+
+
+class ArchiveUnavailable(RuntimeError):
+    """pyarrow is not installed, so Parquet partitions cannot be written."""
+
+
+def _arrow_type(column):
+    if isinstance(column.type, Date):
+        return pa.date32()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    return pa.string()
+
+
+def arrow_schema(columns: Sequence[Any]):
+    """Arrow schema for SQLAlchemy table columns (also used by the analytics export)."""
+    return pa.schema([(c.name, _arrow_type(c)) for c in columns])
+
+
+def schema():
+    """Arrow schema of a partition (every Event column, then the EventText ones)."""
+    return arrow_schema(_TABLE_COLUMNS)
+
+
+def _root(root: Optional[Path]) -> Path:
+    return Path(root) if root is not None else ARCHIVE_DIR
+
+
+def partition_path(d: date, root: Optional[Path] = None) -> Path:
+    return _root(root) / f"{_PREFIX}{d.isoformat()}" / PARTITION_FILE
+
+
+def archived_dates(root: Optional[Path] = None) -> List[date]:
+    """Dates with an archive partition, newest first."""
+    base = _root(root)
+    if not base.is_dir():
+        return []
+    out = []
+    for entry in os.scandir(base):
+        if entry.is_dir() and entry.name.startswith(_PREFIX):
+            try:
+                d = date.fromisoformat(entry.name[len(_PREFIX):])
+            except ValueError:
+                continue
+            if os.path.exists(os.path.join(entry.path, PARTITION_FILE)):
+                out.append(d)
+    out.sort(reverse=True)
+    return out
+
+
+def _sort_newest_first(rows: List[Dict[str, Any]]) -> None:
+    rows.sort(key=lambda r: (r["ts"], r["id"]), reverse=True)
+
+
+def write_partition(d: date, rows: Sequence[Dict[str, Any]], root: Optional[Path] = None) -> int:
+    """
+    Write (or merge into) the partition for date d; rows are flat dicts of COLUMNS.
+    The file is replaced atomically. Returns the number of events in the partition.
+    """
+    if not HAS_PYARROW:
+        raise ArchiveUnavailable("pyarrow is not installed; install it to archive events")
+    path = partition_path(d, root)
+    merged: Dict[str, Dict[str, Any]] = {}
+    if path.exists():
+        for r in pq.read_table(path).to_pylist():
+            merged[r["id"]] = r
+    for r in rows:
+        merged[r["id"]] = {c: r.get(c) for c in COLUMNS}
+    out = list(merged.values())
+    _sort_newest_first(out)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+    pq.write_table(pa.Table.from_pylist(out, schema=schema()), tmp, compression="zstd")
+    os.replace(tmp, path)
+    return len(out)
+
+
+def read_partition(
+    d: date,
+    country: Optional[str] = None,
+    category: Optional[str] = None,
+    root: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """Events of one archived date, newest first, optionally filtered."""
+    if not HAS_PYARROW:
+        return []
+    path = partition_path(d, root)
+    if not path.exists():
+        return []
+    filters = []
+    if country:
+        filters.append(("country", "=", country))
+    if category:
+        filters.append(("category", "=", category))
+    return pq.read_table(path, filters=filters or None).to_pylist()
+
+
+def iter_archived_events(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    country: Optional[str] = None,
+    category: Optional[str] = None,
+    after: Optional[Sequence[Any]] = None,
+    root: Optional[Path] = None,
+) -> Iterator[Tuple[Event, EventText]]:
+    """
+    Archived events newest first by (date, ts, id) as detached (Event, EventText) pairs,
+    for partitions in [start, end] and strictly after the keyset `after`
+    (date, ts, id) in that order. Partitions are read one at a time, so a
+    caller that stops early never touches older files.
+    """
+    after_date: Optional[date] = after[0] if after else None
+    for d in archived_dates(root):
+        if end is not None and d > end:
+            continue
+        if start is not None and d < start:
+            break
+        if after_date is not None and d > after_date:
+            continue
+        for r in read_partition(d, country, category, root):
+            if after_date == d and (r["ts"], r["id"]) >= (after[1], after[2]):
+                continue
+            yield (
+                Event(**{c: r[c] for c in _CORE_COLUMNS}),
+                EventText(event_id=r["id"], **{c: r.get(c) for c in EVENT_TEXT_COLUMNS}),
+            )
+
@@ -0,0 +1,242 @@
+"""
+Versioned response cache for read endpoints.
+
+Read endpoints only change when a pipeline commits, so responses are cached
+under (path, query params, data version). The data version lives in the
+data_version table and is bumped by pipeline commits (bump_data_version), so
+every API worker sees the same version. Clients get a strong ETag derived from
+the same key plus Cache-Control; a matching If-None-Match returns 304 without
+running the endpoint. Between pipeline runs a poll costs one cached version
+lookup at most.
+
+Entries also keep their gzip/brotli encodings, made on first request for each
+encoding, so a body is compressed once per data version rather than per poll.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .compression import SUPPORTED_ENCODINGS, compress, negotiate_encoding
+from .db import ReadSessionLocal
+from .models import DataVersion
+from .pipeline_config import (
+    COMPRESSION_ENABLED,
+    COMPRESSION_MIN_BYTES,
+    DATA_VERSION_TTL_SECONDS,
+    RESPONSE_CACHE_MAX_AGE,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_MAX_ENTRIES,
+)
+from .vector_tiles import MVT_MEDIA_TYPE
+
+# Path prefixes whose GET responses depend only on DB state (and the current date)
+CACHEABLE_PREFIXES: Tuple[str, ...] = (
+    "/map",
+    "/brief",
+    "/analytics/",
+    "/events/combined",
+    "/entities/",
+    "/history/risk",
+    "/network",
+    "/tiles/",
+)
+
+# Response media types worth caching (JSON bodies and vector tiles)
+CACHEABLE_MEDIA_TYPES: Tuple[str, ...] = ("application/json", MVT_MEDIA_TYPE)
+
+_version_lock = threading.Lock()
+_version_cache: Dict[str, float] = {"version": -1, "fetched_at": 0.0}
+
+
+# ── Data version ─────────────────────────────────────────────────────────
+
+def bump_data_version(session: Session) -> None:
+    """
+    Increment the shared data version; call inside the transaction that commits new data.
+    """
+    now = datetime.now(timezone.utc)
+    result = session.execute(
+        update(DataVersion).where(DataVersion.id == 1).values(version=DataVersion.version + 1, updated_at=now)
+    )
+    if not result.rowcount:
+        session.add(DataVersion(id=1, version=1, updated_at=now))
+    session.flush()
+    with _version_lock:
+        _version_cache["fetched_at"] = 0.0  # this process re-reads on the next request
+
+
+def current_data_version() -> int:
+    """Shared data version, re-read from the DB at most every DATA_VERSION_TTL_SECONDS."""
+    now = time.monotonic()
+    with _version_lock:
+        if now - _version_cache["fetched_at"] < DATA_VERSION_TTL_SECONDS:
+            return int(_version_cache["version"])
+    session = ReadSessionLocal()
+    try:
+        row = session.get(DataVersion, 1)
+        version = row.version if row else 0
+    finally:
+        session.close()
+    with _version_lock:
+        _version_cache["version"] = version
+        _version_cache["fetched_at"] = now
+    return version
+
+
+# ── Response cache ───────────────────────────────────────────────────────
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    media_type: str
+    etag: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    encoded: Dict[str, bytes] = field(default_factory=dict)  # encoding -> compressed body
+
+    def body_for(self, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """(body, content encoding) for a negotiated encoding; small bodies stay identity."""
+        if encoding is None or len(self.body) < COMPRESSION_MIN_BYTES:
+            return self.body, None
+        data = self.encoded.get(encoding)
+        if data is None:
+            # Two requests racing here both compress; either result is correct
+            data = compress(self.body, encoding, cached=True)
+            self.encoded[encoding] = data
+        return data, encoding
+
+
+class ResponseCache:
+    """Thread-safe LRU of CachedResponse keyed by cache key string."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+response_cache = ResponseCache()
+
+
+def cache_key(request: Request, version: int) -> str:
+    """(path, sorted query params, data version, today) — today because several endpoints use date cutoffs."""
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{params}|v{version}|{date.today().isoformat()}"
+
+
+def etag_for(key: str, encoding: Optional[str] = None) -> str:
+    """Strong ETag for the key; each content encoding is its own representation."""
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def _etag_matches(if_none_match: Optional[str], key: str) -> bool:
+    """True when If-None-Match names any encoding of the entry for `key`."""
+    if not if_none_match:
+        return False
+    # Proxies that re-encode weaken ETags (W/"..."); still the same content for us
+    candidates = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    if "*" in candidates:
+        return True
+    return any(etag_for(key, enc) in candidates for enc in (None, *SUPPORTED_ENCODINGS))
+
+
+def _cache_headers(etag: str) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={RESPONSE_CACHE_MAX_AGE}, must-revalidate",
+        "Vary": "Accept-Encoding",
+    }
+
+
+def _serve(entry: CachedResponse, key: str, encoding: Optional[str], status: str) -> Response:
+    body, used = entry.body_for(encoding)
+    headers = {**entry.headers, **_cache_headers(etag_for(key, used)), "X-Cache": status}
+    if used:
+        headers["Content-Encoding"] = used
+    return Response(content=body, media_type=entry.media_type, headers=headers)
+
+
+def is_cacheable(request: Request) -> bool:
+    if request.method != "GET":
+        return False
+    if request.query_params.get("stream", "").lower() in ("1", "true", "yes"):
+        return False  # NDJSON exports are streamed, never buffered
+    path = request.url.path
+    return any(path == p or path.startswith(p) for p in CACHEABLE_PREFIXES)
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Serve cacheable GETs from response_cache; answer If-None-Match with 304."""
+
+    async def dispatch(self, request: Request, call_next):
+        if not is_cacheable(request):
+            return await call_next(request)
+
+        key = cache_key(request, current_data_version())
+        encoding = negotiate_encoding(request.headers.get("accept-encoding")) if COMPRESSION_ENABLED else None
+        entry = response_cache.get(key)
+
+        if _etag_matches(request.headers.get("if-none-match"), key):
+            small = entry is not None and len(entry.body) < COMPRESSION_MIN_BYTES
+            return Response(status_code=304, headers=_cache_headers(etag_for(key, None if small else encoding)))
+
+        if entry is not None:
+            return _serve(entry, key, encoding, "HIT")
+
+        response = await call_next(request)
+        if response.status_code != 200 or not response.headers.get("content-type", "").startswith(CACHEABLE_MEDIA_TYPES):
+            return response
+
+        body = b""
+        async for chunk in response.body_iterator:
+            body += chunk
+        headers = {
+            k: v for k, v in response.headers.items()
+            if k.lower() not in ("content-length", "content-type", "content-encoding", "etag", "cache-control", "vary")
+        }
+        entry = CachedResponse(
+            body=body, media_type=response.headers["content-type"], etag=etag_for(key), headers=headers
+        )
+        if len(body) <= RESPONSE_CACHE_MAX_BYTES:
+            response_cache.put(key, entry)
+            return _serve(entry, key, encoding, "MISS")
+        # Too large to keep: send as is (CompressionMiddleware still compresses it)
+        return Response(
+            content=body,
+            status_code=200,
+            media_type=entry.media_type,
+            headers={**headers, **_cache_headers(entry.etag), "X-Cache": "MISS"},
+        )
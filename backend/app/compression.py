@@ -0,0 +1,182 @@
+"""
+Response compression: gzip, and brotli when the brotli package is installed.
+
+CompressionMiddleware is a plain ASGI middleware, so streamed responses (NDJSON
+exports) are compressed chunk by chunk instead of being buffered. Bodies under
+COMPRESSION_MIN_BYTES, non-text media types and responses that already carry a
+Content-Encoding pass through untouched; the last case is how the response
+cache serves bodies it compressed once per data version (see cache.py).
+"""
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .pipeline_config import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_CACHED_BROTLI_QUALITY,
+    COMPRESSION_CACHED_GZIP_LEVEL,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_BYTES,
+)
+
+try:
+    import brotli
+
+    HAS_BROTLI = True
+except ImportError:
+    brotli = None
+    HAS_BROTLI = False
+
+# Preferred first
+SUPPORTED_ENCODINGS = ("br", "gzip") if HAS_BROTLI else ("gzip",)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/geo+json",
+    "application/vnd.mapbox-vector-tile",
+    "text/",
+)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported encoding the client accepts (q > 0), or None for identity."""
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    wildcard = accepted.get("*", 0.0)
+    for encoding in SUPPORTED_ENCODINGS:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    content_type = content_type.lower()
+    # Server-sent events must reach the client as written, not held in a compressor
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith("text/event-stream")
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """Compress a whole body; `cached` uses the denser settings meant for compress-once bodies."""
+    if encoding == "br":
+        quality = COMPRESSION_CACHED_BROTLI_QUALITY if cached else COMPRESSION_BROTLI_QUALITY
+        return brotli.compress(body, quality=quality)
+    if encoding == "gzip":
+        level = COMPRESSION_CACHED_GZIP_LEVEL if cached else COMPRESSION_GZIP_LEVEL
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    raise ValueError(f"unsupported encoding: {encoding}")
+
+
+class _StreamCompressor:
+    """Incremental compressor for streamed bodies."""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            c = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+            self._process, self._finish = c.process, c.finish
+        else:
+            z = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+            self._process, self._finish = z.compress, z.flush
+
+    def process(self, data: bytes) -> bytes:
+        return self._process(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    """Compress response bodies the client accepts, above a size threshold."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+
+
+class _CompressingSend:
+    """ASGI send wrapper: holds response.start until the first body chunk decides the mode."""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            data = self.compressor.process(body)
+            if not more_body:
+                data += self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        headers = MutableHeaders(raw=self.start["headers"])
+        # Content-Length also covers small bodies re-streamed by BaseHTTPMiddleware
+        size = int(headers["content-length"]) if "content-length" in headers else None
+        if not more_body:
+            size = len(body)
+        if (
+            "content-encoding" in headers
+            or not is_compressible(headers.get("content-type"))
+            or (size is not None and size < self.minimum_size)
+        ):
+            self.passthrough = True
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if not more_body:
+            data = compress(body, self.encoding)
+            headers["Content-Length"] = str(len(data))
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": data})
+            return
+
+        if "content-length" in headers:
+            del headers["content-length"]
+        self.compressor = _StreamCompressor(self.encoding)
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": self.compressor.process(body), "more_body": True})
@@ -1,20 +1,159 @@
+"""
+Database engines and sessions.
+
+The store is chosen by DATABASE_URL (default: the SQLite file at
+config.sqlite_path). Any other SQLAlchemy URL, e.g. postgresql+psycopg2://...,
+gets a pooled engine shared by API replicas; DATABASE_READ_URL optionally points
+routes at a read replica.
+
+SQLite runs with a tunable profile (WAL, synchronous, cache/mmap sizes, temp
+store, busy timeout) applied on every connection. There are two engines:
+
+  - `engine` (writer): used by pipelines and anything that commits
+    (get_db_session, SessionLocal).
+  - `read_engine` (read-only, pooled): used by API routes (get_db). In WAL mode
+    readers see the last committed snapshot and are never blocked by a
+    pipeline transaction in progress.
+"""
 from contextlib import contextmanager
-from typing import Iterator, Generator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Generator, Iterator, Optional, Tuple
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
 
 from .config import config
+from .pipeline_config import (
+    DATABASE_READ_URL,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_READ_POOL_SIZE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_TEMP_STORE,
+)
 
 
-DATABASE_URL = f"sqlite:///{config.sqlite_path}"
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """PRAGMAs applied to every new SQLite connection."""
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"  # safe with WAL: a crash loses at most the last commits, never corrupts
+    cache_size_kb: int = 65536
+    mmap_size: int = 256 * 1024 * 1024
+    temp_store: str = "MEMORY"
+    busy_timeout_ms: int = 5000
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
+
+# SQLite's own defaults (rollback journal); kept for benchmarks and comparison
+LEGACY_PROFILE = SQLiteProfile(
+    journal_mode="DELETE",
+    synchronous="FULL",
+    cache_size_kb=2000,
+    mmap_size=0,
+    temp_store="DEFAULT",
+    busy_timeout_ms=5000,
 )
 
+DEFAULT_PROFILE = SQLiteProfile(
+    journal_mode=SQLITE_JOURNAL_MODE,
+    synchronous=SQLITE_SYNCHRONOUS,
+    cache_size_kb=SQLITE_CACHE_SIZE_KB,
+    mmap_size=SQLITE_MMAP_SIZE,
+    temp_store=SQLITE_TEMP_STORE,
+    busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS,
+)
+
+
+def _apply_profile(engine: Engine, profile: SQLiteProfile, read_only: bool) -> None:
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        cur.execute(f"PRAGMA busy_timeout = {int(profile.busy_timeout_ms)}")
+        if not read_only:
+            # journal_mode is persistent in the file; only the writer sets it
+            cur.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+        cur.execute(f"PRAGMA synchronous = {profile.synchronous}")
+        cur.execute(f"PRAGMA cache_size = -{int(profile.cache_size_kb)}")
+        cur.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+        cur.execute(f"PRAGMA temp_store = {profile.temp_store}")
+        if read_only:
+            cur.execute("PRAGMA query_only = 1")
+        cur.close()
+
+
+def create_sqlite_engines(
+    path: Path,
+    profile: SQLiteProfile = DEFAULT_PROFILE,
+    read_pool_size: int = SQLITE_READ_POOL_SIZE,
+) -> Tuple[Engine, Engine]:
+    """
+    (writer, reader) engines for the SQLite file at `path`.
+
+    The reader opens the file with mode=ro and query_only, so a route can never
+    take the write lock; its pool lets concurrent requests read in parallel.
+    """
+    timeout_s = profile.busy_timeout_ms / 1000.0
+    writer = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": timeout_s},
+    )
+    _apply_profile(writer, profile, read_only=False)
+
+    reader = create_engine(
+        f"sqlite:///file:{Path(path).resolve()}?mode=ro&uri=true",
+        connect_args={"check_same_thread": False, "timeout": timeout_s},
+        pool_size=read_pool_size,
+        max_overflow=read_pool_size,
+        pool_pre_ping=False,
+    )
+    _apply_profile(reader, profile, read_only=True)
+    return writer, reader
+
+
+def create_engines(url: str, read_url: Optional[str] = None) -> Tuple[Engine, Engine]:
+    """(writer, reader) engines for a database URL; SQLite files get the WAL profile."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.database and parsed.database != ":memory:":
+            return create_sqlite_engines(Path(parsed.database))
+        memory = create_engine(url, connect_args={"check_same_thread": False})
+        return memory, memory
+
+    def pooled(u: str) -> Engine:
+        return create_engine(
+            u,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_pre_ping=True,  # replicas outlive server restarts / idle disconnects
+            pool_recycle=DB_POOL_RECYCLE_SECONDS,
+        )
+
+    writer = pooled(url)
+    reader = pooled(read_url) if read_url else writer
+    return writer, reader
+
+
+def dialect_name(bind) -> str:
+    """Dialect of a Session, Connection or Engine ("sqlite", "postgresql", ...)."""
+    if isinstance(bind, Session):
+        bind = bind.get_bind()
+    return bind.dialect.name
+
+
+DATABASE_URL = DATABASE_URL or f"sqlite:///{config.sqlite_path}"
+
+engine, read_engine = create_engines(DATABASE_URL, DATABASE_READ_URL)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
@@ -41,16 +180,14 @@ def get_db_session() -> Iterator[Session]:
 
 def get_db() -> Generator[Session, None, None]:
     """
-    FastAPI dependency-compatible database session provider.
+    FastAPI dependency-compatible database session provider (read-only engine).
 
     Usage as dependency:
         def endpoint(db: Session = Depends(get_db)):
             ...
     """
-    db: Session = SessionLocal()
+    db: Session = ReadSessionLocal()
     try:
         yield db
     finally:
         db.close()
-
-
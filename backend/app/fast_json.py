@@ -0,0 +1,78 @@
+"""
+Fast JSON path for large list endpoints.
+
+Routes that return thousands of rows skip per-row Pydantic models: they select
+plain columns (Core rows, no ORM hydration), map each row to a dict and return
+a FastJSONResponse, which FastAPI passes through without validating or
+re-encoding. JSON already stored in a column (e.g. event_text.entities_json) is
+parsed once to check it, then embedded as a raw fragment instead of being
+re-serialized.
+
+orjson is used when installed (>= 3.9 for raw fragments); otherwise the stdlib
+json module gives the same output, only slower.
+"""
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from typing import Any, Optional
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+    _Fragment = getattr(orjson, "Fragment", None)
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+    _Fragment = None
+
+HAS_RAW_FRAGMENTS = _Fragment is not None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes (dates/datetimes as ISO 8601)."""
+    if HAS_ORJSON:
+        return orjson.dumps(content, option=_OPTIONS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def raw_json_object(text: Optional[str]) -> Any:
+    """
+    A stored JSON object column for embedding in a response: a raw fragment
+    when orjson supports it (not re-serialized), otherwise the parsed value.
+    The text is always parsed first, since a fragment is copied into the body
+    verbatim and one corrupt row would make the whole response invalid.
+    Anything that is not a JSON object (empty, list, malformed) becomes None,
+    matching the Optional[Dict] fields of the Pydantic schemas.
+    """
+    if not text:
+        return None
+    text = text.strip()
+    if not (text.startswith("{") and text.endswith("}")):
+        return None
+    try:
+        value = orjson.loads(text) if HAS_ORJSON else json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(value, dict):
+        return None
+    return _Fragment(text) if _Fragment is not None else value
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson when available."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
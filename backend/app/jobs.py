@@ -0,0 +1,289 @@
+"""
+In-process background job runner for heavy pipeline work.
+
+Endpoints submit a job and return its ID immediately; the job runs on a
+dedicated worker thread (not the API threadpool). Progress, status and
+per-stage timings are persisted to the pipeline_runs table so any API
+worker can answer GET /pipeline/jobs/{id}.
+
+Heavy runs never overlap, across API replicas too: a job holds a lease, one
+pipeline_checkpoints row naming its run ID, that it renews while it runs
+(JOB_LEASE_SECONDS). A lease left by a process that died expires and is taken
+over, and its run is marked failed. At startup, queued/running rows are failed
+unless they hold a live lease, so a starting replica never fails another
+replica's running job.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .db import get_db_session
+from .models import PipelineCheckpoint, PipelineRun
+from .pipeline_config import JOB_LEASE_SECONDS
+from .stream import EVENT_JOB, notify, publish
+
+logger = logging.getLogger("events-risk-dashboard.jobs")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Heavy runs are serialized; the executor only needs one worker
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-job")
+_heavy_lock = threading.Lock()  # this process; the lease below covers every replica
+_active_run_id: Optional[str] = None
+
+# The lease row: fingerprint = holder's run ID, updated_at = last renewal
+_LEASE = (
+    PipelineCheckpoint.pipeline == "jobs",
+    PipelineCheckpoint.stage == "lease",
+    PipelineCheckpoint.key == "heavy",
+)
+
+
+class JobBusyError(RuntimeError):
+    """Raised when a heavy job is submitted while another one is still running."""
+
+    def __init__(self, active_run_id: Optional[str]):
+        super().__init__(f"pipeline job already running: {active_run_id}")
+        self.active_run_id = active_run_id
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobContext:
+    """
+    Handle passed to a running job for reporting progress and stage timings.
+
+    With run_id=None (e.g. CLI runs) nothing is persisted; stages are still
+    timed and logged, so pipeline code can always take a context.
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id
+        self.stages: List[Dict[str, Any]] = []
+
+    def _persist(self, **values: Any) -> None:
+        if self.run_id is None:
+            return
+        with get_db_session() as session:
+            session.execute(
+                update(PipelineRun).where(PipelineRun.id == self.run_id).values(**values)
+            )
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Time a named stage. The yielded dict can be given a "rows" count by the caller.
+        The stage is recorded (and persisted) even if it raises.
+        """
+        record: Dict[str, Any] = {"name": name, "rows": None}
+        start = time.perf_counter()
+        self._persist(message=f"stage: {name}")
+        try:
+            yield record
+        finally:
+            record["duration_s"] = round(time.perf_counter() - start, 3)
+            self.stages.append(record)
+            logger.info("pipeline stage finished", extra={"run_id": self.run_id, **record})
+            self._persist(stages_json=json.dumps(self.stages))
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        """Report overall progress (0-1)."""
+        values: Dict[str, Any] = {"progress": round(max(0.0, min(1.0, fraction)), 4)}
+        if message is not None:
+            values["message"] = message
+        self._persist(**values)
+
+
+# ── Lease ────────────────────────────────────────────────────────────────
+
+def _lease_holder(session: Session, live_only: bool = True) -> Optional[str]:
+    """Run ID holding the heavy-job lease (only if renewed within JOB_LEASE_SECONDS when live_only)."""
+    stmt = select(PipelineCheckpoint.fingerprint).where(*_LEASE)
+    if live_only:
+        stmt = stmt.where(PipelineCheckpoint.updated_at >= _now() - timedelta(seconds=JOB_LEASE_SECONDS))
+    return session.execute(stmt).scalar()
+
+
+def _acquire_lease(run_id: str) -> Optional[str]:
+    """Take the lease for run_id. Returns None on success, else the run ID holding it."""
+    now = _now()
+    with get_db_session() as session:
+        row = session.execute(
+            select(PipelineCheckpoint.fingerprint, PipelineCheckpoint.updated_at).where(*_LEASE)
+        ).first()
+        if row is None:
+            try:
+                session.add(PipelineCheckpoint(pipeline="jobs", stage="lease", key="heavy", fingerprint=run_id,
+                                               updated_at=now))
+                session.flush()
+            except IntegrityError:  # another replica inserted it first
+                session.rollback()
+                return _lease_holder(session, live_only=False)
+            return None
+        if _lease_holder(session) is not None:
+            return row.fingerprint
+        # Expired: take it over unless someone else just did (compare-and-swap on the row we read)
+        taken = session.execute(
+            update(PipelineCheckpoint)
+            .where(*_LEASE, PipelineCheckpoint.fingerprint == row.fingerprint,
+                   PipelineCheckpoint.updated_at == row.updated_at)
+            .values(fingerprint=run_id, updated_at=now)
+        ).rowcount
+        if not taken:
+            return _lease_holder(session, live_only=False)
+        session.execute(
+            update(PipelineRun)
+            .where(PipelineRun.id == row.fingerprint, PipelineRun.status.in_([JOB_QUEUED, JOB_RUNNING]))
+            .values(status=JOB_FAILED, error="lease expired (process stopped renewing it)", finished_at=now)
+        )
+        logger.warning("took over expired job lease", extra={"run_id": run_id, "previous": row.fingerprint})
+        return None
+
+
+def _renew_lease(run_id: str) -> bool:
+    with get_db_session() as session:
+        return bool(session.execute(
+            update(PipelineCheckpoint)
+            .where(*_LEASE, PipelineCheckpoint.fingerprint == run_id)
+            .values(updated_at=_now())
+        ).rowcount)
+
+
+def _release_lease(run_id: str) -> None:
+    with get_db_session() as session:
+        session.execute(delete(PipelineCheckpoint).where(*_LEASE, PipelineCheckpoint.fingerprint == run_id))
+
+
+def _keep_lease(run_id: str, done: threading.Event) -> None:
+    """Renew the lease until the job finishes (runs on its own thread)."""
+    while not done.wait(JOB_LEASE_SECONDS / 4):
+        try:
+            if not _renew_lease(run_id):
+                logger.error("job lease lost", extra={"run_id": run_id})
+                return
+        except Exception:  # noqa: BLE001
+            logger.exception("could not renew job lease", extra={"run_id": run_id})
+
+
+# ── Runner ───────────────────────────────────────────────────────────────
+
+def _publish_finished(run_id: str, kind: str, status: str) -> None:
+    """Job-completion event for GET /stream."""
+    try:
+        with get_db_session() as session:
+            publish(session, EVENT_JOB, {"run_id": run_id, "kind": kind, "status": status})
+        notify()
+    except Exception:  # noqa: BLE001
+        logger.exception("could not publish job completion", extra={"run_id": run_id})
+
+
+def _run(run_id: str, kind: str, fn: Callable[[JobContext], Dict[str, Any]]) -> None:
+    global _active_run_id
+    ctx = JobContext(run_id)
+    done = threading.Event()
+    threading.Thread(target=_keep_lease, args=(run_id, done), name="pipeline-job-lease", daemon=True).start()
+    try:
+        ctx._persist(status=JOB_RUNNING, started_at=_now(), progress=0.0)
+        logger.info("pipeline job started", extra={"run_id": run_id, "kind": kind})
+        result = fn(ctx)
+        ctx._persist(
+            status=JOB_SUCCEEDED,
+            progress=1.0,
+            message=None,
+            result_json=json.dumps(result, default=str),
+            finished_at=_now(),
+        )
+        logger.info("pipeline job succeeded", extra={"run_id": run_id, "kind": kind})
+        _publish_finished(run_id, kind, JOB_SUCCEEDED)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("pipeline job failed", extra={"run_id": run_id, "kind": kind})
+        try:
+            ctx._persist(status=JOB_FAILED, error=str(exc)[:2000], finished_at=_now())
+        except Exception:  # noqa: BLE001
+            logger.exception("could not record job failure", extra={"run_id": run_id})
+        _publish_finished(run_id, kind, JOB_FAILED)
+    finally:
+        done.set()
+        try:
+            _release_lease(run_id)
+        except Exception:  # noqa: BLE001
+            logger.exception("could not release job lease", extra={"run_id": run_id})  # expires on its own
+        _active_run_id = None
+        _heavy_lock.release()
+
+
+def submit_job(kind: str, fn: Callable[[JobContext], Dict[str, Any]]) -> str:
+    """
+    Queue a heavy job and return its run ID. Raises JobBusyError if one is
+    already running in this process or holds the lease in another replica.
+    """
+    global _active_run_id
+    if not _heavy_lock.acquire(blocking=False):
+        raise JobBusyError(_active_run_id)
+    run_id = str(uuid.uuid4())
+    try:
+        holder = _acquire_lease(run_id)
+    except Exception:
+        _heavy_lock.release()
+        raise
+    if holder is not None:
+        _heavy_lock.release()
+        raise JobBusyError(holder)
+    try:
+        with get_db_session() as session:
+            session.add(
+                PipelineRun(id=run_id, kind=kind, status=JOB_QUEUED, progress=0.0, created_at=_now())
+            )
+        _active_run_id = run_id
+        _executor.submit(_run, run_id, kind, fn)
+    except Exception:
+        _active_run_id = None
+        _release_lease(run_id)
+        _heavy_lock.release()
+        raise
+    return run_id
+
+
+def get_job(session: Session, run_id: str) -> Optional[PipelineRun]:
+    """Fetch a pipeline_runs row by ID."""
+    return session.get(PipelineRun, run_id)
+
+
+def active_job_id() -> Optional[str]:
+    """Run ID of the heavy job currently holding the lock, if any."""
+    return _active_run_id
+
+
+def fail_interrupted_runs() -> int:
+    """
+    Mark queued/running rows left by a stopped process as failed (called at
+    startup). Only the holder of a live lease can still be running, in this or
+    another replica; it is left alone. Returns number of rows updated.
+    """
+    with get_db_session() as session:
+        stmt = (
+            update(PipelineRun)
+            .where(PipelineRun.status.in_([JOB_QUEUED, JOB_RUNNING]))
+            .values(status=JOB_FAILED, error="interrupted by restart", finished_at=_now())
+        )
+        holder = _lease_holder(session)
+        if holder is not None:
+            stmt = stmt.where(PipelineRun.id != holder)
+        return session.execute(stmt).rowcount or 0
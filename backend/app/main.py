@@ -8,12 +8,35 @@ _project_root = _backend_root.parent
 load_dotenv(_project_root / ".env")
 load_dotenv(_project_root / "frontend" / ".env")
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .logging_config import setup_logging, logger
 from .db import engine, Base
-from .routes import health, countries, combined, events, metrics, spikes, brief, history, map as map_router, valyu, analytics, country_insights, pipeline
+from .jobs import fail_interrupted_runs
+from .cache import ResponseCacheMiddleware
+from .compression import CompressionMiddleware
+from .search import ensure_search_index
+from .stream import broker as stream_broker
+from .pipeline_config import COMPRESSION_ENABLED, PIPELINE_SCHEDULER_ENABLED, RESPONSE_CACHE_ENABLED
+from .routes import health, countries, combined, entities, events, metrics, spikes, brief, history, map as map_router, network, valyu, analytics, country_insights, pipeline, stream, tiles
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the built-in pipeline scheduler when PIPELINE_SCHEDULER_ENABLED is set."""
+    scheduler = None
+    if PIPELINE_SCHEDULER_ENABLED:
+        from .pipeline.scheduler import PipelineScheduler
+
+        scheduler = PipelineScheduler()
+        scheduler.start()
+    yield
+    if scheduler is not None:
+        scheduler.stop()
+    stream_broker.close()
 
 
 def create_app() -> FastAPI:
@@ -24,10 +47,15 @@ def create_app() -> FastAPI:
 
     logger.info("initializing database schema")
     Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    interrupted = fail_interrupted_runs()
+    if interrupted:
+        logger.warning("marked interrupted pipeline jobs as failed", extra={"count": interrupted})
 
     app = FastAPI(
         title="Global Events Risk Intelligence Dashboard API",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -36,21 +64,32 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor"],
     )
+    if RESPONSE_CACHE_ENABLED:
+        # Read endpoints cached per data version; 304 on If-None-Match
+        app.add_middleware(ResponseCacheMiddleware)
+    if COMPRESSION_ENABLED:
+        # Outermost: compresses what the cache did not already serve encoded
+        app.add_middleware(CompressionMiddleware)
 
     # Routers
     app.include_router(health.router)
     app.include_router(countries.router)
     app.include_router(combined.router)
     app.include_router(events.router)
+    app.include_router(entities.router)
     app.include_router(metrics.router)
     app.include_router(spikes.router)
     app.include_router(brief.router)
     app.include_router(history.router)
     app.include_router(map_router.router)
+    app.include_router(network.router)
+    app.include_router(tiles.router)
     app.include_router(valyu.router)
     app.include_router(analytics.router)
     app.include_router(country_insights.router)
+    app.include_router(stream.router)
     app.include_router(pipeline.router)
 
     return app
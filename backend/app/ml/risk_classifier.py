@@ -10,8 +10,9 @@ from __future__ import annotations
 
 import json
 import logging
+import random
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import jenkspy
 import numpy as np
@@ -143,6 +144,47 @@ def compute_percentile(score: float, all_scores: np.ndarray) -> float:
     return float(np.sum(all_scores <= score) / len(all_scores) * 100.0)
 
 
+def compute_percentile_sorted(score: float, sorted_scores: np.ndarray) -> float:
+    """
+    Same result as compute_percentile, but O(log n) via binary search.
+    `sorted_scores` must be sorted ascending.
+    """
+    n = len(sorted_scores)
+    if n == 0:
+        return 50.0
+    rank = int(np.searchsorted(sorted_scores, score, side="right"))
+    return float(rank / n * 100.0)
+
+
+def reservoir_sample(values: Iterable[float], k: int, seed: int = 42) -> List[float]:
+    """
+    Uniform sample of at most k values from a stream (Algorithm R).
+    Memory is bounded by k regardless of stream length; deterministic for a given seed.
+    """
+    rng = random.Random(seed)
+    reservoir: List[float] = []
+    for i, v in enumerate(values):
+        if i < k:
+            reservoir.append(v)
+            continue
+        j = rng.randint(0, i)
+        if j < k:
+            reservoir[j] = v
+    return reservoir
+
+
+def tier_centroids(scores: np.ndarray, boundaries: List[float]) -> Dict[str, Optional[float]]:
+    """Mean score per tier (None for empty tiers), using the same cut rule as assign_tier."""
+    if len(scores) == 0:
+        return {name: None for name in TIER_NAMES}
+    idx = np.searchsorted(np.asarray(boundaries, dtype=float), scores, side="right")
+    out: Dict[str, Optional[float]] = {}
+    for i, name in enumerate(TIER_NAMES):
+        members = scores[idx == i]
+        out[name] = round(float(np.mean(members)), 2) if len(members) else None
+    return out
+
+
 class RiskTierClassifier:
     """
     Stateful classifier that maintains current tier boundaries.
@@ -154,32 +196,50 @@ class RiskTierClassifier:
         self.k = k
         self.boundaries: List[float] = list(DEFAULT_BOUNDARIES)
         self.tier_ranges: Dict[str, Tuple[float, float]] = _make_tier_ranges(DEFAULT_BOUNDARIES)
-        self.all_scores: np.ndarray = np.array([])
+        self.all_scores: np.ndarray = np.array([])  # sorted ascending
+        self.centroids: Dict[str, Optional[float]] = {}
+        self.n_samples: int = 0
+        self.n_fit_samples: int = 0
         self.fitted_at: Optional[str] = None
+        self.version: Optional[int] = None  # set when loaded from risk_tier_config
 
-    def fit(self, scores: List[float]) -> Dict:
+    def fit(self, scores: List[float], sample_size: Optional[int] = None) -> Dict:
         """
         Fit tier boundaries to current score distribution.
-        Returns tier configuration dict.
+
+        If sample_size is set and there are more scores than that, boundaries are
+        fitted on a reservoir sample (Jenks is superlinear); percentiles still use
+        every score. Returns tier configuration dict.
         """
-        arr = np.array([s for s in scores if s is not None and not np.isnan(s)])
+        arr = np.array([s for s in scores if s is not None and not np.isnan(s)], dtype=float)
         if len(arr) == 0:
             return {"method": self.method, "boundaries": self.boundaries, "tier_ranges": self.tier_ranges}
 
+        arr.sort()
         self.all_scores = arr
+        self.n_samples = len(arr)
+
+        if sample_size is not None and len(arr) > sample_size:
+            fit_arr = np.array(reservoir_sample(arr.tolist(), sample_size))
+        else:
+            fit_arr = arr
+        self.n_fit_samples = len(fit_arr)
 
         if self.method == "jenks":
-            self.boundaries, self.tier_ranges = classify_jenks(arr, self.k)
+            self.boundaries, self.tier_ranges = classify_jenks(fit_arr, self.k)
         else:
-            self.boundaries, self.tier_ranges = classify_kmeans(arr, self.k)
+            self.boundaries, self.tier_ranges = classify_kmeans(fit_arr, self.k)
 
+        self.centroids = tier_centroids(fit_arr, self.boundaries)
         self.fitted_at = datetime.now(timezone.utc).isoformat()
 
         return {
             "method": self.method,
             "boundaries": self.boundaries,
             "tier_ranges": self.tier_ranges,
+            "centroids": self.centroids,
             "n_samples": len(arr),
+            "n_fit_samples": self.n_fit_samples,
             "fitted_at": self.fitted_at,
             "stats": {
                 "mean": round(float(np.mean(arr)), 2),
@@ -196,7 +256,7 @@ class RiskTierClassifier:
         Returns (tier_name, percentile).
         """
         tier = assign_tier(score, self.boundaries)
-        percentile = compute_percentile(score, self.all_scores) if len(self.all_scores) > 0 else 50.0
+        percentile = compute_percentile_sorted(score, self.all_scores) if len(self.all_scores) > 0 else 50.0
         return tier, round(percentile, 1)
 
     def to_dict(self) -> Dict:
@@ -206,5 +266,5 @@ class RiskTierClassifier:
             "boundaries": self.boundaries,
             "tier_ranges": {k: list(v) for k, v in self.tier_ranges.items()},
             "fitted_at": self.fitted_at,
-            "n_samples": len(self.all_scores),
+            "n_samples": self.n_samples,
         }
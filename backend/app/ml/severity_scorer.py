@@ -17,6 +17,10 @@ import re
 from datetime import datetime, timezone
 from typing import Dict, Optional, Tuple
 
+# Bump whenever scoring logic or lexicons change; re-enrich skips events
+# already scored with this version (stored in events.severity_version).
+SEVERITY_ALGORITHM_VERSION = "sev-v2"
+
 # ── Category base weights (normalized 0-1) ───────────────────────────────
 
 CATEGORY_WEIGHTS: Dict[str, float] = {
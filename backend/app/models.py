@@ -8,6 +8,7 @@ from sqlalchemy import (
     Date,
     DateTime,
     Float,
+    Index,
     Integer,
     String,
     UniqueConstraint,
@@ -18,7 +19,9 @@ from .db import Base
 
 class Event(Base):
     """
-    Normalized event from GDELT or Valyu sources.
+    Normalized event from GDELT or Valyu sources: the narrow columns that
+    aggregation, map and Day 2 queries scan. Title, content, source URL and
+    entities live in event_text (EventText), read only by feed/detail routes.
     """
 
     __tablename__ = "events"
@@ -42,20 +45,134 @@ class Event(Base):
 
     avg_tone = Column(Float, nullable=True)
 
-    source_url = Column(String, nullable=True)
-
     # High-level category (taxonomy or ML classified)
     category = Column(String, nullable=True, index=True)
 
     # ── ML-enriched fields ──
     source = Column(String(16), nullable=True, default="gdelt")  # "gdelt" | "valyu"
-    title = Column(String, nullable=True)
-    content = Column(String, nullable=True)
     category_confidence = Column(Float, nullable=True)  # 0-1 ML confidence
     severity_index = Column(Float, nullable=True)  # 0-100 NLP severity
     sentiment_score = Column(Float, nullable=True)  # -1 to 1 polarity
-    entities_json = Column(String, nullable=True)  # JSON: {countries, orgs, persons}
     threat_level = Column(String(16), nullable=True)  # critical/high/medium/low/info
+    severity_version = Column(String(16), nullable=True, index=True)  # SEVERITY_ALGORITHM_VERSION used
+
+    # GDELT Actor1/Actor2 country (CAMEO code resolved to ISO-2); the pair feeds country_edges_daily
+    actor1_country = Column(String(2), nullable=True)
+    actor2_country = Column(String(2), nullable=True)
+
+    # Quadkey of the event point (or its country centroid) at GRID_MAX_LEVEL; see pipeline/event_grid.py
+    grid_cell = Column(String(16), nullable=True)
+
+    # Composite indexes matched to hot query paths (checked by benchmarks/explain_routes.py)
+    __table_args__ = (
+        # Country insights: country = ? AND date >= ? ORDER BY date DESC
+        Index("ix_events_country_date", "country", "date"),
+        # Spike evidence: date/country/category lookup ordered by tone; covers the id it returns
+        Index("ix_events_date_country_category_tone", "date", "country", "category", "avg_tone", "id"),
+        # /events and /events/combined: newest-first keyset on (date, ts, id)
+        Index("ix_events_date_ts_id", "date", "ts", "id"),
+        # Events inside a grid cell (quadkey prefix range) over a date range
+        Index("ix_events_grid_cell_date", "grid_cell", "date"),
+    )
+
+
+class EventText(Base):
+    """
+    Bulky text of an event, one row per event id, kept out of events so that
+    table's pages hold only the narrow columns. Written by upsert_events.
+    """
+
+    __tablename__ = "event_text"
+
+    event_id = Column(String, primary_key=True)  # events.id
+    title = Column(String, nullable=True)
+    content = Column(String, nullable=True)  # Valyu article text, truncated at ingest
+    source_url = Column(String, nullable=True)
+    entities_json = Column(String, nullable=True)  # JSON: {countries, orgs, persons}
+
+
+# Columns moved from events to event_text; upsert_events routes them there
+EVENT_TEXT_COLUMNS = ("title", "content", "source_url", "entities_json")
+
+
+class EventEntity(Base):
+    """
+    One named entity (country, organization, person, location) mentioned by an
+    event; the normalized form of EventText.entities_json, written at ingest.
+    """
+
+    __tablename__ = "event_entities"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(String, nullable=False)  # indexed by uq_event_entity (leading column)
+    date = Column(Date, nullable=False)  # event date, copied for date-bounded lookups
+
+    type = Column(String(16), nullable=False)  # "country" | "organization" | "person" | "location"
+    value = Column(String, nullable=False)  # lookup key: casefolded, whitespace collapsed
+    name = Column(String, nullable=False)  # as extracted, for display
+    iso2 = Column(String(2), nullable=True)  # countries only
+
+    __table_args__ = (
+        UniqueConstraint("event_id", "type", "value", name="uq_event_entity"),
+        # GET /entities/{value}/events: (type, value) lookup, newest first
+        Index("ix_event_entities_type_value", "type", "value", "date", "event_id"),
+        # Events mentioning a country in a date range
+        Index("ix_event_entities_iso2_date", "iso2", "date"),
+    )
+
+
+class CountryEdgeDaily(Base):
+    """
+    Daily country-country interaction edge for the network view: GDELT actor
+    pairs and countries co-mentioned by one Valyu article. Undirected; stored
+    with country_a < country_b. Rebuilt per date whenever that date's events change.
+    """
+
+    __tablename__ = "country_edges_daily"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, nullable=False)
+    country_a = Column(String(2), nullable=False)
+    country_b = Column(String(2), nullable=False)
+
+    weight = Column(Integer, nullable=False)  # events linking the pair that day
+    mean_severity = Column(Float, nullable=True)
+    conflict_count = Column(Integer, nullable=False, default=0)  # GDELT quad_class 3/4 (conflict) events
+
+    __table_args__ = (
+        UniqueConstraint("date", "country_a", "country_b", name="uq_country_edge_daily"),
+        # One country's edges over a date range
+        Index("ix_country_edges_daily_a_date", "country_a", "date"),
+        Index("ix_country_edges_daily_b_date", "country_b", "date"),
+    )
+
+
+class EventGridDaily(Base):
+    """
+    Daily event count per spatial grid cell (Web Mercator tile) at each of the
+    pre-aggregated cluster levels, for GET /map/clusters. Rebuilt per date
+    whenever that date's events change.
+    """
+
+    __tablename__ = "event_grid_daily"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, nullable=False)
+    level = Column(Integer, nullable=False)
+    x = Column(Integer, nullable=False)
+    y = Column(Integer, nullable=False)
+    cell = Column(String(16), nullable=False)  # quadkey of (x, y, level)
+
+    event_count = Column(Integer, nullable=False)
+    max_severity = Column(Float, nullable=True)
+    lat = Column(Float, nullable=False)  # mean event position, for placing the cluster
+    lon = Column(Float, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("date", "level", "cell", name="uq_event_grid_daily"),
+        # Bounding-box read: level = ? AND x range, then y and date checked in the index
+        Index("ix_event_grid_daily_level_x_y_date", "level", "x", "y", "date"),
+    )
 
 
 class DailyMetric(Base):
@@ -129,6 +246,41 @@ class DailyMetric(Base):
 
     __table_args__ = (
         UniqueConstraint("date", "country", "category", name="uq_daily_metrics_key"),
+        # Per-country time series (sparklines, decomposition, history)
+        Index("ix_daily_metrics_country_date", "country", "date"),
+        # Day 2 rolling baselines: ORDER BY country, category, date
+        Index("ix_daily_metrics_country_category_date", "country", "category", "date"),
+    )
+
+
+class MetricRollup(Base):
+    """
+    Weekly or monthly rollup of daily_metrics per (country, category), and per
+    country across categories (category = "*"). Weeks start on Monday. Kept in
+    step with daily_metrics by pipeline/rollups.py; long-range trend reads use
+    it instead of re-grouping daily rows.
+    """
+
+    __tablename__ = "metric_rollups"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    granularity = Column(String(8), nullable=False)  # "week" | "month"
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)  # last day of the period
+    country = Column(String(2), nullable=False)
+    category = Column(String, nullable=False)  # "*" = all categories
+
+    days = Column(Integer, nullable=False)  # days with data in the period
+    event_count = Column(Integer, nullable=False)
+    mean_severity = Column(Float, nullable=True)
+    max_severity = Column(Float, nullable=True)
+    max_risk = Column(Float, nullable=True)
+    risk_tier = Column(String(16), nullable=True)  # most frequent daily tier (ties: the more severe)
+    updated_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Country series: granularity = ? AND category = ? AND country IN (...) AND period_start >= ?
+        UniqueConstraint("granularity", "category", "country", "period_start", name="uq_metric_rollups_key"),
     )
 
 
@@ -190,14 +342,42 @@ class RiskSnapshot(Base):
     )
 
 
+class CountrySummary(Base):
+    """
+    Materialized per-country map row (latest data within 7 days of the newest date),
+    refreshed at the end of each pipeline run. Countries without data are stored
+    at baseline (has_data=False) so GET /map is a single read.
+    """
+
+    __tablename__ = "country_summary"
+
+    country = Column(String(2), primary_key=True)
+    lat = Column(Float, nullable=False)
+    lon = Column(Float, nullable=False)
+    has_data = Column(Boolean, nullable=False, index=True)
+    latest_date = Column(Date, nullable=True)
+    severity_index = Column(Float, nullable=True)
+    risk_score = Column(Float, nullable=True)
+    event_count = Column(Integer, nullable=True)
+    risk_tier = Column(String(16), nullable=True)
+    risk_percentile = Column(Float, nullable=True)
+    trend_7d = Column(String(16), nullable=True)
+    trend_30d = Column(String(16), nullable=True)
+    avg_sentiment = Column(Float, nullable=True)
+    top_category = Column(String, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+
+
 class RiskTierConfig(Base):
     """
-    Stores K-means/Jenks risk tier boundaries. Recomputed daily.
+    Stores K-means/Jenks risk tier boundaries. Recomputed once per pipeline run.
+    One row per tier; all rows from one fit share a version (latest version wins).
     """
 
     __tablename__ = "risk_tier_config"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    version = Column(Integer, nullable=True, index=True)
     method = Column(String(16), nullable=False)  # "kmeans" | "jenks"
     tier = Column(String(16), nullable=False)  # critical/high/medium/low/info
     lower_bound = Column(Float, nullable=False)
@@ -206,3 +386,75 @@ class RiskTierConfig(Base):
     n_samples = Column(Integer, nullable=True)
     created_at = Column(DateTime, nullable=True)
 
+
+
+class PipelineRun(Base):
+    """
+    One background pipeline job (re-enrich, Valyu run, ...): status, progress and per-stage timings.
+    """
+
+    __tablename__ = "pipeline_runs"
+
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(32), nullable=False, index=True)  # "re_enrich" | "run_valyu" | ...
+    status = Column(String(16), nullable=False, index=True)  # queued/running/succeeded/failed
+    progress = Column(Float, nullable=True)  # 0-1
+    message = Column(String, nullable=True)
+    stages_json = Column(String, nullable=True)  # JSON: [{name, duration_s, rows}, ...]
+    result_json = Column(String, nullable=True)  # JSON summary returned by the job
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=True, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class PipelineCheckpoint(Base):
+    """
+    Per-stage checkpoint for scheduled pipelines (e.g. fingerprint of a GDELT ZIP already normalized).
+    UPSERT key: (pipeline, stage, key).
+    """
+
+    __tablename__ = "pipeline_checkpoints"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    pipeline = Column(String(16), nullable=False)  # "gdelt" | "valyu"
+    stage = Column(String(32), nullable=False)
+    key = Column(String, nullable=False)
+    fingerprint = Column(String(64), nullable=True)
+    rows = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("pipeline", "stage", "key", name="uq_pipeline_checkpoints_key"),
+    )
+
+
+class DataVersion(Base):
+    """
+    Single-row counter bumped whenever a pipeline commits new data.
+    Read endpoints key their response cache and ETags on it.
+    """
+
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
+
+class StreamEvent(Base):
+    """
+    Outbox of change notifications for GET /stream (new spikes, risk tier changes,
+    pipeline completions). Written in the same transaction as the data it describes;
+    the id is the SSE event id clients resume from with Last-Event-ID.
+    """
+
+    __tablename__ = "stream_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(16), nullable=False)  # "spikes" | "risk_tier" | "pipeline" | "job"
+    payload_json = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
+
+    # Never reuse ids after pruning, or a resuming client could skip new events
+    __table_args__ = {"sqlite_autoincrement": True}
@@ -0,0 +1,111 @@
+"""
+Keyset (cursor) pagination and NDJSON streaming for list endpoints.
+
+Pages are ordered by a fixed key, e.g. (date, ts, id) descending, and the cursor
+is the key of the last row served, so page N costs the same as page 1 and rows
+inserted by a pipeline run never shift or duplicate rows across pages. Cursors
+are opaque base64url-encoded JSON; clients pass them back unchanged.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from .db import ReadSessionLocal
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+STREAM_BATCH_SIZE = 1000
+
+# (column or SQL expression, descending?)
+SortKey = Tuple[ColumnElement, bool]
+
+
+def _encode_value(v: Any) -> Any:
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return v
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parsers: Sequence[Callable[[Any], Any]]) -> List[Any]:
+    """Decode a cursor into typed key values (one parser per sort key); 400 on a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("wrong cursor arity")
+        return [parse(v) for parse, v in zip(parsers, values)]
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def order_by_keys(keys: Sequence[SortKey]) -> List[ColumnElement]:
+    return [col.desc() if desc else col.asc() for col, desc in keys]
+
+
+def keyset_after(keys: Sequence[SortKey], values: Sequence[Any]) -> ColumnElement:
+    """
+    Predicate selecting rows strictly after `values` in the order given by `keys`.
+    Expanded to (k1 > v1) OR (k1 = v1 AND k2 > v2) ... so mixed directions work
+    and each branch can still use a (k1, k2, ...) index.
+    """
+    branches = []
+    for i, (col, desc) in enumerate(keys):
+        prefix = [keys[j][0] == values[j] for j in range(i)]
+        step = col < values[i] if desc else col > values[i]
+        branches.append(and_(*prefix, step))
+    return or_(*branches)
+
+
+def ndjson_response(
+    build_stmt: Callable[[], Any],
+    serialize: Callable[[Any], Union[str, bytes]],
+    batch_size: int = STREAM_BATCH_SIZE,
+    extra: Optional[Callable[[], Iterable[Any]]] = None,
+) -> StreamingResponse:
+    """
+    Stream every row of `build_stmt()` as one JSON object per line.
+
+    Rows are fetched in batches of `batch_size` on a session owned by the
+    generator (the request session may be closed before streaming finishes),
+    so memory stays constant however large the export is. Rows from `extra()`
+    (e.g. archived events) follow the database rows, serialized the same way.
+    """
+
+    def generate() -> Iterator[bytes]:
+        session = ReadSessionLocal()
+        try:
+            result = session.execute(build_stmt().execution_options(yield_per=batch_size))
+            for row in result:
+                line = serialize(row)
+                yield (line if isinstance(line, bytes) else line.encode()) + b"\n"
+            for row in extra() if extra is not None else ():
+                line = serialize(row)
+                yield (line if isinstance(line, bytes) else line.encode()) + b"\n"
+        finally:
+            session.close()
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def split_page(rows: Sequence[Any], limit: int, key_of: Callable[[Any], Sequence[Any]]) -> Tuple[List[Any], Optional[str]]:
+    """
+    Queries fetch limit + 1 rows; the extra row only signals that another page exists.
+    Returns (page rows, cursor for the next page or None).
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit:
+        return page, None
+    return page, encode_cursor(key_of(page[-1]))
@@ -8,13 +8,12 @@ negative goldstein magnitude, negative tone, quad_class intensity).
 from __future__ import annotations
 
 import logging
-from datetime import date
-
 import pandas as pd
-from sqlalchemy import select, delete
+from sqlalchemy import case, delete, func, select
 from sqlalchemy.orm import Session
 
 from ..models import Event, DailyMetric
+from .retention import archive_horizon
 
 logger = logging.getLogger("events-risk-dashboard.aggregate")
 
@@ -52,73 +51,72 @@ def aggregate_daily_metrics(session: Session) -> int:
     """
     Aggregate events into daily_metrics for all available dates.
     Includes severity layer: mean_goldstein, min_goldstein, mean_tone,
-    pct_negative_tone, severity_index. Bulk write.
+    pct_negative_tone, severity_index. The GROUP BY runs in the database;
+    only the per-group severity index is computed in Python. Bulk write.
+
+    Dates before the retention archive horizon no longer have events in the
+    table, so their daily_metrics rows are kept as they are.
     """
     logger.info("aggregating daily metrics")
 
-    stmt = select(
-        Event.date,
-        Event.country,
-        Event.category,
-        Event.avg_tone,
-        Event.goldstein,
-        Event.quad_class,
-    ).where(Event.category.isnot(None))
-
-    rows = session.execute(stmt).all()
-    if not rows:
-        logger.info("no events to aggregate")
-        return 0
-
-    df = pd.DataFrame(
-        rows,
-        columns=["date", "country", "category", "avg_tone", "goldstein", "quad_class"],
+    country = func.coalesce(func.nullif(Event.country, ""), "XX").label("country")
+    quad_frac = case(
+        (Event.quad_class.is_(None), 0.0),
+        (Event.quad_class >= 4, 1.0),
+        (Event.quad_class <= 0, 0.0),
+        else_=Event.quad_class / 4.0,
     )
-    df["country"] = df["country"].fillna("XX").replace("", "XX")
-    df["quad_class"] = pd.to_numeric(df["quad_class"], errors="coerce")
-    df["quad_frac"] = (df["quad_class"] / 4.0).clip(0, 1).fillna(0)
-    df["negative_tone"] = (df["avg_tone"] < 0).astype(float)
-
-    grouped = (
-        df.groupby(["date", "country", "category"])
-        .agg(
-            event_count=("date", "size"),
-            avg_tone=("avg_tone", "mean"),
-            mean_goldstein=("goldstein", "mean"),
-            min_goldstein=("goldstein", "min"),
-            pct_negative_tone=("negative_tone", "mean"),
-            quad_intensity=("quad_frac", "mean"),
+    stmt = (
+        select(
+            Event.date,
+            country,
+            Event.category,
+            func.count().label("event_count"),
+            func.avg(Event.avg_tone).label("avg_tone"),
+            func.avg(Event.goldstein).label("mean_goldstein"),
+            func.min(Event.goldstein).label("min_goldstein"),
+            func.avg(case((Event.avg_tone < 0, 1.0), else_=0.0)).label("pct_negative_tone"),
+            func.avg(quad_frac).label("quad_intensity"),
         )
-        .reset_index()
-    )
-    grouped["mean_tone"] = grouped["avg_tone"]
-    grouped["severity_index"] = grouped.apply(
-        lambda r: _severity_index_row(
-            r.get("min_goldstein"),
-            r.get("mean_tone"),
-            r.get("pct_negative_tone", 0),
-            r.get("quad_intensity", 0),
-        ),
-        axis=1,
+        .where(Event.category.isnot(None))
+        .group_by(Event.date, country, Event.category)
     )
+    horizon = archive_horizon(session)
+    if horizon is not None:
+        stmt = stmt.where(Event.date >= horizon)
 
-    session.execute(delete(DailyMetric))
-    count = 0
-    for _, row in grouped.iterrows():
-        dm = DailyMetric(
-            date=row["date"],
-            country=row["country"],
-            category=row["category"],
-            event_count=int(row["event_count"]),
-            avg_tone=float(row["avg_tone"]) if pd.notna(row["avg_tone"]) else None,
-            mean_tone=float(row["mean_tone"]) if pd.notna(row["mean_tone"]) else None,
-            mean_goldstein=float(row["mean_goldstein"]) if pd.notna(row["mean_goldstein"]) else None,
-            min_goldstein=float(row["min_goldstein"]) if pd.notna(row["min_goldstein"]) else None,
-            pct_negative_tone=float(row["pct_negative_tone"]) if pd.notna(row["pct_negative_tone"]) else None,
-            severity_index=float(row["severity_index"]) if pd.notna(row["severity_index"]) else None,
-        )
-        session.add(dm)
-        count += 1
+    groups = session.execute(stmt).all()
+    if not groups:
+        logger.info("no events to aggregate")
+        return 0
+
+    def _f(v):
+        return float(v) if v is not None else None
+
+    mappings = [
+        {
+            "date": g.date,
+            "country": g.country,
+            "category": g.category,
+            "event_count": int(g.event_count),
+            "avg_tone": _f(g.avg_tone),
+            "mean_tone": _f(g.avg_tone),
+            "mean_goldstein": _f(g.mean_goldstein),
+            "min_goldstein": _f(g.min_goldstein),
+            "pct_negative_tone": _f(g.pct_negative_tone),
+            "severity_index": _severity_index_row(
+                _f(g.min_goldstein), _f(g.avg_tone), _f(g.pct_negative_tone) or 0.0, _f(g.quad_intensity) or 0.0
+            ),
+        }
+        for g in groups
+    ]
+
+    if horizon is not None:
+        session.execute(delete(DailyMetric).where(DailyMetric.date >= horizon))
+    else:
+        session.execute(delete(DailyMetric))
+    session.bulk_insert_mappings(DailyMetric, mappings)
+    count = len(mappings)
 
     logger.info("finished aggregating daily metrics", extra={"rows": count})
     return count
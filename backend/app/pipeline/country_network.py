@@ -0,0 +1,116 @@
+"""
+Country interaction network: country_edges_daily, one row per (date, country
+pair), read by GET /network.
+
+Edges come from two sources that never overlap:
+  - GDELT: Actor1/Actor2 country pairs (events.actor1_country/actor2_country)
+  - Valyu: countries co-mentioned by one article (event_entities, type country)
+
+Ingest calls refresh_country_edges() with the dates it touched, and only those
+dates are rebuilt from the events, so the table stays current without a full
+pass and re-ingesting a file never double-counts.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pycountry
+from sqlalchemy import and_, case, delete, func, select
+from sqlalchemy.orm import Session, aliased
+
+from ..models import CountryEdgeDaily, Event, EventEntity
+from .entity_index import ENTITY_COUNTRY
+from .retention import live_dates
+
+logger = logging.getLogger(__name__)
+
+# GDELT QuadClass: 3 = verbal conflict, 4 = material conflict
+CONFLICT_QUAD_CLASSES = (3, 4)
+
+_DATE_CHUNK = 100
+
+
+@lru_cache(maxsize=512)
+def cameo_to_iso2(code: Optional[str]) -> Optional[str]:
+    """GDELT actor country (CAMEO, ISO 3166 alpha-3 for countries) -> ISO-2; None for regions/unknown."""
+    if not code or not isinstance(code, str) or len(code.strip()) != 3:
+        return None
+    country = pycountry.countries.get(alpha_3=code.strip().upper())
+    return country.alpha_2 if country else None
+
+
+def _conflicts():
+    return func.sum(case((Event.quad_class.in_(CONFLICT_QUAD_CLASSES), 1), else_=0))
+
+
+def _actor_pair_edges(session: Session, dates: List[date]):
+    a1, a2 = Event.actor1_country, Event.actor2_country
+    low = case((a1 < a2, a1), else_=a2)
+    high = case((a1 < a2, a2), else_=a1)
+    return session.execute(
+        select(Event.date, low, high, func.count(), func.avg(Event.severity_index), _conflicts())
+        .where(Event.date.in_(dates), a1.isnot(None), a2.isnot(None), a1 != a2)
+        .group_by(Event.date, low, high)
+    ).all()
+
+
+def _co_mention_edges(session: Session, dates: List[date]):
+    e1, e2 = aliased(EventEntity), aliased(EventEntity)
+    return session.execute(
+        select(Event.date, e1.iso2, e2.iso2, func.count(), func.avg(Event.severity_index), _conflicts())
+        .select_from(Event)
+        .join(e1, and_(e1.event_id == Event.id, e1.type == ENTITY_COUNTRY))
+        .join(e2, and_(e2.event_id == Event.id, e2.type == ENTITY_COUNTRY, e2.iso2 > e1.iso2))
+        .where(Event.date.in_(dates), e1.iso2.isnot(None))
+        .group_by(Event.date, e1.iso2, e2.iso2)
+    ).all()
+
+
+def refresh_country_edges(session: Session, dates: Iterable[date]) -> int:
+    """
+    Rebuild country_edges_daily for the given dates from the events, except
+    dates already archived by retention. Returns edges written.
+    """
+    dates = live_dates(session, dates)
+    written = 0
+    for i in range(0, len(dates), _DATE_CHUNK):
+        chunk = dates[i:i + _DATE_CHUNK]
+        edges: Dict[Tuple[date, str, str], List[float]] = {}
+        for rows in (_actor_pair_edges(session, chunk), _co_mention_edges(session, chunk)):
+            for d, a, b, weight, mean_severity, conflicts in rows:
+                acc = edges.setdefault((d, a, b), [0, 0.0, 0, 0])  # weight, severity sum, severity n, conflicts
+                acc[0] += weight
+                if mean_severity is not None:
+                    acc[1] += float(mean_severity) * weight
+                    acc[2] += weight
+                acc[3] += conflicts or 0
+        session.execute(delete(CountryEdgeDaily).where(CountryEdgeDaily.date.in_(chunk)))
+        session.bulk_insert_mappings(CountryEdgeDaily, [
+            {
+                "date": d, "country_a": a, "country_b": b, "weight": int(w),
+                "mean_severity": round(sev / n, 2) if n else None, "conflict_count": int(c),
+            }
+            for (d, a, b), (w, sev, n, c) in edges.items()
+        ])
+        written += len(edges)
+    logger.info("Refreshed country edges", extra={"dates": len(dates), "edges": written})
+    return written
+
+
+def rebuild_country_edges(session: Session) -> int:
+    """Rebuild country_edges_daily for every event date (existing databases). Returns edges written."""
+    dates = session.execute(select(Event.date).distinct()).scalars().all()
+    return refresh_country_edges(session, dates)
+
+
+if __name__ == "__main__":
+    from ..db import Base, engine, get_db_session
+    from ..logging_config import setup_logging
+
+    setup_logging()
+    Base.metadata.create_all(bind=engine)
+    with get_db_session() as session:
+        print(f"country_edges_daily rows written: {rebuild_country_edges(session)}")
@@ -0,0 +1,198 @@
+"""
+Per-country map summary: latest severity, risk, event count, tier, percentile,
+trends, sentiment and top category per country.
+
+compute_country_rows() holds the aggregation that GET /map used to run on every
+request; refresh_country_summary() materializes it into country_summary at the
+end of each pipeline run so the endpoint is a single indexed read, and publishes
+countries whose tier changed to GET /stream.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from ..country_centroids import COUNTRY_CENTROIDS, get_centroid
+from ..models import CountrySummary, DailyMetric
+from ..pipeline_config import STREAM_MAX_ITEMS
+from ..stream import EVENT_RISK_TIER, publish
+from .risk_tiers import load_latest_tier_config, tier_for
+
+logger = logging.getLogger("events-risk-dashboard.country_summary")
+
+
+def baseline_row(code: str, coords) -> Dict[str, Any]:
+    """Map row for a country with no data."""
+    return {
+        "country": code,
+        "lat": coords[0],
+        "lon": coords[1],
+        "has_data": False,
+        "latest_date": None,
+        "severity_index": 0,
+        "risk_score": 0,
+        "event_count": 0,
+        "risk_tier": "none",
+        "risk_percentile": None,
+        "trend_7d": None,
+        "trend_30d": None,
+        "avg_sentiment": None,
+        "top_category": None,
+    }
+
+
+def compute_country_rows(
+    session: Session,
+    date_param: Optional[date] = None,
+    include_all: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Per-country aggregates from daily_metrics.
+
+    With date_param, uses that date only; otherwise the latest data per country
+    across the last 7 days. With include_all, countries without data are appended
+    at baseline severity.
+    """
+    if date_param:
+        # Specific date requested — use that date only
+        date_filter = DailyMetric.date == date_param
+    else:
+        # No specific date — use last 7 days and take latest per country
+        latest = session.execute(
+            select(DailyMetric.date).order_by(DailyMetric.date.desc()).limit(1)
+        ).scalars().first()
+        if not latest:
+            if include_all:
+                return [baseline_row(code, coords) for code, coords in COUNTRY_CENTROIDS.items()]
+            return []
+        date_filter = DailyMetric.date >= latest - timedelta(days=7)
+
+    # Get the latest date per country (within date range)
+    latest_per_country = (
+        select(
+            DailyMetric.country,
+            func.max(DailyMetric.date).label("latest_date"),
+        )
+        .where(date_filter)
+        .where(DailyMetric.country.isnot(None))
+        .group_by(DailyMetric.country)
+    ).subquery()
+
+    # Get per-country aggregates using their latest date
+    rows = session.execute(
+        select(
+            DailyMetric.country,
+            latest_per_country.c.latest_date,
+            func.max(DailyMetric.severity_index).label("severity_index"),
+            func.max(DailyMetric.risk_score).label("risk_score"),
+            func.sum(DailyMetric.event_count).label("event_count"),
+            func.avg(DailyMetric.avg_sentiment).label("avg_sentiment"),
+        )
+        .join(
+            latest_per_country,
+            (DailyMetric.country == latest_per_country.c.country)
+            & (DailyMetric.date == latest_per_country.c.latest_date),
+        )
+        .group_by(DailyMetric.country, latest_per_country.c.latest_date)
+    ).all()
+
+    # Get risk tiers and trends (from the metric with highest severity per country)
+    tier_data: Dict[str, Dict[str, Any]] = {}
+    top_rows = session.execute(
+        select(
+            DailyMetric.country,
+            DailyMetric.category,
+            DailyMetric.risk_tier,
+            DailyMetric.risk_percentile,
+            DailyMetric.trend_7d,
+            DailyMetric.trend_30d,
+        )
+        .join(
+            latest_per_country,
+            (DailyMetric.country == latest_per_country.c.country)
+            & (DailyMetric.date == latest_per_country.c.latest_date),
+        )
+        .order_by(DailyMetric.severity_index.desc())
+    ).all()
+    for m in top_rows:
+        if m.country and m.country not in tier_data:
+            tier_data[m.country] = {
+                "risk_tier": m.risk_tier,
+                "risk_percentile": m.risk_percentile,
+                "trend_7d": m.trend_7d,
+                "trend_30d": m.trend_30d,
+                "top_category": m.category,
+            }
+
+    # Tiers come from the stored model so /map agrees with /analytics/risk-tiers
+    tiers = load_latest_tier_config(session)
+
+    countries_with_data = set()
+    out: List[Dict[str, Any]] = []
+    for country, latest_date, severity_index, risk_score, event_count, avg_sentiment in rows:
+        if not country:
+            continue
+        centroid = get_centroid(country)
+        if centroid is None:
+            continue
+        countries_with_data.add(country)
+
+        extra = tier_data.get(country, {})
+        out.append({
+            "country": country,
+            "lat": centroid[0],
+            "lon": centroid[1],
+            "has_data": True,
+            "latest_date": latest_date,
+            "severity_index": float(severity_index) if severity_index is not None else None,
+            "risk_score": float(risk_score) if risk_score is not None else None,
+            "event_count": int(event_count) if event_count is not None else None,
+            "risk_tier": tier_for(severity_index, tiers, fallback=extra.get("risk_tier")),
+            "risk_percentile": float(extra["risk_percentile"]) if extra.get("risk_percentile") is not None else None,
+            "trend_7d": extra.get("trend_7d"),
+            "trend_30d": extra.get("trend_30d"),
+            "avg_sentiment": float(avg_sentiment) if avg_sentiment is not None else None,
+            "top_category": extra.get("top_category"),
+        })
+
+    # Add remaining countries at baseline
+    if include_all:
+        for code, coords in COUNTRY_CENTROIDS.items():
+            if code not in countries_with_data:
+                out.append(baseline_row(code, coords))
+
+    return out
+
+
+def refresh_country_summary(session: Session) -> int:
+    """
+    Rebuild country_summary from daily_metrics (all countries, including baselines).
+    Returns number of rows written.
+    """
+    rows = compute_country_rows(session, date_param=None, include_all=True)
+    previous = dict(session.execute(select(CountrySummary.country, CountrySummary.risk_tier)).all())
+    now = datetime.now(timezone.utc)
+    session.execute(delete(CountrySummary))
+    session.bulk_insert_mappings(CountrySummary, [{**r, "updated_at": now} for r in rows])
+    session.flush()
+    if previous:
+        _publish_tier_changes(session, previous, rows)
+    logger.info("country summary refreshed", extra={"rows": len(rows)})
+    return len(rows)
+
+
+def _publish_tier_changes(session: Session, previous: Dict[str, Optional[str]], rows: List[Dict[str, Any]]) -> None:
+    """Notify /stream clients of countries whose map tier changed in this refresh."""
+    changes = [
+        {"country": r["country"], "from": previous.get(r["country"]), "to": r["risk_tier"],
+         "severity_index": r["severity_index"]}
+        for r in rows
+        if previous.get(r["country"]) != r["risk_tier"]
+    ]
+    if changes:
+        changes.sort(key=lambda c: c["severity_index"] or 0, reverse=True)
+        publish(session, EVENT_RISK_TIER, {"count": len(changes), "changes": changes[:STREAM_MAX_ITEMS]})
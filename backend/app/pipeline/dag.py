@@ -0,0 +1,206 @@
+"""
+Stage-level DAG runner for scheduled pipelines.
+
+Each stage runs in its own transaction (get_db_session), so a failure in a late
+stage (e.g. Day 2) keeps the work already committed by earlier stages (e.g.
+normalize). A stage is skipped when its upstream failed, or when none of its
+upstream stages produced new data. A stage that changed data bumps the shared
+data version (cache.py) in its own transaction, and the run's completion is
+published to GET /stream (stream.py). Durations, row counts and statuses are
+recorded through the JobContext (persisted to pipeline_runs for background jobs).
+
+Checkpoints (pipeline_checkpoints) let a stage remember what it already
+processed, e.g. the content hash of each GDELT ZIP it normalized.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..cache import bump_data_version
+from ..db import get_db_session
+from ..jobs import JobContext
+from ..models import PipelineCheckpoint
+from ..stream import EVENT_PIPELINE, notify, prune_stream_events, publish
+
+logger = logging.getLogger("events-risk-dashboard.dag")
+
+STAGE_OK = "ok"
+STAGE_SKIPPED = "skipped"
+STAGE_FAILED = "failed"
+
+
+@dataclass
+class StageResult:
+    """Outcome of one stage; `changed` tells downstream stages whether there is new data."""
+    rows: int = 0
+    changed: bool = True
+    output: Any = None
+
+
+@dataclass
+class Stage:
+    """
+    A pipeline stage. `run(session, upstream_results)` returns a StageResult.
+    always_run: run even when upstream produced no new data (still skipped if upstream failed).
+    """
+    name: str
+    run: Callable[[Session, Dict[str, StageResult]], StageResult]
+    depends_on: Tuple[str, ...] = ()
+    always_run: bool = False
+
+
+@dataclass
+class DagRun:
+    pipeline: str
+    results: Dict[str, StageResult] = field(default_factory=dict)
+    statuses: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def failed(self) -> List[str]:
+        return [name for name, status in self.statuses.items() if status == STAGE_FAILED]
+
+
+class DagStageError(RuntimeError):
+    """Raised after a DAG run in which at least one stage failed."""
+
+
+def _toposort(stages: List[Stage]) -> List[Stage]:
+    by_name = {s.name: s for s in stages}
+    ordered: List[Stage] = []
+    visiting: set = set()
+    done: set = set()
+
+    def visit(s: Stage) -> None:
+        if s.name in done:
+            return
+        if s.name in visiting:
+            raise ValueError(f"cycle in pipeline DAG at stage {s.name!r}")
+        visiting.add(s.name)
+        for dep in s.depends_on:
+            if dep not in by_name:
+                raise ValueError(f"stage {s.name!r} depends on unknown stage {dep!r}")
+            visit(by_name[dep])
+        visiting.discard(s.name)
+        done.add(s.name)
+        ordered.append(s)
+
+    for s in stages:
+        visit(s)
+    return ordered
+
+
+def run_dag(
+    pipeline: str,
+    stages: List[Stage],
+    ctx: Optional[JobContext] = None,
+    *,
+    raise_on_failure: bool = True,
+) -> DagRun:
+    """
+    Run stages in dependency order, each in its own committed transaction.
+    Raises DagStageError at the end if any stage failed (unless raise_on_failure=False).
+    """
+    ctx = ctx or JobContext()
+    run = DagRun(pipeline=pipeline)
+    ordered = _toposort(stages)
+
+    blocked: set = set()  # failed stages and everything downstream of them
+    for i, stage in enumerate(ordered):
+        with ctx.stage(stage.name) as record:
+            if any(dep in blocked for dep in stage.depends_on):
+                blocked.add(stage.name)
+                run.statuses[stage.name] = STAGE_SKIPPED
+                record.update(status=STAGE_SKIPPED, reason="upstream failed")
+            elif (
+                stage.depends_on
+                and not stage.always_run
+                and not any(run.results[dep].changed for dep in stage.depends_on if dep in run.results)
+            ):
+                run.statuses[stage.name] = STAGE_SKIPPED
+                record.update(status=STAGE_SKIPPED, reason="no new data upstream")
+            else:
+                try:
+                    with get_db_session() as session:
+                        result = stage.run(session, run.results)
+                        if result.changed:
+                            # Committed with the stage, so API caches never see a stale version
+                            bump_data_version(session)
+                    notify()  # push this stage's /stream events now if clients are in this process
+                    run.results[stage.name] = result
+                    run.statuses[stage.name] = STAGE_OK
+                    record.update(status=STAGE_OK, rows=result.rows, changed=result.changed)
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("pipeline stage failed", extra={"pipeline": pipeline, "stage": stage.name})
+                    blocked.add(stage.name)
+                    run.statuses[stage.name] = STAGE_FAILED
+                    record.update(status=STAGE_FAILED, error=str(exc)[:500])
+        ctx.progress((i + 1) / len(ordered), f"{pipeline}: {stage.name} {run.statuses[stage.name]}")
+
+    logger.info("pipeline dag finished", extra={"pipeline": pipeline, "statuses": run.statuses})
+    _publish_run_finished(run)
+    if run.failed and raise_on_failure:
+        raise DagStageError(f"{pipeline} stages failed: {', '.join(run.failed)}")
+    return run
+
+
+def _publish_run_finished(run: DagRun) -> None:
+    """Pipeline-completion event for GET /stream; also trims old stream events."""
+    try:
+        with get_db_session() as session:
+            publish(session, EVENT_PIPELINE, {"pipeline": run.pipeline, "statuses": run.statuses, "failed": run.failed})
+            prune_stream_events(session)
+        notify()
+    except Exception:  # noqa: BLE001
+        logger.exception("could not publish pipeline completion", extra={"pipeline": run.pipeline})
+
+
+# ── Checkpoints ──────────────────────────────────────────────────────────
+
+def file_fingerprint(path: Path) -> str:
+    """SHA-256 of file contents (a re-downloaded but unchanged file keeps its fingerprint)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def get_checkpoint(session: Session, pipeline: str, stage: str, key: str) -> Optional[PipelineCheckpoint]:
+    return session.execute(
+        select(PipelineCheckpoint).where(
+            PipelineCheckpoint.pipeline == pipeline,
+            PipelineCheckpoint.stage == stage,
+            PipelineCheckpoint.key == key,
+        )
+    ).scalars().first()
+
+
+def set_checkpoint(
+    session: Session,
+    pipeline: str,
+    stage: str,
+    key: str,
+    fingerprint: Optional[str],
+    rows: Optional[int] = None,
+) -> None:
+    """UPSERT a checkpoint row; committed together with the stage's own writes."""
+    now = datetime.now(timezone.utc)
+    existing = get_checkpoint(session, pipeline, stage, key)
+    if existing:
+        existing.fingerprint = fingerprint
+        existing.rows = rows
+        existing.updated_at = now
+    else:
+        session.add(
+            PipelineCheckpoint(
+                pipeline=pipeline, stage=stage, key=key, fingerprint=fingerprint, rows=rows, updated_at=now
+            )
+        )
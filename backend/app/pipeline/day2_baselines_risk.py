@@ -3,7 +3,8 @@ Day 2 pipeline v2: robust rolling baseline (median+MAD or mean+std), risk scorin
 
 - Step 4: Rolling center/dispersion, baseline_quality (low/ok), z_score with variance floor; bulk update.
 - Step 5: z_used (one_sided or two_sided), risk_score + reasons_json + pipeline_version; bulk update.
-- Step 6: Spike UPSERT (no table clear), evidence by |avg_tone| desc; store full audit fields.
+- Step 6: Spike UPSERT (no table clear), evidence by |avg_tone| desc; store full audit fields;
+  newly detected spikes are published to GET /stream.
 """
 from __future__ import annotations
 
@@ -17,6 +18,7 @@ import pandas as pd
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from .. import analytics_engine
 from ..models import Event, DailyMetric, Spike
 from ..pipeline_config import (
     BASELINE_METHOD,
@@ -27,7 +29,11 @@ from ..pipeline_config import (
     SPIKE_EVIDENCE_N,
     SPIKE_MODE,
     Z_SPIKE_THRESHOLD,
+    DAY2_SERVER_SIDE_ROLLING,
+    STREAM_MAX_ITEMS,
 )
+from ..stream import EVENT_SPIKES, publish
+from .upsert import SPIKE_KEY, existing_keys, upsert_spikes
 
 logger = logging.getLogger("events-risk-dashboard.day2")
 
@@ -54,35 +60,17 @@ def _rolling_mad(series: pd.Series, window: int, min_periods: int) -> pd.Series:
     return abs_dev.rolling(window, min_periods=min_periods).median()
 
 
-def compute_rolling_and_zscore(session: Session) -> int:
-    """
-    Step 4: Compute rolling_center, rolling_dispersion, baseline_quality, z_score.
-    Robust: median + MAD with 0.6745 scaling. Standard: mean + std.
-    min_periods=7; before that baseline_quality=low and z_score=null. Variance floor: null z when dispersion==0.
-    Bulk update daily_metrics.
-    """
-    logger.info("computing rolling baselines and z-scores", extra={"method": BASELINE_METHOD})
-    stmt = select(DailyMetric).order_by(DailyMetric.country, DailyMetric.category, DailyMetric.date)
-    rows = session.execute(stmt).scalars().all()
+def _rolling_pandas(session: Session, window: int, min_periods: int) -> Optional[pd.DataFrame]:
+    """Rolling center/dispersion per (country, category) in pandas (required for median + MAD)."""
+    stmt = select(
+        DailyMetric.id, DailyMetric.date, DailyMetric.country, DailyMetric.category, DailyMetric.event_count
+    ).order_by(DailyMetric.country, DailyMetric.category, DailyMetric.date)
+    rows = session.execute(stmt).all()
     if not rows:
-        logger.info("no daily_metrics for rolling")
-        return 0
+        return None
 
-    df = pd.DataFrame(
-        [
-            {
-                "id": m.id,
-                "date": m.date,
-                "country": m.country,
-                "category": m.category,
-                "event_count": m.event_count,
-            }
-            for m in rows
-        ]
-    )
+    df = pd.DataFrame(rows, columns=["id", "date", "country", "category", "event_count"])
     df = df.sort_values(["country", "category", "date"])
-    window = BASELINE_WINDOW_DAYS_SHORT
-    min_periods = BASELINE_MIN_PERIODS
 
     def roll_center(x: pd.Series) -> pd.Series:
         if BASELINE_METHOD == "robust":
@@ -98,11 +86,86 @@ def compute_rolling_and_zscore(session: Session) -> int:
     df["rolling_dispersion"] = df.groupby(["country", "category"])["event_count"].transform(
         roll_dispersion
     )
-    # baseline_quality: "ok" only when we have at least min_periods in the window
     df["n_in_window"] = (
         df.groupby(["country", "category"])["event_count"]
         .transform(lambda x: x.rolling(window, min_periods=1).count())
     )
+    return df
+
+
+def _rolling_standard_sql(session: Session, window: int, min_periods: int) -> pd.DataFrame:
+    """
+    Rolling mean + sample std per (country, category) computed by the database
+    with window functions (SQLite >= 3.25, PostgreSQL); same row-based window
+    as pandas rolling(window). Only sqrt runs in Python.
+    """
+    ec = DailyMetric.event_count
+    w = dict(
+        partition_by=(DailyMetric.country, DailyMetric.category),
+        order_by=DailyMetric.date,
+        rows=(-(window - 1), 0),
+    )
+    stmt = select(
+        DailyMetric.id,
+        ec,
+        func.count(ec).over(**w).label("n"),
+        func.sum(ec).over(**w).label("s1"),
+        func.sum(ec * ec).over(**w).label("s2"),
+    )
+    df = pd.DataFrame(session.execute(stmt).all(), columns=["id", "event_count", "n", "s1", "s2"])
+    if df.empty:
+        return df
+    n = df["n"].astype(float)
+    s1 = df["s1"].astype(float)
+    s2 = df["s2"].astype(float)
+    mean = s1 / n
+    var = ((s2 - s1 * s1 / n) / (n - 1)).where(n > 1).clip(lower=0)
+    enough = n >= min_periods
+    df["rolling_center"] = mean.where(enough)
+    df["rolling_dispersion"] = np.sqrt(var).where(enough)
+    df["n_in_window"] = n
+    return df
+
+
+def _rolling_duckdb(session: Session, window: int, min_periods: int) -> Optional[pd.DataFrame]:
+    """Rolling center/dispersion per (country, category) as DuckDB window functions (analytics_engine.py)."""
+    rows = session.execute(
+        select(DailyMetric.id, DailyMetric.country, DailyMetric.category, DailyMetric.date, DailyMetric.event_count)
+    ).all()
+    if not rows:
+        return None
+    df = analytics_engine.rolling_baseline(rows, window, min_periods, BASELINE_METHOD)
+    return df.rename(columns={"value": "event_count"})
+
+
+def compute_rolling_and_zscore(session: Session) -> int:
+    """
+    Step 4: Compute rolling_center, rolling_dispersion, baseline_quality, z_score.
+    Robust: median + MAD with 0.6745 scaling. Standard: mean + std.
+    min_periods=7; before that baseline_quality=low and z_score=null. Variance floor: null z when dispersion==0.
+    Bulk update daily_metrics.
+    """
+    logger.info("computing rolling baselines and z-scores", extra={"method": BASELINE_METHOD})
+    window = BASELINE_WINDOW_DAYS_SHORT
+    min_periods = BASELINE_MIN_PERIODS
+
+    if analytics_engine.enabled():
+        df = _rolling_duckdb(session, window, min_periods)
+        if df is None:
+            logger.info("no daily_metrics for rolling")
+            return 0
+    elif BASELINE_METHOD == "standard" and DAY2_SERVER_SIDE_ROLLING:
+        df = _rolling_standard_sql(session, window, min_periods)
+        if df.empty:
+            logger.info("no daily_metrics for rolling")
+            return 0
+    else:
+        df = _rolling_pandas(session, window, min_periods)
+        if df is None:
+            logger.info("no daily_metrics for rolling")
+            return 0
+
+    # baseline_quality: "ok" only when we have at least min_periods in the window
     df["baseline_quality"] = df["n_in_window"].apply(lambda n: "ok" if n >= min_periods else "low")
 
     # Z-score: only when dispersion > 0 and quality ok. Robust: 0.6745 * (x - median) / MAD
@@ -151,36 +214,57 @@ def compute_severity_baseline(session: Session) -> int:
     and non-null severity_index get z_severity. Bulk update.
     """
     logger.info("computing severity baseline (z_severity)")
-    stmt = select(DailyMetric).order_by(DailyMetric.country, DailyMetric.category, DailyMetric.date)
-    rows = session.execute(stmt).scalars().all()
-    if not rows:
-        return 0
-
-    df = pd.DataFrame(
-        [
-            {
-                "id": m.id,
-                "date": m.date,
-                "country": m.country,
-                "category": m.category,
-                "severity_index": m.severity_index if m.severity_index is not None else 0.0,
-                "baseline_quality": m.baseline_quality or "low",
-            }
-            for m in rows
-        ]
-    )
-    df = df.sort_values(["country", "category", "date"])
     window = BASELINE_WINDOW_DAYS_SHORT
     min_periods = BASELINE_MIN_PERIODS
-    # Use log1p(severity_index+1) for stable scale; store center/dispersion in original scale for interpretability
-    df["sev_log"] = np.log1p(df["severity_index"].clip(0, None) + 1)
-    df["severity_rolling_center"] = df.groupby(["country", "category"])["sev_log"].transform(
-        lambda x: x.rolling(window, min_periods=min_periods).median()
-    )
-    mad_series = df.groupby(["country", "category"])["sev_log"].transform(
-        lambda x: _rolling_mad(x, window, min_periods)
-    )
-    df["severity_rolling_dispersion"] = mad_series
+    if analytics_engine.enabled():
+        rows = session.execute(
+            select(
+                DailyMetric.id, DailyMetric.country, DailyMetric.category, DailyMetric.date,
+                DailyMetric.severity_index, DailyMetric.baseline_quality,
+            )
+        ).all()
+        if not rows:
+            return 0
+        # Same log1p(severity_index + 1) scale as the pandas path below
+        df = analytics_engine.rolling_baseline(
+            [r[:5] for r in rows], window, min_periods, "robust",
+            value_sql="ln(1 + greatest(coalesce(value, 0), 0) + 1)",
+        ).rename(columns={
+            "value": "sev_log",
+            "rolling_center": "severity_rolling_center",
+            "rolling_dispersion": "severity_rolling_dispersion",
+        })
+        quality = {r[0]: r[5] or "low" for r in rows}
+        df["baseline_quality"] = df["id"].map(quality)
+    else:
+        stmt = select(DailyMetric).order_by(DailyMetric.country, DailyMetric.category, DailyMetric.date)
+        rows = session.execute(stmt).scalars().all()
+        if not rows:
+            return 0
+
+        df = pd.DataFrame(
+            [
+                {
+                    "id": m.id,
+                    "date": m.date,
+                    "country": m.country,
+                    "category": m.category,
+                    "severity_index": m.severity_index if m.severity_index is not None else 0.0,
+                    "baseline_quality": m.baseline_quality or "low",
+                }
+                for m in rows
+            ]
+        )
+        df = df.sort_values(["country", "category", "date"])
+        # Use log1p(severity_index+1) for stable scale; store center/dispersion in original scale for interpretability
+        df["sev_log"] = np.log1p(df["severity_index"].clip(0, None) + 1)
+        df["severity_rolling_center"] = df.groupby(["country", "category"])["sev_log"].transform(
+            lambda x: x.rolling(window, min_periods=min_periods).median()
+        )
+        mad_series = df.groupby(["country", "category"])["sev_log"].transform(
+            lambda x: _rolling_mad(x, window, min_periods)
+        )
+        df["severity_rolling_dispersion"] = mad_series
     df["z_severity"] = None
     ok = (df["baseline_quality"] == "ok") & df["severity_rolling_dispersion"].notna() & (df["severity_rolling_dispersion"] > 0)
     df.loc[ok, "z_severity"] = (
@@ -312,7 +396,7 @@ def detect_spikes(session: Session) -> int:
     z_threshold = Z_SPIKE_THRESHOLD
     now = datetime.now(timezone.utc)
     window = BASELINE_WINDOW_DAYS_SHORT
-    count = 0
+    spike_rows = []
     for m in rows:
         z = m.z_score or 0
         z_used = max(0, z) if SPIKE_MODE == "one_sided" else abs(z)
@@ -324,54 +408,44 @@ def detect_spikes(session: Session) -> int:
         )
         delta = (m.event_count - m.rolling_center) if m.rolling_center is not None else None
 
-        existing = session.execute(
-            select(Spike).where(
-                Spike.date == m.date,
-                Spike.country == m.country,
-                Spike.category == m.category,
-                Spike.baseline_method == BASELINE_METHOD,
-                Spike.baseline_window_days == window,
-                Spike.pipeline_version == PIPELINE_VERSION,
-            )
-        ).scalars().first()
-
-        if existing:
-            existing.z_score = z
-            existing.z_used = z_used
-            existing.delta = float(delta) if delta is not None else None
-            existing.rolling_center = m.rolling_center
-            existing.rolling_dispersion = m.rolling_dispersion
-            existing.baseline_quality = m.baseline_quality
-            existing.baseline_method = BASELINE_METHOD
-            existing.baseline_window_days = window
-            existing.evidence_event_ids = json.dumps(evidence_ids)
-            existing.computed_at = now
-            existing.pipeline_version = PIPELINE_VERSION
-        else:
-            session.add(
-                Spike(
-                    date=m.date,
-                    country=m.country,
-                    category=m.category,
-                    z_score=z,
-                    z_used=z_used,
-                    delta=float(delta) if delta is not None else None,
-                    rolling_center=m.rolling_center,
-                    rolling_dispersion=m.rolling_dispersion,
-                    baseline_quality=m.baseline_quality,
-                    baseline_method=BASELINE_METHOD,
-                    baseline_window_days=window,
-                    evidence_event_ids=json.dumps(evidence_ids),
-                    computed_at=now,
-                    pipeline_version=PIPELINE_VERSION,
-                )
-            )
-        count += 1
-
-    logger.info("spikes upserted", extra={"count": count})
+        spike_rows.append({
+            "date": m.date,
+            "country": m.country,
+            "category": m.category,
+            "z_score": z,
+            "z_used": z_used,
+            "delta": float(delta) if delta is not None else None,
+            "rolling_center": m.rolling_center,
+            "rolling_dispersion": m.rolling_dispersion,
+            "baseline_quality": m.baseline_quality,
+            "baseline_method": BASELINE_METHOD,
+            "baseline_window_days": window,
+            "evidence_event_ids": json.dumps(evidence_ids),
+            "computed_at": now,
+            "pipeline_version": PIPELINE_VERSION,
+        })
+
+    already = existing_keys(session, Spike, SPIKE_KEY, spike_rows) if spike_rows else set()
+    count = upsert_spikes(session, spike_rows)
+    new_rows = [r for r in spike_rows if tuple(r[k] for k in SPIKE_KEY) not in already]
+    if new_rows:
+        _publish_new_spikes(session, new_rows)
+    logger.info("spikes upserted", extra={"count": count, "new": len(new_rows)})
     return count
 
 
+def _publish_new_spikes(session: Session, new_rows: List[dict]) -> None:
+    """Notify /stream clients of newly detected spikes (strongest first, capped)."""
+    top = sorted(new_rows, key=lambda r: (r["date"], r["z_used"]), reverse=True)[:STREAM_MAX_ITEMS]
+    publish(session, EVENT_SPIKES, {
+        "count": len(new_rows),
+        "spikes": [
+            {k: r[k] for k in ("date", "country", "category", "z_score", "delta")}
+            for r in top
+        ],
+    })
+
+
 def run_day2_pipeline(session: Session) -> None:
     """Run all Day 2 steps: rolling + z-score, severity baseline, risk scores, spike detection."""
     compute_rolling_and_zscore(session)
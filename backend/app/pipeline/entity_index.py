@@ -0,0 +1,123 @@
+"""
+event_entities: the normalized entity index behind related-country lookups and
+GET /entities/{value}/events.
+
+Rows are derived from EventText.entities_json (ExtractedEntities.to_dict()) when
+events are stored, so readers never parse JSON per event. Re-storing an event
+replaces its rows. Existing databases are back-filled with:
+
+    python -m backend.app.pipeline.entity_index
+"""
+from __future__ import annotations
+
+import json
+import logging
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..models import Event, EventEntity, EventText
+
+logger = logging.getLogger(__name__)
+
+ENTITY_COUNTRY = "country"
+ENTITY_ORGANIZATION = "organization"
+ENTITY_PERSON = "person"
+ENTITY_LOCATION = "location"
+ENTITY_TYPES = (ENTITY_COUNTRY, ENTITY_ORGANIZATION, ENTITY_PERSON, ENTITY_LOCATION)
+
+# entities_json list key -> entity type
+_LIST_KEYS = {
+    "organizations": ENTITY_ORGANIZATION,
+    "persons": ENTITY_PERSON,
+    "locations": ENTITY_LOCATION,
+}
+
+_ID_CHUNK = 500
+
+
+def entity_key(value: str) -> str:
+    """Lookup key for an entity name: casefolded, whitespace collapsed."""
+    return " ".join(value.split()).casefold()
+
+
+def entity_rows(event_id: str, event_date: date, entities: Any) -> List[Dict[str, Any]]:
+    """event_entities rows for one event's entities (dict or JSON string); malformed input gives []."""
+    if isinstance(entities, str):
+        try:
+            entities = json.loads(entities)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    if not isinstance(entities, dict):
+        return []
+
+    rows: Dict[tuple, Dict[str, Any]] = {}
+
+    def add(type_: str, name: Any, iso2: Optional[str] = None) -> None:
+        if not isinstance(name, str) or not name.strip():
+            return
+        key = entity_key(name)
+        if (type_, key) not in rows:
+            rows[(type_, key)] = {
+                "event_id": event_id, "date": event_date,
+                "type": type_, "value": key, "name": name.strip(), "iso2": iso2,
+            }
+
+    for c in entities.get("countries") or []:
+        if isinstance(c, dict):
+            code = c.get("code")
+            code = code.upper() if isinstance(code, str) and len(code) == 2 else None
+            add(ENTITY_COUNTRY, c.get("name") or code, code)
+    for list_key, type_ in _LIST_KEYS.items():
+        for name in entities.get(list_key) or []:
+            add(type_, name)
+    return list(rows.values())
+
+
+def index_event_entities(session: Session, events: Iterable[Dict[str, Any]]) -> int:
+    """
+    Replace the event_entities rows of the given events (dicts with id, date,
+    entities_json). Call in the transaction that stores the events. Returns rows written.
+    """
+    events = list(events)
+    ids = [e["id"] for e in events]
+    for i in range(0, len(ids), _ID_CHUNK):
+        session.execute(delete(EventEntity).where(EventEntity.event_id.in_(ids[i:i + _ID_CHUNK])))
+    rows: List[Dict[str, Any]] = []
+    for e in events:
+        rows.extend(entity_rows(e["id"], e["date"], e.get("entities_json")))
+    if rows:
+        session.bulk_insert_mappings(EventEntity, rows)
+    return len(rows)
+
+
+def backfill_event_entities(session: Session, chunk_size: int = 5000) -> int:
+    """Rebuild event_entities for every event with entities_json, committing per chunk. Returns rows written."""
+    written = 0
+    last_id = ""
+    while True:
+        chunk = session.execute(
+            select(Event.id, Event.date, EventText.entities_json)
+            .join(EventText, EventText.event_id == Event.id)
+            .where(EventText.entities_json.isnot(None), Event.id > last_id)
+            .order_by(Event.id)
+            .limit(chunk_size)
+        ).all()
+        if not chunk:
+            return written
+        written += index_event_entities(session, ({"id": r.id, "date": r.date, "entities_json": r.entities_json} for r in chunk))
+        session.commit()
+        last_id = chunk[-1].id
+        logger.info("Indexed entities up to event %s (%d rows)", last_id, written)
+
+
+if __name__ == "__main__":
+    from ..db import Base, engine, get_db_session
+    from ..logging_config import setup_logging
+
+    setup_logging()
+    Base.metadata.create_all(bind=engine)
+    with get_db_session() as session:
+        print(f"event_entities rows written: {backfill_event_entities(session)}")
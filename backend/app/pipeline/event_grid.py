@@ -0,0 +1,200 @@
+"""
+Spatial grid for event points: every event gets a quadkey (Web Mercator tile
+path, one digit per zoom level) in events.grid_cell at ingest, and
+event_grid_daily keeps per-day counts for the cells at CLUSTER_LEVELS, read by
+GET /map/clusters.
+
+A quadkey prefix is the enclosing cell at a coarser level, so "events in cell
+q" is the index range grid_cell >= q AND grid_cell < q + "4". Events without
+coordinates are placed at their country centroid, as the feed does.
+
+Ingest calls refresh_event_grid() with the dates it touched. Existing
+databases are back-filled with:
+
+    python -m backend.app.pipeline.event_grid
+"""
+from __future__ import annotations
+
+import logging
+import math
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from ..country_centroids import get_centroid
+from ..models import Event, EventGridDaily
+from .retention import live_dates
+
+logger = logging.getLogger(__name__)
+
+# Level stored in events.grid_cell (~600 m cells at the equator)
+GRID_MAX_LEVEL = 16
+# Levels pre-aggregated in event_grid_daily
+CLUSTER_LEVELS = (2, 4, 6, 8, 10, 12)
+# Cluster cells are drawn ~2 levels finer than the map zoom (~64 px per cell)
+CLUSTER_LEVEL_OFFSET = 2
+
+MAX_LATITUDE = 85.05112878  # Web Mercator limit
+
+_DATE_CHUNK = 100
+
+
+def tile_xy(lat: float, lon: float, level: int) -> Tuple[int, int]:
+    """Web Mercator tile (x, y) containing a point at the given level."""
+    lat = min(max(lat, -MAX_LATITUDE), MAX_LATITUDE)
+    n = 1 << level
+    x = int((lon + 180.0) / 360.0 * n)
+    sin_lat = math.sin(math.radians(lat))
+    y = int((0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_pixel(lat: float, lon: float, z: int, x: int, y: int, extent: int) -> Tuple[int, int]:
+    """Position of a point relative to tile (z, x, y), 0..extent inside the tile."""
+    lat = min(max(lat, -MAX_LATITUDE), MAX_LATITUDE)
+    n = 1 << z
+    wx = (lon + 180.0) / 360.0 * n
+    sin_lat = math.sin(math.radians(lat))
+    wy = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * n
+    return int((wx - x) * extent), int((wy - y) * extent)
+
+
+def tile_to_quadkey(x: int, y: int, level: int) -> str:
+    digits = []
+    for i in range(level, 0, -1):
+        mask = 1 << (i - 1)
+        digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+    return "".join(digits)
+
+
+def quadkey_to_tile(quadkey: str) -> Tuple[int, int, int]:
+    """Quadkey -> (x, y, level)."""
+    x = y = 0
+    level = len(quadkey)
+    for i, digit in enumerate(quadkey):
+        mask = 1 << (level - i - 1)
+        d = int(digit)
+        if d & 1:
+            x |= mask
+        if d & 2:
+            y |= mask
+    return x, y, level
+
+
+def tile_center(x: int, y: int, level: int) -> Tuple[float, float]:
+    """(lat, lon) at the center of a tile."""
+    n = 1 << level
+    lon = (x + 0.5) / n * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 0.5) / n))))
+    return lat, lon
+
+
+def quadkey_range(quadkey: str) -> Tuple[str, str]:
+    """[low, high) grid_cell bounds of every cell inside `quadkey`."""
+    return quadkey, quadkey + "4"
+
+
+def grid_cell(lat: Optional[float], lon: Optional[float], country: Optional[str] = None) -> Optional[str]:
+    """Quadkey at GRID_MAX_LEVEL for a point, or for the country centroid when the point is missing."""
+    if lat is None or lon is None:
+        centroid = get_centroid(country) if country else None
+        if not centroid:
+            return None
+        lat, lon = centroid[0], centroid[1]
+    return tile_to_quadkey(*tile_xy(lat, lon, GRID_MAX_LEVEL), GRID_MAX_LEVEL)
+
+
+def cluster_level(zoom: int) -> int:
+    """Pre-aggregated level to cluster at for a map zoom."""
+    for level in CLUSTER_LEVELS:
+        if level >= zoom + CLUSTER_LEVEL_OFFSET:
+            return level
+    return CLUSTER_LEVELS[-1]
+
+
+def refresh_event_grid(session: Session, dates: Iterable[date]) -> int:
+    """
+    Rebuild event_grid_daily for the given dates from the events, except dates
+    already archived by retention. Returns cells written.
+    """
+    dates = live_dates(session, dates)
+    finest = CLUSTER_LEVELS[-1]
+    cell = func.substr(Event.grid_cell, 1, finest)
+    written = 0
+    for i in range(0, len(dates), _DATE_CHUNK):
+        chunk = dates[i:i + _DATE_CHUNK]
+        # One pass at the finest level; coarser cells are quadkey prefixes of those
+        cells: Dict[Tuple[date, str], List] = {}  # count, max severity, lat sum, lon sum, located count
+        for d, quadkey, count, max_severity, lat_sum, lon_sum, located in session.execute(
+            select(Event.date, cell, func.count(), func.max(Event.severity_index),
+                   func.sum(Event.lat), func.sum(Event.lon), func.count(Event.lat))
+            .where(Event.date.in_(chunk), Event.grid_cell.isnot(None))
+            .group_by(Event.date, cell)
+        ):
+            for level in CLUSTER_LEVELS:
+                acc = cells.setdefault((d, quadkey[:level]), [0, None, 0.0, 0.0, 0])
+                acc[0] += count
+                if max_severity is not None and (acc[1] is None or max_severity > acc[1]):
+                    acc[1] = max_severity
+                if located:
+                    acc[2] += lat_sum
+                    acc[3] += lon_sum
+                    acc[4] += located
+        rows = []
+        for (d, quadkey), (count, max_severity, lat_sum, lon_sum, located) in cells.items():
+            x, y, level = quadkey_to_tile(quadkey)
+            if located:
+                lat, lon = lat_sum / located, lon_sum / located
+            else:  # only centroid-placed events
+                lat, lon = tile_center(x, y, level)
+            rows.append({
+                "date": d, "level": level, "x": x, "y": y, "cell": quadkey, "event_count": count,
+                "max_severity": max_severity, "lat": round(lat, 5), "lon": round(lon, 5),
+            })
+        session.execute(delete(EventGridDaily).where(EventGridDaily.date.in_(chunk)))
+        if rows:
+            session.bulk_insert_mappings(EventGridDaily, rows)
+        written += len(rows)
+    logger.info("Refreshed event grid", extra={"dates": len(dates), "cells": written})
+    return written
+
+
+def backfill_grid_cells(session: Session, chunk_size: int = 5000) -> int:
+    """Set events.grid_cell where missing, committing per chunk. Returns events updated."""
+    updated = 0
+    last_id = ""
+    while True:
+        chunk = session.execute(
+            select(Event.id, Event.lat, Event.lon, Event.country)
+            .where(Event.grid_cell.is_(None), Event.id > last_id)
+            .order_by(Event.id)
+            .limit(chunk_size)
+        ).all()
+        if not chunk:
+            return updated
+        params = [{"id": r.id, "grid_cell": grid_cell(r.lat, r.lon, r.country)} for r in chunk]
+        params = [p for p in params if p["grid_cell"]]
+        if params:
+            session.execute(update(Event), params)
+        session.commit()
+        updated += len(params)
+        last_id = chunk[-1].id
+
+
+def rebuild_event_grid(session: Session) -> int:
+    """Rebuild event_grid_daily for every event date (existing databases). Returns cells written."""
+    dates = session.execute(select(Event.date).distinct()).scalars().all()
+    return refresh_event_grid(session, dates)
+
+
+if __name__ == "__main__":
+    from ..db import Base, engine, get_db_session
+    from ..logging_config import setup_logging
+
+    setup_logging()
+    Base.metadata.create_all(bind=engine)
+    with get_db_session() as session:
+        print(f"events.grid_cell set: {backfill_grid_cells(session)}")
+        print(f"event_grid_daily rows written: {rebuild_event_grid(session)}")
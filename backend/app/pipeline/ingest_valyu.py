@@ -20,15 +20,36 @@ from sqlalchemy.orm import Session
 from ..db import get_db, SessionLocal
 from ..models import DailyMetric, Event
 from ..country_centroids import get_centroid
-from .. import valyu_client
+from .. import analytics_engine, valyu_client
+from ..jobs import JobContext
 from ..ml.entity_extractor import extract_entities
 from ..ml.event_classifier import classify_event, ensure_model_trained
-from ..ml.severity_scorer import score_severity
+from ..ml.severity_scorer import SEVERITY_ALGORITHM_VERSION, score_severity
 from ..ml.risk_classifier import RiskTierClassifier
 from ..ml.trend_detector import detect_trend
+from ..pipeline_config import RISK_TIER_SAMPLE_SIZE
+from .country_summary import refresh_country_summary
+from .dag import Stage, StageResult, run_dag
+from .country_network import refresh_country_edges
+from .entity_index import index_event_entities
+from .event_grid import grid_cell, refresh_event_grid
+from .risk_tiers import save_tier_config
+from .rollups import refresh_metric_rollups
+from .upsert import upsert_daily_metrics, upsert_events
 
 logger = logging.getLogger(__name__)
 
+# Columns refreshed when a Valyu article is re-ingested
+ML_EVENT_COLUMNS = (
+    "category",
+    "category_confidence",
+    "severity_index",
+    "sentiment_score",
+    "threat_level",
+    "severity_version",
+    "entities_json",
+)
+
 # Diverse threat queries for broad coverage
 INGESTION_QUERIES = [
     # Core conflict
@@ -202,39 +223,36 @@ def store_events(enriched_events: List[Dict[str, Any]], session: Session) -> int
     Upsert enriched events into the events table.
     Returns number of new events inserted.
     """
-    inserted = 0
-    for evt in enriched_events:
-        existing = session.get(Event, evt["id"])
-        if existing:
-            # Update ML fields on existing event
-            existing.category = evt["category"]
-            existing.category_confidence = evt["category_confidence"]
-            existing.severity_index = evt["severity_index"]
-            existing.sentiment_score = evt["sentiment_score"]
-            existing.threat_level = evt["threat_level"]
-            existing.entities_json = evt["entities_json"]
-        else:
-            event = Event(
-                id=evt["id"],
-                ts=evt["ts"],
-                date=evt["date"],
-                country=evt["country"],
-                lat=evt["lat"],
-                lon=evt["lon"],
-                source=evt["source"],
-                title=evt["title"],
-                content=evt["content"],
-                source_url=evt["source_url"],
-                category=evt["category"],
-                category_confidence=evt["category_confidence"],
-                severity_index=evt["severity_index"],
-                sentiment_score=evt["sentiment_score"],
-                threat_level=evt["threat_level"],
-                entities_json=evt["entities_json"],
-                avg_tone=evt["avg_tone"],
-            )
-            session.add(event)
-            inserted += 1
+    rows = {
+        evt["id"]: {
+            "id": evt["id"],
+            "ts": evt["ts"],
+            "date": evt["date"],
+            "country": evt["country"],
+            "lat": evt["lat"],
+            "lon": evt["lon"],
+            "source": evt["source"],
+            "title": evt["title"],
+            "content": evt["content"],
+            "source_url": evt["source_url"],
+            "category": evt["category"],
+            "category_confidence": evt["category_confidence"],
+            "severity_index": evt["severity_index"],
+            "sentiment_score": evt["sentiment_score"],
+            "threat_level": evt["threat_level"],
+            "severity_version": SEVERITY_ALGORITHM_VERSION,
+            "entities_json": evt["entities_json"],
+            "avg_tone": evt["avg_tone"],
+            "grid_cell": grid_cell(evt["lat"], evt["lon"], evt["country"]),
+        }
+        for evt in enriched_events
+    }
+    # Existing events only get their ML fields refreshed
+    inserted = upsert_events(session, list(rows.values()), update_columns=ML_EVENT_COLUMNS)
+    index_event_entities(session, rows.values())
+    dates = {evt["date"] for evt in rows.values()}
+    refresh_country_edges(session, dates)
+    refresh_event_grid(session, dates)
 
     session.commit()
     logger.info("Stored %d new events, updated %d existing", inserted, len(enriched_events) - inserted)
@@ -266,38 +284,27 @@ def aggregate_daily_metrics(session: Session, target_date: Optional[date] = None
         .group_by(Event.date, Event.country, Event.category)
     )
 
-    rows = session.execute(stmt).all()
-    upserted = 0
-
-    for row in rows:
-        existing = session.execute(
-            select(DailyMetric).where(
-                DailyMetric.date == row.date,
-                DailyMetric.country == row.country,
-                DailyMetric.category == row.category,
-            )
-        ).scalars().first()
-
-        if existing:
-            existing.event_count = row.event_count
-            existing.avg_tone = row.avg_tone
-            existing.severity_index = row.avg_severity
-            existing.avg_sentiment = row.avg_sentiment
-            existing.computed_at = datetime.now(timezone.utc)
-        else:
-            metric = DailyMetric(
-                date=row.date,
-                country=row.country,
-                category=row.category,
-                event_count=row.event_count,
-                avg_tone=row.avg_tone,
-                severity_index=row.avg_severity,
-                avg_sentiment=row.avg_sentiment,
-                computed_at=datetime.now(timezone.utc),
-                pipeline_version="valyu_ml_v1",
-            )
-            session.add(metric)
-        upserted += 1
+    now = datetime.now(timezone.utc)
+    metrics = [
+        {
+            "date": row.date,
+            "country": row.country,
+            "category": row.category,
+            "event_count": row.event_count,
+            "avg_tone": row.avg_tone,
+            "severity_index": row.avg_severity,
+            "avg_sentiment": row.avg_sentiment,
+            "computed_at": now,
+            "pipeline_version": "valyu_ml_v1",
+        }
+        for row in session.execute(stmt).all()
+    ]
+    # pipeline_version is only set on insert, as before
+    upserted = upsert_daily_metrics(
+        session,
+        metrics,
+        update_columns=("event_count", "avg_tone", "severity_index", "avg_sentiment", "computed_at"),
+    )
 
     session.commit()
     logger.info("Aggregated %d daily metrics for %s", upserted, target_date)
@@ -307,61 +314,131 @@ def aggregate_daily_metrics(session: Session, target_date: Optional[date] = None
 def compute_risk_and_trends(session: Session) -> None:
     """
     Compute risk tiers + trend detection on aggregated daily metrics.
-    """
-    # Get all severity scores for risk tier fitting
-    scores = session.execute(
-        select(DailyMetric.severity_index).where(DailyMetric.severity_index.isnot(None))
-    ).scalars().all()
 
+    Jenks is fitted on a bounded reservoir sample; percentiles come from one
+    sorted array via binary search; trends are looked up by (country, latest_date).
+    One pass over the metric rows, written back with a bulk update.
+    """
+    rows = session.execute(
+        select(
+            DailyMetric.id,
+            DailyMetric.date,
+            DailyMetric.country,
+            DailyMetric.severity_index,
+        ).order_by(DailyMetric.date.asc())
+    ).all()
+
+    scores = [float(r.severity_index) for r in rows if r.severity_index is not None]
     if not scores:
         logger.warning("No severity scores to classify")
         return
 
     # Fit risk tiers
     classifier = RiskTierClassifier(method="jenks")
-    tier_config = classifier.fit([float(s) for s in scores])
-    logger.info("Risk tiers: %s", tier_config.get("tier_ranges", {}))
-
-    # Apply risk tiers to all metrics
-    metrics = session.execute(select(DailyMetric)).scalars().all()
-    for m in metrics:
-        if m.severity_index is not None:
-            tier, percentile = classifier.classify(m.severity_index)
-            m.risk_tier = tier
-            m.risk_percentile = percentile
-            m.risk_score = m.severity_index  # use severity as risk for now
-
-    # Compute trends per country
-    country_series: Dict[str, List] = defaultdict(list)
-    country_metrics = session.execute(
-        select(DailyMetric).order_by(DailyMetric.date.asc())
-    ).scalars().all()
+    tier_config = classifier.fit(scores, sample_size=RISK_TIER_SAMPLE_SIZE)
+    logger.info(
+        "Risk tiers: %s (fitted on %d of %d scores)",
+        tier_config.get("tier_ranges", {}),
+        classifier.n_fit_samples,
+        len(scores),
+    )
+    save_tier_config(session, classifier)
 
-    for m in country_metrics:
-        if m.severity_index is not None:
-            country_series[m.country].append((m.date, m.severity_index))
+    # Compute trends per country (rows are already date-ordered)
+    country_series: Dict[str, List] = defaultdict(list)
+    for r in rows:
+        if r.severity_index is not None:
+            country_series[r.country].append((r.date, r.severity_index))
 
+    trends: Dict[tuple, tuple] = {}
     for country, series in country_series.items():
         if len(series) < 4:
             continue
         values = [v for _, v in series]
         trend_7d = detect_trend(values[-7:] if len(values) >= 7 else values)
         trend_30d = detect_trend(values[-30:] if len(values) >= 30 else values)
-
-        # Apply to latest metrics for this country
         latest_date = series[-1][0]
-        for m in metrics:
-            if m.country == country and m.date == latest_date:
-                m.trend_7d = trend_7d.direction
-                m.trend_30d = trend_30d.direction
-                m.trend_slope = trend_7d.slope
-                m.trend_confidence = trend_7d.confidence
-
+        trends[(country, latest_date)] = (trend_7d, trend_30d)
+
+    # Apply risk tiers and trends in a single pass
+    mappings = []
+    for r in rows:
+        mapping: Dict[str, Any] = {"id": r.id}
+        if r.severity_index is not None:
+            tier, percentile = classifier.classify(r.severity_index)
+            mapping.update({
+                "risk_tier": tier,
+                "risk_percentile": percentile,
+                "risk_score": r.severity_index,  # use severity as risk for now
+            })
+        trend = trends.get((r.country, r.date))
+        if trend is not None:
+            trend_7d, trend_30d = trend
+            mapping.update({
+                "trend_7d": trend_7d.direction,
+                "trend_30d": trend_30d.direction,
+                "trend_slope": trend_7d.slope,
+                "trend_confidence": trend_7d.confidence,
+            })
+        if len(mapping) > 1:
+            mappings.append(mapping)
+
+    session.bulk_update_mappings(DailyMetric, mappings)
     session.commit()
     logger.info("Computed risk tiers and trends for %d countries", len(country_series))
 
 
-def run_valyu_pipeline(days_back: int = 7) -> Dict[str, Any]:
+def valyu_stages(days_back: int = 7) -> List[Stage]:
+    """
+    Stage DAG for the Valyu pipeline: fetch → store → aggregate (touched dates) → risk tiers → country summary.
+    Each stage commits on its own; nothing downstream runs when the fetch returns no articles.
+    """
+    def _fetch(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+        enriched = fetch_and_classify(days_back=days_back)
+        if not enriched:
+            logger.warning("No articles fetched from Valyu")
+        return StageResult(rows=len(enriched), changed=bool(enriched), output=enriched)
+
+    def _store(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+        enriched = upstream["fetch_and_classify"].output
+        stored = store_events(enriched, session)
+        return StageResult(rows=stored, changed=True, output=sorted(set(e["date"] for e in enriched)))
+
+    def _aggregate(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+        dates = upstream["store_events"].output
+        total_metrics = 0
+        for d in dates:
+            total_metrics += aggregate_daily_metrics(session, d)
+        return StageResult(rows=total_metrics, changed=total_metrics > 0, output=dates)
+
+    def _risk_tiers(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+        compute_risk_and_trends(session)
+        return StageResult(rows=upstream["aggregate"].rows)
+
+    def _country_summary(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+        return StageResult(rows=refresh_country_summary(session))
+
+    def _rollups(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+        return StageResult(rows=refresh_metric_rollups(session))
+
+    def _analytics_export(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+        exported = analytics_engine.export_parquet(session, dates=upstream["aggregate"].output)
+        return StageResult(rows=sum(exported.values()))
+
+    stages = [
+        Stage("fetch_and_classify", _fetch),
+        Stage("store_events", _store, depends_on=("fetch_and_classify",)),
+        Stage("aggregate", _aggregate, depends_on=("store_events",)),
+        Stage("risk_tiers", _risk_tiers, depends_on=("aggregate",)),
+        Stage("country_summary", _country_summary, depends_on=("risk_tiers",)),
+        Stage("rollups", _rollups, depends_on=("risk_tiers",)),
+    ]
+    if analytics_engine.enabled():
+        stages.append(Stage("analytics_export", _analytics_export, depends_on=("rollups",)))
+    return stages
+
+
+def run_valyu_pipeline(days_back: int = 7, ctx: Optional[JobContext] = None) -> Dict[str, Any]:
     """
     Run the full Valyu ingestion pipeline:
       1. Fetch & classify articles
@@ -369,40 +446,24 @@ def run_valyu_pipeline(days_back: int = 7) -> Dict[str, Any]:
       3. Aggregate daily metrics
       4. Compute risk tiers + trends
 
+    Stage timings are reported through ctx when run as a background job.
     Returns summary stats.
     """
     logger.info("Starting Valyu ingestion pipeline (days_back=%d)", days_back)
-
-    # Fetch and classify
-    enriched = fetch_and_classify(days_back=days_back)
-    if not enriched:
-        logger.warning("No articles fetched from Valyu")
-        return {"events_fetched": 0, "events_stored": 0, "metrics_aggregated": 0}
-
-    session = SessionLocal()
-    try:
-        # Store events
-        stored = store_events(enriched, session)
-
-        # Aggregate daily metrics for each date
-        dates = set(e["date"] for e in enriched)
-        total_metrics = 0
-        for d in sorted(dates):
-            total_metrics += aggregate_daily_metrics(session, d)
-
-        # Compute risk tiers and trends
-        compute_risk_and_trends(session)
-
-        summary = {
-            "events_fetched": len(enriched),
-            "events_stored": stored,
-            "dates_processed": len(dates),
-            "metrics_aggregated": total_metrics,
-        }
-        logger.info("Pipeline complete: %s", summary)
-        return summary
-    finally:
-        session.close()
+    run = run_dag("valyu", valyu_stages(days_back), ctx)
+
+    fetched = run.results.get("fetch_and_classify")
+    stored = run.results.get("store_events")
+    aggregated = run.results.get("aggregate")
+    summary = {
+        "events_fetched": fetched.rows if fetched else 0,
+        "events_stored": stored.rows if stored else 0,
+        "dates_processed": len(stored.output) if stored else 0,
+        "metrics_aggregated": aggregated.rows if aggregated else 0,
+        "stages": run.statuses,
+    }
+    logger.info("Pipeline complete: %s", summary)
+    return summary
 
 
 if __name__ == "__main__":
@@ -4,17 +4,21 @@ import logging
 import zipfile
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, Optional, List
+from typing import Any, Dict, Iterable, Optional, List
 
 import pandas as pd
 from sqlalchemy.orm import Session
 
-from ..models import Event
 from ..taxonomy import map_event_to_category
-from ..ml.severity_scorer import score_severity
+from ..ml.severity_scorer import SEVERITY_ALGORITHM_VERSION, score_severity
+from .country_network import cameo_to_iso2, refresh_country_edges
+from .event_grid import grid_cell, refresh_event_grid
+from .upsert import upsert_events
 
 logger = logging.getLogger("events-risk-dashboard.normalize")
 
+UPSERT_BATCH_SIZE = 5000
+
 
 # Column indices for GDELT 1.0 daily export (58 columns tab-separated, no header)
 # See: https://blog.gdeltproject.org/gdelt-2-0-our-global-world-in-realtime/
@@ -117,6 +121,8 @@ def normalize_zip_to_events(zip_path: Path, session: Session) -> int:
 
     inserted = 0
     failed = 0
+    pending: Dict[str, Dict[str, Any]] = {}
+    dates = set()
 
     for _, row in df.iterrows():
         try:
@@ -174,45 +180,33 @@ def normalize_zip_to_events(zip_path: Path, session: Session) -> int:
             threat_level = severity["threat_level"]
             sentiment_polarity = severity["sentiment_polarity"]
 
-            # Idempotent upsert: update if exists, else insert
-            existing: Optional[Event] = session.get(Event, event_id)
-            if existing:
-                existing.ts = dt
-                existing.date = dt.date()
-                existing.country = country
-                existing.admin1 = admin1
-                existing.lat = lat
-                existing.lon = lon
-                existing.event_code = event_code
-                existing.quad_class = quad_class
-                existing.goldstein = goldstein
-                existing.avg_tone = avg_tone
-                existing.source_url = source_url
-                existing.category = category
-                existing.severity_index = severity_index
-                existing.threat_level = threat_level
-                existing.sentiment_score = sentiment_polarity
-            else:
-                event = Event(
-                    id=event_id,
-                    ts=dt,
-                    date=dt.date(),
-                    country=country,
-                    admin1=admin1,
-                    lat=lat,
-                    lon=lon,
-                    event_code=event_code,
-                    quad_class=quad_class,
-                    goldstein=goldstein,
-                    avg_tone=avg_tone,
-                    source_url=source_url,
-                    category=category,
-                    severity_index=severity_index,
-                    threat_level=threat_level,
-                    sentiment_score=sentiment_polarity,
-                )
-                session.add(event)
-                inserted += 1
+            # Last row wins for an id repeated within the file
+            pending[event_id] = {
+                "id": event_id,
+                "ts": dt,
+                "date": dt.date(),
+                "country": country,
+                "admin1": admin1,
+                "lat": lat,
+                "lon": lon,
+                "event_code": event_code,
+                "quad_class": quad_class,
+                "goldstein": goldstein,
+                "avg_tone": avg_tone,
+                "source_url": source_url,
+                "category": category,
+                "severity_index": severity_index,
+                "threat_level": threat_level,
+                "sentiment_score": sentiment_polarity,
+                "severity_version": SEVERITY_ALGORITHM_VERSION,
+                "actor1_country": cameo_to_iso2(_get(row, IDX_ACTOR1_COUNTRY)),
+                "actor2_country": cameo_to_iso2(_get(row, IDX_ACTOR2_COUNTRY)),
+                "grid_cell": grid_cell(lat, lon, country),
+            }
+            dates.add(dt.date())
+            if len(pending) >= UPSERT_BATCH_SIZE:
+                inserted += upsert_events(session, list(pending.values()))
+                pending.clear()
         except Exception as exc:
             failed += 1
             if failed <= 5:
@@ -220,6 +214,11 @@ def normalize_zip_to_events(zip_path: Path, session: Session) -> int:
                     "failed to normalize row",
                     extra={"path": str(zip_path), "error": str(exc)},
                 )
+    # Idempotent upsert by event ID (ON CONFLICT DO UPDATE)
+    inserted += upsert_events(session, list(pending.values()))
+    refresh_country_edges(session, dates)
+    refresh_event_grid(session, dates)
+
     if failed > 0:
         logger.info("rows skipped or failed", extra={"path": str(zip_path), "failed": failed})
 
@@ -0,0 +1,231 @@
+"""
+Re-enrichment: re-score existing events with the latest severity algorithm,
+then re-aggregate daily_metrics, refit risk tiers and refresh the map summary.
+
+Events are streamed in keyset-paginated chunks (by primary key), scored across
+a process pool and written back with bulk updates, one commit per chunk. Each
+event records SEVERITY_ALGORITHM_VERSION, so events already at the current
+version are skipped and an interrupted run resumes where it stopped. The dates
+of committed chunks are checkpointed in the same commit and cleared only once
+the aggregate/tier/summary stages finish, so a resumed run still re-aggregates
+dates whose events an earlier, interrupted run re-scored.
+
+The pool uses the "spawn" start method: the job runs on a worker thread inside
+the API process, and forking a multi-threaded process is unsafe.
+
+Runs as a background job (see jobs.py) triggered by POST /pipeline/re-enrich.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from .. import analytics_engine
+from ..cache import bump_data_version
+from ..db import get_db_session
+from ..jobs import JobContext
+from ..ml.severity_scorer import SEVERITY_ALGORITHM_VERSION, score_severity
+from ..models import Event, EventText, PipelineCheckpoint
+from ..pipeline_config import RE_ENRICH_CHUNK_SIZE, RE_ENRICH_WORKERS
+from .country_summary import refresh_country_summary
+from .dag import set_checkpoint
+from .rollups import refresh_metric_rollups
+from .ingest_valyu import aggregate_daily_metrics, compute_risk_and_trends
+
+logger = logging.getLogger("events-risk-dashboard.re_enrich")
+
+# Columns needed for scoring: (id, title, content, category, country, date, goldstein, quad_class)
+_SCORING_COLUMNS = (
+    Event.id,
+    EventText.title,
+    EventText.content,
+    Event.category,
+    Event.country,
+    Event.date,
+    Event.goldstein,
+    Event.quad_class,
+)
+
+
+def _event_text(title: Optional[str], content: Optional[str], category: Optional[str], country: Optional[str]) -> str:
+    """Build scoring text from available data."""
+    text = ""
+    if title:
+        text = title
+    if content:
+        text = f"{text}. {content}" if text else content
+    if not text:
+        text = f"{category or 'Event'} in {country or 'unknown'}"
+    return text
+
+
+def score_chunk(rows: List[Tuple]) -> List[Dict[str, Any]]:
+    """
+    Score one chunk of event rows (tuples of _SCORING_COLUMNS).
+    Module-level and DB-free so it can run in a worker process.
+    Returns bulk-update mappings.
+    """
+    mappings = []
+    for event_id, title, content, category, country, event_date, goldstein, quad_class in rows:
+        severity = score_severity(
+            _event_text(title, content, category, country),
+            category=category or "Civil Unrest",
+            entity_count=0,
+            published_date=str(event_date) if event_date else None,
+            country_code=country,
+            goldstein_scale=goldstein,
+            quad_class=quad_class,
+        )
+        mappings.append({
+            "id": event_id,
+            "severity_index": severity["severity_index"],
+            "threat_level": severity["threat_level"],
+            "sentiment_score": severity["sentiment_polarity"],
+            "severity_version": SEVERITY_ALGORITHM_VERSION,
+        })
+    return mappings
+
+
+def _stale_filter(force: bool):
+    if force:
+        return None
+    return or_(Event.severity_version.is_(None), Event.severity_version != SEVERITY_ALGORITHM_VERSION)
+
+
+def _iter_chunks(session: Session, chunk_size: int, force: bool):
+    """Yield lists of scoring rows, keyset-paginated on Event.id."""
+    stale = _stale_filter(force)
+    last_id: Optional[str] = None
+    while True:
+        stmt = (
+            select(*_SCORING_COLUMNS)
+            .outerjoin(EventText, EventText.event_id == Event.id)
+            .order_by(Event.id)
+            .limit(chunk_size)
+        )
+        if stale is not None:
+            stmt = stmt.where(stale)
+        if last_id is not None:
+            stmt = stmt.where(Event.id > last_id)
+        rows = [tuple(r) for r in session.execute(stmt).all()]
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield rows
+
+
+PIPELINE = "re_enrich"
+_PENDING_STAGE = "pending_aggregate"  # one checkpoint per re-scored date (key = ISO date)
+
+
+def _pending_dates(session: Session) -> Set[date]:
+    return {
+        date.fromisoformat(k) for k in session.execute(
+            select(PipelineCheckpoint.key).where(
+                PipelineCheckpoint.pipeline == PIPELINE, PipelineCheckpoint.stage == _PENDING_STAGE,
+            )
+        ).scalars()
+    }
+
+
+def _clear_pending_dates(session: Session) -> None:
+    session.execute(delete(PipelineCheckpoint).where(
+        PipelineCheckpoint.pipeline == PIPELINE, PipelineCheckpoint.stage == _PENDING_STAGE,
+    ))
+
+
+def re_enrich_events(
+    ctx: Optional[JobContext] = None,
+    *,
+    force: bool = False,
+    chunk_size: int = RE_ENRICH_CHUNK_SIZE,
+    workers: int = RE_ENRICH_WORKERS,
+) -> Dict[str, Any]:
+    """
+    Re-score events not yet at the current severity version (all events if force),
+    then recompute daily_metrics for the touched dates (including those left
+    pending by an interrupted run) and refit risk tiers. Returns summary stats.
+    """
+    ctx = ctx or JobContext()
+
+    with get_db_session() as session:
+        count_stmt = select(func.count(Event.id))
+        stale = _stale_filter(force)
+        if stale is not None:
+            count_stmt = count_stmt.where(stale)
+        total = session.execute(count_stmt).scalar() or 0
+        all_events = session.execute(select(func.count(Event.id))).scalar() or 0
+        logger.info(
+            "re-enrich starting",
+            extra={"events": total, "version": SEVERITY_ALGORITHM_VERSION, "workers": workers},
+        )
+
+        updated = 0
+        dates: Set[date] = _pending_dates(session)
+        if dates:
+            logger.info("re-enrich resuming", extra={"pending_dates": len(dates)})
+
+        def write(mappings: List[Dict[str, Any]], chunk_dates: Set[date]) -> None:
+            nonlocal updated
+            session.bulk_update_mappings(Event, mappings)
+            for d in chunk_dates - dates:
+                set_checkpoint(session, PIPELINE, _PENDING_STAGE, d.isoformat(), None)
+            session.commit()  # checkpoint: a restart skips this chunk but still aggregates its dates
+            updated += len(mappings)
+            dates.update(chunk_dates)
+            ctx.progress(0.8 * updated / max(total, 1), f"scored {updated}/{total} events")
+
+        with ctx.stage("score_events") as stage:
+            if workers <= 1:
+                for rows in _iter_chunks(session, chunk_size, force):
+                    write(score_chunk(rows), {r[5] for r in rows if r[5] is not None})
+            else:
+                # Keep a bounded number of chunks in flight so memory stays flat
+                pending: Deque[Tuple[Future, Set[date]]] = deque()
+                spawn = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=workers, mp_context=spawn) as pool:
+                    for rows in _iter_chunks(session, chunk_size, force):
+                        pending.append((pool.submit(score_chunk, rows), {r[5] for r in rows if r[5] is not None}))
+                        if len(pending) >= workers * 2:
+                            fut, chunk_dates = pending.popleft()
+                            write(fut.result(), chunk_dates)
+                    while pending:
+                        fut, chunk_dates = pending.popleft()
+                        write(fut.result(), chunk_dates)
+            stage["rows"] = updated
+        logger.info("Re-enriched %d events", updated)
+
+        with ctx.stage("aggregate") as stage:
+            metrics_updated = 0
+            for d in sorted(dates):
+                metrics_updated += aggregate_daily_metrics(session, d)
+            stage["rows"] = metrics_updated
+        ctx.progress(0.9, "recomputing risk tiers")
+
+        if dates:
+            with ctx.stage("risk_tiers"):
+                compute_risk_and_trends(session)
+            with ctx.stage("country_summary") as stage:
+                stage["rows"] = refresh_country_summary(session)
+            with ctx.stage("rollups") as stage:
+                stage["rows"] = refresh_metric_rollups(session)
+            if analytics_engine.enabled():
+                with ctx.stage("analytics_export") as stage:
+                    stage["rows"] = sum(analytics_engine.export_parquet(session, dates=dates).values())
+            bump_data_version(session)
+            _clear_pending_dates(session)
+
+    return {
+        "events_re_enriched": updated,
+        "events_skipped_current_version": all_events - total,
+        "severity_version": SEVERITY_ALGORITHM_VERSION,
+        "dates_recomputed": len(dates),
+        "metrics_updated": metrics_updated,
+    }
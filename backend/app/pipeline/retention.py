@@ -0,0 +1,203 @@
+"""
+Events retention: archive old events to Parquet, compact the database, prune raw ZIPs.
+
+Runs as a DAG of stages (see dag.py), from the built-in scheduler when
+EVENTS_RETENTION_DAYS or RAW_RETENTION_DAYS is set, or on demand:
+
+    python -m backend.app.pipeline.retention [--days 180] [--raw-days 14]
+
+  - archive:   events dated before today - EVENTS_RETENTION_DAYS are written to
+               date-partitioned Parquet (archive.py), then deleted from events
+               (with event_text and event_entities), one date per transaction. The file is
+               written first, so a crash in between only re-merges the date.
+  - compact:   on SQLite, VACUUM once free pages pass RETENTION_VACUUM_FREE_RATIO.
+  - prune_raw: GDELT ZIPs in data/raw older than RAW_RETENTION_DAYS are deleted
+               with their normalize checkpoints.
+
+daily_metrics and the rollup tables stay in the database: aggregate_daily_metrics
+only rebuilds dates from the archive horizon on (see archive_horizon()), and
+GET /events reads archived partitions when a page reaches past it.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, inspect, select
+from sqlalchemy.orm import Session
+
+from .. import archive
+from ..config import config
+from ..db import dialect_name
+from ..jobs import JobContext
+from ..models import EVENT_TEXT_COLUMNS, Event, EventEntity, EventText, PipelineCheckpoint
+from ..pipeline_config import EVENTS_RETENTION_DAYS, RAW_RETENTION_DAYS, RETENTION_VACUUM_FREE_RATIO
+from ..search import rebuild_search_index
+from .dag import DagRun, Stage, StageResult, get_checkpoint, run_dag, set_checkpoint
+
+logger = logging.getLogger("events-risk-dashboard.retention")
+
+PIPELINE = "retention"
+# Ingest re-aggregates recent dates from events (Valyu looks back a week), so those must stay in the table
+MIN_RETENTION_DAYS = 30
+RAW_ZIP_SUFFIX = ".export.CSV.zip"
+
+_ID_CHUNK = 900
+
+
+def archive_horizon(session: Session) -> Optional[date]:
+    """First date still kept in events after archiving (events before it are in Parquet), or None."""
+    if not inspect(session.connection()).has_table(PipelineCheckpoint.__tablename__):
+        # A database from before pipeline checkpoints (run_migration.py back-fills) has archived nothing
+        return None
+    checkpoint = get_checkpoint(session, PIPELINE, "archive", "events")
+    return date.fromisoformat(checkpoint.fingerprint) if checkpoint and checkpoint.fingerprint else None
+
+
+def live_dates(session: Session, dates: Iterable[date]) -> List[date]:
+    """
+    The dates not before the archive horizon, sorted. Rollups rebuilt per date
+    from events must skip archived dates: a re-ingested old event would
+    otherwise replace the whole archived day with itself.
+    """
+    horizon = archive_horizon(session)
+    return sorted(d for d in set(dates) if horizon is None or d >= horizon)
+
+
+def archive_events(session: Session, before: date) -> int:
+    """
+    Move events dated before `before` into the Parquet archive, committing per date.
+    Returns events archived.
+    """
+    if before > date.today() - timedelta(days=MIN_RETENTION_DAYS):
+        raise ValueError(f"retention horizon must be at least {MIN_RETENTION_DAYS} days back")
+    if not archive.HAS_PYARROW:
+        raise archive.ArchiveUnavailable("pyarrow is not installed; install it to archive events")
+
+    dates = session.execute(
+        select(Event.date).where(Event.date < before).distinct().order_by(Event.date)
+    ).scalars().all()
+    stmt = (
+        select(Event.__table__, *(getattr(EventText, c) for c in EVENT_TEXT_COLUMNS))
+        .outerjoin(EventText, EventText.event_id == Event.id)
+    )
+    archived = 0
+    for d in dates:
+        rows = [dict(r) for r in session.execute(stmt.where(Event.date == d)).mappings()]
+        archive.write_partition(d, rows)
+        ids = [r["id"] for r in rows]
+        for i in range(0, len(ids), _ID_CHUNK):
+            part = ids[i:i + _ID_CHUNK]
+            session.execute(delete(EventEntity).where(EventEntity.event_id.in_(part)))
+            session.execute(delete(EventText).where(EventText.event_id.in_(part)))
+        session.execute(delete(Event).where(Event.date == d))
+        session.commit()
+        archived += len(rows)
+        logger.info("archived events", extra={"date": str(d), "events": len(rows)})
+
+    current = archive_horizon(session)
+    if current is None or before > current:
+        set_checkpoint(session, PIPELINE, "archive", "events", before.isoformat(), rows=archived)
+    return archived
+
+
+def compact_database(session: Session, min_free_ratio: float = RETENTION_VACUUM_FREE_RATIO) -> bool:
+    """
+    VACUUM a SQLite database whose free pages exceed min_free_ratio, then
+    re-index search (VACUUM may renumber event_text rowids). Returns whether it ran.
+    """
+    if dialect_name(session) != "sqlite":
+        return False  # PostgreSQL reclaims space with autovacuum
+    pages = _pragma(session, "page_count")
+    free = _pragma(session, "freelist_count")
+    if not pages or free / pages < min_free_ratio:
+        return False
+    session.commit()
+    # VACUUM cannot run inside a transaction
+    with session.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("VACUUM")
+    rebuild_search_index(session)
+    logger.info("vacuumed database", extra={"pages": pages, "free_pages": free})
+    return True
+
+
+def _pragma(session: Session, name: str) -> int:
+    return int(session.connection().exec_driver_sql(f"PRAGMA {name}").scalar() or 0)
+
+
+def prune_raw_zips(session: Session, before: date) -> int:
+    """Delete GDELT export ZIPs dated before `before` and their normalize checkpoints. Returns files deleted."""
+    if not config.raw_data_dir.is_dir():
+        return 0
+    removed: List[str] = []
+    for path in config.raw_data_dir.glob(f"*{RAW_ZIP_SUFFIX}"):
+        try:
+            d = date(int(path.name[:4]), int(path.name[4:6]), int(path.name[6:8]))
+        except ValueError:
+            continue
+        if d < before:
+            path.unlink()
+            removed.append(path.name)
+    for i in range(0, len(removed), _ID_CHUNK):
+        session.execute(delete(PipelineCheckpoint).where(
+            PipelineCheckpoint.pipeline == "gdelt",
+            PipelineCheckpoint.stage == "normalize",
+            PipelineCheckpoint.key.in_(removed[i:i + _ID_CHUNK]),
+        ))
+    logger.info("pruned raw zips", extra={"files": len(removed)})
+    return len(removed)
+
+
+def retention_stages(days: int = EVENTS_RETENTION_DAYS, raw_days: int = RAW_RETENTION_DAYS) -> List[Stage]:
+    """Stage DAG for retention; a horizon of 0 days skips that part."""
+    today = date.today()
+
+    def _archive(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+        if days <= 0:
+            return StageResult(rows=0, changed=False)
+        n = archive_events(session, today - timedelta(days=days))
+        return StageResult(rows=n, changed=n > 0)
+
+    def _compact(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+        return StageResult(rows=int(compact_database(session)), changed=False)
+
+    def _prune_raw(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+        if raw_days <= 0:
+            return StageResult(rows=0, changed=False)
+        return StageResult(rows=prune_raw_zips(session, today - timedelta(days=raw_days)), changed=False)
+
+    return [
+        Stage("archive", _archive),
+        Stage("compact", _compact, depends_on=("archive",)),
+        Stage("prune_raw", _prune_raw),
+    ]
+
+
+def run_retention(
+    days: int = EVENTS_RETENTION_DAYS,
+    raw_days: int = RAW_RETENTION_DAYS,
+    ctx: Optional[JobContext] = None,
+) -> DagRun:
+    """Archive → compact, and prune raw ZIPs."""
+    logger.info("starting retention", extra={"days": days, "raw_days": raw_days})
+    return run_dag(PIPELINE, retention_stages(days, raw_days), ctx)
+
+
+def main() -> None:
+    from ..logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Archive old events to Parquet, compact the DB, prune raw ZIPs.")
+    parser.add_argument("--days", type=int, default=EVENTS_RETENTION_DAYS,
+                        help="Archive events older than this many days (0 = keep; default: %(default)s).")
+    parser.add_argument("--raw-days", type=int, default=RAW_RETENTION_DAYS,
+                        help="Delete GDELT ZIPs older than this many days (0 = keep; default: %(default)s).")
+    args = parser.parse_args()
+    setup_logging()
+    run = run_retention(days=args.days, raw_days=args.raw_days)
+    print({name: (run.statuses[name], r.rows) for name, r in run.results.items()})
+
+
+if __name__ == "__main__":
+    main()
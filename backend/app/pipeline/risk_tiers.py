@@ -0,0 +1,147 @@
+"""
+Risk tier model persistence: fit once per pipeline run, store in risk_tier_config,
+and load the latest version for API reads (tiers stay consistent across requests).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..ml.risk_classifier import TIER_NAMES, RiskTierClassifier, assign_tier
+from ..models import DailyMetric, RiskTierConfig
+from ..pipeline_config import RISK_TIER_SAMPLE_SIZE
+
+logger = logging.getLogger("events-risk-dashboard.risk_tiers")
+
+# Process-local cache of the latest stored model, keyed by (database URL, version):
+# versions are numbered per database, so another engine's version 1 is a different model
+_cache: Dict[str, object] = {"key": None, "classifier": None}
+
+
+def save_tier_config(session: Session, classifier: RiskTierClassifier) -> int:
+    """
+    Append one risk_tier_config row per tier for a fitted classifier under a new version.
+    Returns the version written.
+    """
+    now = datetime.now(timezone.utc)
+    n_samples = classifier.n_samples
+    current = session.execute(select(func.max(RiskTierConfig.version))).scalar()
+    version = (current or 0) + 1
+    for name in TIER_NAMES:
+        lower, upper = classifier.tier_ranges.get(name, (None, None))
+        if lower is None:
+            continue
+        session.add(
+            RiskTierConfig(
+                version=version,
+                method=classifier.method,
+                tier=name,
+                lower_bound=float(lower),
+                upper_bound=float(upper),
+                centroid=classifier.centroids.get(name),
+                n_samples=n_samples,
+                created_at=now,
+            )
+        )
+    session.flush()
+    _cache["key"] = None
+    logger.info("risk tier config saved", extra={"version": version, "n_samples": n_samples})
+    return version
+
+
+def fit_risk_tiers(session: Session) -> Optional[RiskTierClassifier]:
+    """
+    Fit Jenks tiers on daily_metrics.severity_index and persist them.
+    Returns the fitted classifier, or None when there are no scores.
+    """
+    scores = session.execute(
+        select(DailyMetric.severity_index).where(DailyMetric.severity_index.isnot(None))
+    ).scalars().all()
+    if not scores:
+        logger.info("no severity scores; skipping risk tier fit")
+        return None
+    classifier = RiskTierClassifier(method="jenks")
+    classifier.fit([float(s) for s in scores], sample_size=RISK_TIER_SAMPLE_SIZE)
+    save_tier_config(session, classifier)
+    return classifier
+
+
+def load_latest_tier_config(session: Session) -> Optional[RiskTierClassifier]:
+    """
+    Rebuild a classifier from the latest stored tier config (boundaries only; no scores).
+    Cached per version, so a steady-state call is one indexed MAX() lookup.
+    """
+    version = session.execute(select(func.max(RiskTierConfig.version))).scalar()
+    if version is None:
+        return None
+    key = (session.get_bind().url.render_as_string(hide_password=True), version)
+    if _cache["key"] == key:
+        return _cache["classifier"]  # type: ignore[return-value]
+
+    rows = session.execute(
+        select(RiskTierConfig).where(RiskTierConfig.version == version)
+    ).scalars().all()
+    by_tier = {r.tier: r for r in rows}
+    if any(name not in by_tier for name in TIER_NAMES):
+        logger.warning("incomplete risk tier config", extra={"version": version})
+        return None
+
+    classifier = RiskTierClassifier(method=rows[0].method)
+    classifier.boundaries = [by_tier[name].lower_bound for name in TIER_NAMES[1:]]
+    classifier.tier_ranges = {
+        name: (by_tier[name].lower_bound, by_tier[name].upper_bound) for name in TIER_NAMES
+    }
+    classifier.centroids = {name: by_tier[name].centroid for name in TIER_NAMES}
+    classifier.n_samples = rows[0].n_samples or 0
+    created = rows[0].created_at
+    classifier.fitted_at = created.isoformat() if created else None
+    classifier.version = version
+
+    _cache["key"] = key
+    _cache["classifier"] = classifier
+    return classifier
+
+
+def tier_for(
+    severity_index: Optional[float],
+    classifier: Optional[RiskTierClassifier],
+    fallback: Optional[str] = None,
+) -> Optional[str]:
+    """Tier for a severity under the stored model; fallback when either is missing."""
+    if severity_index is None or classifier is None:
+        return fallback
+    return assign_tier(float(severity_index), classifier.boundaries)
+
+
+# Sort rank per tier: critical first
+THREAT_RANK: Dict[str, int] = {name: len(TIER_NAMES) - 1 - i for i, name in enumerate(TIER_NAMES)}
+
+
+def threat_rank_expr(
+    severity_col: ColumnElement,
+    fallback_col: ColumnElement,
+    classifier: Optional[RiskTierClassifier],
+    default: str = "medium",
+) -> ColumnElement:
+    """
+    SQL equivalent of THREAT_RANK[tier_for(severity, classifier, fallback) or default],
+    so threat ordering (and keyset pagination over it) runs in the database.
+    """
+    fallback_rank = case(
+        {name: rank for name, rank in THREAT_RANK.items()},
+        value=fallback_col,
+        else_=THREAT_RANK[default],
+    )
+    if classifier is None or not classifier.boundaries:
+        return fallback_rank
+    whens = [(severity_col.is_(None), fallback_rank)]
+    whens += [
+        (severity_col < bound, THREAT_RANK[TIER_NAMES[i]])
+        for i, bound in enumerate(classifier.boundaries)
+    ]
+    return case(*whens, else_=THREAT_RANK[TIER_NAMES[-1]])
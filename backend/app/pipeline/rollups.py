@@ -0,0 +1,221 @@
+"""
+Weekly and monthly rollups of daily_metrics in metric_rollups, per
+(country, category) and per country (category "*"): days with data, event
+count, mean/max severity, max risk and the most frequent daily tier.
+
+Day 2 and the tier refit can move any day's values, so each refresh
+recomputes the periods from daily_metrics in one pass over narrow columns
+and writes only the rollup rows whose values changed (and drops periods
+that no longer have data). Pipelines call refresh_metric_rollups() after
+daily_metrics is final; pass `since` to leave earlier periods untouched.
+
+Long-range trend reads (/analytics/sparklines, /analytics/decomposition,
+/history/risk) pick a granularity with pick_granularity(). Existing
+databases are filled with:
+
+    python -m backend.app.pipeline.rollups [--since YYYY-MM-DD]
+"""
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.orm import Session
+
+from ..models import DailyMetric, MetricRollup
+from ..pipeline_config import ROLLUP_DAY_MAX_DAYS, ROLLUP_WEEK_MAX_DAYS
+from .risk_tiers import THREAT_RANK
+
+logger = logging.getLogger("events-risk-dashboard.rollups")
+
+GRANULARITIES = ("week", "month")
+ALL_CATEGORIES = "*"
+ROLLUP_KEY = ("granularity", "category", "country", "period_start")  # uq_metric_rollups_key
+
+# Compared when diffing fresh against stored rows
+_VALUE_COLUMNS = ("period_end", "days", "event_count", "mean_severity", "max_severity", "max_risk", "risk_tier")
+
+Key = Tuple[str, str, str, date]  # granularity, category, country, period_start
+
+
+def period_start(d: date, granularity: str) -> date:
+    """First day of the week (Monday) or month containing d; d itself for "day"."""
+    if granularity == "week":
+        return d - timedelta(days=d.weekday())
+    if granularity == "month":
+        return d.replace(day=1)
+    return d
+
+
+def period_end(start: date, granularity: str) -> date:
+    """Last day of the period starting at `start`."""
+    if granularity == "week":
+        return start + timedelta(days=6)
+    if granularity == "month":
+        next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return next_month - timedelta(days=1)
+    return start
+
+
+def pick_granularity(days: int, requested: str = "auto") -> str:
+    """
+    Granularity for a trend read over `days`: the requested one, or for "auto"
+    daily rows up to ROLLUP_DAY_MAX_DAYS, weeks up to ROLLUP_WEEK_MAX_DAYS, then months.
+    """
+    if requested != "auto":
+        return requested
+    if days <= ROLLUP_DAY_MAX_DAYS:
+        return "day"
+    if days <= ROLLUP_WEEK_MAX_DAYS:
+        return "week"
+    return "month"
+
+
+class _Acc:
+    __slots__ = ("dates", "event_count", "severity_sum", "severity_n", "max_severity", "max_risk", "tiers")
+
+    def __init__(self) -> None:
+        self.dates: set = set()
+        self.event_count = 0
+        self.severity_sum = 0.0
+        self.severity_n = 0
+        self.max_severity: Optional[float] = None
+        self.max_risk: Optional[float] = None
+        self.tiers: Counter = Counter()
+
+    def add(self, d: date, event_count: int, severity: Optional[float], risk: Optional[float], tier: Optional[str]) -> None:
+        self.dates.add(d)
+        self.event_count += event_count or 0
+        if severity is not None:
+            self.severity_sum += severity
+            self.severity_n += 1
+            if self.max_severity is None or severity > self.max_severity:
+                self.max_severity = severity
+        if risk is not None and (self.max_risk is None or risk > self.max_risk):
+            self.max_risk = risk
+        if tier:
+            self.tiers[tier] += 1
+
+    def row(self, key: Key) -> Dict[str, Any]:
+        granularity, category, country, start = key
+        # THREAT_RANK is 0 for critical, so a lower rank wins a tie
+        tier = min(self.tiers, key=lambda t: (-self.tiers[t], THREAT_RANK.get(t, len(THREAT_RANK)))) if self.tiers else None
+        return {
+            "granularity": granularity, "category": category, "country": country, "period_start": start,
+            "period_end": period_end(start, granularity),
+            "days": len(self.dates),
+            "event_count": int(self.event_count),
+            "mean_severity": round(self.severity_sum / self.severity_n, 2) if self.severity_n else None,
+            "max_severity": _round(self.max_severity),
+            "max_risk": _round(self.max_risk),
+            "risk_tier": tier,
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(float(value), 2) if value is not None else None
+
+
+def compute_rollups(session: Session, since: Optional[date] = None) -> Dict[Key, Dict[str, Any]]:
+    """Rollup rows for every period from the one containing `since` (all periods when None)."""
+    stmt = select(
+        DailyMetric.date, DailyMetric.country, DailyMetric.category, DailyMetric.event_count,
+        DailyMetric.severity_index, DailyMetric.risk_score, DailyMetric.risk_tier,
+    )
+    if since is not None:
+        # Months start no later than weeks, so this covers both
+        stmt = stmt.where(DailyMetric.date >= min(period_start(since, g) for g in GRANULARITIES))
+
+    accs: Dict[Key, _Acc] = {}
+    starts: Dict[date, Tuple[Tuple[str, date], ...]] = {}
+    for d, country, category, event_count, severity, risk, tier in session.execute(
+        stmt.execution_options(yield_per=10_000)
+    ):
+        severity = float(severity) if severity is not None else None
+        risk = float(risk) if risk is not None else None
+        periods = starts.get(d)
+        if periods is None:
+            periods = starts[d] = tuple((g, period_start(d, g)) for g in GRANULARITIES)
+        for granularity, start in periods:
+            for cat in (category, ALL_CATEGORIES):
+                key = (granularity, cat, country, start)
+                acc = accs.get(key)
+                if acc is None:
+                    acc = accs[key] = _Acc()
+                acc.add(d, event_count, severity, risk, tier)
+
+    rows = {key: acc.row(key) for key, acc in accs.items()}
+    if since is not None:
+        # The month pass reads a few days before the week containing `since`
+        rows = {k: r for k, r in rows.items() if k[3] >= period_start(since, k[0])}
+    return rows
+
+
+def refresh_metric_rollups(session: Session, since: Optional[date] = None) -> int:
+    """
+    Bring metric_rollups in line with daily_metrics for periods from `since`
+    (all when None). Returns rollup rows inserted, updated or deleted.
+    """
+    fresh = compute_rollups(session, since)
+
+    scope = []
+    for granularity in GRANULARITIES:
+        cond = MetricRollup.granularity == granularity
+        if since is not None:
+            cond = and_(cond, MetricRollup.period_start >= period_start(since, granularity))
+        scope.append(cond)
+    stored: Dict[Key, Tuple[int, Tuple]] = {}  # key -> (id, values)
+    stale: List[int] = []
+    for r in session.execute(
+        select(MetricRollup.id, *[getattr(MetricRollup, c) for c in ROLLUP_KEY + _VALUE_COLUMNS])
+        .where(or_(*scope))
+    ):
+        key = tuple(r[1:1 + len(ROLLUP_KEY)])
+        if key in fresh:
+            stored[key] = (r.id, tuple(r[1 + len(ROLLUP_KEY):]))
+        else:
+            stale.append(r.id)
+
+    # Keys are known from the read above, so plain executemany inserts/updates instead of an UPSERT
+    now = datetime.now(timezone.utc)
+    inserts: List[Dict[str, Any]] = []
+    updates: List[Dict[str, Any]] = []
+    for key, row in fresh.items():
+        current = stored.get(key)
+        if current is None:
+            inserts.append({**row, "updated_at": now})
+        elif current[1] != tuple(row[c] for c in _VALUE_COLUMNS):
+            updates.append({"id": current[0], **{c: row[c] for c in _VALUE_COLUMNS}, "updated_at": now})
+    if inserts:
+        session.bulk_insert_mappings(MetricRollup, inserts)
+    if updates:
+        session.bulk_update_mappings(MetricRollup, updates)
+    for i in range(0, len(stale), 900):
+        session.execute(delete(MetricRollup).where(MetricRollup.id.in_(stale[i:i + 900])))
+    session.flush()
+    logger.info(
+        "metric rollups refreshed",
+        extra={
+            "since": str(since) if since else None, "periods": len(fresh),
+            "inserted": len(inserts), "updated": len(updates), "deleted": len(stale),
+        },
+    )
+    return len(inserts) + len(updates) + len(stale)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from ..db import Base, engine, get_db_session
+    from ..logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Refresh weekly/monthly metric_rollups from daily_metrics.")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="Only periods from this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+    setup_logging()
+    Base.metadata.create_all(bind=engine)
+    with get_db_session() as session:
+        print(f"metric_rollups rows written: {refresh_metric_rollups(session, since=args.since)}")
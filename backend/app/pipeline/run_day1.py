@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import logging
 
+from ..cache import bump_data_version
 from ..db import get_db_session
 from .ingest_gdelt import download_daily_exports
 from .normalize import normalize_many
@@ -33,6 +34,7 @@ def run_pipeline(days: int) -> None:
 
         metrics_rows = aggregate_daily_metrics(session=session)
         logger.info("aggregated daily metrics", extra={"rows": metrics_rows})
+        bump_data_version(session)
 
     logger.info("day1 pipeline completed")
 
@@ -1,5 +1,6 @@
 """
-Run Day 2 pipeline: rolling baselines, z-scores, risk scores, spike detection.
+Run Day 2 pipeline: rolling baselines, z-scores, risk scores, spike detection,
+then refit risk tiers before the map summary is refreshed (as gdelt_stages does).
 
 Requires daily_metrics to already be populated (run Day 1 pipeline first).
 """
@@ -7,9 +8,14 @@ from __future__ import annotations
 
 import argparse
 
+from .. import analytics_engine
+from ..cache import bump_data_version
 from ..db import get_db_session
 from ..logging_config import setup_logging, logger
+from .country_summary import refresh_country_summary
 from .day2_baselines_risk import run_day2_pipeline
+from .risk_tiers import fit_risk_tiers
+from .rollups import refresh_metric_rollups
 
 
 def main() -> None:
@@ -19,6 +25,12 @@ def main() -> None:
     logger.info("starting day2 pipeline")
     with get_db_session() as session:
         run_day2_pipeline(session)
+        fit_risk_tiers(session)  # country_summary reads tiers from the latest stored config
+        refresh_country_summary(session)
+        refresh_metric_rollups(session)
+        if analytics_engine.enabled():
+            analytics_engine.export_parquet(session)
+        bump_data_version(session)
     logger.info("day2 pipeline completed")
 
 
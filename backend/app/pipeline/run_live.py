@@ -1,11 +1,18 @@
 """
 Live ingest pipeline (Step 1): incremental GDELT pull + full refresh of metrics and risk.
 
-Run on a schedule (e.g. cron every 6h):
+Runs as a DAG of stages (see dag.py), either from the built-in scheduler
+(scheduler.py) or on demand / from cron:
   - Download latest 1–2 days of GDELT exports (optionally re-download latest day for updates).
-  - Normalize into events (upsert by event ID — no duplicates).
+  - Normalize into events (upsert by event ID — no duplicates); ZIPs whose content
+    hash matches their checkpoint are skipped.
   - Re-aggregate daily_metrics from all events, then run Day 2 (baselines, risk, spikes).
+  - Fit risk tiers once and store them in risk_tier_config for the API.
+  - Refresh the country_summary table behind GET /map and the weekly/monthly metric_rollups.
   - Optionally append risk snapshots for history.
+  - With ANALYTICS_ENGINE=duckdb, re-export events and daily_metrics to Parquet.
+
+Each stage commits on its own; when normalize finds nothing new, every later stage is skipped.
 
 Requires an initial Day 1 run (e.g. run_day1 --days 14) so the DB has enough history for rolling baselines.
 """
@@ -13,58 +20,124 @@ from __future__ import annotations
 
 import argparse
 import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
 
+from .. import analytics_engine
 from ..config import config
-from ..db import get_db_session
+from ..jobs import JobContext
 from ..logging_config import setup_logging, logger
 from .ingest_gdelt import download_daily_exports
-from .normalize import normalize_many
+from .normalize import normalize_zip_to_events
 from .aggregate_daily import aggregate_daily_metrics
+from .country_summary import refresh_country_summary
+from .dag import DagRun, Stage, StageResult, file_fingerprint, get_checkpoint, run_dag, set_checkpoint
 from .day2_baselines_risk import run_day2_pipeline
+from .risk_tiers import fit_risk_tiers
+from .rollups import refresh_metric_rollups
 
+PIPELINE = "gdelt"
 
-def run_live_pipeline(snapshot: bool = True) -> None:
-    """
-    Run live ingest: download latest days → normalize (upsert) → aggregate → Day 2 → optional snapshot.
-    """
-    setup_logging()
-
-    logger.info(
-        "starting live ingest pipeline",
-        extra={
-            "live_ingest_days": config.live_ingest_days,
-            "redownload_latest": config.live_redownload_latest,
-        },
-    )
 
+def _download(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
     zips = download_daily_exports(
         days=config.live_ingest_days,
         redownload_latest=config.live_redownload_latest,
     )
     if not zips:
         logger.warning("no gdelt zip files from live ingest - nothing to process")
-        return
+    return StageResult(rows=len(zips), changed=bool(zips), output=zips)
+
+
+def _normalize(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+    inserted = 0
+    processed = 0
+    for zp in upstream["download"].output:
+        fingerprint = file_fingerprint(zp)
+        checkpoint = get_checkpoint(session, PIPELINE, "normalize", zp.name)
+        if checkpoint and checkpoint.fingerprint == fingerprint:
+            logger.info("zip unchanged since last normalize; skipping", extra={"path": str(zp)})
+            continue
+        n = normalize_zip_to_events(zp, session=session)
+        set_checkpoint(session, PIPELINE, "normalize", zp.name, fingerprint, rows=n)
+        session.commit()  # checkpoint per ZIP
+        inserted += n
+        processed += 1
+    logger.info("normalized events (upsert)", extra={"inserted": inserted, "zips": processed})
+    return StageResult(rows=inserted, changed=processed > 0)
+
+
+def _aggregate(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+    rows = aggregate_daily_metrics(session=session)
+    return StageResult(rows=rows, changed=rows > 0)
+
+
+def _day2(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+    run_day2_pipeline(session)
+    return StageResult(rows=upstream["aggregate"].rows)
 
-    with get_db_session() as session:
-        inserted = normalize_many(zips, session=session)
-        logger.info("normalized events (upsert)", extra={"inserted": inserted})
 
-        metrics_rows = aggregate_daily_metrics(session=session)
-        logger.info("aggregated daily metrics", extra={"rows": metrics_rows})
+def _risk_tiers(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+    classifier = fit_risk_tiers(session)
+    return StageResult(rows=classifier.n_samples if classifier else 0, changed=classifier is not None)
 
-        run_day2_pipeline(session)
-        logger.info("day2 pipeline (baselines, risk, spikes) completed")
 
-        if snapshot:
-            try:
-                from .risk_snapshots import append_risk_snapshots
+def _country_summary(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+    return StageResult(rows=refresh_country_summary(session))
 
-                appended = append_risk_snapshots(session)
-                logger.info("risk snapshots appended", extra={"rows": appended})
-            except Exception as e:  # noqa: BLE001
-                logger.warning("risk snapshots skipped", extra={"error": str(e)})
 
-    logger.info("live ingest pipeline completed")
+def _rollups(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+    return StageResult(rows=refresh_metric_rollups(session))
+
+
+def _analytics_export(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+    # changed=True bumps the data version, so responses cached from the previous export are dropped
+    return StageResult(rows=sum(analytics_engine.export_parquet(session).values()))
+
+
+def _snapshot(session: Session, upstream: Dict[str, StageResult]) -> StageResult:
+    try:
+        from .risk_snapshots import append_risk_snapshots
+
+        return StageResult(rows=append_risk_snapshots(session))
+    except Exception as e:  # noqa: BLE001
+        logger.warning("risk snapshots skipped", extra={"error": str(e)})
+        return StageResult(rows=0, changed=False)
+
+
+def gdelt_stages(snapshot: bool = True) -> List[Stage]:
+    """Stage DAG for the live GDELT pipeline."""
+    stages = [
+        Stage("download", _download),
+        Stage("normalize", _normalize, depends_on=("download",)),
+        Stage("aggregate", _aggregate, depends_on=("normalize",)),
+        Stage("day2", _day2, depends_on=("aggregate",)),
+        Stage("risk_tiers", _risk_tiers, depends_on=("day2",)),
+        Stage("country_summary", _country_summary, depends_on=("risk_tiers",)),
+        Stage("rollups", _rollups, depends_on=("risk_tiers",)),
+    ]
+    if analytics_engine.enabled():
+        stages.append(Stage("analytics_export", _analytics_export, depends_on=("rollups",)))
+    if snapshot:
+        stages.append(Stage("snapshot", _snapshot, depends_on=("day2",)))
+    return stages
+
+
+def run_live_pipeline(snapshot: bool = True, ctx: Optional[JobContext] = None) -> DagRun:
+    """
+    Run live ingest: download latest days → normalize (upsert) → aggregate → Day 2 → tiers → country summary + rollups → optional snapshot.
+    """
+    logger.info(
+        "starting live ingest pipeline",
+        extra={
+            "live_ingest_days": config.live_ingest_days,
+            "redownload_latest": config.live_redownload_latest,
+        },
+    )
+    run = run_dag(PIPELINE, gdelt_stages(snapshot=snapshot), ctx)
+    logger.info("live ingest pipeline completed", extra={"statuses": run.statuses})
+    return run
 
 
 def main() -> None:
@@ -77,6 +150,7 @@ def main() -> None:
         help="Skip appending risk snapshots for history.",
     )
     args = parser.parse_args()
+    setup_logging()
     run_live_pipeline(snapshot=not args.no_snapshot)
 
 
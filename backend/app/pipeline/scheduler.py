@@ -0,0 +1,159 @@
+"""
+Built-in pipeline scheduler: runs the GDELT and Valyu stage DAGs (and, when
+EVENTS_RETENTION_DAYS or RAW_RETENTION_DAYS is set, retention) on fixed intervals.
+
+Usable two ways:
+  - from the API lifespan (PIPELINE_SCHEDULER_ENABLED=1): a daemon thread started
+    and stopped with the app;
+  - as a standalone daemon: `python -m backend.app.pipeline.scheduler`.
+
+Runs go through jobs.submit_job, so they are recorded in pipeline_runs (per-stage
+durations and row counts) and never overlap with each other or with manual
+/pipeline runs; a due run that finds the lock held is retried on the next poll.
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from ..jobs import JobBusyError, JobContext, submit_job
+from ..logging_config import logger, setup_logging
+from ..pipeline_config import (
+    EVENTS_RETENTION_DAYS,
+    RAW_RETENTION_DAYS,
+    SCHEDULE_GDELT_MINUTES,
+    SCHEDULE_RETENTION_MINUTES,
+    SCHEDULE_VALYU_MINUTES,
+    SCHEDULER_POLL_SECONDS,
+)
+
+
+@dataclass
+class ScheduledPipeline:
+    kind: str
+    interval_s: float
+    run: Callable[[JobContext], Dict[str, Any]]
+    next_due: float = 0.0  # monotonic; 0 = run on first poll
+
+
+def _run_gdelt(ctx: JobContext) -> Dict[str, Any]:
+    from .run_live import run_live_pipeline
+
+    run = run_live_pipeline(snapshot=True, ctx=ctx)
+    return {"stages": run.statuses, "rows": {name: r.rows for name, r in run.results.items()}}
+
+
+def _run_valyu(ctx: JobContext) -> Dict[str, Any]:
+    from .ingest_valyu import run_valyu_pipeline
+
+    return run_valyu_pipeline(days_back=2, ctx=ctx)
+
+
+def _run_retention(ctx: JobContext) -> Dict[str, Any]:
+    from .retention import run_retention
+
+    run = run_retention(ctx=ctx)
+    return {"stages": run.statuses, "rows": {name: r.rows for name, r in run.results.items()}}
+
+
+def default_pipelines() -> List[ScheduledPipeline]:
+    """GDELT, Valyu and retention schedules from pipeline_config; an interval <= 0 disables a pipeline."""
+    pipelines = []
+    if SCHEDULE_GDELT_MINUTES > 0:
+        pipelines.append(ScheduledPipeline("scheduled_gdelt", SCHEDULE_GDELT_MINUTES * 60, _run_gdelt))
+    if SCHEDULE_VALYU_MINUTES > 0:
+        pipelines.append(ScheduledPipeline("scheduled_valyu", SCHEDULE_VALYU_MINUTES * 60, _run_valyu))
+    if SCHEDULE_RETENTION_MINUTES > 0 and (EVENTS_RETENTION_DAYS > 0 or RAW_RETENTION_DAYS > 0):
+        pipelines.append(
+            ScheduledPipeline("scheduled_retention", SCHEDULE_RETENTION_MINUTES * 60, _run_retention)
+        )
+    return pipelines
+
+
+class PipelineScheduler:
+    """Polls every `poll_s` seconds and submits any pipeline whose interval has elapsed."""
+
+    def __init__(
+        self,
+        pipelines: Optional[List[ScheduledPipeline]] = None,
+        poll_s: float = SCHEDULER_POLL_SECONDS,
+    ):
+        self.pipelines = pipelines if pipelines is not None else default_pipelines()
+        self.poll_s = poll_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def tick(self) -> List[str]:
+        """Submit due pipelines. Returns the run IDs submitted."""
+        submitted = []
+        now = time.monotonic()
+        for p in self.pipelines:
+            if now < p.next_due:
+                continue
+            try:
+                run_id = submit_job(p.kind, p.run)
+            except JobBusyError as exc:
+                logger.info("scheduled run deferred; job running", extra={"kind": p.kind, "active": exc.active_run_id})
+                continue
+            p.next_due = now + p.interval_s
+            submitted.append(run_id)
+            logger.info("scheduled pipeline submitted", extra={"kind": p.kind, "run_id": run_id})
+        return submitted
+
+    def run_forever(self) -> None:
+        logger.info(
+            "pipeline scheduler started",
+            extra={"pipelines": [(p.kind, p.interval_s) for p in self.pipelines]},
+        )
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception:  # noqa: BLE001
+                logger.exception("pipeline scheduler tick failed")
+            self._stop.wait(self.poll_s)
+        logger.info("pipeline scheduler stopped")
+
+    def start(self) -> None:
+        """Run in a daemon thread (API lifespan)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run_forever, name="pipeline-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the GDELT/Valyu pipeline scheduler as a daemon.")
+    parser.add_argument("--once", action="store_true", help="Submit every pipeline once, wait, and exit.")
+    args = parser.parse_args()
+    setup_logging()
+
+    from ..db import Base, engine
+    from ..jobs import _executor
+    from ..search import ensure_search_index
+
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    scheduler = PipelineScheduler()
+    if args.once:
+        for p in scheduler.pipelines:
+            # Runs are serialized by the job lock; wait for each before the next
+            scheduler.tick()
+            _executor.submit(lambda: None).result()
+        return
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Dialect-aware bulk UPSERT helpers for events (with event_text), daily_metrics and spikes.
+
+SQLite and PostgreSQL both support INSERT ... ON CONFLICT (key) DO UPDATE, so
+a batch of rows is written in one statement per chunk instead of a SELECT +
+UPDATE/INSERT per row. Other dialects fall back to the per-row path.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from ..db import dialect_name
+from ..models import EVENT_TEXT_COLUMNS, DailyMetric, Event, EventText, Spike
+
+logger = logging.getLogger("events-risk-dashboard.upsert")
+
+# Keep (rows x columns) bound parameters under SQLite's limit (32766)
+_MAX_PARAMS = 30_000
+
+DAILY_METRIC_KEY = ("date", "country", "category")
+SPIKE_KEY = ("date", "country", "category", "baseline_method", "baseline_window_days", "pipeline_version")
+
+
+def _dialect_insert(session: Session):
+    name = dialect_name(session)
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert
+
+
+def upsert_rows(
+    session: Session,
+    model,
+    rows: Sequence[Dict[str, Any]],
+    key: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+) -> int:
+    """
+    INSERT rows into model's table; on a `key` conflict update `update_columns`
+    (default: every non-key column present in the rows). Returns rows written.
+    All rows must have the same keys.
+    """
+    if not rows:
+        return 0
+    columns = list(rows[0].keys())
+    if update_columns is None:
+        update_columns = [c for c in columns if c not in key]
+
+    insert = _dialect_insert(session)
+    if insert is None:
+        return _upsert_rows_portable(session, model, rows, key, update_columns)
+
+    chunk = max(1, _MAX_PARAMS // max(1, len(columns)))
+    for i in range(0, len(rows), chunk):
+        stmt = insert(model).values(list(rows[i:i + chunk]))
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(key),
+                set_={c: getattr(stmt.excluded, c) for c in update_columns},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(key))
+        session.execute(stmt)
+    return len(rows)
+
+
+def _upsert_rows_portable(session, model, rows, key, update_columns) -> int:
+    for row in rows:
+        existing = session.execute(
+            select(model).where(*[getattr(model, k) == row[k] for k in key])
+        ).scalars().first()
+        if existing:
+            for c in update_columns:
+                setattr(existing, c, row[c])
+        else:
+            session.add(model(**row))
+    session.flush()
+    return len(rows)
+
+
+def existing_keys(session: Session, model, key: Sequence[str], rows: Sequence[Dict[str, Any]]) -> Set[tuple]:
+    """Keys among `rows` that already exist (to report inserted vs updated counts)."""
+    found: Set[tuple] = set()
+    cols = [getattr(model, k) for k in key]
+    values = [tuple(r[k] for k in key) for r in rows]
+    chunk = max(1, 900 // len(key))
+    for i in range(0, len(values), chunk):
+        part = values[i:i + chunk]
+        where = cols[0].in_([v[0] for v in part]) if len(cols) == 1 else tuple_(*cols).in_(part)
+        found.update(tuple(r) for r in session.execute(select(*cols).where(where)).all())
+    return found
+
+
+# ── Table helpers ────────────────────────────────────────────────────────
+
+def upsert_events(
+    session: Session,
+    rows: List[Dict[str, Any]],
+    update_columns: Optional[Sequence[str]] = None,
+) -> int:
+    """
+    UPSERT events by id. Rows are flat (as normalize/ingest build them); title,
+    content, source_url and entities_json go to event_text under the same id.
+    Returns the number of new events (not previously stored).
+    """
+    if not rows:
+        return 0
+    already = existing_keys(session, Event, ("id",), rows)
+    text_columns = [c for c in rows[0] if c in EVENT_TEXT_COLUMNS]
+    core_columns = [c for c in rows[0] if c not in EVENT_TEXT_COLUMNS]
+    core_update = text_update = None
+    if update_columns is not None:
+        core_update = [c for c in update_columns if c not in EVENT_TEXT_COLUMNS]
+        text_update = [c for c in update_columns if c in EVENT_TEXT_COLUMNS]
+
+    upsert_rows(session, Event, [{c: r[c] for c in core_columns} for r in rows], ("id",), core_update)
+    if text_columns:
+        text_rows = [{"event_id": r["id"], **{c: r[c] for c in text_columns}} for r in rows]
+        upsert_rows(session, EventText, text_rows, ("event_id",), text_update)
+    return sum(1 for r in rows if (r["id"],) not in already)
+
+
+def upsert_daily_metrics(
+    session: Session,
+    rows: List[Dict[str, Any]],
+    update_columns: Optional[Sequence[str]] = None,
+) -> int:
+    """UPSERT daily_metrics by (date, country, category). Returns rows written."""
+    return upsert_rows(session, DailyMetric, rows, DAILY_METRIC_KEY, update_columns)
+
+
+def upsert_spikes(session: Session, rows: List[Dict[str, Any]]) -> int:
+    """UPSERT spikes by (date, country, category, baseline method/window, pipeline_version)."""
+    return upsert_rows(session, Spike, rows, SPIKE_KEY)
@@ -1,5 +1,9 @@
 """
 Analytics endpoints: risk distribution, category breakdown, sparklines, decomposition.
+
+History-wide reads (risk-distribution with `days`, category-breakdown) run in
+DuckDB over the Parquet export when ANALYTICS_ENGINE=duckdb (analytics_engine.py);
+category-breakdown then also counts events moved to the retention archive.
 """
 from __future__ import annotations
 
@@ -11,8 +15,9 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from .. import analytics_engine
 from ..db import get_db
-from ..models import DailyMetric, Event
+from ..models import DailyMetric, Event, MetricRollup
 from ..schemas import (
     CategoryBreakdownResponse,
     DecompositionResponse,
@@ -22,21 +27,37 @@ from ..schemas import (
 )
 from ..ml.risk_classifier import RiskTierClassifier
 from ..ml.time_series import compute_ewma, decompose_stl
+from ..pipeline.risk_tiers import load_latest_tier_config
+from ..pipeline.rollups import ALL_CATEGORIES, period_start, pick_granularity
 
 router = APIRouter(prefix="/analytics")
 
+GRANULARITY_PATTERN = "^(auto|day|week|month)$"
+# STL seasonal period per series granularity (a week of days, ~a month of weeks, a year of months)
+STL_PERIODS = {"day": 7, "week": 4, "month": 12}
+
 
 @router.get("/risk-distribution", response_model=RiskDistributionResponse)
 def get_risk_distribution(
+    days: Optional[int] = Query(default=None, ge=1, le=3650,
+                                description="Every daily row of the last N days instead of the latest 500"),
     db: Session = Depends(get_db),
 ) -> RiskDistributionResponse:
     """Histogram of severity/risk score distribution across all recent metrics."""
-    scores = db.execute(
-        select(DailyMetric.severity_index)
-        .where(DailyMetric.severity_index.isnot(None))
-        .order_by(DailyMetric.date.desc())
-        .limit(500)
-    ).scalars().all()
+    bin_edges = list(analytics_engine.SEVERITY_BIN_EDGES)
+    bin_labels = ["0-20", "20-40", "40-60", "60-80", "80-100"]
+
+    if days is not None and analytics_engine.available():
+        counts, stats = analytics_engine.severity_distribution(date.today() - timedelta(days=days))
+        bins = [{"range": label, "count": c} for label, c in zip(bin_labels, counts)]
+        return RiskDistributionResponse(bins=bins, stats=stats)
+
+    stmt = select(DailyMetric.severity_index).where(DailyMetric.severity_index.isnot(None))
+    if days is not None:
+        stmt = stmt.where(DailyMetric.date >= date.today() - timedelta(days=days))
+    else:
+        stmt = stmt.order_by(DailyMetric.date.desc()).limit(500)
+    scores = db.execute(stmt).scalars().all()
 
     if not scores:
         return RiskDistributionResponse(bins=[], stats={})
@@ -44,8 +65,6 @@ def get_risk_distribution(
     arr = np.array([float(s) for s in scores])
 
     # Build histogram bins
-    bin_edges = [0, 20, 40, 60, 80, 100]
-    bin_labels = ["0-20", "20-40", "40-60", "60-80", "80-100"]
     counts, _ = np.histogram(arr, bins=bin_edges)
 
     bins = [{"range": label, "count": int(c)} for label, c in zip(bin_labels, counts)]
@@ -66,50 +85,49 @@ def get_risk_distribution(
 def get_risk_tiers(
     db: Session = Depends(get_db),
 ) -> RiskTiersResponse:
-    """Current risk tier boundaries computed via Jenks Natural Breaks."""
-    scores = db.execute(
-        select(DailyMetric.severity_index)
-        .where(DailyMetric.severity_index.isnot(None))
-    ).scalars().all()
-
-    classifier = RiskTierClassifier(method="jenks")
-    if scores:
-        config = classifier.fit([float(s) for s in scores])
-    else:
-        config = {"method": "jenks", "boundaries": [], "n_samples": 0}
+    """Current risk tier boundaries (Jenks Natural Breaks), as last fitted and stored by the pipeline."""
+    classifier = load_latest_tier_config(db)
+    if classifier is None:
+        # No pipeline fit yet: report the default boundaries
+        classifier = RiskTierClassifier(method="jenks")
 
     return RiskTiersResponse(
         method=classifier.method,
         boundaries=classifier.boundaries,
         tier_ranges={k: list(v) for k, v in classifier.tier_ranges.items()},
-        n_samples=len(classifier.all_scores),
+        centroids=classifier.centroids,
+        n_samples=classifier.n_samples,
         fitted_at=classifier.fitted_at,
+        version=classifier.version,
     )
 
 
 @router.get("/category-breakdown", response_model=CategoryBreakdownResponse)
 def get_category_breakdown(
-    days: int = Query(default=7, ge=1, le=90),
+    days: int = Query(default=7, ge=1, le=730),
     db: Session = Depends(get_db),
 ) -> CategoryBreakdownResponse:
     """Category distribution of events over last N days."""
     cutoff = date.today() - timedelta(days=days)
-    rows = db.execute(
-        select(Event.category, func.count(Event.id).label("cnt"))
-        .where(Event.date >= cutoff)
-        .where(Event.category.isnot(None))
-        .group_by(Event.category)
-        .order_by(func.count(Event.id).desc())
-    ).all()
+    if analytics_engine.available():
+        rows = analytics_engine.category_counts(cutoff)
+    else:
+        rows = db.execute(
+            select(Event.category, func.count(Event.id).label("cnt"))
+            .where(Event.date >= cutoff)
+            .where(Event.category.isnot(None))
+            .group_by(Event.category)
+            .order_by(func.count(Event.id).desc())
+        ).all()
 
-    total = sum(r.cnt for r in rows)
+    total = sum(cnt for _, cnt in rows)
     categories = [
         {
-            "name": r.category,
-            "count": r.cnt,
-            "percentage": round(r.cnt / total * 100, 1) if total > 0 else 0,
+            "name": category,
+            "count": cnt,
+            "percentage": round(cnt / total * 100, 1) if total > 0 else 0,
         }
-        for r in rows
+        for category, cnt in rows
     ]
 
     return CategoryBreakdownResponse(categories=categories, total=total)
@@ -118,56 +136,91 @@ def get_category_breakdown(
 @router.get("/sparklines", response_model=List[SparklineResponse])
 def get_sparklines(
     countries: str = Query(..., description="Comma-separated country codes"),
-    days: int = Query(default=14, ge=3, le=90),
+    days: int = Query(default=14, ge=3, le=730),
+    granularity: str = Query(default="auto", pattern=GRANULARITY_PATTERN, description="auto picks by range"),
     db: Session = Depends(get_db),
 ) -> List[SparklineResponse]:
-    """Mini time series of severity index per country for sparkline charts."""
+    """Mini time series of severity index per country for sparkline charts (max per day, week or month)."""
     country_list = [c.strip().upper() for c in countries.split(",") if c.strip()]
     cutoff = date.today() - timedelta(days=days)
+    granularity = pick_granularity(days, granularity)
 
-    results = []
-    for country in country_list:
-        rows = db.execute(
-            select(DailyMetric.date, func.max(DailyMetric.severity_index).label("severity"))
-            .where(DailyMetric.country == country)
-            .where(DailyMetric.date >= cutoff)
-            .group_by(DailyMetric.date)
-            .order_by(DailyMetric.date.asc())
-        ).all()
-
-        dates = [str(r.date) for r in rows]
-        values = [float(r.severity) if r.severity is not None else None for r in rows]
-
-        results.append(SparklineResponse(country=country, dates=dates, values=values))
-
-    return results
+    # One grouped query for all countries (served by ix_daily_metrics_country_date), split in memory;
+    # weeks and months read the per-country rollups instead
+    series: Dict[str, SparklineResponse] = {
+        c: SparklineResponse(country=c, dates=[], values=[], granularity=granularity) for c in country_list
+    }
+    if series:
+        if granularity == "day":
+            stmt = (
+                select(
+                    DailyMetric.country,
+                    DailyMetric.date,
+                    func.max(DailyMetric.severity_index).label("severity"),
+                )
+                .where(DailyMetric.country.in_(list(series)))
+                .where(DailyMetric.date >= cutoff)
+                .group_by(DailyMetric.country, DailyMetric.date)
+                .order_by(DailyMetric.country, DailyMetric.date.asc())
+            )
+        else:
+            stmt = (
+                select(
+                    MetricRollup.country,
+                    MetricRollup.period_start.label("date"),
+                    MetricRollup.max_severity.label("severity"),
+                )
+                .where(MetricRollup.granularity == granularity, MetricRollup.category == ALL_CATEGORIES)
+                .where(MetricRollup.country.in_(list(series)))
+                .where(MetricRollup.period_start >= period_start(cutoff, granularity))
+                .order_by(MetricRollup.country, MetricRollup.period_start.asc())
+            )
+        for r in db.execute(stmt).all():
+            s = series[r.country]
+            s.dates.append(str(r.date))
+            s.values.append(float(r.severity) if r.severity is not None else None)
+
+    # Same order (and duplicates) as requested
+    return [series[c] for c in country_list]
 
 
 @router.get("/decomposition", response_model=Optional[DecompositionResponse])
 def get_decomposition(
     country: str = Query(..., description="ISO-2 country code"),
-    days: int = Query(default=30, ge=14, le=180),
+    days: int = Query(default=30, ge=14, le=730),
+    granularity: str = Query(default="auto", pattern=GRANULARITY_PATTERN, description="auto picks by range"),
     db: Session = Depends(get_db),
 ) -> Optional[DecompositionResponse]:
-    """STL decomposition of severity time series for a country."""
+    """
+    STL decomposition of severity time series for a country (daily, or
+    weekly/monthly rollups for long ranges). With granularity=auto, a range
+    with too few months for a yearly season (2 x 12 points) falls back to weeks.
+    """
     cutoff = date.today() - timedelta(days=days)
+    requested = granularity
+    granularity = pick_granularity(days, requested)
 
-    rows = db.execute(
-        select(DailyMetric.date, func.avg(DailyMetric.severity_index).label("severity"))
-        .where(DailyMetric.country == country.upper())
-        .where(DailyMetric.date >= cutoff)
-        .where(DailyMetric.severity_index.isnot(None))
-        .group_by(DailyMetric.date)
-        .order_by(DailyMetric.date.asc())
-    ).all()
-
-    if len(rows) < 14:
-        return None
+    if granularity == "day":
+        rows = db.execute(
+            select(DailyMetric.date, func.avg(DailyMetric.severity_index).label("severity"))
+            .where(DailyMetric.country == country.upper())
+            .where(DailyMetric.date >= cutoff)
+            .where(DailyMetric.severity_index.isnot(None))
+            .group_by(DailyMetric.date)
+            .order_by(DailyMetric.date.asc())
+        ).all()
+        if len(rows) < 14:
+            return None
+    else:
+        rows = _rollup_severity(db, country.upper(), cutoff, granularity)
+        if requested == "auto" and granularity == "month" and len(rows) < 2 * STL_PERIODS["month"]:
+            granularity = "week"
+            rows = _rollup_severity(db, country.upper(), cutoff, granularity)
 
     dates = [str(r.date) for r in rows]
     values = [float(r.severity) for r in rows]
 
-    result = decompose_stl(values, dates=dates, period=7)
+    result = decompose_stl(values, dates=dates, period=STL_PERIODS[granularity])
     if result is None:
         return None
 
@@ -178,9 +231,22 @@ def get_decomposition(
         seasonal=result.seasonal,
         residual=result.residual,
         seasonal_strength=result.seasonal_strength,
+        granularity=granularity,
     )
 
 
+def _rollup_severity(db: Session, country: str, cutoff: date, granularity: str) -> List:
+    """(date, severity) per week/month rollup period from cutoff's period on, oldest first."""
+    return db.execute(
+        select(MetricRollup.period_start.label("date"), MetricRollup.mean_severity.label("severity"))
+        .where(MetricRollup.granularity == granularity, MetricRollup.category == ALL_CATEGORIES)
+        .where(MetricRollup.country == country)
+        .where(MetricRollup.period_start >= period_start(cutoff, granularity))
+        .where(MetricRollup.mean_severity.isnot(None))
+        .order_by(MetricRollup.period_start.asc())
+    ).all()
+
+
 @router.get("/top-movers")
 def get_top_movers(
     limit: int = Query(default=20, ge=1, le=100),
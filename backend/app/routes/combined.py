@@ -6,102 +6,146 @@ with NLP category classification, severity scoring, and entity extraction.
 """
 from __future__ import annotations
 
-import json
 from datetime import date, datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ..country_centroids import get_centroid
 from ..db import get_db
-from ..models import Event
-from ..schemas import CombinedEventsResponse, MapEventLocation, ValyuEventResponse
+from ..fast_json import FastJSONResponse, dumps, raw_json_object
+from ..ml.risk_classifier import RiskTierClassifier
+from ..models import Event, EventText
+from ..pagination import decode_cursor, keyset_after, ndjson_response, order_by_keys, split_page
+from ..pipeline.risk_tiers import load_latest_tier_config, threat_rank_expr, tier_for
+from ..schemas import CombinedEventsResponse
 
 router = APIRouter()
 
-
-def _event_to_response(e: Event) -> ValyuEventResponse:
-    """Convert a DB Event (ML-enriched) to API response."""
+_CURSOR_PARSERS = (int, date.fromisoformat, datetime.fromisoformat, str)
+
+
+def _sort_keys(tiers: Optional[RiskTierClassifier]):
+    """Critical first, then newest; id breaks ties so the order (and cursor) is total."""
+    rank = threat_rank_expr(Event.severity_index, Event.threat_level, tiers).label("threat_rank")
+    return rank, ((rank, False), (Event.date, True), (Event.ts, True), (Event.id, True))
+
+
+# Only the columns the response needs; content is cut to the summary length in SQL
+_SUMMARY_CHARS = 500
+_EVENT_COLUMNS = (
+    Event.id,
+    Event.source,
+    EventText.title,
+    func.substr(EventText.content, 1, _SUMMARY_CHARS + 1).label("content"),
+    Event.category,
+    Event.severity_index,
+    Event.threat_level,
+    Event.lat,
+    Event.lon,
+    Event.admin1,
+    Event.country,
+    Event.date,
+    Event.ts,
+    EventText.source_url,
+    Event.category_confidence,
+    Event.sentiment_score,
+    EventText.entities_json,
+)
+
+
+def _event_to_dict(e: Any, tiers: Optional[RiskTierClassifier] = None) -> Dict[str, Any]:
+    """
+    Event row (Core) -> ValyuEventResponse-shaped dict. Threat level uses the stored
+    tier model when present; entities_json is embedded without re-parsing.
+    """
     lat = e.lat
     lon = e.lon
     if (lat is None or lon is None) and e.country:
         centroid = get_centroid(e.country)
         if centroid:
             lat, lon = centroid[0], centroid[1]
-    lat = lat if lat is not None else 0.0
-    lon = lon if lon is not None else 0.0
+    lat = float(lat) if lat is not None else 0.0
+    lon = float(lon) if lon is not None else 0.0
 
-    title = e.title or f"{e.category or 'Event'} in {e.country or 'Unknown'}"
     content = e.content or ""
-    summary = (content[:500] + "…") if len(content) > 500 else content
-
-    # Parse entities if available
-    entities = None
-    if e.entities_json:
-        try:
-            entities = json.loads(e.entities_json)
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-    return ValyuEventResponse(
-        id=str(e.id),
-        source=e.source or "valyu",
-        title=title,
-        summary=summary,
-        category=e.category or "event",
-        threatLevel=e.threat_level or "medium",
-        location=MapEventLocation(
-            latitude=lat,
-            longitude=lon,
-            placeName=e.admin1 or e.country,
-            country=e.country,
-        ),
-        timestamp=e.ts.isoformat() if isinstance(e.ts, datetime) else str(e.ts),
-        sourceUrl=e.source_url,
-        severity_index=e.severity_index,
-        risk_score=e.severity_index,  # use severity as risk score
-        event_count=None,
-        category_confidence=e.category_confidence,
-        sentiment_polarity=e.sentiment_score,
-        entities=entities,
-    )
-
-
-@router.get("/events/combined", response_model=CombinedEventsResponse)
+    summary = (content[:_SUMMARY_CHARS] + "…") if len(content) > _SUMMARY_CHARS else content
+
+    return {
+        "id": str(e.id),
+        "source": e.source or "valyu",
+        "title": e.title or f"{e.category or 'Event'} in {e.country or 'Unknown'}",
+        "summary": summary,
+        "category": e.category or "event",
+        "threatLevel": tier_for(e.severity_index, tiers, fallback=e.threat_level) or "medium",
+        "location": {
+            "latitude": lat,
+            "longitude": lon,
+            "placeName": e.admin1 or e.country,
+            "country": e.country,
+            "region": None,
+        },
+        "timestamp": e.ts.isoformat() if isinstance(e.ts, datetime) else str(e.ts),
+        "sourceUrl": e.source_url,
+        "severity_index": e.severity_index,
+        "risk_score": e.severity_index,  # use severity as risk score
+        "event_count": None,
+        "category_confidence": e.category_confidence,
+        "sentiment_polarity": e.sentiment_score,
+        "entities": raw_json_object(e.entities_json),
+    }
+
+
+@router.get("/events/combined", response_model=CombinedEventsResponse, response_class=FastJSONResponse)
 def get_combined_events(
     date_param: Optional[date] = Query(default=None, alias="date"),
     limit: int = Query(default=500, ge=1, le=2000),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from the previous page's next_cursor"),
+    stream: bool = Query(default=False, description="Stream all matching events as NDJSON (ignores limit)"),
     db: Session = Depends(get_db),
-) -> CombinedEventsResponse:
+):
     """
     ML-enriched events for map and feed. Events are pre-classified with:
     - NLP category (TF-IDF + LogReg)
     - Severity index (sentiment + keyword intensity + entity density)
     - Threat level (K-means risk tiers)
     - Named entities (spaCy NER)
-    """
-    stmt = select(Event).order_by(Event.date.desc(), Event.ts.desc())
 
-    if date_param:
-        stmt = stmt.where(Event.date == date_param)
-    else:
-        cutoff = datetime.now(timezone.utc).date() - timedelta(days=14)
-        stmt = stmt.where(Event.date >= cutoff)
-
-    stmt = stmt.limit(limit)
-    rows = db.execute(stmt).scalars().all()
-
-    events = [_event_to_response(e) for e in rows]
-
-    # Sort by threat level (critical first)
-    threat_order = {"critical": 0, "high": 1, "medium": 2, "low": 3, "info": 4}
-    events.sort(key=lambda x: threat_order.get(x.threatLevel, 5))
+    Ordered by threat level (critical first), then newest, in SQL; paged by
+    (threat rank, date, ts, id) via next_cursor. Rows are serialized straight
+    to JSON (see fast_json) rather than through CombinedEventsResponse.
+    """
+    tiers = load_latest_tier_config(db)
+    rank, keys = _sort_keys(tiers)
+    after = decode_cursor(cursor, _CURSOR_PARSERS) if cursor else None
+
+    def build_stmt():
+        stmt = (
+            select(*_EVENT_COLUMNS, rank)
+            .outerjoin(EventText, EventText.event_id == Event.id)
+            .order_by(*order_by_keys(keys))
+        )
+        if date_param:
+            stmt = stmt.where(Event.date == date_param)
+        else:
+            cutoff = datetime.now(timezone.utc).date() - timedelta(days=14)
+            stmt = stmt.where(Event.date >= cutoff)
+        if after:
+            stmt = stmt.where(keyset_after(keys, after))
+        return stmt
+
+    if stream:
+        return ndjson_response(build_stmt, lambda row: dumps(_event_to_dict(row, tiers)))
+
+    rows = db.execute(build_stmt().limit(limit + 1)).all()
+    page, next_cursor = split_page(rows, limit, lambda r: (r.threat_rank, r.date, r.ts, r.id))
+    events = [_event_to_dict(e, tiers) for e in page]
 
     # Count by source
     counts: Dict[str, int] = {}
     for e in events:
-        counts[e.source] = counts.get(e.source, 0) + 1
+        counts[e["source"]] = counts.get(e["source"], 0) + 1
 
-    return CombinedEventsResponse(events=events, count=len(events), sources=counts)
+    return FastJSONResponse({"events": events, "count": len(events), "sources": counts, "next_cursor": next_cursor})
@@ -1,14 +1,17 @@
 """
 Fast country insights endpoint. Uses DB-first data + Valyu search (not slow /v1/answer).
-Returns rich insights for any country in <5 seconds.
+Returns rich insights for any country within INSIGHTS_BUDGET_SECONDS (default 4.5s).
 """
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
+import threading
+import time
 from collections import Counter
-from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy import func, select
@@ -16,7 +19,14 @@ from sqlalchemy.orm import Session
 
 from ..country_centroids import COUNTRY_CENTROIDS
 from ..db import get_db
-from ..models import DailyMetric, Event
+from ..models import DailyMetric, Event, EventEntity, EventText
+from ..pipeline.entity_index import ENTITY_COUNTRY, ENTITY_ORGANIZATION
+from ..pipeline.risk_tiers import load_latest_tier_config, tier_for
+from ..pipeline_config import (
+    INSIGHTS_BUDGET_SECONDS,
+    INSIGHTS_NEWS_CACHE_SECONDS,
+    INSIGHTS_NEWS_TIMEOUT_SECONDS,
+)
 from .. import valyu_client
 
 logger = logging.getLogger(__name__)
@@ -96,45 +106,32 @@ def _build_risk_context(
     return " ".join(parts)
 
 
-@router.get("/countries/{country_code}/insights")
-def get_country_insights(
-    country_code: str,
-    db: Session = Depends(get_db),
-) -> Dict[str, Any]:
-    """
-    Fast country insights. DB-first with optional Valyu search enrichment.
-    Returns in <5s for any country.
-    """
-    code = country_code.upper().strip()
-    name = _country_name(code)
-
+def _db_insights(db: Session, code: str, name: str) -> Dict[str, Any]:
+    """Recent events, metrics summary, category breakdown and history from the DB."""
     # ── 1. DB events for this country (last 14 days) ──
     cutoff = datetime.now(timezone.utc).date() - timedelta(days=14)
     db_events_raw = db.execute(
-        select(Event)
+        select(Event, EventText.title, EventText.source_url)
+        .outerjoin(EventText, EventText.event_id == Event.id)
         .where(Event.country == code, Event.date >= cutoff)
         .order_by(Event.date.desc())
         .limit(50)
-    ).scalars().all()
+    ).all()
 
+    tiers = load_latest_tier_config(db)
+    entities = _entities_by_event(db, [r.Event.id for r in db_events_raw])
     recent_events = []
-    for e in db_events_raw:
-        entities = None
-        if e.entities_json:
-            try:
-                entities = json.loads(e.entities_json)
-            except (json.JSONDecodeError, TypeError):
-                pass
+    for e, title, source_url in db_events_raw:
         recent_events.append({
             "id": str(e.id),
-            "title": e.title or f"{e.category or 'Event'} in {name}",
+            "title": title or f"{e.category or 'Event'} in {name}",
             "category": e.category,
-            "threat_level": e.threat_level or "medium",
+            "threat_level": tier_for(e.severity_index, tiers, fallback=e.threat_level) or "medium",
             "severity": e.severity_index,
             "sentiment": e.sentiment_score,
             "date": str(e.date),
-            "source_url": e.source_url,
-            "entities": entities,
+            "source_url": source_url,
+            "entities": entities.get(e.id),
         })
 
     # ── 2. Daily metrics summary ──
@@ -181,7 +178,110 @@ def get_country_insights(
             cat = e.get("category", "Unknown")
             category_breakdown[cat] = category_breakdown.get(cat, 0) + 1
 
-    # ── 3. Valyu search for recent news (fast, ~3-5s) ──
+    # ── 3. Metrics over time (for sparkline / mini chart) ──
+    metrics_history = []
+    history_rows = db.execute(
+        select(DailyMetric.date, func.max(DailyMetric.severity_index), func.sum(DailyMetric.event_count))
+        .where(DailyMetric.country == code)
+        .group_by(DailyMetric.date)
+        .order_by(DailyMetric.date.desc())
+        .limit(14)
+    ).all()
+    for d, sev, ec in reversed(history_rows):
+        metrics_history.append({
+            "date": str(d),
+            "severity": float(sev) if sev else 0,
+            "events": int(ec) if ec else 0,
+        })
+
+    return {
+        "recent_events": recent_events,
+        "related_countries": _related_countries(db, code, cutoff),
+        "related_organizations": _related_organizations(db, code, cutoff),
+        "summary": metrics_summary,
+        "category_breakdown": category_breakdown,
+        "metrics_history": metrics_history,
+    }
+
+
+def _entities_by_event(db: Session, event_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Entities of the given events from event_entities, in the entities_json shape."""
+    out: Dict[str, Dict[str, Any]] = {}
+    if not event_ids:
+        return out
+    rows = db.execute(
+        select(EventEntity.event_id, EventEntity.type, EventEntity.name, EventEntity.iso2)
+        .where(EventEntity.event_id.in_(event_ids))
+        .order_by(EventEntity.id)
+    ).all()
+    for r in rows:
+        ents = out.setdefault(r.event_id, {"countries": [], "organizations": [], "persons": [], "locations": []})
+        if r.type == ENTITY_COUNTRY:
+            ents["countries"].append({"name": r.name, "code": r.iso2})
+        else:
+            ents[f"{r.type}s"].append(r.name)
+    return out
+
+
+def _country_event_ids(code: str, since: date):
+    # Drives the lookups below from ix_events_country_date into the event_id index
+    return select(Event.id).where(Event.country == code, Event.date >= since).scalar_subquery()
+
+
+def _related_countries(db: Session, code: str, since: date, limit: int = 10) -> List[str]:
+    """Countries most often mentioned by this country's events since `since`."""
+    mentions = func.count(func.distinct(EventEntity.event_id))
+    rows = db.execute(
+        select(EventEntity.iso2)
+        .where(
+            EventEntity.event_id.in_(_country_event_ids(code, since)),
+            EventEntity.type == ENTITY_COUNTRY,
+            EventEntity.iso2.isnot(None),
+            EventEntity.iso2 != code,
+        )
+        .group_by(EventEntity.iso2)
+        .order_by(mentions.desc(), EventEntity.iso2)
+        .limit(limit)
+    ).scalars().all()
+    return list(rows)
+
+
+def _related_organizations(db: Session, code: str, since: date, limit: int = 10) -> List[Dict[str, Any]]:
+    """Organizations most often mentioned by this country's events since `since`."""
+    mentions = func.count(func.distinct(EventEntity.event_id)).label("mentions")
+    rows = db.execute(
+        select(EventEntity.value, func.min(EventEntity.name).label("name"), mentions)
+        .where(
+            EventEntity.event_id.in_(_country_event_ids(code, since)),
+            # `|| ''` keeps the planner off the (type, value) index, which would read every organization row
+            EventEntity.type + "" == ENTITY_ORGANIZATION,
+        )
+        .group_by(EventEntity.value)
+        .order_by(mentions.desc(), EventEntity.value)
+        .limit(limit)
+    ).all()
+    return [{"name": r.name, "value": r.value, "mentions": r.mentions} for r in rows]
+
+
+# Enriched news per country: code -> (monotonic fetch time, news). Only non-empty results are kept.
+_news_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+_news_lock = threading.Lock()
+# Background news fetches outlive the request that started them; in-flight ones are
+# shared so repeated clicks while Valyu is slow make one upstream call
+_news_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="insights-news")
+_news_inflight: Dict[str, "Future[List[Dict[str, Any]]]"] = {}
+
+
+def _cached_news(code: str) -> Optional[List[Dict[str, Any]]]:
+    with _news_lock:
+        hit = _news_cache.get(code)
+    if hit and time.monotonic() - hit[0] < INSIGHTS_NEWS_CACHE_SECONDS:
+        return hit[1]
+    return None
+
+
+def _fetch_news(code: str, name: str) -> List[Dict[str, Any]]:
+    """Valyu search + per-article classification; stores the result in _news_cache."""
     recent_news: List[Dict[str, Any]] = []
     try:
         start_date = (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%Y-%m-%d")
@@ -189,6 +289,7 @@ def get_country_insights(
             f"{name} conflict security threat crisis",
             max_num_results=5,
             start_date=start_date,
+            timeout=INSIGHTS_NEWS_TIMEOUT_SECONDS,
         )
 
         for item in search_results[:5]:
@@ -221,18 +322,62 @@ def get_country_insights(
     except Exception as exc:
         logger.warning("Valyu search failed for %s: %s", code, exc)
 
-    # ── 4. Related countries (from entities in events) ──
-    related_countries: List[str] = []
-    seen = {code}
-    for e in recent_events[:20]:
-        ents = e.get("entities")
-        if isinstance(ents, dict):
-            for c in ents.get("countries", []):
-                cc = c.get("code") if isinstance(c, dict) else None
-                if cc and cc not in seen:
-                    seen.add(cc)
-                    related_countries.append(cc)
-    # Also check news entities
+    if recent_news:
+        with _news_lock:
+            _news_cache[code] = (time.monotonic(), recent_news)
+    return recent_news
+
+
+def _news_future(code: str, name: str) -> "Future[List[Dict[str, Any]]]":
+    """Start (or join) the background news fetch for a country."""
+    with _news_lock:
+        fut = _news_inflight.get(code)
+        if fut is None:
+            fut = _news_executor.submit(_fetch_news, code, name)
+            _news_inflight[code] = fut
+            fut.add_done_callback(lambda _: _news_inflight.pop(code, None))
+    return fut
+
+
+@router.get("/countries/{country_code}/insights")
+async def get_country_insights(
+    country_code: str,
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """
+    Fast country insights. DB-first with optional Valyu search enrichment.
+
+    DB queries and the Valyu search run concurrently. If the search has not
+    finished within INSIGHTS_BUDGET_SECONDS, DB-only results are returned with
+    `partial: true`; the search keeps running and its enriched news is cached
+    per country for the next request.
+    """
+    started = time.monotonic()
+    code = country_code.upper().strip()
+    name = _country_name(code)
+
+    news = _cached_news(code)
+    news_fut = _news_future(code, name) if news is None else None
+
+    db_part = await asyncio.to_thread(_db_insights, db, code, name)
+
+    partial = False
+    if news_fut is not None:
+        remaining = max(0.0, INSIGHTS_BUDGET_SECONDS - (time.monotonic() - started))
+        # asyncio.wait does not cancel on timeout, so a slow fetch still fills the cache
+        done, _ = await asyncio.wait({asyncio.wrap_future(news_fut)}, timeout=remaining)
+        if done:
+            news = news_fut.result()
+        else:
+            news = []
+            partial = True
+            logger.info("insights news over budget; returning DB-only results for %s", code)
+    recent_news: List[Dict[str, Any]] = news or []
+    recent_events = db_part["recent_events"]
+
+    # ── Related countries (from the event_entities index, plus news entities) ──
+    related_countries: List[str] = list(db_part["related_countries"])
+    seen = {code, *related_countries}
     for n in recent_news:
         ents = n.get("entities")
         if isinstance(ents, dict):
@@ -242,33 +387,19 @@ def get_country_insights(
                     seen.add(cc)
                     related_countries.append(cc)
 
-    # ── 5. Risk context text ──
-    risk_context = _build_risk_context(name, recent_events, metrics_summary, recent_news)
-
-    # ── 6. Metrics over time (for sparkline / mini chart) ──
-    metrics_history = []
-    history_rows = db.execute(
-        select(DailyMetric.date, func.max(DailyMetric.severity_index), func.sum(DailyMetric.event_count))
-        .where(DailyMetric.country == code)
-        .group_by(DailyMetric.date)
-        .order_by(DailyMetric.date.desc())
-        .limit(14)
-    ).all()
-    for d, sev, ec in reversed(history_rows):
-        metrics_history.append({
-            "date": str(d),
-            "severity": float(sev) if sev else 0,
-            "events": int(ec) if ec else 0,
-        })
+    # ── Risk context text ──
+    risk_context = _build_risk_context(name, recent_events, db_part["summary"], recent_news)
 
     return {
         "country": code,
         "country_name": name,
-        "summary": metrics_summary,
+        "summary": db_part["summary"],
         "risk_context": risk_context,
         "recent_events": recent_events[:20],
         "recent_news": recent_news,
-        "category_breakdown": category_breakdown,
+        "category_breakdown": db_part["category_breakdown"],
         "related_countries": related_countries[:10],
-        "metrics_history": metrics_history,
+        "related_organizations": db_part["related_organizations"],
+        "metrics_history": db_part["metrics_history"],
+        "partial": partial,
     }
@@ -0,0 +1,75 @@
+"""
+GET /entities/{value}/events: events mentioning a named entity, newest first,
+served from the event_entities index (no entities_json parsing).
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from ..models import Event, EventEntity, EventText
+from ..pagination import decode_cursor, keyset_after, order_by_keys, split_page
+from ..pipeline.entity_index import ENTITY_COUNTRY, ENTITY_TYPES, entity_key
+from ..schemas import EntityEventItem, EntityEventsResponse
+
+router = APIRouter()
+
+_SORT_KEYS = ((EventEntity.date, True), (EventEntity.event_id, True))
+_CURSOR_PARSERS = (date.fromisoformat, str)
+
+
+@router.get("/entities/{value}/events", response_model=EntityEventsResponse)
+def entity_events(
+    value: str,
+    type: Optional[str] = Query(default=None, pattern=f"^({'|'.join(ENTITY_TYPES)})$",
+                                description="Entity type; default: any"),
+    start: Optional[date] = Query(default=None, description="Start date (YYYY-MM-DD)"),
+    end: Optional[date] = Query(default=None, description="End date (YYYY-MM-DD)"),
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db),
+) -> EntityEventsResponse:
+    """
+    Events mentioning an entity, e.g. /entities/Hezbollah/events?type=organization.
+    Names match case-insensitively; with type=country the value may be an ISO-2 code.
+    """
+    if type == ENTITY_COUNTRY and len(value.strip()) == 2:
+        key = value.strip().upper()
+        match = [EventEntity.type == ENTITY_COUNTRY, EventEntity.iso2 == key]
+    else:
+        key = entity_key(value)
+        match = [EventEntity.type == type if type else EventEntity.type.in_(ENTITY_TYPES), EventEntity.value == key]
+
+    stmt = (
+        select(
+            EventEntity.date, EventEntity.event_id, Event.country, Event.category,
+            Event.source, EventText.title, EventText.source_url, Event.severity_index,
+        )
+        .distinct()  # an event can mention the same name as two types
+        .join(Event, Event.id == EventEntity.event_id)
+        .outerjoin(EventText, EventText.event_id == EventEntity.event_id)
+        .where(*match)
+        .order_by(*order_by_keys(_SORT_KEYS))
+    )
+    if start:
+        stmt = stmt.where(EventEntity.date >= start)
+    if end:
+        stmt = stmt.where(EventEntity.date <= end)
+    if cursor:
+        stmt = stmt.where(keyset_after(_SORT_KEYS, decode_cursor(cursor, _CURSOR_PARSERS)))
+
+    rows = db.execute(stmt.limit(limit + 1)).all()
+    page, next_cursor = split_page(rows, limit, lambda r: (r.date, r.event_id))
+    events = [
+        EntityEventItem(
+            id=r.event_id, date=r.date, country=r.country, category=r.category, source=r.source,
+            title=r.title, source_url=r.source_url, severity_index=r.severity_index,
+        )
+        for r in page
+    ]
+    return EntityEventsResponse(value=key, type=type, events=events, count=len(events), next_cursor=next_cursor)
@@ -1,61 +1,150 @@
-from datetime import date
+from dataclasses import asdict
+from datetime import date, datetime
+from itertools import islice
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from ..archive import iter_archived_events
 from ..db import get_db
-from ..models import Event
-from ..schemas import EventResponse
+from ..models import Event, EventText
+from ..pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    keyset_after,
+    ndjson_response,
+    order_by_keys,
+    split_page,
+)
+from ..schemas import EventResponse, EventSearchHit, EventSearchResponse
+from ..search import SORT_RECENT, SORT_RELEVANCE, SearchUnavailable, search_events
 
 
 router = APIRouter()
 
+# Newest first; id breaks ties so the order (and cursor) is total
+_SORT_KEYS = ((Event.date, True), (Event.ts, True), (Event.id, True))
+_CURSOR_PARSERS = (date.fromisoformat, datetime.fromisoformat, str)
+
 
 @router.get("/events", response_model=List[EventResponse])
 def list_events(
+    response: Response,
     country: Optional[str] = Query(default=None, description="ISO-2 country code filter"),
     start: Optional[date] = Query(default=None, description="Start date (YYYY-MM-DD)"),
     end: Optional[date] = Query(default=None, description="End date (YYYY-MM-DD)"),
     category: Optional[str] = Query(default=None, description="Category filter"),
     limit: int = Query(default=200, ge=1, le=2000),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+    stream: bool = Query(default=False, description="Stream all matching events as NDJSON (ignores limit)"),
     db: Session = Depends(get_db),
 ) -> List[EventResponse]:
     """
-    List normalized events with optional filters.
+    List normalized events with optional filters, newest first.
+
+    Paged by (date, ts, id): when more rows exist, the X-Next-Cursor response
+    header carries the cursor for the next page. Events moved to the Parquet
+    archive by the retention pipeline are read from there once a page reaches
+    their dates.
     """
-    stmt = select(Event).order_by(Event.date.desc())
-
-    if country:
-        stmt = stmt.where(Event.country == country)
-    if start:
-        stmt = stmt.where(Event.date >= start)
-    if end:
-        stmt = stmt.where(Event.date <= end)
-    if category:
-        stmt = stmt.where(Event.category == category)
-
-    stmt = stmt.limit(limit)
-
-    events = db.execute(stmt).scalars().all()
-
-    return [
-        EventResponse(
-            id=e.id,
-            ts=e.ts,
-            date=e.date,
-            country=e.country,
-            admin1=e.admin1,
-            lat=e.lat,
-            lon=e.lon,
-            event_code=e.event_code,
-            quad_class=e.quad_class,
-            goldstein=getattr(e, "goldstein", None),
-            avg_tone=e.avg_tone,
-            source_url=e.source_url,
-            category=e.category,
+    after = decode_cursor(cursor, _CURSOR_PARSERS) if cursor else None
+
+    def build_stmt():
+        stmt = (
+            select(Event, EventText.source_url)
+            .outerjoin(EventText, EventText.event_id == Event.id)
+            .order_by(*order_by_keys(_SORT_KEYS))
         )
-        for e in events
-    ]
+        if country:
+            stmt = stmt.where(Event.country == country)
+        if start:
+            stmt = stmt.where(Event.date >= start)
+        if end:
+            stmt = stmt.where(Event.date <= end)
+        if category:
+            stmt = stmt.where(Event.category == category)
+        if after:
+            stmt = stmt.where(keyset_after(_SORT_KEYS, after))
+        return stmt
+
+    def archived(floor: Optional[date]):
+        # (Event, source_url) pairs, like the live rows
+        return ((e, t.source_url) for e, t in iter_archived_events(
+            start=floor, end=end, country=country, category=category, after=after,
+        ))
+
+    if stream:
+        return ndjson_response(
+            build_stmt,
+            lambda row: _to_response(*row).model_dump_json(),
+            extra=lambda: archived(start),
+        )
+
+    rows = [tuple(r) for r in db.execute(build_stmt().limit(limit + 1)).all()]
+    # A full page can only be displaced by archived events dated on or after its last row
+    floor = rows[limit][0].date if len(rows) > limit else start
+    older = list(islice(archived(floor), limit + 1))
+    if older:
+        live = {e.id for e, _ in rows}
+        rows = sorted(
+            [*rows, *(r for r in older if r[0].id not in live)],
+            key=lambda r: (r[0].date, r[0].ts, r[0].id), reverse=True,
+        )[:limit + 1]
+    events, next_cursor = split_page(rows, limit, lambda r: (r[0].date, r[0].ts, r[0].id))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [_to_response(e, source_url) for e, source_url in events]
+
+
+@router.get("/events/search", response_model=EventSearchResponse)
+def search(
+    q: str = Query(..., min_length=1, max_length=500, description='Words (ANDed), "phrases", prefix*, OR'),
+    country: Optional[str] = Query(default=None, description="ISO-2 country code filter"),
+    category: Optional[str] = Query(default=None, description="Category filter"),
+    start: Optional[date] = Query(default=None, description="Start date (YYYY-MM-DD)"),
+    end: Optional[date] = Query(default=None, description="End date (YYYY-MM-DD)"),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0, le=10_000),
+    sort: str = Query(default=SORT_RELEVANCE, pattern=f"^({SORT_RELEVANCE}|{SORT_RECENT})$",
+                      description="relevance (bm25) or recent; recent (newest event date first) skips ranking"),
+    db: Session = Depends(get_db),
+) -> EventSearchResponse:
+    """
+    Full-text search over event titles and content, best match first, with
+    highlighted snippets. Backed by the FTS5 index (SQLite) or a GIN tsvector
+    index (PostgreSQL); see app/search.py.
+    """
+    try:
+        hits = search_events(db, q, country=country, category=category, start=start, end=end,
+                             limit=limit + 1, offset=offset, sort=sort)
+    except SearchUnavailable as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+    more = len(hits) > limit
+    results = [EventSearchHit(**asdict(h)) for h in hits[:limit]]
+    return EventSearchResponse(
+        query=q,
+        results=results,
+        count=len(results),
+        next_offset=offset + limit if more else None,
+    )
+
+
+def _to_response(e: Event, source_url: Optional[str]) -> EventResponse:
+    return EventResponse(
+        id=e.id,
+        ts=e.ts,
+        date=e.date,
+        country=e.country,
+        admin1=e.admin1,
+        lat=e.lat,
+        lon=e.lon,
+        event_code=e.event_code,
+        quad_class=e.quad_class,
+        goldstein=getattr(e, "goldstein", None),
+        avg_tone=e.avg_tone,
+        source_url=source_url,
+        category=e.category,
+    )
 
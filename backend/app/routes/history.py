@@ -1,5 +1,5 @@
 """
-History API: risk snapshots over time (Step 1).
+History API: risk snapshots over time (Step 1), weekly/monthly rollups for long ranges.
 """
 from datetime import date, timedelta
 from typing import List, Optional
@@ -9,24 +9,38 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from ..db import get_db
-from ..models import RiskSnapshot
+from ..models import MetricRollup, RiskSnapshot
+from ..pipeline.rollups import ALL_CATEGORIES, period_start, pick_granularity
 from ..schemas import RiskSnapshotResponse
 
 
 router = APIRouter()
 
+# granularity=auto keeps per-run risk snapshots up to this range (the endpoint's limit before rollups)
+SNAPSHOT_MAX_DAYS = 365
+
 
 @router.get("/history/risk", response_model=List[RiskSnapshotResponse])
 def get_risk_history(
     country: Optional[str] = Query(default=None, description="ISO-2 country code filter"),
-    days: int = Query(default=90, ge=1, le=365, description="Number of days of history"),
+    days: int = Query(default=90, ge=1, le=730, description="Number of days of history"),
+    granularity: str = Query(default="auto", pattern="^(auto|day|week|month)$", description="auto picks by range"),
     db: Session = Depends(get_db),
 ) -> List[RiskSnapshotResponse]:
     """
     Return risk snapshots for monitoring over time. Data is appended by the live ingest pipeline.
+    With granularity=auto, ranges up to SNAPSHOT_MAX_DAYS return snapshots; longer ones (or
+    granularity=week|month) return metric_rollups rows instead: max daily risk score, mean
+    severity and total events per period, with period_end set.
     """
     end = date.today()
     start = end - timedelta(days=days)
+    if granularity == "auto" and days <= SNAPSHOT_MAX_DAYS:
+        granularity = "day"
+    granularity = pick_granularity(days, granularity)
+    if granularity != "day":
+        return _rollup_history(db, country, start, granularity)
+
     stmt = (
         select(RiskSnapshot)
         .where(RiskSnapshot.snapshot_date >= start, RiskSnapshot.snapshot_date <= end)
@@ -45,3 +59,25 @@ def get_risk_history(
         )
         for r in rows
     ]
+
+
+def _rollup_history(db: Session, country: Optional[str], start: date, granularity: str) -> List[RiskSnapshotResponse]:
+    stmt = (
+        select(MetricRollup)
+        .where(MetricRollup.granularity == granularity, MetricRollup.category == ALL_CATEGORIES)
+        .where(MetricRollup.period_start >= period_start(start, granularity))
+        .order_by(MetricRollup.period_start.desc())
+    )
+    if country:
+        stmt = stmt.where(MetricRollup.country == country.upper())
+    return [
+        RiskSnapshotResponse(
+            snapshot_date=r.period_start,
+            country=r.country,
+            risk_score=r.max_risk,
+            severity_index=r.mean_severity,
+            event_count=r.event_count,
+            period_end=r.period_end,
+        )
+        for r in db.execute(stmt).scalars().all()
+    ]
@@ -4,29 +4,40 @@ Optionally includes ALL countries from centroids for full globe coverage.
 
 Uses the latest available data per country (within last 7 days) so all
 monitored countries appear, not just those with data on the latest single date.
+The default view is served from the country_summary table, which the pipelines
+refresh at the end of each run; a specific ?date= is aggregated on the fly.
+
+/map/clusters serves event clusters from the event_grid_daily rollups, so a
+zoomed-out view reads one row per cell and day instead of every event.
 """
-from datetime import date, timedelta
-from typing import List, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 
-from ..country_centroids import COUNTRY_CENTROIDS, get_centroid
 from ..db import get_db
-from ..models import DailyMetric
-from ..schemas import MapCountryResponse
+from ..fast_json import FastJSONResponse
+from ..models import CountrySummary, EventGridDaily
+from ..pipeline.country_summary import compute_country_rows
+from ..pipeline.event_grid import cluster_level, tile_xy
+from ..schemas import MapClustersResponse, MapCountryResponse
 
 
 router = APIRouter()
 
+# MapCountryResponse fields; rows are serialized directly without building models
+_MAP_FIELDS = tuple(MapCountryResponse.model_fields)
+_SUMMARY_COLUMNS = tuple(getattr(CountrySummary, name) for name in _MAP_FIELDS)
+
 
-@router.get("/map", response_model=List[MapCountryResponse])
+@router.get("/map", response_model=List[MapCountryResponse], response_class=FastJSONResponse)
 def get_map(
     date_param: Optional[date] = Query(default=None, alias="date", description="Date (YYYY-MM-DD); default latest 7 days"),
     include_all: bool = Query(default=True, description="Include all countries (not just those with data)"),
     db: Session = Depends(get_db),
-) -> List[MapCountryResponse]:
+) -> FastJSONResponse:
     """
     Per-country aggregates with ML-enriched fields:
     severity, risk_tier, risk_percentile, trend_7d, trend_30d, avg_sentiment, top_category.
@@ -34,141 +45,75 @@ def get_map(
     Uses the latest data per country across the last 7 days for comprehensive coverage.
     When include_all=true, also includes countries without data at severity=0.
     """
+    if date_param is None:
+        stmt = select(*_SUMMARY_COLUMNS).order_by(CountrySummary.has_data.desc(), CountrySummary.country)
+        if not include_all:
+            stmt = stmt.where(CountrySummary.has_data.is_(True))
+        summary = db.execute(stmt).all()
+        if summary or db.execute(select(CountrySummary.country).limit(1)).first():
+            return FastJSONResponse([dict(zip(_MAP_FIELDS, r)) for r in summary])
+        # country_summary not built yet (no pipeline run since upgrade): aggregate live
+
+    rows = compute_country_rows(db, date_param=date_param, include_all=include_all)
+    return FastJSONResponse([{k: r.get(k) for k in _MAP_FIELDS} for r in rows])
+
+
+def _parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    try:
+        west, south, east, north = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be west,south,east,north")
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= north <= 90):
+        raise HTTPException(status_code=400, detail="bbox out of range")
+    return west, south, east, north
+
+
+@router.get("/map/clusters", response_model=MapClustersResponse, response_class=FastJSONResponse)
+def get_map_clusters(
+    bbox: str = Query(default="-180,-90,180,90", description="west,south,east,north in degrees"),
+    zoom: int = Query(default=2, ge=0, le=22),
+    date_param: Optional[date] = Query(default=None, alias="date", description="Single day; default last 14 days"),
+    db: Session = Depends(get_db),
+) -> FastJSONResponse:
+    """
+    Event counts and max severity per grid cell inside bbox, at the
+    pre-aggregated level for the zoom. A bbox with west > east crosses the
+    antimeridian.
+    """
+    west, south, east, north = _parse_bbox(bbox)
+    level = cluster_level(zoom)
     if date_param:
-        # Specific date requested — use that date only
-        cutoff_date = date_param
-        date_filter = DailyMetric.date == date_param
+        start = end = date_param
     else:
-        # No specific date — use last 7 days and take latest per country
-        latest = db.execute(
-            select(DailyMetric.date).order_by(DailyMetric.date.desc()).limit(1)
-        ).scalars().first()
-        if not latest:
-            if include_all:
-                return _all_countries_baseline()
-            return []
-        cutoff_date = latest - timedelta(days=7)
-        date_filter = DailyMetric.date >= cutoff_date
-
-    # Get the latest date per country (within date range)
-    latest_per_country = (
-        select(
-            DailyMetric.country,
-            func.max(DailyMetric.date).label("latest_date"),
-        )
-        .where(date_filter)
-        .where(DailyMetric.country.isnot(None))
-        .group_by(DailyMetric.country)
-    ).subquery()
+        end = datetime.now(timezone.utc).date()
+        start = end - timedelta(days=14)
+
+    x0, y0 = tile_xy(north, west, level)  # tile y grows southwards
+    x1, y1 = tile_xy(south, east, level)
+    g = EventGridDaily
+    if x0 <= x1:
+        x_match = g.x.between(x0, x1)
+    else:
+        x_match = or_(g.x >= x0, g.x <= x1)
 
-    # Get per-country aggregates using their latest date
-    rows = db.execute(
+    count = func.sum(g.event_count)
+    stmt = (
         select(
-            DailyMetric.country,
-            func.max(DailyMetric.severity_index).label("severity_index"),
-            func.max(DailyMetric.risk_score).label("risk_score"),
-            func.sum(DailyMetric.event_count).label("event_count"),
-            func.avg(DailyMetric.avg_sentiment).label("avg_sentiment"),
-        )
-        .join(
-            latest_per_country,
-            (DailyMetric.country == latest_per_country.c.country)
-            & (DailyMetric.date == latest_per_country.c.latest_date),
-        )
-        .group_by(DailyMetric.country)
-    ).all()
-
-    # Get risk tiers and trends (from the metric with highest severity per country)
-    tier_data = {}
-    all_metrics = db.execute(
-        select(DailyMetric)
-        .join(
-            latest_per_country,
-            (DailyMetric.country == latest_per_country.c.country)
-            & (DailyMetric.date == latest_per_country.c.latest_date),
-        )
-        .order_by(DailyMetric.severity_index.desc())
-    ).scalars().all()
-
-    for m in all_metrics:
-        if m.country and m.country not in tier_data:
-            tier_data[m.country] = {
-                "risk_tier": m.risk_tier,
-                "risk_percentile": m.risk_percentile,
-                "trend_7d": m.trend_7d,
-                "trend_30d": m.trend_30d,
-                "top_category": m.category,
-            }
-
-    countries_with_data = set()
-    out: List[MapCountryResponse] = []
-    for country, severity_index, risk_score, event_count, avg_sentiment in rows:
-        if not country:
-            continue
-        centroid = get_centroid(country)
-        if centroid is None:
-            continue
-        lat, lon = centroid[0], centroid[1]
-        countries_with_data.add(country)
-
-        extra = tier_data.get(country, {})
-        out.append(
-            MapCountryResponse(
-                country=country,
-                lat=lat,
-                lon=lon,
-                severity_index=float(severity_index) if severity_index is not None else None,
-                risk_score=float(risk_score) if risk_score is not None else None,
-                event_count=int(event_count) if event_count is not None else None,
-                risk_tier=extra.get("risk_tier"),
-                risk_percentile=float(extra["risk_percentile"]) if extra.get("risk_percentile") is not None else None,
-                trend_7d=extra.get("trend_7d"),
-                trend_30d=extra.get("trend_30d"),
-                avg_sentiment=float(avg_sentiment) if avg_sentiment is not None else None,
-                top_category=extra.get("top_category"),
-            )
-        )
-
-    # Add remaining countries at baseline
-    if include_all:
-        for code, coords in COUNTRY_CENTROIDS.items():
-            if code not in countries_with_data:
-                out.append(
-                    MapCountryResponse(
-                        country=code,
-                        lat=coords[0],
-                        lon=coords[1],
-                        severity_index=0,
-                        risk_score=0,
-                        event_count=0,
-                        risk_tier="none",
-                        risk_percentile=None,
-                        trend_7d=None,
-                        trend_30d=None,
-                        avg_sentiment=None,
-                        top_category=None,
-                    )
-                )
-
-    return out
-
-
-def _all_countries_baseline() -> List[MapCountryResponse]:
-    """Return all countries with no data at baseline severity."""
-    return [
-        MapCountryResponse(
-            country=code,
-            lat=coords[0],
-            lon=coords[1],
-            severity_index=0,
-            risk_score=0,
-            event_count=0,
-            risk_tier="none",
-            risk_percentile=None,
-            trend_7d=None,
-            trend_30d=None,
-            avg_sentiment=None,
-            top_category=None,
+            g.cell,
+            (func.sum(g.lat * g.event_count) / count).label("lat"),
+            (func.sum(g.lon * g.event_count) / count).label("lon"),
+            count.label("count"),
+            func.max(g.max_severity).label("max_severity"),
         )
-        for code, coords in COUNTRY_CENTROIDS.items()
+        .where(g.level == level, g.date >= start, g.date <= end, x_match, g.y.between(y0, y1))
+        .group_by(g.cell)
+        .order_by(g.cell)
+    )
+    clusters = [
+        {"cell": r.cell, "lat": round(r.lat, 5), "lon": round(r.lon, 5), "count": int(r.count),
+         "max_severity": r.max_severity}
+        for r in db.execute(stmt)
     ]
+    return FastJSONResponse({
+        "zoom": zoom, "level": level, "start": start, "end": end, "clusters": clusters,
+    })
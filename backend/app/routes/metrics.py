@@ -1,70 +1,77 @@
 from datetime import date
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from ..db import get_db
+from ..fast_json import FastJSONResponse, dumps
 from ..models import DailyMetric
+from ..pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    keyset_after,
+    ndjson_response,
+    order_by_keys,
+    split_page,
+)
 from ..schemas import MetricResponse
 
 
 router = APIRouter()
 
+# Newest first; id breaks ties so the order (and cursor) is total
+_SORT_KEYS = ((DailyMetric.date, True), (DailyMetric.id, True))
+_CURSOR_PARSERS = (date.fromisoformat, int)
 
-@router.get("/metrics", response_model=List[MetricResponse])
+# MetricResponse fields, selected as plain columns (no ORM objects) and serialized directly
+_METRIC_FIELDS = tuple(MetricResponse.model_fields)
+_METRIC_COLUMNS = tuple(getattr(DailyMetric, name) for name in _METRIC_FIELDS)
+
+
+@router.get("/metrics", response_model=List[MetricResponse], response_class=FastJSONResponse)
 def list_metrics(
     country: Optional[str] = Query(default=None, description="ISO-2 country code filter"),
     start: Optional[date] = Query(default=None, description="Start date (YYYY-MM-DD)"),
     end: Optional[date] = Query(default=None, description="End date (YYYY-MM-DD)"),
     category: Optional[str] = Query(default=None, description="Category filter"),
+    limit: int = Query(default=1000, ge=1, le=10000),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+    stream: bool = Query(default=False, description="Stream all matching metrics as NDJSON (ignores limit)"),
     db: Session = Depends(get_db),
-) -> List[MetricResponse]:
+) -> Response:
     """
-    List daily aggregated metrics with optional filters.
+    List daily aggregated metrics with optional filters, newest first.
+
+    Paged by (date, id): when more rows exist, the X-Next-Cursor response
+    header carries the cursor for the next page.
     """
-    stmt = select(DailyMetric).order_by(DailyMetric.date.desc())
+    after = decode_cursor(cursor, _CURSOR_PARSERS) if cursor else None
+
+    def build_stmt():
+        stmt = select(*_METRIC_COLUMNS, DailyMetric.id).order_by(*order_by_keys(_SORT_KEYS))
+        if country:
+            stmt = stmt.where(DailyMetric.country == country)
+        if start:
+            stmt = stmt.where(DailyMetric.date >= start)
+        if end:
+            stmt = stmt.where(DailyMetric.date <= end)
+        if category:
+            stmt = stmt.where(DailyMetric.category == category)
+        if after:
+            stmt = stmt.where(keyset_after(_SORT_KEYS, after))
+        return stmt
 
-    if country:
-        stmt = stmt.where(DailyMetric.country == country)
-    if start:
-        stmt = stmt.where(DailyMetric.date >= start)
-    if end:
-        stmt = stmt.where(DailyMetric.date <= end)
-    if category:
-        stmt = stmt.where(DailyMetric.category == category)
+    if stream:
+        return ndjson_response(build_stmt, lambda row: dumps(_to_dict(row)))
 
-    metrics = db.execute(stmt).scalars().all()
+    rows = db.execute(build_stmt().limit(limit + 1)).all()
+    metrics, next_cursor = split_page(rows, limit, lambda m: (m.date, m.id))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return FastJSONResponse([_to_dict(m) for m in metrics], headers=headers)
 
-    return [
-        MetricResponse(
-            date=m.date,
-            country=m.country,
-            category=m.category,
-            event_count=m.event_count,
-            avg_tone=m.avg_tone,
-            mean_goldstein=getattr(m, "mean_goldstein", None),
-            min_goldstein=getattr(m, "min_goldstein", None),
-            mean_tone=getattr(m, "mean_tone", None),
-            pct_negative_tone=getattr(m, "pct_negative_tone", None),
-            severity_index=getattr(m, "severity_index", None),
-            severity_rolling_center=getattr(m, "severity_rolling_center", None),
-            severity_rolling_dispersion=getattr(m, "severity_rolling_dispersion", None),
-            z_severity=getattr(m, "z_severity", None),
-            percentile_180d=getattr(m, "percentile_180d", None),
-            rolling_mean=m.rolling_mean,
-            rolling_std=m.rolling_std,
-            rolling_center=m.rolling_center,
-            rolling_dispersion=m.rolling_dispersion,
-            baseline_quality=m.baseline_quality,
-            baseline_method=m.baseline_method,
-            z_score=m.z_score,
-            risk_score=m.risk_score,
-            reasons_json=m.reasons_json,
-            computed_at=m.computed_at,
-            pipeline_version=m.pipeline_version,
-        )
-        for m in metrics
-    ]
 
+def _to_dict(row) -> dict:
+    # zip stops before the trailing id column
+    return dict(zip(_METRIC_FIELDS, row))
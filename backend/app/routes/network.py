@@ -0,0 +1,81 @@
+"""
+Country interaction network (actor-network "spider web" view), from the daily
+country_edges_daily rollups maintained at ingest.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from ..models import CountryEdgeDaily
+from ..schemas import NetworkEdge, NetworkNode, NetworkResponse
+
+
+router = APIRouter()
+
+
+@router.get("/network", response_model=NetworkResponse)
+def get_network(
+    start: Optional[date] = Query(default=None, description="Start date (YYYY-MM-DD); default end - days"),
+    end: Optional[date] = Query(default=None, description="End date (YYYY-MM-DD); default today"),
+    days: int = Query(default=30, ge=1, le=365, description="Range length when start is not given"),
+    country: Optional[str] = Query(default=None, description="Only edges touching this ISO-2 country"),
+    k: int = Query(default=100, ge=1, le=1000, description="Number of heaviest edges"),
+    min_weight: int = Query(default=1, ge=1),
+    db: Session = Depends(get_db),
+) -> NetworkResponse:
+    """
+    The k heaviest country-country edges summed over [start, end], plus the
+    countries they connect. Edges are undirected (source < target).
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=days - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    e = CountryEdgeDaily
+    weight = func.sum(e.weight)
+    severity_weight = func.sum(case((e.mean_severity.isnot(None), e.weight), else_=0))
+    stmt = (
+        select(
+            e.country_a,
+            e.country_b,
+            weight.label("weight"),
+            (func.sum(e.mean_severity * e.weight) / func.nullif(severity_weight, 0)).label("mean_severity"),
+            func.sum(e.conflict_count).label("conflicts"),
+        )
+        .where(e.date >= start, e.date <= end)
+        .group_by(e.country_a, e.country_b)
+        .having(weight >= min_weight)
+        .order_by(weight.desc(), e.country_a, e.country_b)
+        .limit(k)
+    )
+    if country:
+        code = country.upper()
+        stmt = stmt.where((e.country_a == code) | (e.country_b == code))
+
+    edges: List[NetworkEdge] = []
+    node_weight: Dict[str, int] = defaultdict(int)
+    node_degree: Dict[str, int] = defaultdict(int)
+    for r in db.execute(stmt).all():
+        w = int(r.weight)
+        edges.append(NetworkEdge(
+            source=r.country_a,
+            target=r.country_b,
+            weight=w,
+            mean_severity=round(float(r.mean_severity), 2) if r.mean_severity is not None else None,
+            conflict_ratio=round(int(r.conflicts or 0) / w, 3),
+        ))
+        for c in (r.country_a, r.country_b):
+            node_weight[c] += w
+            node_degree[c] += 1
+
+    nodes = [
+        NetworkNode(id=c, weight=node_weight[c], degree=node_degree[c])
+        for c in sorted(node_weight, key=lambda c: (-node_weight[c], c))
+    ]
+    return NetworkResponse(start=start, end=end, nodes=nodes, edges=edges)
@@ -1,91 +1,78 @@
 """
-Pipeline management endpoints: re-enrich events, run Valyu pipeline, etc.
+Pipeline management endpoints: re-enrich events, run Valyu pipeline, poll job status.
+
+Heavy runs execute as background jobs (see jobs.py): POST returns a job ID
+immediately and progress is polled via GET /pipeline/jobs/{id}.
 """
 from __future__ import annotations
 
+import json
 import logging
-from typing import Any, Dict
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from ..db import get_db
-from ..models import Event, DailyMetric
-from ..ml.severity_scorer import score_severity
-from ..ml.risk_classifier import RiskTierClassifier
+from ..jobs import JobBusyError, get_job, submit_job
+from ..schemas import PipelineJobResponse, PipelineJobSubmitResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.post("/pipeline/re-enrich")
-def re_enrich_events(db: Session = Depends(get_db)) -> Dict[str, Any]:
-    """
-    Re-score all existing events with the latest severity algorithm.
-    Updates severity_index, threat_level, sentiment_score on all events.
-    Then recomputes risk tiers on daily_metrics.
-    """
-    events = db.execute(select(Event)).scalars().all()
-    updated = 0
-
-    for e in events:
-        # Build text from available data
-        text = ""
-        if e.title:
-            text = e.title
-        if e.content:
-            text = f"{text}. {e.content}" if text else e.content
-        if not text:
-            text = f"{e.category or 'Event'} in {e.country or 'unknown'}"
-
-        severity = score_severity(
-            text,
-            category=e.category or "Civil Unrest",
-            entity_count=0,
-            published_date=str(e.date) if e.date else None,
-            country_code=e.country,
-            goldstein_scale=e.goldstein,
-            quad_class=e.quad_class,
+def _submit(kind: str, fn) -> PipelineJobSubmitResponse:
+    try:
+        job_id = submit_job(kind, fn)
+    except JobBusyError as exc:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "a pipeline job is already running", "job_id": exc.active_run_id},
         )
+    return PipelineJobSubmitResponse(job_id=job_id, kind=kind, status="queued")
 
-        e.severity_index = severity["severity_index"]
-        e.threat_level = severity["threat_level"]
-        e.sentiment_score = severity["sentiment_polarity"]
-        updated += 1
-
-    db.commit()
-    logger.info("Re-enriched %d events", updated)
 
-    # Now recompute daily_metrics severity from events
-    from ..pipeline.ingest_valyu import aggregate_daily_metrics, compute_risk_and_trends
-    import collections
-
-    # Get all distinct dates
-    dates = db.execute(
-        select(Event.date).distinct().where(Event.date.isnot(None))
-    ).scalars().all()
-
-    metrics_updated = 0
-    for d in dates:
-        metrics_updated += aggregate_daily_metrics(db, d)
-
-    # Recompute risk tiers
-    compute_risk_and_trends(db)
+@router.post("/pipeline/re-enrich", response_model=PipelineJobSubmitResponse, status_code=202)
+def re_enrich_events(
+    force: bool = Query(default=False, description="Re-score events already at the current severity version"),
+) -> PipelineJobSubmitResponse:
+    """
+    Re-score existing events with the latest severity algorithm.
+    Updates severity_index, threat_level, sentiment_score and severity_version in
+    chunks (skipping events already at the current version unless force=true),
+    then recomputes daily_metrics and risk tiers. Runs in the background.
+    """
+    from ..pipeline.re_enrich import re_enrich_events as run_re_enrich
 
-    return {
-        "events_re_enriched": updated,
-        "dates_recomputed": len(dates),
-        "metrics_updated": metrics_updated,
-    }
+    return _submit("re_enrich", lambda ctx: run_re_enrich(ctx=ctx, force=force))
 
 
-@router.post("/pipeline/run-valyu")
-def run_valyu(db: Session = Depends(get_db)) -> Dict[str, Any]:
+@router.post("/pipeline/run-valyu", response_model=PipelineJobSubmitResponse, status_code=202)
+def run_valyu() -> PipelineJobSubmitResponse:
     """
-    Trigger a full Valyu ingestion pipeline run.
+    Trigger a full Valyu ingestion pipeline run in the background.
     Fetches new articles, classifies, scores, stores, and recomputes metrics.
     """
     from ..pipeline.ingest_valyu import run_valyu_pipeline
-    result = run_valyu_pipeline(days_back=7)
-    return result
+
+    return _submit("run_valyu", lambda ctx: run_valyu_pipeline(days_back=7, ctx=ctx))
+
+
+@router.get("/pipeline/jobs/{job_id}", response_model=PipelineJobResponse)
+def get_pipeline_job(job_id: str, db: Session = Depends(get_db)) -> PipelineJobResponse:
+    """Status, progress, stage timings and result of a pipeline job."""
+    run = get_job(db, job_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return PipelineJobResponse(
+        job_id=run.id,
+        kind=run.kind,
+        status=run.status,
+        progress=run.progress,
+        message=run.message,
+        stages=json.loads(run.stages_json) if run.stages_json else [],
+        result=json.loads(run.result_json) if run.result_json else None,
+        error=run.error,
+        created_at=run.created_at,
+        started_at=run.started_at,
+        finished_at=run.finished_at,
+    )
@@ -0,0 +1,38 @@
+"""
+GET /stream: server-sent events for dashboards, replacing polling of /map, /brief and /spikes.
+
+Events (JSON data):
+  spikes     new spike rows from a Day 2 run: {count, spikes: [{date, country, category, z_score, delta}]}
+  risk_tier  countries whose map tier changed: {changes: [{country, from, to, severity_index}]}
+  pipeline   a pipeline run finished: {pipeline, statuses, failed}
+  job        a background job finished: {run_id, kind, status}
+  reset      the resume point is gone; refetch everything
+
+EventSource reconnects with Last-Event-ID automatically; ?last_event_id= does
+the same for a fresh page that remembered the last id it saw.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from ..stream import event_source
+
+router = APIRouter()
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    last_event_id_header: Optional[int] = Header(default=None, alias="Last-Event-ID"),
+    last_event_id: Optional[int] = Query(default=None, ge=0, description="Resume after this event id"),
+) -> StreamingResponse:
+    """Server-sent events with compact change deltas, pushed as pipeline stages commit."""
+    resume = last_event_id_header if last_event_id_header is not None else last_event_id
+    return StreamingResponse(
+        event_source(request.is_disconnected, resume),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,149 @@
+"""
+Vector tiles for the map: GET /tiles/{z}/{x}/{y}.mvt (Mapbox Vector Tile).
+
+Layers:
+  - countries: country centroids with risk tier and severity (country_summary)
+  - clusters:  below TILE_POINTS_MIN_ZOOM, one point per grid cell from the
+               event_grid_daily rollups (count, max severity)
+  - events:    from TILE_POINTS_MIN_ZOOM, event points read by the tile's
+               quadkey range on events.grid_cell; the most severe
+               TILE_MAX_POINTS are kept
+
+Tiles cover the last 14 days (or ?date=) and are cached per data version.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..country_centroids import get_centroid
+from ..db import get_db
+from ..models import CountrySummary, Event, EventGridDaily
+from ..pipeline.event_grid import GRID_MAX_LEVEL, cluster_level, quadkey_range, tile_pixel, tile_to_quadkey
+from ..pipeline.risk_tiers import load_latest_tier_config, tier_for
+from ..pipeline_config import TILE_MAX_POINTS, TILE_POINTS_MIN_ZOOM
+from ..vector_tiles import EXTENT, MVT_MEDIA_TYPE, Feature, encode_tile
+
+
+router = APIRouter()
+
+MAX_ZOOM = 22
+
+
+def _inside(px: int, py: int) -> bool:
+    return 0 <= px < EXTENT and 0 <= py < EXTENT
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(float(value), 1) if value is not None else None
+
+
+def _country_features(db: Session, z: int, x: int, y: int) -> List[Feature]:
+    features = []
+    for c in db.execute(
+        select(CountrySummary.country, CountrySummary.lat, CountrySummary.lon, CountrySummary.risk_tier,
+               CountrySummary.severity_index, CountrySummary.risk_score, CountrySummary.event_count,
+               CountrySummary.trend_7d)
+        .where(CountrySummary.has_data.is_(True))
+    ):
+        px, py = tile_pixel(c.lat, c.lon, z, x, y, EXTENT)
+        if _inside(px, py):
+            features.append((px, py, {
+                "country": c.country, "risk_tier": c.risk_tier, "severity_index": _round(c.severity_index),
+                "risk_score": _round(c.risk_score), "event_count": c.event_count, "trend_7d": c.trend_7d,
+            }))
+    return features
+
+
+def _cluster_features(db: Session, z: int, x: int, y: int, start: date, end: date, tiers) -> List[Feature]:
+    level = cluster_level(z)
+    if level >= z:
+        shift = level - z
+        xs, ys = (x << shift, ((x + 1) << shift) - 1), (y << shift, ((y + 1) << shift) - 1)
+    else:
+        # Zoomed past the finest cluster level (TILE_POINTS_MIN_ZOOM above it): read the enclosing cell and clip
+        xs, ys = (x >> (z - level),) * 2, (y >> (z - level),) * 2
+    g = EventGridDaily
+    count = func.sum(g.event_count)
+    rows = db.execute(
+        select(
+            (func.sum(g.lat * g.event_count) / count).label("lat"),
+            (func.sum(g.lon * g.event_count) / count).label("lon"),
+            count.label("count"),
+            func.max(g.max_severity).label("max_severity"),
+        )
+        .where(
+            g.level == level,
+            g.x.between(*xs),
+            g.y.between(*ys),
+            g.date >= start,
+            g.date <= end,
+        )
+        .group_by(g.cell)
+    )
+    features = []
+    for r in rows:
+        px, py = tile_pixel(r.lat, r.lon, z, x, y, EXTENT)
+        if _inside(px, py):
+            features.append((px, py, {
+                "count": int(r.count), "max_severity": _round(r.max_severity),
+                "threat_level": tier_for(r.max_severity, tiers),
+            }))
+    return features
+
+
+def _event_features(db: Session, z: int, x: int, y: int, start: date, end: date, tiers) -> List[Feature]:
+    # Below GRID_MAX_LEVEL the tile is exactly a quadkey range; deeper tiles read their ancestor's and clip
+    level = min(z, GRID_MAX_LEVEL)
+    low, high = quadkey_range(tile_to_quadkey(x >> (z - level), y >> (z - level), level))
+    rows = db.execute(
+        select(Event.id, Event.lat, Event.lon, Event.country, Event.severity_index, Event.threat_level,
+               Event.category)
+        .where(Event.grid_cell >= low, Event.grid_cell < high, Event.date >= start, Event.date <= end)
+        .order_by(Event.severity_index.desc().nulls_last(), Event.id)
+        .limit(TILE_MAX_POINTS)
+    )
+    features = []
+    for e in rows:
+        lat, lon = e.lat, e.lon
+        if lat is None or lon is None:
+            lat, lon = get_centroid(e.country)[:2]  # grid_cell was set from the centroid
+        px, py = tile_pixel(lat, lon, z, x, y, EXTENT)
+        if _inside(px, py):
+            features.append((px, py, {
+                "id": e.id, "severity_index": _round(e.severity_index),
+                "threat_level": tier_for(e.severity_index, tiers, fallback=e.threat_level), "category": e.category,
+            }))
+    return features
+
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+def get_tile(
+    z: int,
+    x: int,
+    y: int,
+    date_param: Optional[date] = Query(default=None, alias="date", description="Single day; default last 14 days"),
+    db: Session = Depends(get_db),
+) -> Response:
+    """
+    Mapbox Vector Tile with countries, clusters (low zoom) or events (high zoom)
+    layers. Empty tiles are an empty 200 body.
+    """
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < (1 << z) and 0 <= y < (1 << z)):
+        raise HTTPException(status_code=400, detail="tile out of range")
+    if date_param:
+        start = end = date_param
+    else:
+        end = datetime.now(timezone.utc).date()
+        start = end - timedelta(days=14)
+
+    tiers = load_latest_tier_config(db)
+    layers = {"countries": _country_features(db, z, x, y)}
+    if z < TILE_POINTS_MIN_ZOOM:
+        layers["clusters"] = _cluster_features(db, z, x, y, start, end, tiers)
+    else:
+        layers["events"] = _event_features(db, z, x, y, start, end, tiers)
+    return Response(content=encode_tile(layers), media_type=MVT_MEDIA_TYPE)
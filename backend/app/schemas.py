@@ -26,6 +26,46 @@ class EventResponse(BaseModel):
     category: Optional[str]
 
 
+class EventSearchHit(BaseModel):
+    id: str
+    date: date
+    country: Optional[str]
+    category: Optional[str]
+    source: Optional[str]
+    title: Optional[str]
+    source_url: Optional[str]
+    severity_index: Optional[float]
+    score: float  # higher is more relevant (bm25 on SQLite, ts_rank_cd on PostgreSQL)
+    title_snippet: Optional[str]  # HTML-escaped, matches wrapped in <mark>
+    content_snippet: Optional[str]
+
+
+class EventSearchResponse(BaseModel):
+    query: str
+    results: List[EventSearchHit]
+    count: int
+    next_offset: Optional[int] = None  # pass as ?offset= for the next page
+
+
+class EntityEventItem(BaseModel):
+    id: str
+    date: date
+    country: Optional[str]
+    category: Optional[str]
+    source: Optional[str]
+    title: Optional[str]
+    source_url: Optional[str]
+    severity_index: Optional[float]
+
+
+class EntityEventsResponse(BaseModel):
+    value: str  # normalized lookup key (or ISO-2 for a country code)
+    type: Optional[str]
+    events: List[EntityEventItem]
+    count: int
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page
+
+
 class MetricResponse(BaseModel):
     date: date
     country: str
@@ -82,11 +122,12 @@ class CountryListResponse(BaseModel):
 
 
 class RiskSnapshotResponse(BaseModel):
-    snapshot_date: date
+    snapshot_date: date  # day, or first day of the week/month
     country: str
     risk_score: Optional[float] = None
     severity_index: Optional[float] = None
     event_count: Optional[int] = None
+    period_end: Optional[date] = None  # last day of the week/month (rollup rows only)
 
 
 class MapCountryResponse(BaseModel):
@@ -105,6 +146,22 @@ class MapCountryResponse(BaseModel):
     top_category: Optional[str] = None
 
 
+class MapCluster(BaseModel):
+    cell: str  # quadkey
+    lat: float  # mean event position in the cell
+    lon: float
+    count: int
+    max_severity: Optional[float] = None
+
+
+class MapClustersResponse(BaseModel):
+    zoom: int
+    level: int  # grid level the clusters were read at
+    start: date
+    end: date
+    clusters: List[MapCluster]
+
+
 class MapEventLocation(BaseModel):
     latitude: float
     longitude: float
@@ -157,6 +214,7 @@ class CombinedEventsResponse(BaseModel):
     events: List[ValyuEventResponse]
     count: int
     sources: Dict[str, int] = {}
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page
 
 
 # ── Analytics schemas ────────────────────────────────────────────────────
@@ -169,8 +227,10 @@ class RiskTiersResponse(BaseModel):
     method: str
     boundaries: List[float]
     tier_ranges: Dict[str, List[float]]
+    centroids: Dict[str, Optional[float]] = {}
     n_samples: int
     fitted_at: Optional[str] = None
+    version: Optional[int] = None
 
 class CategoryBreakdownResponse(BaseModel):
     categories: List[Dict]  # [{name, count, percentage}, ...]
@@ -178,8 +238,9 @@ class CategoryBreakdownResponse(BaseModel):
 
 class SparklineResponse(BaseModel):
     country: str
-    dates: List[str]
+    dates: List[str]  # day, or first day of the week/month
     values: List[Optional[float]]
+    granularity: str = "day"  # "day" | "week" | "month"
 
 class DecompositionResponse(BaseModel):
     country: str
@@ -188,4 +249,49 @@ class DecompositionResponse(BaseModel):
     seasonal: List[Optional[float]]
     residual: List[Optional[float]]
     seasonal_strength: float
+    granularity: str = "day"  # "day" | "week" | "month"
+
+
+
+# ── Pipeline job schemas ─────────────────────────────────────────────────
+
+class PipelineJobSubmitResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
 
+class PipelineJobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str  # queued/running/succeeded/failed
+    progress: Optional[float] = None
+    message: Optional[str] = None
+    stages: List[Dict] = []  # [{name, duration_s, rows}, ...]
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+# ── Country network ──────────────────────────────────────────────────────
+
+class NetworkEdge(BaseModel):
+    source: str  # ISO-2; source < target (edges are undirected)
+    target: str
+    weight: int  # events linking the pair in the range
+    mean_severity: Optional[float]
+    conflict_ratio: float  # share of GDELT conflict (quad_class 3/4) events
+
+
+class NetworkNode(BaseModel):
+    id: str  # ISO-2
+    weight: int  # sum of the returned edges touching the country
+    degree: int
+
+
+class NetworkResponse(BaseModel):
+    start: date
+    end: date
+    nodes: List[NetworkNode]
+    edges: List[NetworkEdge]
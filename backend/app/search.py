@@ -0,0 +1,293 @@
+"""
+Full-text search over event titles and content (GET /events/search).
+
+SQLite: an FTS5 table, events_fts, indexes event_text.title/content as an
+external-content index (the text is not stored twice). Triggers on event_text
+keep it in sync, so every write path (ingest upserts, re-enrich, retention
+deletes) updates the index in the same transaction. Results are ranked with bm25, title
+matches weighted above content, and come with highlighted snippets.
+
+PostgreSQL: a GIN index on to_tsvector(title || content) over event_text,
+ranked with ts_rank_cd and highlighted with ts_headline.
+
+event_text has no INTEGER PRIMARY KEY, so the index follows its implicit rowid.
+VACUUM may renumber rowids; run rebuild_search_index() after one.
+"""
+from __future__ import annotations
+
+import html
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import event, func, literal_column, select, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .db import dialect_name
+from .models import Event, EventText
+
+logger = logging.getLogger("events-risk-dashboard.search")
+
+# bm25 column weights: a term in the title counts for more than one in the body
+TITLE_WEIGHT = 5.0
+CONTENT_WEIGHT = 1.0
+
+SNIPPET_TOKENS = 24
+
+SORT_RELEVANCE = "relevance"
+# Newest first (event date, then time): no ranking pass over the matches
+SORT_RECENT = "recent"
+
+# Private-use markers put around matches by SQL, swapped for <mark> after escaping
+_HL_OPEN, _HL_CLOSE = "\x02", "\x03"
+
+_SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+        title, content,
+        content='event_text', content_rowid='rowid',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_text_fts_ai AFTER INSERT ON event_text BEGIN
+        INSERT INTO events_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_text_fts_ad AFTER DELETE ON event_text BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title, content)
+        VALUES ('delete', old.rowid, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_text_fts_au AFTER UPDATE OF title, content ON event_text
+    WHEN old.title IS NOT new.title OR old.content IS NOT new.content BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title, content)
+        VALUES ('delete', old.rowid, old.title, old.content);
+        INSERT INTO events_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content);
+    END
+    """,
+)
+
+_PG_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_event_text_search ON event_text USING gin "
+    "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(content, '')))"
+)
+
+
+class SearchUnavailable(RuntimeError):
+    """The database dialect has no full-text index support here."""
+
+
+# ── Index maintenance ────────────────────────────────────────────────────
+
+def ensure_search_index(bind) -> bool:
+    """
+    Create the search index and sync triggers if missing (idempotent). On SQLite,
+    rebuilds the index when it does not cover every event_text row (first run on
+    an existing database). Returns True if a rebuild ran.
+    """
+    engine_or_conn = bind.get_bind() if isinstance(bind, Session) else bind
+    if isinstance(engine_or_conn, Engine):
+        with engine_or_conn.begin() as conn:
+            return _ensure(conn)
+    return _ensure(engine_or_conn)
+
+
+def _ensure(conn: Connection) -> bool:
+    name = conn.dialect.name
+    if name == "postgresql":
+        conn.execute(text(_PG_DDL))
+        return False
+    if name != "sqlite":
+        return False
+    for ddl in _SQLITE_DDL:
+        conn.execute(text(ddl))
+    indexed = conn.execute(text("SELECT count(*) FROM events_fts_docsize")).scalar()
+    total = conn.execute(text("SELECT count(*) FROM event_text")).scalar()
+    if indexed == total:
+        return False
+    logger.info("rebuilding events search index", extra={"indexed": indexed, "events": total})
+    conn.execute(text("INSERT INTO events_fts(events_fts) VALUES ('rebuild')"))
+    return True
+
+
+def rebuild_search_index(session: Session) -> None:
+    """Re-index every event from the event_text table (SQLite; e.g. after VACUUM)."""
+    if dialect_name(session) == "sqlite":
+        session.execute(text("INSERT INTO events_fts(events_fts) VALUES ('rebuild')"))
+
+
+def optimize_search_index(session: Session) -> None:
+    """Merge FTS5 segments after large ingests (SQLite); queries touch fewer b-trees."""
+    if dialect_name(session) == "sqlite":
+        session.execute(text("INSERT INTO events_fts(events_fts) VALUES ('optimize')"))
+
+
+@event.listens_for(EventText.__table__, "after_create")
+def _create_with_event_text(target, connection, **kw) -> None:
+    # Fresh databases (create_all) get the index together with the event_text table
+    _ensure(connection)
+
+
+# ── Queries ──────────────────────────────────────────────────────────────
+
+_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def to_match_query(q: str) -> str:
+    """
+    User text -> FTS5 MATCH expression. Words are ANDed; "quoted phrases",
+    prefix* terms and OR between terms are supported. Everything else is
+    quoted, so user input can never be an FTS5 syntax error. Returns "" when
+    nothing searchable remains.
+    """
+    parts: List[str] = []
+    for phrase, word in _TOKEN_RE.findall(q):
+        if phrase:
+            words = _WORD_RE.findall(phrase)
+            if words:
+                parts.append('"' + " ".join(words) + '"')
+            continue
+        if word == "OR":
+            if parts and parts[-1] != "OR":
+                parts.append("OR")
+            continue
+        words = _WORD_RE.findall(word)
+        if not words:
+            continue
+        term = '"' + " ".join(words) + '"'
+        if word.endswith("*"):
+            term += "*"
+        parts.append(term)
+    while parts and parts[-1] == "OR":
+        parts.pop()
+    return " ".join(parts)
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    id: str
+    date: date
+    country: Optional[str]
+    category: Optional[str]
+    source: Optional[str]
+    title: Optional[str]
+    source_url: Optional[str]
+    severity_index: Optional[float]
+    score: float
+    title_snippet: Optional[str]
+    content_snippet: Optional[str]
+
+
+_HIT_COLUMNS = (
+    Event.id, Event.date, Event.country, Event.category, Event.source,
+    EventText.title, EventText.source_url, Event.severity_index,
+)
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a snippet and turn the match markers into <mark> tags."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_HL_OPEN, "<mark>").replace(_HL_CLOSE, "</mark>")
+
+
+def search_events(
+    session: Session,
+    q: str,
+    country: Optional[str] = None,
+    category: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = 20,
+    offset: int = 0,
+    sort: str = SORT_RELEVANCE,
+) -> List[SearchHit]:
+    """
+    Events matching q, with filters: best match first, or newest first with
+    sort="recent". Raises SearchUnavailable on other dialects.
+    """
+    name = dialect_name(session)
+    if name == "sqlite":
+        match = to_match_query(q)
+        if not match:
+            return []
+        fts = literal_column("events_fts")
+        # ORDER BY the built-in rank column lets FTS5 sort internally, so snippets
+        # are only computed for the rows LIMIT keeps (not every match)
+        rank = literal_column("events_fts.rank")
+        stmt = (
+            select(
+                *_HIT_COLUMNS,
+                (-rank).label("score"),
+                func.snippet(fts, 0, _HL_OPEN, _HL_CLOSE, "…", SNIPPET_TOKENS).label("title_snippet"),
+                func.snippet(fts, 1, _HL_OPEN, _HL_CLOSE, "…", SNIPPET_TOKENS).label("content_snippet"),
+            )
+            .select_from(
+                table("events_fts")
+                .join(EventText, literal_column("event_text.rowid") == literal_column("events_fts.rowid"))
+                .join(Event, Event.id == EventText.event_id)
+            )
+            .where(text("events_fts MATCH :match").bindparams(match=match))
+            .where(text(f"events_fts.rank MATCH 'bm25({TITLE_WEIGHT}, {CONTENT_WEIGHT})'"))
+            # By event date, not rowid: back-fills and rebuilds insert older articles after newer ones
+            .order_by(*((Event.date.desc(), Event.ts.desc(), Event.id) if sort == SORT_RECENT else (rank,)))
+        )
+    elif name == "postgresql":
+        if not _WORD_RE.search(q):
+            return []
+        query = func.websearch_to_tsquery("english", q)
+        title, content = func.coalesce(EventText.title, ""), func.coalesce(EventText.content, "")
+        document = func.to_tsvector("english", title + " " + content)  # matches the ix_event_text_search expression
+        weighted = func.setweight(func.to_tsvector("english", title), "A").op("||")(
+            func.setweight(func.to_tsvector("english", content), "D")
+        )
+        options = f"StartSel={_HL_OPEN}, StopSel={_HL_CLOSE}, MaxWords={SNIPPET_TOKENS}, MinWords=5"
+        score = func.ts_rank_cd(weighted, query)
+        stmt = (
+            select(
+                *_HIT_COLUMNS,
+                score.label("score"),
+                func.ts_headline("english", title, query, options).label("title_snippet"),
+                func.ts_headline("english", content, query, options).label("content_snippet"),
+            )
+            .select_from(EventText)
+            .join(Event, Event.id == EventText.event_id)
+            .where(document.op("@@")(query))
+            .order_by(*((Event.date.desc(), Event.ts.desc()) if sort == SORT_RECENT else (score.desc(),)), Event.id)
+        )
+    else:
+        raise SearchUnavailable(f"full-text search is not supported on {name}")
+
+    if country:
+        stmt = stmt.where(Event.country == country)
+    if category:
+        stmt = stmt.where(Event.category == category)
+    if start:
+        stmt = stmt.where(Event.date >= start)
+    if end:
+        stmt = stmt.where(Event.date <= end)
+
+    rows = session.execute(stmt.limit(limit).offset(offset)).all()
+    return [
+        SearchHit(
+            id=r.id,
+            date=r.date,
+            country=r.country,
+            category=r.category,
+            source=r.source,
+            title=r.title,
+            source_url=r.source_url,
+            severity_index=r.severity_index,
+            score=round(float(r.score), 4),
+            title_snippet=highlight(r.title_snippet),
+            content_snippet=highlight(r.content_snippet),
+        )
+        for r in rows
+    ]
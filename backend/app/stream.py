@@ -0,0 +1,306 @@
+"""
+Change notifications for GET /stream (server-sent events).
+
+Pipelines may run in another process (scheduler daemon, CLI), so a change is
+recorded with publish() as a stream_events row in the same transaction as the
+data it describes. Each API process runs one poller thread that reads new rows
+and fans them out to its connected clients (StreamBroker); a client that
+reconnects with Last-Event-ID is replayed what it missed from the table.
+Pipelines running inside the API process call notify() after committing, so
+their events go out without waiting for the next poll.
+
+Ids come from a sequence, so on PostgreSQL a transaction can commit a lower id
+after a higher one was already read. The poller remembers the ids it skipped
+and re-polls them for STREAM_GAP_SECONDS; one that shows up is delivered late,
+without an SSE id, so the client's Last-Event-ID keeps pointing at the newest
+event. (A rolled-back transaction leaves a hole that simply expires.)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from .db import ReadSessionLocal
+from .models import StreamEvent
+from .pipeline_config import (
+    STREAM_GAP_SECONDS,
+    STREAM_HEARTBEAT_SECONDS,
+    STREAM_MAX_GAPS,
+    STREAM_POLL_SECONDS,
+    STREAM_QUEUE_SIZE,
+    STREAM_REPLAY_LIMIT,
+    STREAM_RETENTION_HOURS,
+)
+
+logger = logging.getLogger("events-risk-dashboard.stream")
+
+EVENT_SPIKES = "spikes"
+EVENT_RISK_TIER = "risk_tier"
+EVENT_PIPELINE = "pipeline"
+EVENT_JOB = "job"
+EVENT_RESET = "reset"  # resume point no longer available: client should refetch
+
+# EventSource reconnect delay sent to clients
+RETRY_MS = 3000
+
+
+# ── Publishing (pipelines) ───────────────────────────────────────────────
+
+def publish(session: Session, kind: str, payload: Dict[str, Any]) -> None:
+    """Record a change notification; delivered once the caller's transaction commits."""
+    session.add(
+        StreamEvent(
+            kind=kind,
+            payload_json=json.dumps(payload, default=str, separators=(",", ":")),
+            created_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+def prune_stream_events(session: Session) -> int:
+    """Delete notifications older than STREAM_RETENTION_HOURS. Returns rows deleted."""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=STREAM_RETENTION_HOURS)
+    return session.execute(delete(StreamEvent).where(StreamEvent.created_at < cutoff)).rowcount or 0
+
+
+def notify() -> None:
+    """Wake this process's poller (call after committing published events)."""
+    broker.wake()
+
+
+# ── Reading ──────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class StreamMessage:
+    id: int
+    kind: str
+    data: str
+    late: bool = False  # committed after a higher id had been delivered
+
+
+def format_sse(message: StreamMessage) -> str:
+    if message.late:
+        return f"event: {message.kind}\ndata: {message.data}\n\n"
+    return f"id: {message.id}\nevent: {message.kind}\ndata: {message.data}\n\n"
+
+
+def events_after(last_id: int, limit: int) -> List[StreamMessage]:
+    session = ReadSessionLocal()
+    try:
+        rows = session.execute(
+            select(StreamEvent.id, StreamEvent.kind, StreamEvent.payload_json)
+            .where(StreamEvent.id > last_id)
+            .order_by(StreamEvent.id)
+            .limit(limit)
+        ).all()
+    finally:
+        session.close()
+    return [StreamMessage(id=r.id, kind=r.kind, data=r.payload_json) for r in rows]
+
+
+def events_with_ids(ids: List[int]) -> List[StreamMessage]:
+    session = ReadSessionLocal()
+    try:
+        rows = session.execute(
+            select(StreamEvent.id, StreamEvent.kind, StreamEvent.payload_json)
+            .where(StreamEvent.id.in_(ids))
+            .order_by(StreamEvent.id)
+        ).all()
+    finally:
+        session.close()
+    return [StreamMessage(id=r.id, kind=r.kind, data=r.payload_json, late=True) for r in rows]
+
+
+def event_id_range() -> Tuple[Optional[int], int]:
+    """(oldest, newest) retained event id; (None, 0) when empty."""
+    session = ReadSessionLocal()
+    try:
+        oldest, newest = session.execute(select(func.min(StreamEvent.id), func.max(StreamEvent.id))).one()
+    finally:
+        session.close()
+    return oldest, newest or 0
+
+
+# ── Fan-out ──────────────────────────────────────────────────────────────
+
+@dataclass(eq=False)
+class Subscriber:
+    """One connected client: a bounded queue on the client's event loop."""
+    loop: asyncio.AbstractEventLoop
+    start_id: int = 0  # poller mark at subscribe time: everything after it is delivered live
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=STREAM_QUEUE_SIZE))
+    overflowed: bool = False
+
+    def offer(self, message: StreamMessage) -> None:
+        # Runs on the subscriber's loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too far behind: the stream is closed and the client resumes from the table
+            self.overflowed = True
+
+
+class StreamBroker:
+    """Polls stream_events on one daemon thread and fans new rows out to subscribers."""
+
+    def __init__(self, poll_seconds: float = STREAM_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_id: Optional[int] = None
+        self._gaps: Dict[int, float] = {}  # id skipped below _last_id -> monotonic time first seen missing
+
+    def subscribe(self) -> Subscriber:
+        """Register the calling coroutine's client; must be called on its event loop."""
+        sub = Subscriber(loop=asyncio.get_running_loop())
+        with self._lock:
+            if self._last_id is None:
+                self._last_id = event_id_range()[1]
+            sub.start_id = self._last_id
+            self._subscribers.add(sub)
+            if self._thread is None or not self._thread.is_alive():
+                self._closed.clear()
+                self._thread = threading.Thread(target=self._run, name="stream-poller", daemon=True)
+                self._thread.start()
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def close(self) -> None:
+        """Stop the poller thread (app shutdown); a later subscribe starts a new one."""
+        self._closed.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def poll_once(self) -> int:
+        """Deliver rows committed since the last poll, and skipped ids committed since. Returns messages delivered."""
+        if self._last_id is None:
+            return 0
+        delivered = 0
+        if self._gaps:
+            expired = time.monotonic() - STREAM_GAP_SECONDS
+            for gap_id in [i for i, seen in self._gaps.items() if seen < expired]:
+                del self._gaps[gap_id]
+            for message in events_with_ids(sorted(self._gaps)) if self._gaps else []:
+                del self._gaps[message.id]
+                self._deliver(message)
+                delivered += 1
+        while True:
+            batch = events_after(self._last_id, STREAM_REPLAY_LIMIT)
+            for message in batch:
+                self._note_gaps(self._last_id, message.id)
+                self._last_id = message.id
+                self._deliver(message)
+            delivered += len(batch)
+            if len(batch) < STREAM_REPLAY_LIMIT:
+                return delivered
+
+    def _note_gaps(self, last_id: int, next_id: int) -> None:
+        now = time.monotonic()
+        for gap_id in range(max(last_id + 1, next_id - STREAM_MAX_GAPS), next_id):
+            if len(self._gaps) >= STREAM_MAX_GAPS:
+                break
+            self._gaps[gap_id] = now
+
+    def _deliver(self, message: StreamMessage) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, message)
+            except RuntimeError:  # the client's loop is closed
+                self.unsubscribe(sub)
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            try:
+                self.poll_once()
+            except Exception:  # noqa: BLE001
+                logger.exception("stream poll failed")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+
+broker = StreamBroker()
+
+
+# ── SSE body ─────────────────────────────────────────────────────────────
+
+async def event_source(
+    is_disconnected,
+    last_event_id: Optional[int],
+    heartbeat_seconds: float = STREAM_HEARTBEAT_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    SSE body for one client. With last_event_id, first replays retained events
+    after it (or sends `reset` when they are no longer available); then streams
+    live events, with a comment line every heartbeat_seconds to keep proxies open.
+    """
+    sub = broker.subscribe()
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        oldest, newest = await asyncio.to_thread(event_id_range)
+        # The poller mark can trail the client's id (rows committed before its next
+        # poll); the client already has everything up to its own id either way.
+        sent = sub.start_id if last_event_id is None else max(sub.start_id, last_event_id)
+        replayed: Set[int] = set()
+        if last_event_id is not None and last_event_id > newest:
+            # Store was rebuilt since the client's last event
+            yield format_sse(StreamMessage(id=newest, kind=EVENT_RESET, data="{}"))
+            sent = newest
+        elif last_event_id is not None and last_event_id < newest:
+            backlog = await asyncio.to_thread(events_after, last_event_id, STREAM_REPLAY_LIMIT + 1)
+            pruned = oldest is not None and last_event_id < oldest - 1
+            if pruned or len(backlog) > STREAM_REPLAY_LIMIT:
+                yield format_sse(StreamMessage(id=newest, kind=EVENT_RESET, data="{}"))
+                sent = newest
+            else:
+                for message in backlog:
+                    yield format_sse(message)
+                replayed = {m.id for m in backlog}
+                sent = backlog[-1].id if backlog else last_event_id
+
+        while not sub.overflowed:
+            if await is_disconnected():
+                break
+            try:
+                message = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message.late:
+                # Committed late; the replay above could only have included it if it committed by then
+                if message.id not in replayed:
+                    yield format_sse(message)
+                continue
+            if message.id <= sent:
+                continue  # already replayed
+            yield format_sse(message)
+            sent = message.id
+    finally:
+        broker.unsubscribe(sub)
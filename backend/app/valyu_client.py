@@ -22,6 +22,7 @@ def search(
     search_type: str = "news",
     max_num_results: int = 20,
     start_date: Optional[str] = None,
+    timeout: float = 60,
 ) -> List[Dict[str, Any]]:
     """
     Call Valyu /v1/search. Returns list of { title, url, content, publishedDate, source }.
@@ -43,7 +44,7 @@ def search(
             f"{VALYU_BASE}/v1/search",
             json=payload,
             headers={"Content-Type": "application/json", HEADER_API_KEY: key},
-            timeout=60,
+            timeout=timeout,
         )
         r.raise_for_status()
         data = r.json()
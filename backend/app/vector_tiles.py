@@ -0,0 +1,98 @@
+"""
+Mapbox Vector Tile (MVT 2.1) encoding for point layers.
+
+Only what GET /tiles/{z}/{x}/{y}.mvt needs: point features with scalar
+attributes, written straight to protobuf bytes, so no protobuf or
+mapbox-vector-tile dependency is required. Points are given in tile pixel
+coordinates (0..extent inside the tile); see pipeline.event_grid.tile_pixel().
+"""
+from __future__ import annotations
+
+import struct
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+EXTENT = 4096
+
+_VARINT, _LEN, _I64 = 0, 2, 1
+_MOVE_TO_ONE = (1 & 0x7) | (1 << 3)  # MoveTo command, count 1
+_POINT = 1  # GeomType.POINT
+
+# A feature: (px, py, attributes); None attributes are left out
+Feature = Tuple[int, int, Mapping[str, Any]]
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _bytes_field(field: int, data: bytes) -> bytes:
+    return _key(field, _LEN) + _varint(len(data)) + data
+
+
+def _value(value: Any) -> bytes:
+    if isinstance(value, bool):
+        return _key(7, _VARINT) + _varint(int(value))
+    if isinstance(value, int):
+        return _key(6, _VARINT) + _varint(_zigzag(value))  # sint64
+    if isinstance(value, float):
+        return _key(3, _I64) + struct.pack("<d", value)  # double
+    return _bytes_field(1, str(value).encode())
+
+
+def encode_layer(name: str, features: Iterable[Feature], extent: int = EXTENT) -> bytes:
+    """One MVT layer of point features; empty bytes when there are no features."""
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    value_list: List[Any] = []
+    body = bytearray()
+    for px, py, attributes in features:
+        tags: List[int] = []
+        for k, v in attributes.items():
+            if v is None:
+                continue
+            ki = keys.setdefault(k, len(keys))
+            vk = (type(v), v)
+            vi = values.get(vk)
+            if vi is None:
+                vi = values[vk] = len(value_list)
+                value_list.append(v)
+            tags += (ki, vi)
+        feature = bytearray()
+        if tags:
+            feature += _bytes_field(2, b"".join(_varint(t) for t in tags))
+        feature += _key(3, _VARINT) + _varint(_POINT)
+        feature += _bytes_field(4, _varint(_MOVE_TO_ONE) + _varint(_zigzag(px)) + _varint(_zigzag(py)))
+        body += _bytes_field(2, bytes(feature))
+    if not body:
+        return b""
+    layer = bytearray(_key(15, _VARINT) + _varint(2) + _bytes_field(1, name.encode()))
+    layer += body
+    for k in keys:
+        layer += _bytes_field(3, k.encode())
+    for v in value_list:
+        layer += _bytes_field(4, _value(v))
+    layer += _key(5, _VARINT) + _varint(extent)
+    return _bytes_field(3, bytes(layer))
+
+
+def encode_tile(layers: Mapping[str, Sequence[Feature]], extent: int = EXTENT) -> bytes:
+    """MVT bytes for named point layers; an empty tile is empty bytes."""
+    return b"".join(encode_layer(name, features, extent) for name, features in layers.items())
+
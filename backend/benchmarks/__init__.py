@@ -0,0 +1,6 @@
+"""
+Latency benchmarks for hot API paths against a synthetic SQLite database.
+
+Run from project root, e.g.:
+    python -m backend.benchmarks.bench_map
+"""
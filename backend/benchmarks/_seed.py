@@ -0,0 +1,141 @@
+"""
+Synthetic data and timing helpers shared by the benchmarks.
+"""
+from __future__ import annotations
+
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.app.country_centroids import COUNTRY_CENTROIDS
+from backend.app.ml.severity_scorer import CATEGORY_WEIGHTS
+from backend.app.models import EVENT_TEXT_COLUMNS, Base, DailyMetric, Event, EventText
+
+CATEGORIES = list(CATEGORY_WEIGHTS)
+
+TIERS = ["info", "low", "medium", "high", "critical"]
+TRENDS = ["rising", "stable", "falling"]
+
+
+def temp_engine() -> Tuple[Engine, sessionmaker]:
+    """File-backed SQLite in a temp dir (closer to production than :memory:)."""
+    path = Path(tempfile.mkdtemp(prefix="atlas-bench-")) / "bench.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine, autoflush=False)
+
+
+def seed_daily_metrics(session: Session, days: int = 60, countries: int = 180, seed: int = 0) -> int:
+    """(countries x categories x days) daily_metrics rows ending today."""
+    rng = random.Random(seed)
+    codes = list(COUNTRY_CENTROIDS)[:countries]
+    today = date.today()
+    rows: List[Dict] = []
+    for d in range(days):
+        day = today - timedelta(days=d)
+        for c in codes:
+            for cat in CATEGORIES:
+                sev = rng.uniform(0, 100)
+                rows.append({
+                    "date": day,
+                    "country": c,
+                    "category": cat,
+                    "event_count": rng.randint(1, 400),
+                    "avg_tone": rng.uniform(-10, 5),
+                    "severity_index": sev,
+                    "risk_score": sev * 0.8,
+                    "risk_tier": rng.choice(TIERS),
+                    "risk_percentile": rng.uniform(0, 100),
+                    "trend_7d": rng.choice(TRENDS),
+                    "trend_30d": rng.choice(TRENDS),
+                    "avg_sentiment": rng.uniform(-1, 1),
+                })
+    session.bulk_insert_mappings(DailyMetric, rows)
+    session.commit()
+    return len(rows)
+
+
+def seed_events(
+    session: Session,
+    n: int = 100_000,
+    days: int = 30,
+    seed: int = 0,
+    text_fn: Optional[Callable[[random.Random], Tuple[str, str]]] = None,
+) -> int:
+    """n synthetic events spread over the last `days` days; text_fn(rng) -> (title, content) overrides the filler text."""
+    rng = random.Random(seed)
+    codes = list(COUNTRY_CENTROIDS)
+    now = datetime.now().replace(microsecond=0)
+    batch: List[Dict] = []
+    for i in range(n):
+        ts = now - timedelta(seconds=rng.randint(0, days * 86400))
+        country = rng.choice(codes)
+        lat, lon = COUNTRY_CENTROIDS[country][:2]
+        sev = rng.uniform(0, 100)
+        title, content = text_fn(rng) if text_fn else (f"Synthetic event {i} in {country}", "x" * rng.randint(200, 2000))
+        batch.append({
+            "id": f"bench{i:09d}",
+            "ts": ts,
+            "date": ts.date(),
+            "country": country,
+            "lat": lat + rng.uniform(-2, 2),
+            "lon": lon + rng.uniform(-2, 2),
+            "event_code": "190",
+            "quad_class": rng.randint(1, 4),
+            "goldstein": rng.uniform(-10, 10),
+            "avg_tone": rng.uniform(-10, 5),
+            "source": rng.choice(["gdelt", "valyu"]),
+            "title": title,
+            "content": content,
+            "source_url": f"https://example.org/{i}",
+            "category": rng.choice(CATEGORIES),
+            "severity_index": sev,
+            "threat_level": TIERS[min(4, int(sev // 20))],
+            "sentiment_score": rng.uniform(-1, 1),
+            "entities_json": '{"countries": [{"code": "%s"}], "organizations": [], "persons": []}' % country,
+        })
+        if len(batch) >= 20_000:
+            _insert_events(session, batch)
+            batch = []
+    if batch:
+        _insert_events(session, batch)
+    return n
+
+
+def _insert_events(session: Session, rows: List[Dict]) -> None:
+    """Flat event dicts -> events + event_text, as upsert_events splits them."""
+    session.bulk_insert_mappings(Event, [{k: v for k, v in r.items() if k not in EVENT_TEXT_COLUMNS} for r in rows])
+    session.bulk_insert_mappings(EventText, [{"event_id": r["id"], **{c: r[c] for c in EVENT_TEXT_COLUMNS}} for r in rows])
+    session.commit()
+
+
+def timeit(fn: Callable[[], object], repeat: int = 20, warmup: int = 2) -> Dict[str, float]:
+    """Median / p95 / min wall time in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+    }
+
+
+def report(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    print(f"\n{title}")
+    width = max(len(k) for k in results)
+    for name, r in results.items():
+        print(f"  {name.ljust(width)}  median {r['median_ms']:>9.3f} ms   p95 {r['p95_ms']:>9.3f} ms   min {r['min_ms']:>9.3f} ms")
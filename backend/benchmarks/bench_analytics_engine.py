@@ -0,0 +1,94 @@
+"""
+History-wide analytics: SQLite + pandas vs the DuckDB engine over the Parquet
+export, for /analytics/category-breakdown and /analytics/risk-distribution over
+a year, and for Day 2's rolling baselines over all daily_metrics. Also times
+the export that each pipeline run pays once. Needs duckdb and pyarrow.
+
+    python -m backend.benchmarks.bench_analytics_engine [--events 10000000] [--days 365]
+
+Seeding 10M events takes a while (and a few GB of disk); try --events 1000000 first.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import select
+
+from backend.app import analytics_engine, archive
+from backend.app.models import DailyMetric
+from backend.app.pipeline import day2_baselines_risk
+from backend.app.pipeline_config import BASELINE_MIN_PERIODS, BASELINE_WINDOW_DAYS_SHORT
+from backend.app.routes.analytics import get_category_breakdown, get_risk_distribution
+from backend.benchmarks._seed import report, seed_daily_metrics, seed_events, temp_engine, timeit
+
+
+def _short_text(rng):
+    return "Synthetic event", ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--countries", type=int, default=180)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if not (analytics_engine.HAS_DUCKDB and archive.HAS_PYARROW):
+        raise SystemExit("install duckdb and pyarrow to run this benchmark")
+
+    _, Session = temp_engine()
+    session = Session()
+    print(f"seeded {seed_events(session, n=args.events, days=args.days, text_fn=_short_text)} events")
+    print(f"seeded {seed_daily_metrics(session, days=args.days, countries=args.countries)} daily_metrics rows")
+
+    analytics_engine.ANALYTICS_DIR = Path(tempfile.mkdtemp(prefix="atlas-bench-analytics-"))
+    today = date.today()
+    report("Parquet export (last stage of each pipeline run)", {
+        "first export (every date)": timeit(lambda: analytics_engine.export_parquet(session), repeat=1, warmup=0),
+        "no event date changed": timeit(lambda: analytics_engine.export_parquet(session), repeat=3, warmup=0),
+        "today's events changed": timeit(
+            lambda: analytics_engine.export_parquet(session, dates=[today]), repeat=3, warmup=0
+        ),
+    })
+
+    def engine(name: str):
+        analytics_engine.ANALYTICS_ENGINE = name
+
+    def sqlite(fn):
+        return lambda: (engine("sqlite"), fn())
+
+    def duckdb(fn):
+        return lambda: (engine("duckdb"), fn())
+
+    days = args.days
+    category = lambda: get_category_breakdown(days=min(days, 730), db=session)  # noqa: E731
+    distribution = lambda: get_risk_distribution(days=days, db=session)  # noqa: E731
+    report(f"GET /analytics/category-breakdown (days={min(days, 730)})", {
+        "SQLite GROUP BY": timeit(sqlite(category), repeat=args.repeat),
+        "DuckDB over Parquet": timeit(duckdb(category), repeat=args.repeat),
+    })
+    report(f"GET /analytics/risk-distribution (days={days})", {
+        "SQLite + numpy": timeit(sqlite(distribution), repeat=args.repeat),
+        "DuckDB over Parquet": timeit(duckdb(distribution), repeat=args.repeat),
+    })
+
+    # Rolling center/dispersion only (the bulk update back to daily_metrics is the same for both)
+    window, min_periods = BASELINE_WINDOW_DAYS_SHORT, BASELINE_MIN_PERIODS
+    narrow = select(DailyMetric.id, DailyMetric.country, DailyMetric.category, DailyMetric.date, DailyMetric.event_count)
+    report("Day 2 rolling median + MAD over all daily_metrics", {
+        "pandas groupby().rolling()": timeit(
+            lambda: day2_baselines_risk._rolling_pandas(session, window, min_periods), repeat=1, warmup=0
+        ),
+        "DuckDB window functions": timeit(
+            lambda: analytics_engine.rolling_baseline(session.execute(narrow).all(), window, min_periods, "robust"),
+            repeat=1, warmup=0,
+        ),
+    })
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Map clusters: loading every event point in range (what the browser clustered
+from /events/combined) vs GET /map/clusters over the event_grid_daily rollups.
+
+    python -m backend.benchmarks.bench_clusters [--events 200000] [--days 14]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from backend.app.models import Event
+from backend.app.pipeline.event_grid import backfill_grid_cells, rebuild_event_grid
+from backend.app.routes.map import get_map_clusters
+from backend.benchmarks._seed import report, seed_events, temp_engine, timeit
+
+
+def load_points(session):
+    start = date.today() - timedelta(days=14)
+    return session.execute(
+        select(Event.lat, Event.lon, Event.severity_index).where(Event.date >= start)
+    ).all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    _, Session = temp_engine()
+    session = Session()
+    seed_events(session, n=args.events, days=args.days)
+    backfill_grid_cells(session)
+    rebuild = timeit(lambda: (rebuild_event_grid(session), session.commit()), repeat=1, warmup=0)
+
+    def clusters(**kw):
+        return get_map_clusters(date_param=None, db=session, **kw)
+
+    results = {
+        f"before: load {len(load_points(session))} points": timeit(lambda: load_points(session), repeat=args.repeat),
+        "after: clusters zoom 2, world": timeit(lambda: clusters(bbox="-180,-90,180,90", zoom=2), repeat=args.repeat),
+        "after: clusters zoom 6, Europe": timeit(lambda: clusters(bbox="-10,35,30,60", zoom=6), repeat=args.repeat),
+        "after: clusters zoom 10, city": timeit(lambda: clusters(bbox="2.2,48.8,2.5,48.95", zoom=10),
+                                               repeat=args.repeat),
+        "grid rebuild (all dates)": rebuild,
+    }
+    world = json.loads(clusters(bbox="-180,-90,180,90", zoom=2).body)
+    report(f"map points over {args.events} events ({len(world['clusters'])} cells at zoom 2)", results)
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+API reads during ingest: read latency and lock errors while a writer commits
+large event batches, with SQLite defaults (rollback journal) vs the WAL profile
+(separate writer + pooled read-only engine).
+
+    python -m backend.benchmarks.bench_concurrency [--seconds 10] [--readers 4] [--batch 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.db import DEFAULT_PROFILE, LEGACY_PROFILE, SQLiteProfile, create_sqlite_engines
+from backend.app.models import Base, Event
+from backend.benchmarks._seed import seed_events
+
+
+def _event_rows(start: int, n: int) -> List[Dict]:
+    now = datetime.now().replace(microsecond=0)
+    return [
+        {
+            "id": f"w{start + i:010d}",
+            "ts": now - timedelta(seconds=i),
+            "date": (now - timedelta(seconds=i)).date(),
+            "country": "US",
+            "category": "conflict",
+            "severity_index": float(i % 100),
+            "content": "x" * 500,
+        }
+        for i in range(n)
+    ]
+
+
+def run_profile(profile: SQLiteProfile, seconds: float, readers: int, batch: int) -> Dict[str, float]:
+    path = Path(tempfile.mkdtemp(prefix="atlas-bench-")) / "concurrency.db"
+    writer, reader = create_sqlite_engines(path, profile, read_pool_size=readers)
+    Base.metadata.create_all(writer)
+    with sessionmaker(bind=writer)() as s:
+        seed_events(s, n=50_000, days=30)
+
+    stop = threading.Event()
+    latencies: List[float] = []
+    errors = {"read": 0, "write": 0}
+    writes = {"batches": 0}
+    lock = threading.Lock()
+
+    def write_loop() -> None:
+        i = 0
+        while not stop.is_set():
+            try:
+                with writer.begin() as conn:
+                    conn.execute(insert(Event), _event_rows(i, batch))
+                    time.sleep(0.2)  # long pipeline transaction still open
+                writes["batches"] += 1
+            except OperationalError:
+                errors["write"] += 1
+            i += batch
+
+    def read_loop() -> None:
+        stmt = (
+            select(Event.id, Event.date, Event.country, Event.severity_index)
+            .order_by(Event.date.desc(), Event.ts.desc(), Event.id.desc())
+            .limit(200)
+        )
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                with reader.connect() as conn:
+                    conn.execute(stmt).all()
+                with lock:
+                    latencies.append((time.perf_counter() - t0) * 1000.0)
+            except OperationalError:
+                with lock:
+                    errors["read"] += 1
+
+    threads = [threading.Thread(target=write_loop)] + [threading.Thread(target=read_loop) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    writer.dispose()
+    reader.dispose()
+
+    latencies.sort()
+    return {
+        "reads": len(latencies),
+        "read_p50_ms": round(statistics.median(latencies), 2) if latencies else float("nan"),
+        "read_p95_ms": round(latencies[int(len(latencies) * 0.95)], 2) if latencies else float("nan"),
+        "read_max_ms": round(latencies[-1], 2) if latencies else float("nan"),
+        "read_errors": errors["read"],
+        "write_batches": writes["batches"],
+        "write_errors": errors["write"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"\nreads during ingest ({args.readers} readers, {args.batch}-row write batches, {args.seconds:.0f}s)")
+    for name, profile in (("before: rollback journal", LEGACY_PROFILE), ("after: WAL profile", DEFAULT_PROFILE)):
+        r = run_profile(profile, args.seconds, args.readers, args.batch)
+        print(
+            f"  {name.ljust(26)} reads {r['reads']:>7}  p50 {r['read_p50_ms']:>8.2f} ms  "
+            f"p95 {r['read_p95_ms']:>8.2f} ms  max {r['read_max_ms']:>8.2f} ms  "
+            f"read errors {r['read_errors']:>4}  write batches {r['write_batches']:>4}  write errors {r['write_errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
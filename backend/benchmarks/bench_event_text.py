@@ -0,0 +1,114 @@
+"""
+Narrow events table: the same events stored wide (title, content, source_url and
+entities_json inline, the layout before event_text) vs split into events +
+event_text, for aggregate_daily_metrics and the events scan behind the map
+(event_grid rebuild for /map/clusters; GET /map itself reads country_summary,
+which is built from daily_metrics). Each is timed warm (database in the OS page
+cache) and cold (the file evicted with posix_fadvise before each run, Linux
+only), where reading far fewer pages shows.
+
+    python -m backend.benchmarks.bench_event_text [--events 300000] [--days 90]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+from typing import Callable, Dict, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.models import EVENT_TEXT_COLUMNS, Base, EventText
+from backend.app.pipeline.aggregate_daily import aggregate_daily_metrics
+from backend.app.pipeline.event_grid import backfill_grid_cells, rebuild_event_grid
+from backend.benchmarks._seed import report, seed_events, temp_engine, timeit
+
+
+def wide_copy(split_engine) -> Tuple[Engine, sessionmaker]:
+    """A copy of the split database with the text columns back inline in events."""
+    split_path = split_engine.url.database
+    path = split_path.replace("bench.db", "wide.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[t for t in Base.metadata.sorted_tables if t is not EventText.__table__])
+
+    conn = sqlite3.connect(path)
+    for c in EVENT_TEXT_COLUMNS:
+        conn.execute(f"ALTER TABLE events ADD COLUMN {c} VARCHAR")
+    conn.execute("ATTACH DATABASE ? AS split", (split_path,))
+    columns = [r[1] for r in conn.execute("PRAGMA split.table_info(events)")]
+    conn.execute(
+        f"INSERT INTO events ({', '.join(columns + list(EVENT_TEXT_COLUMNS))}) "
+        f"SELECT {', '.join('e.' + c for c in columns)}, {', '.join('t.' + c for c in EVENT_TEXT_COLUMNS)} "
+        "FROM split.events e LEFT JOIN split.event_text t ON t.event_id = e.id ORDER BY e.rowid"
+    )
+    conn.commit()
+    conn.execute("DETACH DATABASE split")
+    conn.close()
+    return engine, sessionmaker(bind=engine, autoflush=False)
+
+
+def table_mb(session, name: str) -> float:
+    """Size of a table's b-tree (dbstat needs SQLITE_ENABLE_DBSTAT_VTAB; 0 when unavailable)."""
+    try:
+        size = session.connection().exec_driver_sql(
+            "SELECT sum(pgsize) FROM dbstat WHERE name = ?", (name,)
+        ).scalar()
+    except Exception:
+        return 0.0
+    return round((size or 0) / 1e6, 1)
+
+
+def evict(engine) -> None:
+    """Drop the database file from the OS page cache and close pooled connections (SQLite's own cache)."""
+    engine.dispose()
+    fd = os.open(engine.url.database, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def compare(title: str, layouts: Dict[str, Tuple[Engine, sessionmaker]], fn: Callable, repeat: int) -> None:
+    results = {}
+    for name, (engine, Session) in layouts.items():
+        with Session() as session:
+            results[f"{name}, warm"] = timeit(lambda: (fn(session), session.commit()), repeat=repeat, warmup=1)
+        if hasattr(os, "posix_fadvise"):
+            def cold():
+                evict(engine)
+                with Session() as session:
+                    fn(session)
+                    session.commit()
+            results[f"{name}, cold"] = timeit(cold, repeat=repeat, warmup=0)
+    report(title, results)
+    names = list(layouts)
+    for temp in ("warm", "cold"):
+        before, after = results.get(f"{names[0]}, {temp}"), results.get(f"{names[1]}, {temp}")
+        if before and after:
+            print(f"  speedup ({temp}): {before['median_ms'] / max(after['median_ms'], 1e-6):.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=300_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine, Session = temp_engine()
+    with Session() as session:
+        seed_events(session, n=args.events, days=args.days)
+        backfill_grid_cells(session)
+    layouts = {"before: wide events": wide_copy(engine), "after: events + event_text": (engine, Session)}
+    with layouts["before: wide events"][1]() as wide, Session() as split:
+        print(f"seeded {args.events} events; events table: wide {table_mb(wide, 'events')} MB, "
+              f"narrow {table_mb(split, 'events')} MB (+ event_text {table_mb(split, 'event_text')} MB)")
+
+    compare(f"aggregate_daily_metrics over {args.events} events", layouts, aggregate_daily_metrics, args.repeat)
+    compare("map: event_grid rebuild (all dates, feeds /map/clusters)", layouts, rebuild_event_grid, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
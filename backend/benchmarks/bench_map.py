@@ -0,0 +1,41 @@
+"""
+GET /map latency: on-the-fly aggregation over daily_metrics vs the country_summary read.
+
+    python -m backend.benchmarks.bench_map [--days 60] [--countries 180]
+"""
+from __future__ import annotations
+
+import argparse
+
+from backend.app.pipeline.country_summary import compute_country_rows, refresh_country_summary
+from backend.app.routes.map import get_map
+from backend.benchmarks._seed import report, seed_daily_metrics, temp_engine, timeit
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--countries", type=int, default=180)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    _, Session = temp_engine()
+    session = Session()
+    n = seed_daily_metrics(session, days=args.days, countries=args.countries)
+    print(f"seeded {n} daily_metrics rows")
+
+    live = timeit(lambda: compute_country_rows(session, include_all=True), repeat=args.repeat)
+    refresh = timeit(lambda: (refresh_country_summary(session), session.commit()), repeat=5, warmup=0)
+    summary = timeit(lambda: get_map(date_param=None, include_all=True, db=session), repeat=args.repeat)
+
+    report("GET /map (include_all=true)", {
+        "before: live aggregation": live,
+        "after: country_summary read": summary,
+        "refresh (once per pipeline run)": refresh,
+    })
+    print(f"\n  speedup: {live['median_ms'] / max(summary['median_ms'], 1e-6):.1f}x")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Long-range trend reads: re-grouping daily_metrics per request vs the weekly
+and monthly metric_rollups, for /analytics/decomposition and /analytics/sparklines.
+
+    python -m backend.benchmarks.bench_rollups [--days 365] [--countries 120]
+"""
+from __future__ import annotations
+
+import argparse
+
+from backend.app.country_centroids import COUNTRY_CENTROIDS
+from backend.app.pipeline.rollups import refresh_metric_rollups
+from backend.app.routes.analytics import get_decomposition, get_sparklines
+from backend.benchmarks._seed import report, seed_daily_metrics, temp_engine, timeit
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--countries", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    _, Session = temp_engine()
+    session = Session()
+    n = seed_daily_metrics(session, days=args.days, countries=args.countries)
+    print(f"seeded {n} daily_metrics rows")
+
+    full = timeit(lambda: (refresh_metric_rollups(session), session.commit()), repeat=1, warmup=0)
+    again = timeit(lambda: (refresh_metric_rollups(session), session.commit()), repeat=3, warmup=0)
+    report("metric_rollups refresh (once per pipeline run)", {
+        "first build": full,
+        "no changes (diff only)": again,
+    })
+
+    country = next(iter(COUNTRY_CENTROIDS))
+    countries = ",".join(list(COUNTRY_CENTROIDS)[:50])
+    for days in (180, args.days):
+        report(f"GET /analytics/decomposition (days={days})", {
+            "before: daily rows": timeit(
+                lambda: get_decomposition(country=country, days=days, granularity="day", db=session), repeat=args.repeat
+            ),
+            "after: weekly rollups": timeit(
+                lambda: get_decomposition(country=country, days=days, granularity="week", db=session), repeat=args.repeat
+            ),
+        })
+        report(f"GET /analytics/sparklines (50 countries, days={days})", {
+            "before: daily rows": timeit(
+                lambda: get_sparklines(countries=countries, days=days, granularity="day", db=session), repeat=args.repeat
+            ),
+            "after: weekly rollups": timeit(
+                lambda: get_sparklines(countries=countries, days=days, granularity="week", db=session), repeat=args.repeat
+            ),
+            "after: monthly rollups": timeit(
+                lambda: get_sparklines(countries=countries, days=days, granularity="month", db=session), repeat=args.repeat
+            ),
+        })
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
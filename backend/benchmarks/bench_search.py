@@ -0,0 +1,106 @@
+"""
+Event text search: LIKE '%term%' scans over events.title/content vs the FTS5
+index (bm25 ranking + snippets, as served by GET /events/search).
+
+    python -m backend.benchmarks.bench_search [--events 200000] [--repeat 10]
+
+The corpus draws words from a Zipf-distributed vocabulary, so queries cover a
+rare term, a common term, a phrase, a prefix and a filtered query. Indexing
+runs through the same triggers the ingest upserts use. bm25 scores every
+match, so latency follows the match count: the near-stopword case (a word in
+almost every event) is the worst case, and sort=recent is the way out of it.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import time
+from typing import List, Tuple
+
+from sqlalchemy import func, or_, select, text
+
+from backend.app.models import Event, EventText
+from backend.app.search import optimize_search_index, search_events, to_match_query
+from backend.benchmarks._seed import report, seed_events, temp_engine, timeit
+
+# Query words pinned to a Zipf rank (1 = most frequent); the rest of the vocabulary is synthetic
+_KNOWN_RANKS = {
+    "report": 3, "strike": 150, "drone": 200, "protest": 300, "refugees": 500, "refuge": 900, "militia": 15_000,
+}
+
+
+def _vocabulary(size: int, rng: random.Random) -> Tuple[List[str], List[float]]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = []
+    while len(words) < size - len(_KNOWN_RANKS):
+        words.append("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    for word, rank in sorted(_KNOWN_RANKS.items(), key=lambda kv: kv[1]):
+        words.insert(rank - 1, word)
+    cum_weights = list(itertools.accumulate(1.0 / rank for rank in range(1, size + 1)))  # Zipf, s=1
+    return words, cum_weights
+
+
+def make_text_fn(vocab_size: int = 20_000, seed: int = 1):
+    words, cum_weights = _vocabulary(vocab_size, random.Random(seed))
+
+    def text_fn(rng: random.Random) -> Tuple[str, str]:
+        title = " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(5, 12))).capitalize()
+        content = " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(40, 150)))
+        return title, content
+
+    return text_fn
+
+
+def like_scan(session, term: str, limit: int = 20):
+    pattern = f"%{term}%"
+    return session.execute(
+        select(Event.id, EventText.title)
+        .join(EventText, EventText.event_id == Event.id)
+        .where(or_(EventText.title.like(pattern), EventText.content.like(pattern)))
+        .order_by(Event.date.desc())
+        .limit(limit)
+    ).all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    _, Session = temp_engine()
+    session = Session()
+    t0 = time.perf_counter()
+    seed_events(session, n=args.events, days=args.days, text_fn=make_text_fn())
+    optimize_search_index(session)
+    session.commit()
+    print(f"\nseeded + indexed {args.events} events in {time.perf_counter() - t0:.1f}s")
+
+    country = session.execute(select(Event.country).group_by(Event.country).order_by(func.count().desc())).first()[0]
+    queries = {
+        "rare term": ("militia", {}),
+        "common term": ("strike", {}),
+        "near-stopword": ("report", {}),
+        "near-stopword, sort=recent": ("report", {"sort": "recent"}),
+        "phrase": ('"drone strike"', {}),
+        "prefix": ("refug*", {}),
+        f"term + country={country}": ("protest", {"country": country}),
+    }
+    results = {}
+    for name, (q, filters) in queries.items():
+        matches = session.execute(
+            text("SELECT count(*) FROM events_fts WHERE events_fts MATCH :m"), {"m": to_match_query(q)}
+        ).scalar()
+        name = f"{name} ({matches} matches)"
+        results[f"fts  {name}"] = timeit(lambda: search_events(session, q, limit=20, **filters), repeat=args.repeat)
+    # LIKE cannot rank or stem; one scan per term is the best case for the old approach
+    for name, term in (("rare term", "militia"), ("common term", "strike")):
+        results[f"like {name}"] = timeit(lambda: like_scan(session, term), repeat=max(3, args.repeat // 3), warmup=1)
+    report(f"search over {args.events} events (top 20)", results)
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
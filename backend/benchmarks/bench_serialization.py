@@ -0,0 +1,166 @@
+"""
+Serialization cost of the large list endpoints, per 1k rows: the previous path
+(ORM objects -> Pydantic model per row -> FastAPI response_model validation ->
+json.dumps) vs the fast path (Core rows -> dicts -> orjson, raw entities_json).
+
+    python -m backend.benchmarks.bench_serialization [--events 20000] [--days 30]
+
+Both sides include the query; the previous path is reproduced here since the
+routes no longer build models.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from backend.app.country_centroids import get_centroid
+from backend.app.fast_json import HAS_ORJSON, HAS_RAW_FRAGMENTS
+from backend.app.models import CountrySummary, DailyMetric, Event, EventText
+from backend.app.pipeline.country_summary import refresh_country_summary
+from backend.app.pipeline.risk_tiers import load_latest_tier_config, threat_rank_expr, tier_for
+from backend.app.routes.combined import get_combined_events
+from backend.app.routes.map import get_map
+from backend.app.routes.metrics import list_metrics
+from backend.app.schemas import (
+    CombinedEventsResponse,
+    MapCountryResponse,
+    MapEventLocation,
+    MetricResponse,
+    ValyuEventResponse,
+)
+from backend.benchmarks._seed import seed_daily_metrics, seed_events, temp_engine, timeit
+
+
+def _fastapi_encode(adapter: TypeAdapter, value) -> bytes:
+    """What FastAPI does with a response_model: validate, dump to JSON-able python, json.dumps."""
+    validated = adapter.validate_python(value, from_attributes=True)
+    return json.dumps(adapter.dump_python(validated, mode="json"), ensure_ascii=False).encode("utf-8")
+
+
+def _legacy_event(e: Event, t: EventText, tiers) -> ValyuEventResponse:
+    lat, lon = e.lat, e.lon
+    if (lat is None or lon is None) and e.country:
+        centroid = get_centroid(e.country)
+        if centroid:
+            lat, lon = centroid[0], centroid[1]
+    content = t.content or ""
+    entities = None
+    if t.entities_json:
+        try:
+            entities = json.loads(t.entities_json)
+        except (json.JSONDecodeError, TypeError):
+            pass
+    return ValyuEventResponse(
+        id=str(e.id),
+        source=e.source or "valyu",
+        title=t.title or f"{e.category or 'Event'} in {e.country or 'Unknown'}",
+        summary=(content[:500] + "…") if len(content) > 500 else content,
+        category=e.category or "event",
+        threatLevel=tier_for(e.severity_index, tiers, fallback=e.threat_level) or "medium",
+        location=MapEventLocation(
+            latitude=lat if lat is not None else 0.0,
+            longitude=lon if lon is not None else 0.0,
+            placeName=e.admin1 or e.country,
+            country=e.country,
+        ),
+        timestamp=e.ts.isoformat() if isinstance(e.ts, datetime) else str(e.ts),
+        sourceUrl=t.source_url,
+        severity_index=e.severity_index,
+        risk_score=e.severity_index,
+        category_confidence=e.category_confidence,
+        sentiment_polarity=e.sentiment_score,
+        entities=entities,
+    )
+
+
+def legacy_combined(session, limit: int) -> bytes:
+    tiers = load_latest_tier_config(session)
+    rank = threat_rank_expr(Event.severity_index, Event.threat_level, tiers)
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=14)
+    rows = session.execute(
+        select(Event, EventText, rank).join(EventText, EventText.event_id == Event.id).where(Event.date >= cutoff)
+        .order_by(rank, Event.date.desc(), Event.ts.desc(), Event.id.desc()).limit(limit + 1)
+    ).all()
+    events = [_legacy_event(e, t, tiers) for e, t, _ in rows[:limit]]
+    counts: Dict[str, int] = {}
+    for e in events:
+        counts[e.source] = counts.get(e.source, 0) + 1
+    body = CombinedEventsResponse(events=events, count=len(events), sources=counts)
+    return _fastapi_encode(TypeAdapter(CombinedEventsResponse), body)
+
+
+def legacy_metrics(session, limit: int) -> bytes:
+    rows = session.execute(
+        select(DailyMetric).order_by(DailyMetric.date.desc(), DailyMetric.id.desc()).limit(limit + 1)
+    ).scalars().all()
+    models = [MetricResponse.model_validate(m, from_attributes=True) for m in rows[:limit]]
+    return _fastapi_encode(TypeAdapter(List[MetricResponse]), models)
+
+
+def legacy_map(session) -> bytes:
+    rows = session.execute(
+        select(CountrySummary).order_by(CountrySummary.has_data.desc(), CountrySummary.country)
+    ).scalars().all()
+    models = [MapCountryResponse.model_validate(s, from_attributes=True) for s in rows]
+    return _fastapi_encode(TypeAdapter(List[MapCountryResponse]), models)
+
+
+def _per_1k(fn: Callable[[], object], rows: int, repeat: int) -> Dict[str, float]:
+    r = timeit(fn, repeat=repeat)
+    scale = 1000.0 / max(rows, 1)
+    return {k: round(v * scale, 3) for k, v in r.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    _, Session = temp_engine()
+    session = Session()
+    seed_events(session, n=args.events, days=args.days)
+    seed_daily_metrics(session, days=args.days, countries=60)
+    refresh_country_summary(session)
+    session.commit()
+
+    n_map = len(session.execute(select(CountrySummary.country)).all())
+    cases = {
+        "/events/combined (2000 rows)": (
+            2000,
+            lambda: legacy_combined(session, 2000),
+            lambda: get_combined_events(date_param=None, limit=2000, cursor=None, stream=False, db=session).body,
+        ),
+        "/metrics (10000 rows)": (
+            10_000,
+            lambda: legacy_metrics(session, 10_000),
+            lambda: list_metrics(country=None, start=None, end=None, category=None, limit=10_000,
+                                 cursor=None, stream=False, db=session).body,
+        ),
+        f"/map ({n_map} rows)": (
+            n_map,
+            lambda: legacy_map(session),
+            lambda: get_map(date_param=None, include_all=True, db=session).body,
+        ),
+    }
+
+    print(f"\norjson: {'yes' if HAS_ORJSON else 'no'}   raw fragments: {'yes' if HAS_RAW_FRAGMENTS else 'no (parsed)'}")
+    print("time per 1k rows (query + serialization)")
+    for name, (rows, before, after) in cases.items():
+        b = _per_1k(before, rows, args.repeat)
+        a = _per_1k(after, rows, args.repeat)
+        print(
+            f"  {name.ljust(30)} before {b['median_ms']:>8.2f} ms   after {a['median_ms']:>8.2f} ms   "
+            f"speedup {b['median_ms'] / max(a['median_ms'], 1e-6):.1f}x"
+        )
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+GET /analytics/sparklines latency: one GROUP BY per country vs a single grouped
+country IN (...) query, at 10 / 50 / 200 requested countries.
+
+    python -m backend.benchmarks.bench_sparklines [--days 90] [--sizes 10,50,200]
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, timedelta
+from typing import List
+
+from sqlalchemy import func, select
+
+from backend.app.country_centroids import COUNTRY_CENTROIDS
+from backend.app.models import DailyMetric
+from backend.app.routes.analytics import get_sparklines
+from backend.benchmarks._seed import report, seed_daily_metrics, temp_engine, timeit
+
+
+def per_country_loop(session, country_list: List[str], days: int = 14) -> list:
+    """The previous implementation: one query per country."""
+    cutoff = date.today() - timedelta(days=days)
+    out = []
+    for country in country_list:
+        rows = session.execute(
+            select(DailyMetric.date, func.max(DailyMetric.severity_index).label("severity"))
+            .where(DailyMetric.country == country)
+            .where(DailyMetric.date >= cutoff)
+            .group_by(DailyMetric.date)
+            .order_by(DailyMetric.date.asc())
+        ).all()
+        out.append((country, rows))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--sizes", default="10,50,200")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    _, Session = temp_engine()
+    session = Session()
+    n = seed_daily_metrics(session, days=args.days, countries=len(COUNTRY_CENTROIDS))
+    print(f"seeded {n} daily_metrics rows")
+
+    codes = list(COUNTRY_CENTROIDS)
+    # More sizes than we have centroids: pad with unused codes (no rows, still one lookup each)
+    letters = [chr(c) for c in range(65, 91)]
+    codes += [a + b for a in letters for b in letters if a + b not in COUNTRY_CENTROIDS][: max(0, 200 - len(codes))]
+
+    for size in [int(s) for s in args.sizes.split(",")]:
+        country_list = codes[:size]
+        countries = ",".join(country_list)
+        report(f"GET /analytics/sparklines ({size} countries, days=14)", {
+            "before: query per country": timeit(lambda: per_country_loop(session, country_list), repeat=args.repeat),
+            "after: single grouped query": timeit(
+                lambda: get_sparklines(countries=countries, days=14, granularity="day", db=session), repeat=args.repeat
+            ),
+        })
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Query-plan check: run EXPLAIN QUERY PLAN for every SELECT issued by the read
+routes (and the hot pipeline lookups) against a seeded SQLite DB, and flag full
+table scans. Exits 1 when a scan of a large table is found, so it can run in CI.
+
+    python -m backend.benchmarks.explain_routes [--events 20000] [--verbose]
+
+Statements are captured from the engine while each route runs through a test
+client, so the plans checked are exactly the SQL the routes send.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from backend.app import pagination
+from backend.app.db import get_db
+from backend.app.models import Base, DailyMetric
+from backend.app.pipeline.country_summary import refresh_country_summary
+from backend.app.pipeline.day2_baselines_risk import _get_evidence_event_ids
+from backend.app.pipeline.country_network import rebuild_country_edges
+from backend.app.pipeline.entity_index import backfill_event_entities
+from backend.app.pipeline.event_grid import backfill_grid_cells, rebuild_event_grid
+from backend.app.pipeline.rollups import refresh_metric_rollups
+from backend.app.routes import (
+    analytics,
+    brief,
+    combined,
+    countries,
+    country_insights,
+    entities,
+    events,
+    history,
+    map as map_router,
+    metrics,
+    network,
+    spikes,
+)
+from backend.benchmarks._seed import CATEGORIES, seed_daily_metrics, seed_events, temp_engine
+
+# Small lookup tables that are read whole on purpose
+SMALL_TABLES = {"country_summary", "risk_tier_config", "data_version", "pipeline_checkpoints"}
+
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+
+@dataclass
+class Probe:
+    name: str
+    statements: List[Tuple[str, Sequence]] = field(default_factory=list)
+
+
+def _routes_app() -> FastAPI:
+    app = FastAPI()
+    for module in (
+        analytics, brief, combined, countries, country_insights, entities, events, history, map_router, metrics,
+        network, spikes,
+    ):
+        app.include_router(module.router)
+    return app
+
+
+def route_urls(country: str, day: date) -> List[str]:
+    d = day.isoformat()
+    start = (day - timedelta(days=7)).isoformat()
+    return [
+        "/map",
+        f"/map?date={d}",
+        "/map/clusters?zoom=2",
+        f"/map/clusters?bbox=20,40,40,55&zoom=6&date={d}",
+        "/map/clusters?bbox=170,-50,-170,-30&zoom=4",
+        "/brief",
+        f"/brief?date={d}",
+        "/countries",
+        f"/events?country={country}&start={start}&end={d}",
+        "/events?limit=50",
+        "/events/combined?limit=100",
+        f"/events/combined?date={d}",
+        f"/metrics?country={country}&start={start}",
+        "/metrics?limit=100",
+        f"/spikes?country={country}",
+        "/history/risk",
+        f"/history/risk?country={country}",
+        f"/history/risk?country={country}&days=365",
+        "/analytics/risk-distribution",
+        "/analytics/risk-distribution?days=365",
+        "/analytics/risk-tiers",
+        "/analytics/category-breakdown",
+        f"/analytics/sparklines?countries={country},US,FR",
+        f"/analytics/decomposition?country={country}",
+        f"/analytics/sparklines?countries={country},US,FR&days=365",
+        f"/analytics/decomposition?country={country}&days=180",
+        "/analytics/top-movers",
+        f"/countries/{country}/insights",
+        f"/entities/{country}/events?type=country&start={start}",
+        "/entities/hezbollah/events",
+        f"/events/search?q=synthetic&country={country}",
+        f"/network?end={d}",
+        f"/network?end={d}&country={country}",
+    ]
+
+
+def pipeline_probes(country: str, day: date) -> Dict[str, Callable[[Session], object]]:
+    """Hot pipeline lookups worth keeping index-backed."""
+    return {
+        "day2 spike evidence": lambda s: _get_evidence_event_ids(s, day, country, CATEGORIES[0], 5),
+        "day2 rolling read": lambda s: s.execute(
+            select(DailyMetric).order_by(DailyMetric.country, DailyMetric.category, DailyMetric.date)
+        ).scalars().first(),
+    }
+
+
+def explain(session: Session, statement: str, params: Sequence) -> List[str]:
+    raw = session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, tuple(params or ()))
+    return [row[3] for row in raw]
+
+
+def full_scans(plan: List[str], tables: set) -> List[str]:
+    out = []
+    for detail in plan:
+        m = _SCAN_RE.match(detail.strip())
+        if m and m.group(1) in tables and m.group(1) not in SMALL_TABLES:
+            out.append(detail.strip())
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--countries", type=int, default=60)
+    parser.add_argument("--verbose", action="store_true", help="Print every plan, not only flagged ones.")
+    args = parser.parse_args()
+
+    engine, SessionLocal = temp_engine()
+    session = SessionLocal()
+    seed_daily_metrics(session, days=args.days, countries=args.countries)
+    seed_events(session, n=args.events, days=args.days)
+    backfill_event_entities(session)
+    rebuild_country_edges(session)
+    backfill_grid_cells(session)
+    rebuild_event_grid(session)
+    refresh_country_summary(session)
+    refresh_metric_rollups(session)
+    session.commit()
+
+    country = session.execute(select(DailyMetric.country).limit(1)).scalar()
+    day = session.execute(select(DailyMetric.date).order_by(DailyMetric.date.desc()).limit(1)).scalar()
+
+    probes: List[Probe] = []
+    current: List[Probe] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if current and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            current[0].statements.append((statement, parameters))
+
+    app = _routes_app()
+
+    def override_db():
+        s = SessionLocal()
+        try:
+            yield s
+        finally:
+            s.close()
+
+    app.dependency_overrides[get_db] = override_db
+    pagination.ReadSessionLocal = SessionLocal
+    client = TestClient(app)
+
+    for url in route_urls(country, day):
+        probe = Probe(f"GET {url}")
+        current[:] = [probe]
+        r = client.get(url)
+        if r.status_code != 200:
+            print(f"warning: {url} returned {r.status_code}", file=sys.stderr)
+        probes.append(probe)
+    for name, fn in pipeline_probes(country, day).items():
+        probe = Probe(name)
+        current[:] = [probe]
+        with SessionLocal() as s:
+            fn(s)
+        probes.append(probe)
+    current.clear()
+
+    tables = set(Base.metadata.tables)
+    flagged = 0
+    for probe in probes:
+        seen = set()
+        for statement, params in probe.statements:
+            if statement in seen:
+                continue
+            seen.add(statement)
+            plan = explain(session, statement, params)
+            scans = full_scans(plan, tables)
+            if scans or args.verbose:
+                print(f"\n{'FULL SCAN' if scans else 'ok'}  {probe.name}")
+                print("  " + " ".join(statement.split())[:300])
+                for detail in plan:
+                    print(f"    {detail}")
+            flagged += bool(scans)
+
+    print(f"\n{sum(len(p.statements) for p in probes)} statements from {len(probes)} probes; {flagged} with full scans")
+    session.close()
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,11 @@ _root = Path(__file__).resolve().parents[1]
 if str(_root) not in sys.path:
     sys.path.insert(0, str(_root))
 
-from backend.app.db import engine
+from backend.app.db import dialect_name, engine
+
+if dialect_name(engine) != "sqlite":
+    print(f"DATABASE_URL is {dialect_name(engine)}; tables and indexes are created by the app on startup, nothing to migrate")
+    sys.exit(0)
 
 conn = engine.raw_connection()
 cur = conn.cursor()
@@ -30,6 +34,44 @@ if cur.fetchone():
         else:
             raise
 
+# Events: severity algorithm version (re-enrich skips rows already at the current version)
+cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='events'")
+if cur.fetchone():
+    try:
+        cur.execute("ALTER TABLE events ADD COLUMN severity_version VARCHAR(16)")
+        print("Added events.severity_version")
+    except sqlite3.OperationalError as e:
+        if "duplicate column" in str(e).lower():
+            print("Column events.severity_version already exists, skipping")
+        else:
+            raise
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_events_severity_version ON events (severity_version)")
+
+# Events: GDELT actor countries (country network edges)
+cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='events'")
+if cur.fetchone():
+    for col_name in ("actor1_country", "actor2_country"):
+        try:
+            cur.execute(f"ALTER TABLE events ADD COLUMN {col_name} VARCHAR(2)")
+            print(f"Added events.{col_name}")
+        except sqlite3.OperationalError as e:
+            if "duplicate column" in str(e).lower():
+                print(f"Column events.{col_name} already exists, skipping")
+            else:
+                raise
+
+# Events: spatial grid cell (map clusters)
+cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='events'")
+if cur.fetchone():
+    try:
+        cur.execute("ALTER TABLE events ADD COLUMN grid_cell VARCHAR(16)")
+        print("Added events.grid_cell")
+    except sqlite3.OperationalError as e:
+        if "duplicate column" in str(e).lower():
+            print("Column events.grid_cell already exists, skipping")
+        else:
+            raise
+
 # Columns to add to daily_metrics (ignore if already present)
 daily_columns = [
     ("rolling_mean", "REAL"),
@@ -95,6 +137,16 @@ if cur.fetchone():
                 print(f"Column spikes.{col_name} already exists, skipping")
             else:
                 raise
+    # Spikes created by migration 001 have no unique key; upsert_spikes needs one for ON CONFLICT.
+    # Keep the newest row per key (the application used to replace in place), then add the index.
+    spike_key = "date, country, category, baseline_method, baseline_window_days, pipeline_version"
+    cur.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='spikes'")
+    if "uq_spikes_baseline_version" not in (cur.fetchone()[0] or ""):
+        cur.execute(f"DELETE FROM spikes WHERE id NOT IN (SELECT max(id) FROM spikes GROUP BY {spike_key})")
+        if cur.rowcount:
+            print(f"Removed {cur.rowcount} duplicate spikes rows")
+        cur.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS uq_spikes_baseline_version ON spikes ({spike_key})")
+        print("Index uq_spikes_baseline_version exists or was created.")
 
 # Step 1: risk_snapshots for history (live ingest)
 cur.execute(
@@ -115,6 +167,119 @@ cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='risk_sn
 if cur.fetchone():
     print("Table risk_snapshots exists or was created.")
 
+# Versioned risk tier config (one version per pipeline fit)
+cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='risk_tier_config'")
+if cur.fetchone():
+    try:
+        cur.execute("ALTER TABLE risk_tier_config ADD COLUMN version INTEGER")
+        print("Added risk_tier_config.version")
+    except sqlite3.OperationalError as e:
+        if "duplicate column" in str(e).lower():
+            print("Column risk_tier_config.version already exists, skipping")
+        else:
+            raise
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_risk_tier_config_version ON risk_tier_config (version)")
+
+# Composite / covering indexes matched to hot query paths (see benchmarks/explain_routes.py)
+composite_indexes = [
+    ("daily_metrics", "ix_daily_metrics_country_date", "country, date"),
+    ("daily_metrics", "ix_daily_metrics_country_category_date", "country, category, date"),
+    ("events", "ix_events_country_date", "country, date"),
+    ("events", "ix_events_date_country_category_tone", "date, country, category, avg_tone, id"),
+    ("events", "ix_events_date_ts_id", "date, ts, id"),
+    ("events", "ix_events_grid_cell_date", "grid_cell, date"),
+]
+for table, name, columns in composite_indexes:
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    if cur.fetchone():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+        print(f"Index {name} exists or was created.")
+
+# Events: title/content/source_url/entities_json move to the event_text side table
+# so events pages hold only the narrow columns aggregation and the map scan
+text_columns = ("title", "content", "source_url", "entities_json")
+cur.execute("SELECT name FROM pragma_table_info('events') WHERE name = 'content'")
+has_text_columns = cur.fetchone() is not None
+if has_text_columns:
+    # Before SQLite 3.35 a split leaves the columns in place, emptied: only text still there needs moving
+    cur.execute(f"SELECT 1 FROM events WHERE {' OR '.join(f'{c} IS NOT NULL' for c in text_columns)} LIMIT 1")
+    has_text_columns = cur.fetchone() is not None
+if has_text_columns:
+    # The search index and its triggers follow the text; they are rebuilt on event_text below
+    for trigger in ("events_fts_ai", "events_fts_ad", "events_fts_au",
+                    "event_text_fts_ai", "event_text_fts_ad", "event_text_fts_au"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cur.execute("DROP TABLE IF EXISTS events_fts")
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS event_text (
+            event_id VARCHAR NOT NULL,
+            title VARCHAR,
+            content VARCHAR,
+            source_url VARCHAR,
+            entities_json VARCHAR,
+            PRIMARY KEY (event_id)
+        )
+        """
+    )
+    # Rows written by the app after the upgrade (already split) win
+    cur.execute(
+        f"INSERT OR IGNORE INTO event_text (event_id, {', '.join(text_columns)}) "
+        f"SELECT id, {', '.join(text_columns)} FROM events ORDER BY rowid"
+    )
+    print(f"Copied text of {cur.rowcount} events to event_text")
+    if sqlite3.sqlite_version_info >= (3, 35, 0):
+        for col_name in text_columns:
+            cur.execute(f"ALTER TABLE events DROP COLUMN {col_name}")
+        print("Dropped events." + ", events.".join(text_columns))
+    else:
+        # No DROP COLUMN before SQLite 3.35: empty the columns so VACUUM still frees their pages
+        cur.execute(f"UPDATE events SET {', '.join(f'{c} = NULL' for c in text_columns)}")
+        print(f"SQLite {sqlite3.sqlite_version} cannot drop columns; cleared events.{', events.'.join(text_columns)}")
+    conn.commit()
+    print("Vacuuming (rewrites events without the text pages)...")
+    cur.execute("VACUUM")
+else:
+    print("events holds no title/content text (already split), skipping")
+
 conn.commit()
 conn.close()
+
+# event_entities: normalized index of event_text.entities_json (filled at ingest; back-fill existing events once)
+from sqlalchemy import func, select
+
+from backend.app.db import SessionLocal
+from backend.app.models import CountryEdgeDaily, EventEntity, EventGridDaily, EventText, MetricRollup, PipelineCheckpoint
+from backend.app.pipeline.country_network import rebuild_country_edges
+from backend.app.pipeline.entity_index import backfill_event_entities
+from backend.app.pipeline.event_grid import backfill_grid_cells, rebuild_event_grid
+from backend.app.pipeline.rollups import refresh_metric_rollups
+from backend.app.search import ensure_search_index
+
+EventText.__table__.create(bind=engine, checkfirst=True)
+# Checkpoints first: the rebuilds below skip dates before the archive horizon stored there
+PipelineCheckpoint.__table__.create(bind=engine, checkfirst=True)
+if ensure_search_index(engine):
+    print("Rebuilt the events search index on event_text")
+EventEntity.__table__.create(bind=engine, checkfirst=True)
+CountryEdgeDaily.__table__.create(bind=engine, checkfirst=True)
+EventGridDaily.__table__.create(bind=engine, checkfirst=True)
+MetricRollup.__table__.create(bind=engine, checkfirst=True)
+with SessionLocal() as session:
+    if not session.execute(select(func.count()).select_from(EventEntity)).scalar():
+        print(f"Back-filled event_entities: {backfill_event_entities(session)} rows")
+    # Country network: Valyu co-mentions for existing events (GDELT actor pairs fill in on the next ingest)
+    if not session.execute(select(func.count()).select_from(CountryEdgeDaily)).scalar():
+        print(f"Built country_edges_daily: {rebuild_country_edges(session)} rows")
+        session.commit()
+    # Map clusters: grid cells for existing events, then the per-day rollups
+    if not session.execute(select(func.count()).select_from(EventGridDaily)).scalar():
+        print(f"Set events.grid_cell: {backfill_grid_cells(session)} events")
+        print(f"Built event_grid_daily: {rebuild_event_grid(session)} rows")
+        session.commit()
+    # Weekly/monthly trend rollups of daily_metrics
+    if not session.execute(select(func.count()).select_from(MetricRollup)).scalar():
+        print(f"Built metric_rollups: {refresh_metric_rollups(session)} rows")
+        session.commit()
+
 print("Migration done.")
@@ -0,0 +1,130 @@
+"""
+DuckDB analytics engine: Day 2 rolling windows match pandas, and /analytics reads over
+the Parquet export (including the retention archive) match the SQLite path.
+Run from project root: python -m pytest backend/tests/test_analytics_engine.py -v
+"""
+import random
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import analytics_engine, archive
+from backend.app.models import DailyMetric, Event
+from backend.app.pipeline.day2_baselines_risk import compute_rolling_and_zscore, compute_severity_baseline
+from backend.app.pipeline.retention import archive_events
+from backend.app.routes.analytics import get_category_breakdown, get_risk_distribution
+from backend.tests._db import make_engine
+
+_BASELINE_COLUMNS = ("rolling_center", "rolling_dispersion", "baseline_quality", "z_score",
+                     "severity_rolling_center", "severity_rolling_dispersion", "z_severity")
+
+
+@unittest.skipUnless(analytics_engine.HAS_DUCKDB and archive.HAS_PYARROW, "duckdb/pyarrow not installed")
+class TestAnalyticsEngine(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        for patcher in (
+            mock.patch.object(archive, "ARCHIVE_DIR", root / "events"),
+            mock.patch.object(analytics_engine, "ANALYTICS_DIR", root / "analytics"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        engine = make_engine()
+        self.session = sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+
+        rng = random.Random(7)
+        today = date.today()
+        for d in range(60):
+            day = today - timedelta(days=d)
+            for country in ("US", "FR"):
+                for category in ("Armed Conflict", "Civil Unrest"):
+                    if rng.random() < 0.15:
+                        continue  # gaps, like real data
+                    self.session.add(DailyMetric(
+                        date=day, country=country, category=category, event_count=rng.randint(0, 60),
+                        severity_index=rng.choice([None, rng.uniform(0, 100)]),
+                    ))
+            for i in range(3):
+                self.session.add(Event(
+                    id=f"{day.isoformat()}-{i}", ts=datetime(day.year, day.month, day.day, i), date=day,
+                    country="US", category=("Armed Conflict", "Civil Unrest", "Crime / Terror")[i], source="gdelt",
+                ))
+        self.session.commit()
+
+    def _engine(self, name):
+        return mock.patch.object(analytics_engine, "ANALYTICS_ENGINE", name)
+
+    def _baselines(self):
+        rows = self.session.execute(
+            select(DailyMetric.id, *[getattr(DailyMetric, c) for c in _BASELINE_COLUMNS]).order_by(DailyMetric.id)
+        ).all()
+        return [tuple(round(v, 9) if isinstance(v, float) else v for v in r) for r in rows]
+
+    def test_day2_rolling_windows_match_pandas(self):
+        for method in ("robust", "standard"):
+            with mock.patch("backend.app.pipeline.day2_baselines_risk.BASELINE_METHOD", method):
+                with self._engine("sqlite"):
+                    compute_rolling_and_zscore(self.session)
+                    compute_severity_baseline(self.session)
+                expected = self._baselines()
+                self.session.execute(update(DailyMetric).values({c: None for c in _BASELINE_COLUMNS}))
+                with self._engine("duckdb"):
+                    compute_rolling_and_zscore(self.session)
+                    compute_severity_baseline(self.session)
+                self.assertEqual(self._baselines(), expected, method)
+                self.assertTrue(any(r[4] is not None for r in expected))  # some z-scores were computed
+
+    def test_reads_fall_back_without_an_export(self):
+        with self._engine("duckdb"):
+            self.assertFalse(analytics_engine.available())
+            self.assertEqual(get_category_breakdown(days=7, db=self.session).total, 24)
+
+    def test_analytics_reads_match_sqlite(self):
+        with self._engine("sqlite"):
+            sqlite_dist = get_risk_distribution(days=30, db=self.session)
+            sqlite_mix = get_category_breakdown(days=30, db=self.session)
+        analytics_engine.export_parquet(self.session)
+        with self._engine("duckdb"):
+            self.assertTrue(analytics_engine.available())
+            duck_dist = get_risk_distribution(days=30, db=self.session)
+            duck_mix = get_category_breakdown(days=30, db=self.session)
+        self.assertEqual(duck_dist.bins, sqlite_dist.bins)
+        self.assertEqual(duck_dist.stats, sqlite_dist.stats)
+        self.assertEqual(duck_mix, sqlite_mix)
+
+    def test_export_rewrites_only_changed_dates(self):
+        self.assertEqual(analytics_engine.export_parquet(self.session)["events"], 180)
+        self.assertEqual(analytics_engine.export_parquet(self.session)["events"], 0)
+        today = date.today()
+        self.session.add(Event(id="new", ts=datetime(today.year, today.month, today.day, 23), date=today,
+                               country="FR", category="Civil Unrest", source="gdelt"))
+        self.assertEqual(analytics_engine.export_parquet(self.session)["events"], 4)
+        yesterday = today - timedelta(days=1)
+        self.assertEqual(analytics_engine.export_parquet(self.session, dates=[yesterday])["events"], 3)
+
+    def test_events_view_includes_the_archive_once(self):
+        archive_events(self.session, date.today() - timedelta(days=40))
+        analytics_engine.export_parquet(self.session)
+        with self._engine("duckdb"):
+            mix = get_category_breakdown(days=365, db=self.session)
+            self.assertEqual(mix.total, 180)  # 60 days x 3, of which 20 days archived
+            # Archiving more after the export must not double count
+            archive_events(self.session, date.today() - timedelta(days=35))
+            self.assertEqual(get_category_breakdown(days=365, db=self.session).total, 180)
+
+
+if __name__ == "__main__":
+    unittest.main()
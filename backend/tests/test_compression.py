@@ -0,0 +1,104 @@
+"""
+Response compression: negotiation, size threshold, streaming, and cached bodies compressed once.
+Run from project root: python -m pytest backend/tests/test_compression.py -v
+"""
+import gzip
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.app import cache, compression
+
+BIG = [{"country": f"C{i}", "summary": "x" * 40} for i in range(200)]
+
+
+def _make_app():
+    app = FastAPI()
+    app.add_middleware(cache.ResponseCacheMiddleware)
+    app.add_middleware(compression.CompressionMiddleware)
+
+    @app.get("/map")
+    def map_():
+        return BIG
+
+    @app.get("/events")
+    def events():
+        return BIG
+
+    @app.get("/health")
+    def health():
+        return {"ok": True}
+
+    @app.get("/export")
+    def export():
+        return StreamingResponse((b'{"i": %d}\n' % i for i in range(2000)), media_type="application/x-ndjson")
+
+    return app
+
+
+class TestNegotiation(unittest.TestCase):
+    def test_gzip_and_q_values(self):
+        self.assertEqual(compression.negotiate_encoding("gzip, deflate"), "gzip")
+        self.assertIsNone(compression.negotiate_encoding("gzip;q=0, identity"))
+        self.assertIsNone(compression.negotiate_encoding(None))
+        self.assertEqual(compression.negotiate_encoding("*"), compression.SUPPORTED_ENCODINGS[0])
+
+    @unittest.skipUnless(compression.HAS_BROTLI, "brotli not installed")
+    def test_brotli_preferred(self):
+        self.assertEqual(compression.negotiate_encoding("gzip, br"), "br")
+
+
+class TestCompressionMiddleware(unittest.TestCase):
+    def setUp(self):
+        cache.response_cache.clear()
+        patcher = mock.patch.object(cache, "current_data_version", lambda: 7)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = TestClient(_make_app())
+
+    def test_large_json_is_gzipped(self):
+        r = self.client.get("/events", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(r.headers["content-encoding"], "gzip")
+        self.assertIn("Accept-Encoding", r.headers["vary"])
+        self.assertEqual(r.json(), BIG)  # client decodes
+
+    def test_small_and_identity_pass_through(self):
+        r = self.client.get("/health", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", r.headers)
+        r = self.client.get("/events", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", r.headers)
+
+    def test_stream_is_compressed_incrementally(self):
+        with self.client.stream("GET", "/export", headers={"Accept-Encoding": "gzip"}) as r:
+            self.assertEqual(r.headers["content-encoding"], "gzip")
+            self.assertNotIn("content-length", r.headers)
+            raw = b"".join(r.iter_raw())
+        self.assertEqual(len(gzip.decompress(raw).splitlines()), 2000)
+
+    def test_cached_body_compressed_once_per_version(self):
+        with mock.patch.object(cache, "compress", wraps=cache.compress) as spy:
+            first = self.client.get("/map", headers={"Accept-Encoding": "gzip"})
+            second = self.client.get("/map", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual((first.headers["x-cache"], second.headers["x-cache"]), ("MISS", "HIT"))
+        self.assertEqual(second.headers["content-encoding"], "gzip")
+        self.assertEqual(second.json(), BIG)
+
+        plain = self.client.get("/map", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", plain.headers)
+        self.assertNotEqual(plain.headers["etag"], second.headers["etag"])
+
+        r = self.client.get("/map", headers={"Accept-Encoding": "gzip", "If-None-Match": second.headers["etag"]})
+        self.assertEqual(r.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Country insights latency budget: DB-only partial result when Valyu is slow, cached news afterwards.
+Run from project root: python -m pytest backend/tests/test_country_insights.py -v
+"""
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.db import get_db
+from backend.app.routes import country_insights
+from backend.tests._db import make_engine
+
+
+class TestInsightsBudget(unittest.TestCase):
+    def setUp(self):
+        engine = make_engine()
+        SessionLocal = sessionmaker(bind=engine)
+
+        app = FastAPI()
+        app.include_router(country_insights.router)
+
+        def override_db():
+            s = SessionLocal()
+            try:
+                yield s
+            finally:
+                s.close()
+
+        app.dependency_overrides[get_db] = override_db
+        self.client = TestClient(app)
+        country_insights._news_cache.clear()
+        self.release = threading.Event()
+        self.calls = 0
+
+        def slow_search(*args, **kwargs):
+            self.calls += 1
+            self.release.wait(5)
+            return [{"title": "Border clash", "url": "https://example.org/a", "content": "clash"}]
+
+        for target, value in (
+            ("INSIGHTS_BUDGET_SECONDS", 0.2),
+            ("HAS_ML", False),
+        ):
+            p = mock.patch.object(country_insights, target, value)
+            p.start()
+            self.addCleanup(p.stop)
+        p = mock.patch.object(country_insights.valyu_client, "search", slow_search)
+        p.start()
+        self.addCleanup(p.stop)
+        self.addCleanup(self.release.set)
+
+    def test_slow_search_returns_partial_then_cached(self):
+        t0 = time.monotonic()
+        body = self.client.get("/countries/fr/insights").json()
+        self.assertLess(time.monotonic() - t0, 2.0)
+        self.assertTrue(body["partial"])
+        self.assertEqual(body["recent_news"], [])
+        self.assertEqual(body["country"], "FR")
+
+        # Let the background fetch finish and populate the per-country cache
+        self.release.set()
+        for _ in range(50):
+            if "FR" in country_insights._news_cache:
+                break
+            time.sleep(0.05)
+
+        body = self.client.get("/countries/FR/insights").json()
+        self.assertFalse(body["partial"])
+        self.assertEqual(body["recent_news"][0]["title"], "Border clash")
+        self.assertEqual(self.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Country network: daily edges from GDELT actor pairs and Valyu co-mentions, and the GET /network rollup.
+Run from project root: python -m pytest backend/tests/test_country_network.py -v
+"""
+import json
+import sys
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.models import CountryEdgeDaily
+from backend.app.pipeline.country_network import cameo_to_iso2, rebuild_country_edges, refresh_country_edges
+from backend.app.pipeline.entity_index import index_event_entities
+from backend.app.pipeline.upsert import upsert_events
+from backend.app.routes.network import get_network
+from backend.tests._db import make_engine
+
+D1, D2 = date(2024, 5, 1), date(2024, 5, 2)
+
+
+def _event(id_, day, a1=None, a2=None, severity=None, quad_class=None, countries=()):
+    return {
+        "id": id_, "ts": datetime.combine(day, datetime.min.time()), "date": day, "country": "XX",
+        "title": f"Event {id_}", "actor1_country": a1, "actor2_country": a2,
+        "severity_index": severity, "quad_class": quad_class,
+        "entities_json": json.dumps({"countries": [{"name": c, "code": c} for c in countries]}) if countries else None,
+    }
+
+
+class TestCameoToIso2(unittest.TestCase):
+    def test_countries_map_and_regions_do_not(self):
+        self.assertEqual(cameo_to_iso2("UKR"), "UA")
+        self.assertEqual(cameo_to_iso2(" rus "), "RU")
+        self.assertIsNone(cameo_to_iso2("AFR"))  # CAMEO region, not a country
+        self.assertIsNone(cameo_to_iso2(""))
+        self.assertIsNone(cameo_to_iso2(None))
+
+
+class TestCountryNetwork(unittest.TestCase):
+    def setUp(self):
+        engine = make_engine()
+        self.session = sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+        rows = [
+            _event("g1", D1, "RU", "UA", severity=80, quad_class=4),
+            _event("g2", D1, "UA", "RU", severity=40, quad_class=1),
+            _event("g3", D1, "UA", "UA"),  # domestic: no edge
+            _event("g4", D2, "IL", "LB", severity=60, quad_class=3),
+            _event("v1", D1, severity=20, countries=["UA", "RU", "PL"]),
+        ]
+        upsert_events(self.session, rows)
+        index_event_entities(self.session, rows)
+        self.session.commit()
+        refresh_country_edges(self.session, {D1, D2})
+        self.session.commit()
+
+    def edges(self):
+        return {
+            (e.date, e.country_a, e.country_b): (e.weight, e.mean_severity, e.conflict_count)
+            for e in self.session.execute(select(CountryEdgeDaily)).scalars()
+        }
+
+    def test_actor_pairs_and_co_mentions_merge(self):
+        self.assertEqual(self.edges(), {
+            (D1, "RU", "UA"): (3, 46.67, 1),
+            (D1, "PL", "RU"): (1, 20.0, 0),
+            (D1, "PL", "UA"): (1, 20.0, 0),
+            (D2, "IL", "LB"): (1, 60.0, 1),
+        })
+
+    def test_refresh_is_idempotent(self):
+        before = self.edges()
+        refresh_country_edges(self.session, [D1])
+        self.assertEqual(rebuild_country_edges(self.session), 4)
+        self.session.commit()
+        self.assertEqual(self.edges(), before)
+
+    def test_route_top_k_and_country_filter(self):
+        net = get_network(start=D1, end=D2, days=30, country=None, k=2, min_weight=1, db=self.session)
+        self.assertEqual([(e.source, e.target, e.weight) for e in net.edges][0], ("RU", "UA", 3))
+        self.assertEqual(len(net.edges), 2)
+        net = get_network(start=D1, end=D2, days=30, country="lb", k=10, min_weight=1, db=self.session)
+        self.assertEqual([(e.source, e.target, e.conflict_ratio) for e in net.edges], [("IL", "LB", 1.0)])
+        self.assertEqual(sorted(n.id for n in net.nodes), ["IL", "LB"])
+        net = get_network(start=D2, end=D2, days=30, country=None, k=10, min_weight=2, db=self.session)
+        self.assertEqual(net.edges, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+country_summary: refreshed rows match the live /map aggregation.
+Run from project root: python -m pytest backend/tests/test_country_summary.py -v
+"""
+import json
+import sys
+import unittest
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.country_centroids import COUNTRY_CENTROIDS
+from backend.app.models import CountrySummary, DailyMetric, RiskTierConfig
+from backend.app.pipeline import run_day2
+from backend.app.pipeline.country_summary import compute_country_rows, refresh_country_summary
+from backend.app.pipeline.risk_tiers import load_latest_tier_config, tier_for
+from backend.app.routes.map import get_map
+from backend.tests._db import make_engine
+
+
+class TestCountrySummary(unittest.TestCase):
+
+    def test_summary_matches_live_aggregation(self):
+        engine = make_engine()
+        session = sessionmaker(bind=engine)()
+
+        today = date.today()
+        for cat, sev, count in (("Armed Conflict", 80.0, 10), ("Civil Unrest", 40.0, 5)):
+            session.add(DailyMetric(date=today, country="UA", category=cat, event_count=count,
+                                    severity_index=sev, risk_tier="critical" if sev > 50 else "low",
+                                    trend_7d="rising"))
+        session.add(DailyMetric(date=today - timedelta(days=3), country="FR", category="Civil Unrest",
+                                event_count=2, severity_index=20.0))
+        session.commit()
+
+        live = {r["country"]: r for r in compute_country_rows(session)}
+        self.assertEqual(refresh_country_summary(session), len(COUNTRY_CENTROIDS))
+        session.commit()
+
+        served = {r["country"]: r for r in json.loads(get_map(date_param=None, include_all=True, db=session).body)}
+        self.assertEqual(set(served), set(live))
+        self.assertEqual(served["UA"]["severity_index"], 80.0)
+        self.assertEqual(served["UA"]["event_count"], 15)
+        self.assertEqual(served["UA"]["top_category"], "Armed Conflict")
+        self.assertEqual(served["UA"]["trend_7d"], "rising")
+        self.assertEqual(served["FR"]["event_count"], 2)
+        self.assertEqual(served["DE"]["risk_tier"], "none")
+
+        only_data = json.loads(get_map(date_param=None, include_all=False, db=session).body)
+        self.assertEqual({r["country"] for r in only_data}, {"UA", "FR"})
+        session.close()
+
+    def test_day2_refits_tiers_before_summary(self):
+        engine = make_engine()
+        Session = sessionmaker(bind=engine)
+        session = Session()
+        today = date.today()
+        for i in range(30):
+            session.add(DailyMetric(date=today - timedelta(days=i), country="UA", category="Armed Conflict",
+                                    event_count=5 + i, severity_index=float(3 * i)))
+        session.commit()
+
+        @contextmanager
+        def _session():
+            s = Session()
+            try:
+                yield s
+                s.commit()
+            finally:
+                s.close()
+
+        with mock.patch.object(run_day2, "get_db_session", _session), mock.patch.object(sys, "argv", ["run_day2"]), \
+                mock.patch.object(run_day2, "setup_logging"):  # leave the process-wide logging config alone
+            run_day2.main()
+
+        self.assertEqual(session.execute(select(func.max(RiskTierConfig.version))).scalar(), 1)
+        tiers = load_latest_tier_config(session)
+        ua = session.get(CountrySummary, "UA")
+        self.assertEqual(ua.risk_tier, tier_for(ua.severity_index, tiers))
+        session.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,8 +19,9 @@ os.environ["BASELINE_METHOD"] = "robust"
 os.environ["BASELINE_MIN_PERIODS"] = "7"
 os.environ["SPIKE_MODE"] = "one_sided"
 
-from backend.app.pipeline.day2_baselines_risk import _rolling_mad
+from backend.app.pipeline.day2_baselines_risk import _rolling_mad, _rolling_standard_sql
 from backend.app.pipeline_config import BASELINE_MIN_PERIODS
+from backend.tests._db import make_engine
 
 
 class TestRobustZScore(unittest.TestCase):
@@ -67,13 +68,12 @@ class TestSpikeUpsert(unittest.TestCase):
     """Running spike detection twice does not duplicate spikes (upsert)."""
 
     def test_upsert_no_duplicate_spikes(self):
-        from sqlalchemy import create_engine, select
+        from sqlalchemy import select
         from sqlalchemy.orm import sessionmaker
-        from backend.app.models import Base, DailyMetric, Spike
+        from backend.app.models import DailyMetric, Spike
         from backend.app.pipeline.day2_baselines_risk import detect_spikes
 
-        engine = create_engine("sqlite:///:memory:")
-        Base.metadata.create_all(engine)
+        engine = make_engine()
         Session = sessionmaker(bind=engine)
         session = Session()
 
@@ -109,5 +109,34 @@ class TestSpikeUpsert(unittest.TestCase):
         session.close()
 
 
+class TestServerSideRolling(unittest.TestCase):
+    """Window-function rolling mean/std in the database matches pandas rolling()."""
+
+    def test_matches_pandas(self):
+        from sqlalchemy.orm import sessionmaker
+        from backend.app.models import DailyMetric
+
+        session = sessionmaker(bind=make_engine())()
+        self.addCleanup(session.close)
+        start = date(2025, 1, 1)
+        for country, k in (("US", 3), ("FR", 7)):
+            for i in range(20):
+                session.add(DailyMetric(date=start + timedelta(days=i), country=country, category="Armed Conflict",
+                                        event_count=(i * k) % 11 + 1))
+        session.commit()
+
+        got = _rolling_standard_sql(session, 14, 7).set_index("id").sort_index()
+        rows = [(m.id, m.country, m.date, m.event_count) for m in session.query(DailyMetric)]
+        df = pd.DataFrame(rows, columns=["id", "country", "date", "event_count"]).sort_values(["country", "date"])
+        grouped = df.groupby("country")["event_count"]
+        df["center"] = grouped.transform(lambda x: x.rolling(14, min_periods=7).mean())
+        df["dispersion"] = grouped.transform(lambda x: x.rolling(14, min_periods=7).std())
+        df = df.set_index("id").sort_index()
+
+        pd.testing.assert_series_equal(got["rolling_center"].astype(float), df["center"], check_names=False)
+        pd.testing.assert_series_equal(got["rolling_dispersion"].astype(float), df["dispersion"],
+                                       check_names=False, atol=1e-9)
+
+
 if __name__ == "__main__":
     unittest.main()
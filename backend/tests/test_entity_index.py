@@ -0,0 +1,99 @@
+"""
+event_entities index: rows derived from entities_json, replaced on re-ingest, and the lookups reading it.
+Run from project root: python -m pytest backend/tests/test_entity_index.py -v
+"""
+import json
+import sys
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.models import EventEntity
+from backend.app.pipeline.entity_index import backfill_event_entities, entity_rows, index_event_entities
+from backend.app.pipeline.upsert import upsert_events
+from backend.app.routes.country_insights import _entities_by_event, _related_countries, _related_organizations
+from backend.app.routes.entities import entity_events
+from backend.tests._db import make_engine
+
+DAY = date(2024, 5, 1)
+
+
+def _entities(countries=(), orgs=(), persons=()):
+    return json.dumps({
+        "countries": [{"name": n, "code": c} for n, c in countries],
+        "organizations": list(orgs), "persons": list(persons), "locations": [], "primary_country": None,
+    })
+
+
+class TestEntityRows(unittest.TestCase):
+    def test_normalized_and_deduplicated(self):
+        rows = entity_rows("e1", DAY, _entities(countries=[("Israel", "il")], orgs=["Hezbollah", " hezbollah ", ""]))
+        self.assertEqual(
+            sorted((r["type"], r["value"], r["iso2"]) for r in rows),
+            [("country", "israel", "IL"), ("organization", "hezbollah", None)],
+        )
+
+    def test_malformed_json_gives_no_rows(self):
+        self.assertEqual(entity_rows("e1", DAY, "{not json"), [])
+        self.assertEqual(entity_rows("e1", DAY, None), [])
+
+
+class TestEntityLookups(unittest.TestCase):
+    def setUp(self):
+        engine = make_engine()
+        self.session = sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+        events = [
+            ("a", "LB", DAY, _entities(countries=[("Israel", "IL"), ("Syria", "SY")], orgs=["Hezbollah"])),
+            ("b", "LB", date(2024, 5, 2), _entities(countries=[("Israel", "IL")], orgs=["Hezbollah", "UNIFIL"])),
+            ("c", "IL", date(2024, 5, 3), _entities(countries=[("Lebanon", "LB")], orgs=["Hezbollah"])),
+        ]
+        rows = [
+            {"id": i, "ts": datetime.combine(d, datetime.min.time()), "date": d, "country": c,
+             "title": f"Event {i}", "entities_json": ents}
+            for i, c, d, ents in events
+        ]
+        upsert_events(self.session, rows)
+        index_event_entities(self.session, rows)
+        self.session.commit()
+
+    def test_reingest_replaces_rows(self):
+        index_event_entities(self.session, [{"id": "a", "date": DAY, "entities_json": _entities(orgs=["IDF"])}])
+        self.session.commit()
+        values = self.session.execute(select(EventEntity.value).where(EventEntity.event_id == "a")).scalars().all()
+        self.assertEqual(values, ["idf"])
+
+    def test_backfill_rebuilds_index(self):
+        self.session.query(EventEntity).delete()
+        self.session.commit()
+        self.assertEqual(backfill_event_entities(self.session, chunk_size=2), 8)
+
+    def test_entity_events_newest_first_with_cursor(self):
+        page = entity_events("HEZBOLLAH", type="organization", start=None, end=None, limit=2, cursor=None,
+                             db=self.session)
+        self.assertEqual([e.id for e in page.events], ["c", "b"])
+        page = entity_events("hezbollah", type=None, start=None, end=None, limit=2, cursor=page.next_cursor,
+                             db=self.session)
+        self.assertEqual(([e.id for e in page.events], page.next_cursor), (["a"], None))
+
+    def test_country_code_lookup(self):
+        page = entity_events("il", type="country", start=None, end=None, limit=10, cursor=None, db=self.session)
+        self.assertEqual([e.id for e in page.events], ["b", "a"])
+
+    def test_insights_related_lookups(self):
+        self.assertEqual(_related_countries(self.session, "LB", DAY), ["IL", "SY"])
+        orgs = _related_organizations(self.session, "LB", DAY)
+        self.assertEqual([(o["name"], o["mentions"]) for o in orgs], [("Hezbollah", 2), ("UNIFIL", 1)])
+        ents = _entities_by_event(self.session, ["a"])["a"]
+        self.assertEqual(ents["countries"][0], {"name": "Israel", "code": "IL"})
+        self.assertEqual(ents["organizations"], ["Hezbollah"])
+
+
+if __name__ == "__main__":
+    unittest.main()
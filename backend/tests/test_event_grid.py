@@ -0,0 +1,108 @@
+"""
+Spatial grid: quadkey cells at ingest, event_grid_daily rollups and GET /map/clusters bbox reads.
+Run from project root: python -m pytest backend/tests/test_event_grid.py -v
+"""
+import json
+import sys
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.models import Event, EventGridDaily
+from backend.app.pipeline.event_grid import (
+    GRID_MAX_LEVEL,
+    backfill_grid_cells,
+    cluster_level,
+    grid_cell,
+    quadkey_to_tile,
+    refresh_event_grid,
+    tile_to_quadkey,
+    tile_xy,
+)
+from backend.app.routes.map import get_map_clusters
+from backend.tests._db import make_engine
+
+DAY = date(2024, 5, 1)
+
+
+class TestQuadkeys(unittest.TestCase):
+    def test_tile_math(self):
+        self.assertEqual(tile_xy(0.0, 0.0, 1), (1, 1))
+        self.assertEqual(tile_xy(90.0, -180.0, 3), (0, 0))  # clamped to the Mercator limit
+        self.assertEqual(tile_to_quadkey(3, 5, 3), "213")
+        self.assertEqual(quadkey_to_tile("213"), (3, 5, 3))
+
+    def test_grid_cell_prefix_and_centroid_fallback(self):
+        paris = grid_cell(48.86, 2.35)
+        self.assertEqual(len(paris), GRID_MAX_LEVEL)
+        self.assertTrue(paris.startswith(tile_to_quadkey(*tile_xy(48.86, 2.35, 6), 6)))
+        self.assertEqual(grid_cell(None, None, "FR"), grid_cell(46.0, 2.0))
+        self.assertIsNone(grid_cell(None, None, None))
+
+    def test_cluster_level_follows_zoom(self):
+        self.assertEqual([cluster_level(z) for z in (0, 3, 9, 18)], [2, 6, 12, 12])
+
+
+class TestMapClusters(unittest.TestCase):
+    def setUp(self):
+        engine = make_engine()
+        self.session = sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+        points = [
+            ("p1", 48.85, 2.35, "FR", 30.0),
+            ("p2", 48.87, 2.33, "FR", 70.0),
+            ("b1", 52.52, 13.40, "DE", 50.0),
+            ("c1", None, None, "FR", 90.0),  # centroid-placed
+            ("f1", -17.7, 178.0, "FJ", 10.0),
+        ]
+        self.session.execute(Event.__table__.insert(), [
+            {"id": i, "ts": datetime.combine(DAY, datetime.min.time()), "date": DAY, "country": c,
+             "lat": lat, "lon": lon, "severity_index": sev}
+            for i, lat, lon, c, sev in points
+        ])
+        self.assertEqual(backfill_grid_cells(self.session), 5)
+        refresh_event_grid(self.session, [DAY])
+        self.session.commit()
+
+    def clusters(self, bbox, zoom):
+        resp = get_map_clusters(bbox=bbox, zoom=zoom, date_param=DAY, db=self.session)
+        return json.loads(resp.body)
+
+    def test_world_view_totals(self):
+        body = self.clusters("-180,-90,180,90", 0)
+        self.assertEqual(body["level"], 2)
+        self.assertEqual(sum(c["count"] for c in body["clusters"]), 5)
+
+    def test_bbox_filters_and_aggregates(self):
+        body = self.clusters("2.0,48.5,2.7,49.0", 8)
+        self.assertEqual([(c["count"], c["max_severity"]) for c in body["clusters"]], [(2, 70.0)])
+        self.assertAlmostEqual(body["clusters"][0]["lat"], 48.86, places=2)
+        body = self.clusters("-5,41,10,52", 6)  # France: points and the centroid fallback, not Berlin
+        self.assertEqual(sum(c["count"] for c in body["clusters"]), 3)
+
+    def test_antimeridian_bbox(self):
+        body = self.clusters("170,-30,-170,-10", 6)
+        self.assertEqual([c["count"] for c in body["clusters"]], [1])
+
+    def test_refresh_replaces_date(self):
+        self.session.execute(Event.__table__.delete().where(Event.id == "f1"))
+        refresh_event_grid(self.session, [DAY])
+        total = self.session.execute(
+            select(func.sum(EventGridDaily.event_count)).where(EventGridDaily.level == 2)
+        ).scalar()
+        self.assertEqual(total, 4)
+
+    def test_bad_bbox(self):
+        with self.assertRaises(HTTPException):
+            self.clusters("1,2,3", 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
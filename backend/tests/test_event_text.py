@@ -0,0 +1,88 @@
+"""
+event_text side table: upsert_events splits flat rows between events and
+event_text, feed routes read the text back, and archived partitions keep it.
+Run from project root: python -m pytest backend/tests/test_event_text.py -v
+"""
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import Response
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import archive
+from backend.app.models import Event, EventText
+from backend.app.pipeline.retention import archive_events
+from backend.app.pipeline.upsert import upsert_events
+from backend.app.routes.events import list_events
+from backend.tests._db import make_engine
+
+
+def _row(id_, day, **kw):
+    return {
+        "id": id_, "ts": datetime.combine(day, datetime.min.time()), "date": day, "country": "UA",
+        "category": "Armed Conflict", "severity_index": 40.0, "title": f"Event {id_}", "content": "x" * 50,
+        "source_url": f"https://example.org/{id_}", "entities_json": None, **kw,
+    }
+
+
+class TestEventText(unittest.TestCase):
+    def setUp(self):
+        engine = make_engine()
+        self.session = sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+
+    def _list(self, **kw):
+        params = dict(country=None, start=None, end=None, category=None, limit=50, cursor=None, stream=False)
+        params.update(kw)
+        return list_events(response=Response(), db=self.session, **params)
+
+    def test_upsert_splits_text_from_core_columns(self):
+        today = date.today()
+        self.assertEqual(upsert_events(self.session, [_row("a", today), _row("b", today, title=None)]), 2)
+        self.assertNotIn("title", Event.__table__.c)
+        texts = {t.event_id: t for t in self.session.execute(select(EventText)).scalars()}
+        self.assertEqual((texts["a"].title, texts["a"].source_url), ("Event a", "https://example.org/a"))
+        self.assertIsNone(texts["b"].title)
+
+        # Only the listed columns are updated on conflict, in either table
+        upsert_events(self.session, [_row("a", today, title="Edited", severity_index=90.0, entities_json="{}")],
+                      update_columns=("severity_index", "entities_json"))
+        self.session.expire_all()
+        self.assertEqual(self.session.get(Event, "a").severity_index, 90.0)
+        text = self.session.get(EventText, "a")
+        self.assertEqual((text.title, text.entities_json), ("Event a", "{}"))
+
+    def test_events_route_reads_source_url(self):
+        today = date.today()
+        upsert_events(self.session, [_row("a", today)])
+        self.session.add(Event(id="gdelt-1", ts=datetime.combine(today, datetime.min.time()), date=today,
+                               country="FR"))  # no event_text row
+        self.session.commit()
+        urls = {e.id: e.source_url for e in self._list()}
+        self.assertEqual(urls, {"a": "https://example.org/a", "gdelt-1": None})
+
+    @unittest.skipUnless(archive.HAS_PYARROW, "pyarrow not installed")
+    def test_archive_keeps_text(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        old = date.today() - timedelta(days=60)
+        upsert_events(self.session, [_row("old", old), _row("new", date.today())])
+        self.session.commit()
+        with mock.patch.object(archive, "ARCHIVE_DIR", Path(tmp.name)):
+            self.assertEqual(archive_events(self.session, old + timedelta(days=1)), 1)
+            self.assertIsNone(self.session.get(EventText, "old"))
+            self.assertEqual(archive.read_partition(old)[0]["title"], "Event old")
+            urls = [e.source_url for e in self._list()]
+        self.assertEqual(urls, ["https://example.org/new", "https://example.org/old"])
+
+
+if __name__ == "__main__":
+    unittest.main()
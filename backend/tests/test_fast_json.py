@@ -0,0 +1,107 @@
+"""
+Fast JSON path: /events/combined, /metrics and /map bodies match their Pydantic schemas.
+Run from project root: python -m pytest backend/tests/test_fast_json.py -v
+"""
+import json
+import sys
+import unittest
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import List
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.db import get_db
+from backend.app.fast_json import dumps, raw_json_object
+from backend.app.models import CountrySummary, DailyMetric, Event, EventText
+from backend.app.routes import combined, map as map_router, metrics
+from backend.app.schemas import CombinedEventsResponse, MapCountryResponse, MetricResponse
+from backend.tests._db import make_engine
+
+
+class TestFastJSONHelpers(unittest.TestCase):
+    def test_raw_object_embeds_unchanged(self):
+        body = dumps({"entities": raw_json_object('{"persons": ["A"], "n": 1}')})
+        self.assertEqual(json.loads(body), {"entities": {"persons": ["A"], "n": 1}})
+
+    def test_non_objects_become_none(self):
+        for text in (None, "", "[1, 2]", '{"truncated": ', "null", '{"a": 1,}', "{not json}"):
+            self.assertIsNone(raw_json_object(text), text)
+
+    def test_dates_are_iso(self):
+        body = dumps({"d": date(2025, 3, 1), "ts": datetime(2025, 3, 1, 12, 30)})
+        self.assertEqual(json.loads(body), {"d": "2025-03-01", "ts": "2025-03-01T12:30:00"})
+
+
+class TestFastJSONRoutes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        engine = make_engine()
+        cls.SessionLocal = sessionmaker(bind=engine)
+
+        today = datetime.now(timezone.utc).date()
+        session = cls.SessionLocal()
+        session.add_all([
+            Event(id="e1", ts=datetime(today.year, today.month, today.day, 3), date=today, country="UA",
+                  lat=50.4, lon=30.5, category="Armed Conflict", severity_index=82.5, threat_level="critical",
+                  source="valyu"),
+            EventText(event_id="e1", title="Shelling", content="y" * 900, source_url="https://example.org/1",
+                      entities_json='{"countries": [{"code": "UA"}], "persons": []}'),
+            Event(id="e2", ts=datetime(today.year, today.month, today.day, 4), date=today, country="FR",
+                  category=None, threat_level=None, source="gdelt"),
+            EventText(event_id="e2", content="short", entities_json='{"persons": ["A"],}'),  # corrupt object
+        ])
+        session.add(DailyMetric(date=today, country="UA", category="Armed Conflict", event_count=7, avg_tone=-3.5,
+                                reasons_json='{"z": 2.1}', computed_at=datetime(2025, 3, 1, 12, 0, 5)))
+        session.add(CountrySummary(country="UA", lat=48.4, lon=31.2, severity_index=80.0, event_count=15,
+                                   risk_tier="critical", has_data=True))
+        session.commit()
+        session.close()
+
+        app = FastAPI()
+        for r in (combined.router, metrics.router, map_router.router):
+            app.include_router(r)
+
+        def override_db():
+            s = cls.SessionLocal()
+            try:
+                yield s
+            finally:
+                s.close()
+
+        app.dependency_overrides[get_db] = override_db
+        cls.client = TestClient(app)
+
+    def assertMatchesSchema(self, body, adapter):
+        # Round-tripping through the Pydantic model must not change the body
+        self.assertEqual(adapter.dump_python(adapter.validate_python(body), mode="json"), body)
+
+    def test_combined(self):
+        body = self.client.get("/events/combined").json()
+        self.assertMatchesSchema(body, TypeAdapter(CombinedEventsResponse))
+        e1, e2 = body["events"]
+        self.assertEqual(e1["entities"], {"countries": [{"code": "UA"}], "persons": []})
+        self.assertEqual(len(e1["summary"]), 501)
+        self.assertIsNone(e2["entities"])
+        self.assertEqual((e2["category"], e2["threatLevel"]), ("event", "medium"))
+        self.assertEqual(body["sources"], {"valyu": 1, "gdelt": 1})
+
+    def test_metrics(self):
+        body = self.client.get("/metrics").json()
+        self.assertMatchesSchema(body, TypeAdapter(List[MetricResponse]))
+        self.assertEqual(body[0]["reasons_json"], '{"z": 2.1}')
+
+    def test_map(self):
+        body = self.client.get("/map").json()
+        self.assertMatchesSchema(body, TypeAdapter(List[MapCountryResponse]))
+        self.assertEqual(body[0]["country"], "UA")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Background pipeline jobs: status/progress/stage persistence, the heavy-run lock
+and its database lease shared by API replicas.
+Run from project root: python -m pytest backend/tests/test_jobs.py -v
+"""
+import sys
+import threading
+import unittest
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import jobs
+from backend.app.models import PipelineCheckpoint, PipelineRun
+from backend.tests._db import make_engine
+
+# Shared by the test and the job worker thread; bound in setUpClass
+SessionLocal = sessionmaker()
+
+
+@contextmanager
+def _test_session():
+    session = SessionLocal()
+    try:
+        yield session
+        session.commit()
+    finally:
+        session.close()
+
+
+class TestJobRunner(unittest.TestCase):
+    """A submitted job records stages and result; a second heavy job is refused while it runs."""
+
+    @classmethod
+    def setUpClass(cls):
+        SessionLocal.configure(bind=make_engine())
+        cls._orig_session = jobs.get_db_session
+        jobs.get_db_session = _test_session
+
+    @classmethod
+    def tearDownClass(cls):
+        jobs.get_db_session = cls._orig_session
+
+    def setUp(self):
+        with _test_session() as s:
+            s.execute(delete(PipelineCheckpoint))
+            s.execute(delete(PipelineRun))
+
+    def _other_replica(self, run_id, renewed_ago=timedelta(0), status=jobs.JOB_RUNNING):
+        """A run and its lease written by another API process."""
+        with _test_session() as s:
+            s.add(PipelineRun(id=run_id, kind="test", status=status, created_at=datetime.now(timezone.utc)))
+            s.add(PipelineCheckpoint(pipeline="jobs", stage="lease", key="heavy", fingerprint=run_id,
+                                     updated_at=datetime.now(timezone.utc) - renewed_ago))
+
+    def _status(self, run_id):
+        with _test_session() as s:
+            return jobs.get_job(s, run_id).status
+
+    def test_job_lifecycle_and_lock(self):
+        release = threading.Event()
+
+        def slow_job(ctx):
+            with ctx.stage("work") as stage:
+                release.wait(5)
+                stage["rows"] = 3
+            ctx.progress(0.5)
+            return {"ok": True}
+
+        run_id = jobs.submit_job("test", slow_job)
+        with self.assertRaises(jobs.JobBusyError) as cm:
+            jobs.submit_job("test", slow_job)
+        self.assertEqual(cm.exception.active_run_id, run_id)
+
+        release.set()
+        jobs._executor.submit(lambda: None).result(timeout=10)  # drain the single worker
+
+        session = SessionLocal()
+        try:
+            run = jobs.get_job(session, run_id)
+            self.assertEqual(run.status, jobs.JOB_SUCCEEDED)
+            self.assertEqual(run.progress, 1.0)
+            self.assertIn('"work"', run.stages_json)
+            self.assertIn('"ok"', run.result_json)
+        finally:
+            session.close()
+
+        # Lock and lease released: a new job can be submitted
+        with _test_session() as s:
+            self.assertIsNone(s.execute(select(PipelineCheckpoint)).first())
+        jobs.submit_job("test", lambda ctx: {})
+        jobs._executor.submit(lambda: None).result(timeout=10)
+
+    def test_live_lease_in_another_replica_refuses_job(self):
+        self._other_replica("other")
+        with self.assertRaises(jobs.JobBusyError) as cm:
+            jobs.submit_job("test", lambda ctx: {})
+        self.assertEqual(cm.exception.active_run_id, "other")
+        # The in-process lock was not left taken
+        self.assertTrue(jobs._heavy_lock.acquire(blocking=False))
+        jobs._heavy_lock.release()
+
+    def test_expired_lease_is_taken_over(self):
+        self._other_replica("dead", renewed_ago=timedelta(seconds=jobs.JOB_LEASE_SECONDS + 60))
+        run_id = jobs.submit_job("test", lambda ctx: {})
+        jobs._executor.submit(lambda: None).result(timeout=10)
+        self.assertEqual(self._status("dead"), jobs.JOB_FAILED)
+        self.assertEqual(self._status(run_id), jobs.JOB_SUCCEEDED)
+
+    def test_startup_sweep_spares_live_lease_holder(self):
+        self._other_replica("other")
+        with _test_session() as s:
+            s.add(PipelineRun(id="orphan", kind="test", status=jobs.JOB_QUEUED))
+        self.assertEqual(jobs.fail_interrupted_runs(), 1)
+        self.assertEqual(self._status("other"), jobs.JOB_RUNNING)
+        self.assertEqual(self._status("orphan"), jobs.JOB_FAILED)
+
+    def test_failed_job_records_error(self):
+        def bad_job(ctx):
+            raise ValueError("boom")
+
+        run_id = jobs.submit_job("test", bad_job)
+        jobs._executor.submit(lambda: None).result(timeout=10)
+        session = SessionLocal()
+        try:
+            run = jobs.get_job(session, run_id)
+            self.assertEqual(run.status, jobs.JOB_FAILED)
+            self.assertIn("boom", run.error)
+        finally:
+            session.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+run_migration.py against a database in the shape of the first release: text columns
+on events and none of the tables added since (pipeline_checkpoints, event_text, ...).
+Run from project root: python -m pytest backend/tests/test_migration.py -v
+"""
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Project root on path so "backend.app" resolves
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine
+
+from backend.app.models import DailyMetric, RiskSnapshot, RiskTierConfig, Spike
+from backend.tests._db import sqlite_only
+
+# events as first released: text inline, no severity_version/actor/grid columns
+BASELINE_EVENTS = """
+CREATE TABLE events (
+    id VARCHAR PRIMARY KEY, ts DATETIME NOT NULL, date DATE NOT NULL, country VARCHAR(2), admin1 VARCHAR,
+    lat FLOAT, lon FLOAT, event_code VARCHAR(4), quad_class INTEGER, goldstein FLOAT, avg_tone FLOAT,
+    source_url VARCHAR, category VARCHAR, source VARCHAR(16), title VARCHAR, content VARCHAR,
+    category_confidence FLOAT, severity_index FLOAT, sentiment_score FLOAT, entities_json VARCHAR,
+    threat_level VARCHAR(16)
+)
+"""
+
+
+def _countries(*codes: str) -> str:
+    return json.dumps({"countries": [{"name": c, "code": c} for c in codes]})
+
+
+def _baseline_db(path: Path) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    for model in (DailyMetric, Spike, RiskSnapshot, RiskTierConfig):
+        model.__table__.create(bind=engine)
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    conn.execute(BASELINE_EVENTS)
+    conn.executemany(
+        "INSERT INTO events (id, ts, date, country, lat, lon, category, source, title, content, entities_json)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, 'valyu', ?, ?, ?)",
+        [
+            ("v1", "2024-05-01 08:00:00", "2024-05-01", "UA", 50.4, 30.5, "Armed Conflict",
+             "Port strike", "Shelling near the port", _countries("UA", "RU")),
+            ("v2", "2024-05-02 09:00:00", "2024-05-02", "FR", 48.9, 2.4, "Diplomacy",
+             "Talks in Paris", "Ministers met", _countries("FR", "DE")),
+        ],
+    )
+    conn.execute(
+        "INSERT INTO daily_metrics (date, country, category, event_count, severity_index, risk_score)"
+        " VALUES ('2024-05-01', 'UA', 'Armed Conflict', 1, 40.0, 55.0)"
+    )
+    conn.commit()
+    conn.close()
+
+
+@sqlite_only
+class TestRunMigration(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "events.db"
+        _baseline_db(self.path)
+
+    def migrate(self, sqlite_version=None) -> str:
+        """Run the script; sqlite_version pretends the library is that old (e.g. (3, 34, 0))."""
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{self.path}"}
+        env.pop("DATABASE_READ_URL", None)
+        script = str(ROOT / "backend" / "run_migration.py")
+        args = [script]
+        if sqlite_version:
+            args = ["-c", f"import runpy, sqlite3; sqlite3.sqlite_version_info = {tuple(sqlite_version)!r}; "
+                          f"runpy.run_path({script!r}, run_name='__main__')"]
+        proc = subprocess.run(
+            [sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        return proc.stdout
+
+    def query(self, sql: str):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def test_upgrades_baseline_database(self):
+        out = self.migrate()
+        self.assertIn("Migration done.", out)
+        tables = {name for (name,) in self.query("SELECT name FROM sqlite_master WHERE type='table'")}
+        self.assertLessEqual(
+            {"pipeline_checkpoints", "event_text", "event_entities", "country_edges_daily",
+             "event_grid_daily", "metric_rollups"},
+            tables,
+        )
+        self.assertEqual(
+            self.query("SELECT event_id, title FROM event_text ORDER BY event_id"),
+            [("v1", "Port strike"), ("v2", "Talks in Paris")],
+        )
+        self.assertTrue(self.query("SELECT 1 FROM country_edges_daily"))
+        self.assertTrue(self.query("SELECT 1 FROM event_grid_daily"))
+        self.assertTrue(self.query("SELECT 1 FROM metric_rollups"))
+        # A second run is a no-op
+        out = self.migrate()
+        self.assertIn("already split", out)
+        self.assertNotIn("Vacuuming", out)
+
+    def test_split_without_drop_column_runs_once(self):
+        out = self.migrate(sqlite_version=(3, 34, 0))
+        self.assertIn("cannot drop columns", out)
+        self.assertEqual(self.query("SELECT count(*) FROM events WHERE title IS NOT NULL"), [(0,)])
+        self.assertEqual(self.query("SELECT count(*) FROM event_text"), [(2,)])
+        # The emptied columns are still there, but nothing is copied, dropped or vacuumed again
+        out = self.migrate(sqlite_version=(3, 34, 0))
+        self.assertIn("already split", out)
+        self.assertNotIn("Vacuuming", out)
+        self.assertNotIn("search index", out)
+        self.assertEqual(self.query("SELECT title FROM event_text WHERE event_id = 'v1'"), [("Port strike",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
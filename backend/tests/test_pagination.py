@@ -0,0 +1,126 @@
+"""
+Keyset pagination and NDJSON streaming for /events, /metrics and /events/combined.
+Run from project root: python -m pytest backend/tests/test_pagination.py -v
+"""
+import json
+import sys
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import pagination
+from backend.app.db import get_db
+from backend.app.models import DailyMetric, Event
+from backend.app.routes import combined, events, metrics
+from backend.tests._db import make_engine
+
+
+class TestKeysetPagination(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        engine = make_engine()
+        cls.SessionLocal = sessionmaker(bind=engine)
+
+        today = datetime.now(timezone.utc).date()
+        levels = ["info", "low", "medium", "high", "critical"]
+        session = cls.SessionLocal()
+        for i in range(37):
+            d = today - timedelta(days=i % 5)
+            session.add(Event(
+                id=f"ev{i:03d}",
+                ts=datetime(d.year, d.month, d.day, i % 24),
+                date=d,
+                country="US",
+                category="conflict",
+                threat_level=levels[i % 5],
+                source="valyu",
+            ))
+        for i in range(23):
+            session.add(DailyMetric(date=today - timedelta(days=i), country="US", category="conflict", event_count=i))
+        session.commit()
+        session.close()
+
+        app = FastAPI()
+        for r in (events.router, metrics.router, combined.router):
+            app.include_router(r)
+
+        def override_db():
+            s = cls.SessionLocal()
+            try:
+                yield s
+            finally:
+                s.close()
+
+        app.dependency_overrides[get_db] = override_db
+        cls.patcher = mock.patch.object(pagination, "ReadSessionLocal", cls.SessionLocal)
+        cls.patcher.start()
+        cls.client = TestClient(app)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.patcher.stop()
+
+    def _walk_header_pages(self, path, limit):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": limit}
+            if cursor:
+                params["cursor"] = cursor
+            r = self.client.get(path, params=params)
+            self.assertEqual(r.status_code, 200)
+            seen.extend(r.json())
+            cursor = r.headers.get("X-Next-Cursor")
+            if not cursor:
+                return seen
+
+    def test_events_pages_cover_all_rows_once_in_order(self):
+        rows = self._walk_header_pages("/events", limit=10)
+        ids = [r["id"] for r in rows]
+        self.assertEqual(len(ids), 37)
+        self.assertEqual(len(set(ids)), 37)
+        keys = [(r["date"], r["ts"], r["id"]) for r in rows]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_metrics_paged(self):
+        rows = self._walk_header_pages("/metrics", limit=5)
+        self.assertEqual(len(rows), 23)
+        dates = [r["date"] for r in rows]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+    def test_combined_threat_order_holds_across_pages(self):
+        order = {"critical": 0, "high": 1, "medium": 2, "low": 3, "info": 4}
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 7}
+            if cursor:
+                params["cursor"] = cursor
+            body = self.client.get("/events/combined", params=params).json()
+            seen.extend(body["events"])
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 37)
+        ranks = [order[e["threatLevel"]] for e in seen]
+        self.assertEqual(ranks, sorted(ranks))
+
+    def test_ndjson_stream_returns_everything(self):
+        r = self.client.get("/events", params={"stream": "true", "limit": 1})
+        self.assertTrue(r.headers["content-type"].startswith("application/x-ndjson"))
+        lines = [json.loads(line) for line in r.text.splitlines() if line]
+        self.assertEqual(len(lines), 37)
+
+    def test_invalid_cursor_is_400(self):
+        r = self.client.get("/events", params={"cursor": "not-a-cursor"})
+        self.assertEqual(r.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,7 @@ os.environ.setdefault("BASELINE_METHOD", "robust")
 os.environ.setdefault("SPIKE_MODE", "one_sided")
 
 from backend.app.pipeline.aggregate_daily import _severity_index_row
+from backend.tests._db import make_engine
 
 
 class TestSeverityIndex(unittest.TestCase):
@@ -34,17 +35,48 @@ class TestSeverityIndex(unittest.TestCase):
         self.assertLess(si, 30)
 
 
+class TestAggregateDaily(unittest.TestCase):
+    """The GROUP BY in aggregate_daily_metrics runs in the database."""
+
+    def test_groups_and_averages(self):
+        from datetime import date, datetime
+        from sqlalchemy import select
+        from sqlalchemy.orm import sessionmaker
+        from backend.app.models import DailyMetric, Event
+        from backend.app.pipeline.aggregate_daily import aggregate_daily_metrics
+
+        session = sessionmaker(bind=make_engine())()
+        self.addCleanup(session.close)
+        d = date(2025, 3, 1)
+        for i, (country, tone, goldstein, quad) in enumerate((
+            ("UA", -6.0, -8.0, 4), ("UA", 2.0, -2.0, 2), ("", -1.0, 1.0, None),
+        )):
+            session.add(Event(id=f"e{i}", ts=datetime(2025, 3, 1, i), date=d, country=country,
+                              category="Armed Conflict", avg_tone=tone, goldstein=goldstein, quad_class=quad))
+        session.add(Event(id="nocat", ts=datetime(2025, 3, 1), date=d, country="UA"))  # no category: skipped
+        session.commit()
+
+        self.assertEqual(aggregate_daily_metrics(session), 2)
+        rows = {m.country: m for m in session.execute(select(DailyMetric)).scalars()}
+        self.assertEqual(set(rows), {"UA", "XX"})
+        ua = rows["UA"]
+        self.assertEqual(ua.event_count, 2)
+        self.assertAlmostEqual(ua.avg_tone, -2.0)
+        self.assertAlmostEqual(ua.min_goldstein, -8.0)
+        self.assertAlmostEqual(ua.pct_negative_tone, 0.5)
+        self.assertIsNotNone(ua.severity_index)
+
+
 class TestReasonsJsonSeverityFields(unittest.TestCase):
     """reasons_json from risk scoring includes severity_component, z_severity, severity_index."""
 
     def test_reasons_contain_severity_fields(self):
-        from sqlalchemy import create_engine, select
+        from sqlalchemy import select
         from sqlalchemy.orm import sessionmaker
-        from backend.app.models import Base, DailyMetric
+        from backend.app.models import DailyMetric
         from backend.app.pipeline.day2_baselines_risk import compute_risk_scores, compute_rolling_and_zscore, compute_severity_baseline
 
-        engine = create_engine("sqlite:///:memory:")
-        Base.metadata.create_all(engine)
+        engine = make_engine()
         Session = sessionmaker(bind=engine)
         session = Session()
 
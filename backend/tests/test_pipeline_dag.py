@@ -0,0 +1,107 @@
+"""
+Pipeline DAG: independent stage commits, skip on no new data / failed upstream, checkpoints.
+Run from project root: python -m pytest backend/tests/test_pipeline_dag.py -v
+"""
+import sys
+import unittest
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.models import Event
+from backend.app.pipeline import dag
+from backend.app.pipeline.dag import (
+    STAGE_FAILED,
+    STAGE_OK,
+    STAGE_SKIPPED,
+    DagStageError,
+    Stage,
+    StageResult,
+    get_checkpoint,
+    run_dag,
+    set_checkpoint,
+)
+from backend.tests._db import make_engine
+
+
+class TestRunDag(unittest.TestCase):
+
+    def setUp(self):
+        engine = make_engine()
+        self.Session = sessionmaker(bind=engine)
+
+        @contextmanager
+        def _session():
+            s = self.Session()
+            try:
+                yield s
+                s.commit()
+            except Exception:
+                s.rollback()
+                raise
+            finally:
+                s.close()
+
+        self._orig = dag.get_db_session
+        dag.get_db_session = _session
+
+    def tearDown(self):
+        dag.get_db_session = self._orig
+
+    def _insert(self, session, upstream):
+        session.add(Event(id="e1", ts=datetime(2025, 1, 1), date=date(2025, 1, 1), country="UA"))
+        return StageResult(rows=1)
+
+    def test_failure_keeps_upstream_commit_and_skips_downstream(self):
+        def boom(session, upstream):
+            raise RuntimeError("day2 broke")
+
+        stages = [
+            Stage("normalize", self._insert),
+            Stage("day2", boom, depends_on=("normalize",)),
+            Stage("snapshot", lambda s, u: StageResult(), depends_on=("day2",)),
+        ]
+        with self.assertRaises(DagStageError):
+            run_dag("test", stages)
+
+        session = self.Session()
+        self.assertEqual(session.execute(select(func.count(Event.id))).scalar(), 1)
+        session.close()
+
+    def test_statuses(self):
+        def boom(session, upstream):
+            raise RuntimeError("day2 broke")
+
+        stages = [
+            Stage("download", lambda s, u: StageResult(rows=0, changed=False)),
+            Stage("normalize", lambda s, u: StageResult(), depends_on=("download",)),
+            Stage("other", lambda s, u: StageResult(rows=2)),
+            Stage("day2", boom, depends_on=("other",)),
+            Stage("snapshot", lambda s, u: StageResult(), depends_on=("day2",), always_run=True),
+        ]
+        run = run_dag("test", stages, raise_on_failure=False)
+        self.assertEqual(run.statuses["download"], STAGE_OK)
+        self.assertEqual(run.statuses["normalize"], STAGE_SKIPPED)
+        self.assertEqual(run.statuses["day2"], STAGE_FAILED)
+        self.assertEqual(run.statuses["snapshot"], STAGE_SKIPPED)
+        self.assertEqual(run.failed, ["day2"])
+
+    def test_checkpoint_upsert(self):
+        session = self.Session()
+        set_checkpoint(session, "gdelt", "normalize", "20250101.export.CSV.zip", "abc", rows=10)
+        session.commit()
+        set_checkpoint(session, "gdelt", "normalize", "20250101.export.CSV.zip", "def", rows=12)
+        session.commit()
+        cp = get_checkpoint(session, "gdelt", "normalize", "20250101.export.CSV.zip")
+        self.assertEqual((cp.fingerprint, cp.rows), ("def", 12))
+        session.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Chunked re-enrichment: keyset chunks cover every stale event once and version skipping works.
+Run from project root: python -m pytest backend/tests/test_re_enrich.py -v
+"""
+import sys
+import unittest
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.ml.severity_scorer import SEVERITY_ALGORITHM_VERSION
+from backend.app.models import DailyMetric, Event, EventText, PipelineCheckpoint
+from backend.app.pipeline import re_enrich
+from backend.tests._db import make_engine
+
+
+class TestReEnrich(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = make_engine()
+        self.Session = sessionmaker(bind=self.engine)
+        session = self.Session()
+        for i in range(23):
+            session.add(
+                Event(
+                    id=f"e{i:03d}",
+                    ts=datetime(2025, 1, 1 + i % 3),
+                    date=date(2025, 1, 1 + i % 3),
+                    country="UA",
+                    category="Armed Conflict",
+                    goldstein=-9.0,
+                    quad_class=4,
+                    severity_version="old" if i % 2 else SEVERITY_ALGORITHM_VERSION,
+                )
+            )
+            session.add(EventText(event_id=f"e{i:03d}", title="missile strike kills civilians"))
+        session.commit()
+        session.close()
+
+        @contextmanager
+        def _session():
+            s = self.Session()
+            try:
+                yield s
+                s.commit()
+            finally:
+                s.close()
+
+        self._orig = re_enrich.get_db_session
+        re_enrich.get_db_session = _session
+
+    def tearDown(self):
+        re_enrich.get_db_session = self._orig
+
+    def test_only_stale_events_rescored(self):
+        result = re_enrich.re_enrich_events(chunk_size=4, workers=1)
+        self.assertEqual(result["events_re_enriched"], 11)
+        self.assertEqual(result["events_skipped_current_version"], 12)
+
+        session = self.Session()
+        events = session.execute(select(Event)).scalars().all()
+        self.assertTrue(all(e.severity_version == SEVERITY_ALGORITHM_VERSION for e in events))
+        self.assertTrue(all(e.severity_index is not None for e in events if e.id[1:].isdigit() and int(e.id[1:]) % 2))
+        session.close()
+
+        # Second run has nothing left to do
+        self.assertEqual(re_enrich.re_enrich_events(chunk_size=4, workers=1)["events_re_enriched"], 0)
+
+    def test_force_rescores_everything(self):
+        result = re_enrich.re_enrich_events(force=True, chunk_size=5, workers=1)
+        self.assertEqual(result["events_re_enriched"], 23)
+
+    def test_interrupted_run_reaggregates_on_resume(self):
+        # The run dies after the chunks are committed, before aggregation
+        with mock.patch.object(re_enrich, "aggregate_daily_metrics", side_effect=RuntimeError("killed")):
+            with self.assertRaises(RuntimeError):
+                re_enrich.re_enrich_events(chunk_size=4, workers=1)
+        session = self.Session()
+        self.assertTrue(session.execute(select(PipelineCheckpoint)).scalars().all())
+        self.assertFalse(session.execute(select(DailyMetric)).scalars().all())
+        session.close()
+
+        # Nothing is stale any more, yet the resumed run still re-aggregates the pending dates
+        result = re_enrich.re_enrich_events(chunk_size=4, workers=1)
+        self.assertEqual(result["events_re_enriched"], 0)
+        self.assertEqual(result["dates_recomputed"], 3)
+        session = self.Session()
+        self.assertEqual({m.date for m in session.execute(select(DailyMetric)).scalars()},
+                         {date(2025, 1, d) for d in (1, 2, 3)})
+        self.assertFalse(session.execute(
+            select(PipelineCheckpoint).where(PipelineCheckpoint.pipeline == "re_enrich")).scalars().all())
+        session.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Versioned response cache: ETag/304, cache hits, invalidation on data version bump.
+Run from project root: python -m pytest backend/tests/test_response_cache.py -v
+"""
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from backend.app import cache
+from backend.app.vector_tiles import MVT_MEDIA_TYPE
+
+
+def _make_app(calls):
+    app = FastAPI()
+    app.add_middleware(cache.ResponseCacheMiddleware)
+
+    @app.get("/map")
+    def map_():
+        calls.append("map")
+        return {"n": len(calls)}
+
+    @app.get("/events")
+    def events():
+        calls.append("events")
+        return {"n": len(calls)}
+
+    @app.get("/tiles/{z}/{x}/{y}.mvt")
+    def tile(z: int, x: int, y: int):
+        calls.append("tile")
+        return Response(content=bytes([z, x, y]), media_type=MVT_MEDIA_TYPE)
+
+    return app
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        cache.response_cache.clear()
+        self.version = 1
+        patcher = mock.patch.object(cache, "current_data_version", lambda: self.version)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = []
+        self.client = TestClient(_make_app(self.calls))
+
+    def test_hit_and_304_until_version_bump(self):
+        r1 = self.client.get("/map?include_all=true")
+        self.assertEqual(r1.headers["X-Cache"], "MISS")
+        etag = r1.headers["ETag"]
+
+        r2 = self.client.get("/map?include_all=true")
+        self.assertEqual(r2.headers["X-Cache"], "HIT")
+        self.assertEqual(r2.json(), r1.json())
+
+        r3 = self.client.get("/map?include_all=true", headers={"If-None-Match": etag})
+        self.assertEqual(r3.status_code, 304)
+        self.assertEqual(self.calls, ["map"])
+
+        self.version = 2
+        r4 = self.client.get("/map?include_all=true", headers={"If-None-Match": etag})
+        self.assertEqual(r4.status_code, 200)
+        self.assertNotEqual(r4.headers["ETag"], etag)
+        self.assertEqual(self.calls, ["map", "map"])
+
+    def test_query_params_are_part_of_key(self):
+        a = self.client.get("/map?date=2026-01-01&include_all=true")
+        b = self.client.get("/map?include_all=true&date=2026-01-01")
+        c = self.client.get("/map?include_all=false")
+        self.assertEqual(a.headers["ETag"], b.headers["ETag"])
+        self.assertNotEqual(a.headers["ETag"], c.headers["ETag"])
+
+    def test_vector_tiles_are_cached(self):
+        r1 = self.client.get("/tiles/3/2/1.mvt")
+        r2 = self.client.get("/tiles/3/2/1.mvt")
+        self.assertEqual((r1.headers["X-Cache"], r2.headers["X-Cache"]), ("MISS", "HIT"))
+        self.assertEqual((r2.content, r2.headers["content-type"]), (bytes([3, 2, 1]), MVT_MEDIA_TYPE))
+        self.assertEqual(self.calls, ["tile"])
+
+    def test_uncached_paths_pass_through(self):
+        r = self.client.get("/events")
+        self.assertNotIn("ETag", r.headers)
+        self.client.get("/events")
+        self.assertEqual(self.calls, ["events", "events"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+"""
+Events retention: Parquet archive partitions, GET /events across live and archived
+rows, daily_metrics kept past the horizon, and raw ZIP pruning.
+Run from project root: python -m pytest backend/tests/test_retention.py -v
+"""
+import json
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import archive, pagination
+from backend.app.config import config
+from backend.app.db import get_db
+from backend.app.models import DailyMetric, Event, EventEntity, EventGridDaily, PipelineCheckpoint
+from backend.app.pipeline.aggregate_daily import aggregate_daily_metrics
+from backend.app.pipeline.event_grid import backfill_grid_cells, refresh_event_grid
+from backend.app.pipeline.retention import archive_events, archive_horizon, compact_database, prune_raw_zips
+from backend.app.pipeline.upsert import upsert_events
+from backend.app.search import search_events
+from backend.app.routes import events
+from backend.tests._db import make_engine, sqlite_only
+
+
+@unittest.skipUnless(archive.HAS_PYARROW, "pyarrow not installed")
+class TestEventsRetention(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        patcher = mock.patch.object(archive, "ARCHIVE_DIR", self.root / "events")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        engine = make_engine()
+        self.SessionLocal = sessionmaker(bind=engine)
+        self.session = self.SessionLocal()
+        self.addCleanup(self.session.close)
+
+        # 4 old dates (archived) and 3 recent ones, 5 events each
+        today = date.today()
+        self.old_dates = [today - timedelta(days=40 + i) for i in range(4)]
+        self.recent_dates = [today - timedelta(days=i) for i in range(3)]
+        for d in self.old_dates + self.recent_dates:
+            for i in range(5):
+                self.session.add(Event(
+                    id=f"{d.isoformat()}-{i}", ts=datetime(d.year, d.month, d.day, i), date=d,
+                    country="US" if i % 2 else "FR", category="conflict", source="gdelt",
+                    avg_tone=-2.0, goldstein=-5.0, quad_class=4,
+                ))
+                self.session.add(EventEntity(event_id=f"{d.isoformat()}-{i}", type="country", value="us", name="US", date=d))
+        self.session.commit()
+        self.horizon = today - timedelta(days=30)
+
+    def _client(self):
+        app = FastAPI()
+        app.include_router(events.router)
+
+        def override_db():
+            s = self.SessionLocal()
+            try:
+                yield s
+            finally:
+                s.close()
+
+        app.dependency_overrides[get_db] = override_db
+        patcher = mock.patch.object(pagination, "ReadSessionLocal", self.SessionLocal)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return TestClient(app)
+
+    def test_archive_moves_old_events_to_partitions(self):
+        self.assertEqual(archive_events(self.session, self.horizon), 20)
+        self.assertEqual(archive_horizon(self.session), self.horizon)
+        self.assertEqual(self.session.scalar(select(func.count()).select_from(Event)), 15)
+        self.assertEqual(self.session.scalar(select(func.count()).select_from(EventEntity)), 15)
+        self.assertEqual(archive.archived_dates(), sorted(self.old_dates, reverse=True))
+
+        rows = archive.read_partition(self.old_dates[0], country="FR")
+        self.assertEqual([r["id"] for r in rows], [f"{self.old_dates[0].isoformat()}-{i}" for i in (4, 2, 0)])
+
+    def test_rearchiving_a_date_merges_by_id(self):
+        d = self.old_dates[0]
+        rows = [dict(r) for r in self.session.execute(select(Event.__table__).where(Event.date == d)).mappings()]
+        archive.write_partition(d, rows[:3])  # a crash after writing, before deleting
+        archive_events(self.session, self.horizon)
+        self.assertEqual(len(archive.read_partition(d)), 5)
+
+    def test_horizon_must_leave_recent_events(self):
+        with self.assertRaises(ValueError):
+            archive_events(self.session, date.today() - timedelta(days=7))
+
+    def test_aggregate_keeps_archived_daily_metrics(self):
+        aggregate_daily_metrics(self.session)
+        before = self.session.scalar(select(func.count()).select_from(DailyMetric))
+        archive_events(self.session, self.horizon)
+        aggregate_daily_metrics(self.session)
+        self.session.commit()
+        self.assertEqual(self.session.scalar(select(func.count()).select_from(DailyMetric)), before)
+        old = self.session.scalar(select(DailyMetric).where(DailyMetric.date == self.old_dates[0]).limit(1))
+        self.assertEqual(old.event_count, 3)  # FR events of that date, from before archiving
+
+    def test_reingested_old_event_keeps_archived_rollups(self):
+        backfill_grid_cells(self.session)
+        d = self.old_dates[0]
+        refresh_event_grid(self.session, [d])
+        cells = lambda: self.session.scalar(  # noqa: E731
+            select(func.sum(EventGridDaily.event_count)).where(EventGridDaily.date == d, EventGridDaily.level == 2)
+        )
+        self.assertEqual(cells(), 5)
+        archive_events(self.session, self.horizon)
+        self.session.add(Event(id="late", ts=datetime(d.year, d.month, d.day, 9), date=d, country="US",
+                               grid_cell="0" * 16))
+        refresh_event_grid(self.session, [d])
+        self.assertEqual(cells(), 5)
+
+    @sqlite_only
+    def test_compact_rebuilds_search_index(self):
+        upsert_events(self.session, [{"id": "t1", "ts": datetime.now(), "date": date.today(), "title": "Port strike"}])
+        self.session.commit()
+        self.assertTrue(compact_database(self.session, min_free_ratio=0.0))
+        self.assertEqual([h.id for h in search_events(self.session, "strike")], ["t1"])
+
+    def test_events_pages_span_live_and_archived_rows(self):
+        archive_events(self.session, self.horizon)
+        client = self._client()
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 4}
+            if cursor:
+                params["cursor"] = cursor
+            r = client.get("/events", params=params)
+            self.assertEqual(r.status_code, 200)
+            seen.extend(r.json())
+            cursor = r.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        keys = [(e["date"], e["ts"], e["id"]) for e in seen]
+        self.assertEqual(len(keys), 35)
+        self.assertEqual(len({k[2] for k in keys}), 35)
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+        filtered = client.get("/events", params={"country": "US", "end": self.old_dates[1].isoformat(), "limit": 50})
+        self.assertEqual(len(filtered.json()), 6)  # 2 US events on each of the 3 oldest dates
+
+        stream = client.get("/events", params={"stream": "true"})
+        self.assertEqual(len([json.loads(line) for line in stream.text.splitlines() if line]), 35)
+
+    def test_prune_raw_zips(self):
+        raw = self.root / "raw"
+        raw.mkdir()
+        old, recent = "20200101000000.export.CSV.zip", date.today().strftime("%Y%m%d") + "000000.export.CSV.zip"
+        for name in (old, recent, "notes.txt"):
+            (raw / name).write_bytes(b"")
+        self.session.add(PipelineCheckpoint(pipeline="gdelt", stage="normalize", key=old, fingerprint="x"))
+        self.session.commit()
+        with mock.patch.object(config, "raw_data_dir", raw):
+            self.assertEqual(prune_raw_zips(self.session, self.horizon), 1)
+        self.assertEqual(sorted(p.name for p in raw.iterdir()), sorted(["notes.txt", recent]))
+        self.assertIsNone(self.session.scalar(select(PipelineCheckpoint).where(PipelineCheckpoint.key == old)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Risk tier fitting: reservoir sample bound, binary-search percentiles, persisted tier config.
+Run from project root: python -m pytest backend/tests/test_risk_tiers.py -v
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import numpy as np
+
+from backend.app.ml.risk_classifier import (
+    RiskTierClassifier,
+    compute_percentile,
+    compute_percentile_sorted,
+    reservoir_sample,
+)
+from backend.tests._db import make_engine
+
+
+class TestReservoirSample(unittest.TestCase):
+    """Reservoir sample is bounded by k and deterministic for a seed."""
+
+    def test_sample_bounded_and_deterministic(self):
+        values = [float(i) for i in range(10_000)]
+        a = reservoir_sample(values, 100, seed=7)
+        b = reservoir_sample(iter(values), 100, seed=7)
+        self.assertEqual(len(a), 100)
+        self.assertEqual(a, b)
+        self.assertTrue(set(a) <= set(values))
+
+    def test_short_stream_returned_whole(self):
+        self.assertEqual(reservoir_sample([1.0, 2.0], 10), [1.0, 2.0])
+
+
+class TestPercentileSorted(unittest.TestCase):
+    """Binary-search percentile matches the full-scan percentile."""
+
+    def test_matches_full_scan(self):
+        rng = np.random.default_rng(0)
+        arr = np.round(rng.uniform(0, 100, 500), 1)
+        sorted_arr = np.sort(arr)
+        for score in (0.0, 12.3, 50.0, arr[0], arr[17], 99.9, 100.0):
+            self.assertAlmostEqual(
+                compute_percentile(score, arr), compute_percentile_sorted(score, sorted_arr)
+            )
+
+
+class TestSampledFit(unittest.TestCase):
+    """Fitting on a sample still reports percentiles over every score."""
+
+    def test_fit_uses_sample_for_boundaries(self):
+        scores = list(np.linspace(0, 100, 2000))
+        clf = RiskTierClassifier(method="jenks")
+        config = clf.fit(scores, sample_size=200)
+        self.assertEqual(config["n_samples"], 2000)
+        self.assertEqual(clf.n_fit_samples, 200)
+        self.assertEqual(len(clf.boundaries), 4)
+        _, pct = clf.classify(100.0)
+        self.assertEqual(pct, 100.0)
+
+
+class TestSaveTierConfig(unittest.TestCase):
+    """compute_risk_and_trends persists one risk_tier_config row per tier."""
+
+    def test_tier_config_rows_written(self):
+        from datetime import date, timedelta
+        from sqlalchemy import select
+        from sqlalchemy.orm import sessionmaker
+        from backend.app.models import DailyMetric, RiskTierConfig
+        from backend.app.pipeline.ingest_valyu import compute_risk_and_trends
+
+        engine = make_engine()
+        session = sessionmaker(bind=engine)()
+
+        base_d = date.today() - timedelta(days=10)
+        for i in range(10):
+            session.add(
+                DailyMetric(
+                    date=base_d + timedelta(days=i),
+                    country="UA",
+                    category="Armed Conflict",
+                    event_count=5,
+                    severity_index=float(10 * i),
+                )
+            )
+        session.commit()
+
+        compute_risk_and_trends(session)
+
+        tiers = session.execute(select(RiskTierConfig)).scalars().all()
+        self.assertEqual(len(tiers), 5)
+        self.assertEqual({t.version for t in tiers}, {1})
+        latest = session.execute(
+            select(DailyMetric).order_by(DailyMetric.date.desc()).limit(1)
+        ).scalars().first()
+        self.assertIsNotNone(latest.risk_tier)
+        self.assertIsNotNone(latest.trend_7d)
+        session.close()
+
+
+class TestLoadLatestTierConfig(unittest.TestCase):
+    """The API reads the latest stored version instead of refitting."""
+
+    def test_latest_version_round_trips(self):
+        from sqlalchemy.orm import sessionmaker
+        from backend.app.pipeline.risk_tiers import load_latest_tier_config, save_tier_config, tier_for
+
+        engine = make_engine()
+        session = sessionmaker(bind=engine)()
+
+        self.assertIsNone(load_latest_tier_config(session))
+
+        clf = RiskTierClassifier(method="jenks")
+        clf.fit(list(np.linspace(0, 100, 300)))
+        self.assertEqual(save_tier_config(session, clf), 1)
+        self.assertEqual(save_tier_config(session, clf), 2)
+
+        loaded = load_latest_tier_config(session)
+        self.assertEqual(loaded.version, 2)
+        self.assertEqual(loaded.boundaries, clf.boundaries)
+        self.assertEqual(loaded.n_samples, 300)
+        self.assertEqual(tier_for(99.0, loaded), "critical")
+        self.assertEqual(tier_for(None, loaded, fallback="low"), "low")
+        session.close()
+
+    def test_cache_is_per_database(self):
+        import tempfile
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from backend.app.models import Base
+        from backend.app.pipeline.risk_tiers import load_latest_tier_config, save_tier_config
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        sessions = []
+        for name, top in (("a", 100), ("b", 10)):
+            engine = create_engine(f"sqlite:///{tmp.name}/{name}.db")
+            self.addCleanup(engine.dispose)
+            Base.metadata.create_all(engine)
+            session = sessionmaker(bind=engine)()
+            self.addCleanup(session.close)
+            clf = RiskTierClassifier(method="jenks")
+            clf.fit(list(np.linspace(0, top, 300)))
+            save_tier_config(session, clf)
+            session.commit()
+            sessions.append((session, clf))
+
+        # Both databases are at version 1; each must get its own boundaries
+        for session, clf in sessions + sessions:
+            self.assertEqual(load_latest_tier_config(session).boundaries, clf.boundaries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Weekly/monthly metric_rollups: period math, refresh diffing, and the routes that read them.
+Run from project root: python -m pytest backend/tests/test_rollups.py -v
+"""
+import sys
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.models import DailyMetric, MetricRollup
+from backend.app.pipeline.rollups import (
+    ALL_CATEGORIES,
+    period_end,
+    period_start,
+    pick_granularity,
+    refresh_metric_rollups,
+)
+from backend.app.routes.analytics import get_decomposition, get_sparklines
+from backend.app.routes.history import get_risk_history
+from backend.tests._db import make_engine
+
+
+class TestPeriods(unittest.TestCase):
+    def test_week_and_month_bounds(self):
+        d = date(2024, 2, 29)  # Thursday, leap day
+        self.assertEqual(period_start(d, "week"), date(2024, 2, 26))
+        self.assertEqual(period_end(date(2024, 2, 26), "week"), date(2024, 3, 3))
+        self.assertEqual(period_start(d, "month"), date(2024, 2, 1))
+        self.assertEqual(period_end(date(2024, 2, 1), "month"), date(2024, 2, 29))
+        self.assertEqual(period_end(date(2024, 12, 1), "month"), date(2024, 12, 31))
+
+    def test_auto_granularity_by_range(self):
+        self.assertEqual(pick_granularity(30), "day")
+        self.assertEqual(pick_granularity(180), "week")
+        self.assertEqual(pick_granularity(730), "month")
+        self.assertEqual(pick_granularity(730, "day"), "day")
+
+
+class TestMetricRollups(unittest.TestCase):
+    def setUp(self):
+        engine = make_engine()
+        self.session = sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+        # Two weeks of FR data in two categories, ending this week's Sunday
+        self.monday = period_start(date.today(), "week") - timedelta(days=7)
+        rows = []
+        for i in range(14):
+            d = self.monday + timedelta(days=i)
+            rows.append(self._metric(d, "Armed Conflict", 10, 40.0 + i, "high" if i < 4 else "medium"))
+            rows.append(self._metric(d, "Civil Unrest", 5, 20.0, "low"))
+        self.session.bulk_insert_mappings(DailyMetric, rows)
+        self.session.commit()
+        refresh_metric_rollups(self.session)
+        self.session.commit()
+
+    @staticmethod
+    def _metric(d, category, count, severity, tier):
+        return {"date": d, "country": "FR", "category": category, "event_count": count,
+                "severity_index": severity, "risk_score": severity, "risk_tier": tier}
+
+    def _rollup(self, granularity, category, start):
+        return self.session.execute(
+            select(MetricRollup).where(
+                MetricRollup.granularity == granularity, MetricRollup.category == category,
+                MetricRollup.country == "FR", MetricRollup.period_start == start,
+            )
+        ).scalar_one()
+
+    def test_weekly_values(self):
+        week = self._rollup("week", "Armed Conflict", self.monday)
+        self.assertEqual((week.days, week.event_count, week.period_end), (7, 70, self.monday + timedelta(days=6)))
+        self.assertEqual((week.mean_severity, week.max_severity, week.max_risk), (43.0, 46.0, 46.0))
+        self.assertEqual(week.risk_tier, "high")  # 4 of 7 days
+        total = self._rollup("week", ALL_CATEGORIES, self.monday)
+        self.assertEqual((total.event_count, total.max_severity), (105, 46.0))
+        self.assertEqual(total.risk_tier, "low")  # 7 low vs 4 high vs 3 medium
+
+    def test_tier_ties_go_to_the_more_severe_tier(self):
+        self.session.execute(delete(DailyMetric))
+        self.session.bulk_insert_mappings(DailyMetric, [
+            self._metric(self.monday + timedelta(days=i), "Armed Conflict", 1, 50.0, tier)
+            for i, tier in enumerate(["low", "high", "low", "high", "medium"])
+        ])
+        refresh_metric_rollups(self.session)
+        self.assertEqual(self._rollup("week", ALL_CATEGORIES, self.monday).risk_tier, "high")
+
+    def test_refresh_writes_only_changes(self):
+        self.assertEqual(refresh_metric_rollups(self.session), 0)
+        last = self.monday + timedelta(days=13)
+        self.session.execute(
+            update(DailyMetric)
+            .where(DailyMetric.date == last, DailyMetric.category == "Civil Unrest")
+            .values(event_count=100)
+        )
+        # Its week and month, per category and in total
+        self.assertEqual(refresh_metric_rollups(self.session), 4)
+        self.session.execute(delete(DailyMetric).where(DailyMetric.date >= self.monday + timedelta(days=7)))
+        refresh_metric_rollups(self.session)
+        weeks = self.session.execute(
+            select(MetricRollup.period_start).where(MetricRollup.granularity == "week").distinct()
+        ).scalars().all()
+        self.assertEqual(weeks, [self.monday])
+
+    def test_since_leaves_earlier_periods_alone(self):
+        second = self.monday + timedelta(days=7)
+        self.session.execute(update(DailyMetric).where(DailyMetric.date < second).values(event_count=1))
+        refresh_metric_rollups(self.session, since=second)
+        self.assertEqual(self._rollup("week", "Armed Conflict", self.monday).event_count, 70)
+
+    def test_routes_read_rollups_for_long_ranges(self):
+        (spark,) = get_sparklines(countries="fr", days=180, granularity="auto", db=self.session)
+        self.assertEqual(spark.granularity, "week")
+        self.assertEqual(spark.dates, [str(self.monday), str(self.monday + timedelta(days=7))])
+        self.assertEqual(spark.values, [46.0, 53.0])
+        (daily,) = get_sparklines(countries="FR", days=30, granularity="auto", db=self.session)
+        self.assertEqual((daily.granularity, len(daily.dates)), ("day", 14))
+
+        self.assertEqual(get_risk_history(country="FR", days=365, granularity="auto", db=self.session), [])  # snapshots
+        history = get_risk_history(country="FR", days=365, granularity="week", db=self.session)
+        self.assertEqual(history[0].snapshot_date, self.monday + timedelta(days=7))  # newest first
+        self.assertEqual(history[0].period_end, self.monday + timedelta(days=13))
+        self.assertEqual(history[0].event_count, 105)
+
+
+
+class TestLongRangeDecomposition(unittest.TestCase):
+    def setUp(self):
+        engine = make_engine()
+        self.session = sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+        today = date.today()
+        self.session.bulk_insert_mappings(DailyMetric, [
+            {"date": today - timedelta(days=i), "country": "FR", "category": "Armed Conflict", "event_count": 3,
+             "severity_index": 40.0 + (i % 7) + (i % 30) / 3}
+            for i in range(800)
+        ])
+        refresh_metric_rollups(self.session)
+        self.session.commit()
+
+    def test_auto_falls_back_to_weeks_below_two_years_of_months(self):
+        for days in (401, 500, 650):
+            result = get_decomposition(country="FR", days=days, granularity="auto", db=self.session)
+            self.assertIsNotNone(result, days)
+            self.assertEqual(result.granularity, "week")
+        self.assertEqual(get_decomposition(country="FR", days=730, granularity="auto", db=self.session).granularity,
+                         "month")
+        self.assertIsNone(get_decomposition(country="FR", days=500, granularity="month", db=self.session))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Full-text event search: index kept in sync by upserts, ranking, filters, snippets.
+FTS5 (bm25) on SQLite; tsvector/ts_headline when TEST_DATABASE_URL is PostgreSQL.
+Run from project root: python -m pytest backend/tests/test_search.py -v
+"""
+import sys
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import delete
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.models import Event, EventText
+from backend.app.pipeline.upsert import upsert_events
+from backend.app.routes.events import search
+from backend.app.search import ensure_search_index, search_events, to_match_query
+from backend.tests._db import make_engine, sqlite_only
+
+
+def _event(id_, title, content="", country="UA", category="Armed Conflict", day=date(2024, 5, 1), hour=0):
+    return {
+        "id": id_, "ts": datetime.combine(day, datetime.min.time()).replace(hour=hour), "date": day,
+        "country": country, "category": category, "title": title, "content": content,
+    }
+
+
+class TestMatchQuery(unittest.TestCase):
+    def test_user_input_is_quoted(self):
+        self.assertEqual(to_match_query("port strike"), '"port" "strike"')
+        self.assertEqual(to_match_query('"cease fire" OR truce'), '"cease fire" OR "truce"')
+        self.assertEqual(to_match_query("sanction*"), '"sanction"*')
+        self.assertEqual(to_match_query('NEAR( ) ^ "'), '"NEAR"')
+        self.assertEqual(to_match_query("OR -- OR"), "")
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        engine = make_engine()
+        self.session = sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+        upsert_events(self.session, [
+            _event("a", "Drone strike on Odesa port", "Grain terminals were damaged."),
+            _event("b", "Talks in Geneva", "Officials discussed the port strike at length.", country="CH",
+                   category="Diplomacy", hour=9),
+            _event("c", "Flooding in Dhaka", "Monsoon rains <b>flooded</b> the city.", country="BD",
+                   category="Natural Disaster", day=date(2024, 6, 1)),
+        ])
+        self.session.commit()
+
+    def ids(self, q, **filters):
+        return [h.id for h in search_events(self.session, q, **filters)]
+
+    def test_title_match_ranks_first(self):
+        self.assertEqual(self.ids("port strike"), ["a", "b"])
+
+    def test_recent_sort_is_newest_first(self):
+        self.assertEqual(self.ids("port OR flooded", sort="recent"), ["c", "b", "a"])
+        # A back-filled older article is indexed last but listed by its date
+        upsert_events(self.session, [_event("old", "Port strike in 2023", day=date(2023, 1, 5))])
+        self.session.commit()
+        self.assertEqual(self.ids("port OR flooded", sort="recent"), ["c", "b", "a", "old"])
+
+    def test_stemming_and_filters(self):
+        self.assertEqual(self.ids("flood"), ["c"])
+        self.assertEqual(self.ids("strike", country="CH"), ["b"])
+        self.assertEqual(self.ids("strike", category="Armed Conflict"), ["a"])
+        self.assertEqual(self.ids("flood", start=date(2024, 5, 15)), ["c"])
+        self.assertEqual(self.ids("flood", end=date(2024, 5, 15)), [])
+
+    def test_snippets_escaped_and_highlighted(self):
+        hit = search_events(self.session, "flooded")[0]
+        self.assertIn("<mark>flooded</mark>", hit.content_snippet)
+        self.assertIn("&lt;b&gt;", hit.content_snippet)
+
+    def test_upsert_update_and_delete_keep_index_in_sync(self):
+        upsert_events(self.session, [_event("c", "Earthquake in Dhaka", "Buildings collapsed.", country="BD")])
+        self.session.execute(delete(Event).where(Event.id == "b"))
+        self.session.commit()
+        self.assertEqual(self.ids("flood"), [])
+        self.assertEqual(self.ids("earthquake"), ["c"])
+        self.assertEqual(self.ids("talks"), [])
+
+    @sqlite_only
+    def test_existing_rows_indexed_on_first_ensure(self):
+        engine = make_engine()
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE events_fts")  # a database created before the index existed
+            conn.exec_driver_sql("DROP TRIGGER event_text_fts_ai")
+            row = _event("x", "Border clash reported")
+            conn.execute(Event.__table__.insert(), [{k: row[k] for k in ("id", "ts", "date", "country", "category")}])
+            conn.execute(EventText.__table__.insert(), [{"event_id": "x", "title": row["title"], "content": ""}])
+        self.assertTrue(ensure_search_index(engine))
+        self.assertFalse(ensure_search_index(engine))
+        with sessionmaker(bind=engine)() as s:
+            self.assertEqual([h.id for h in search_events(s, "clash")], ["x"])
+
+    def test_route_pages_with_offset(self):
+        page = search(q="strike", country=None, category=None, start=None, end=None, limit=1, offset=0,
+                      sort="relevance", db=self.session)
+        self.assertEqual((page.count, page.results[0].id, page.next_offset), (1, "a", 1))
+        page = search(q="strike", country=None, category=None, start=None, end=None, limit=1, offset=1,
+                      sort="relevance", db=self.session)
+        self.assertEqual((page.results[0].id, page.next_offset), ("b", None))
+
+
+if __name__ == "__main__":
+    unittest.main()
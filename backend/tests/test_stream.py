@@ -0,0 +1,190 @@
+"""
+GET /stream: outbox publishing, live fan-out, Last-Event-ID replay, and the pipeline deltas.
+Run from project root: python -m pytest backend/tests/test_stream.py -v
+"""
+import asyncio
+import json
+import sys
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import compression, stream
+from backend.app.models import CountrySummary, DailyMetric, StreamEvent
+from backend.app.pipeline.country_summary import refresh_country_summary
+from backend.app.pipeline.day2_baselines_risk import detect_spikes
+from backend.tests._db import make_engine
+
+
+def _parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return int(fields["id"]), fields["event"], json.loads(fields["data"])
+
+
+class StreamTestCase(unittest.TestCase):
+    def setUp(self):
+        engine = make_engine()
+        self.SessionLocal = sessionmaker(bind=engine)
+        self.broker = stream.StreamBroker(poll_seconds=0.02)
+        for target, value in (("ReadSessionLocal", self.SessionLocal), ("broker", self.broker)):
+            patcher = mock.patch.object(stream, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.broker.close)  # runs first: poller stops before the patches are undone
+
+    def publish(self, kind, payload):
+        with self.SessionLocal() as s:
+            stream.publish(s, kind, payload)
+            s.commit()
+        stream.notify()
+
+    def events(self, kind=None):
+        with self.SessionLocal() as s:
+            rows = s.execute(select(StreamEvent).order_by(StreamEvent.id)).scalars().all()
+        return [(r.kind, json.loads(r.payload_json)) for r in rows if kind is None or r.kind == kind]
+
+    def collect(self, last_event_id, n, during=None, timeout=5.0):
+        """First n SSE events from event_source; `during` runs (in a thread) once the stream is open."""
+
+        async def run():
+            out = []
+            source = stream.event_source(lambda: asyncio.sleep(0, False), last_event_id, heartbeat_seconds=0.05)
+            try:
+                async for chunk in source:
+                    if chunk.startswith("retry:") and during:
+                        asyncio.get_running_loop().run_in_executor(None, during)
+                    if chunk.startswith("id:"):
+                        out.append(_parse(chunk))
+                        if len(out) >= n:
+                            break
+            finally:
+                await source.aclose()
+            return out
+
+        return asyncio.run(asyncio.wait_for(run(), timeout))
+
+
+class TestEventSource(StreamTestCase):
+    def test_live_event_is_pushed(self):
+        got = self.collect(None, 1, during=lambda: self.publish("pipeline", {"pipeline": "gdelt"}))
+        self.assertEqual(got[0][1:], ("pipeline", {"pipeline": "gdelt"}))
+
+    def test_resume_replays_missed_events_then_live(self):
+        for i in range(3):
+            self.publish("job", {"i": i})
+        got = self.collect(1, 3, during=lambda: self.publish("job", {"i": 3}))
+        self.assertEqual([p["i"] for _, _, p in got], [1, 2, 3])
+        self.assertEqual([i for i, _, _ in got], [2, 3, 4])
+
+    def test_resume_ahead_of_poller_skips_seen_events(self):
+        self.broker._last_id = 0  # poller mark from before these events: its first poll fans them out
+        for i in range(3):
+            self.publish("job", {"i": i})
+
+        async def run():
+            ids, keepalives = [], 0
+            source = stream.event_source(lambda: asyncio.sleep(0, False), 3, heartbeat_seconds=0.1)
+            try:
+                async for chunk in source:
+                    if chunk.startswith("id:"):
+                        ids.append(_parse(chunk)[0])
+                    elif chunk.startswith(":"):
+                        keepalives += 1
+                        if keepalives == 2:  # poller has delivered
+                            break
+            finally:
+                await source.aclose()
+            return ids
+
+        self.assertEqual(asyncio.run(asyncio.wait_for(run(), 5)), [])
+
+    def test_late_commit_below_watermark_is_delivered(self):
+        def add(id_):
+            with self.SessionLocal() as s:
+                s.add(StreamEvent(id=id_, kind="job", payload_json=f'{{"i": {id_}}}',
+                                  created_at=datetime.now(timezone.utc)))
+                s.commit()
+
+        async def run():
+            sub = stream.Subscriber(loop=asyncio.get_running_loop())
+            self.broker._subscribers.add(sub)
+            self.broker._last_id = 0
+            add(1)
+            add(3)  # id 2 is still in an open transaction elsewhere
+            self.broker.poll_once()
+            add(2)
+            self.broker.poll_once()
+            self.broker.poll_once()  # delivered once
+            await asyncio.sleep(0)
+            return [sub.queue.get_nowait() for _ in range(sub.queue.qsize())]
+
+        got = asyncio.run(run())
+        self.assertEqual([(m.id, m.late) for m in got], [(1, False), (3, False), (2, True)])
+        self.assertFalse(stream.format_sse(got[2]).startswith("id:"))  # Last-Event-ID stays at 3
+
+    def test_resume_past_retention_sends_reset(self):
+        for i in range(3):
+            self.publish("job", {"i": i})
+        with self.SessionLocal() as s:
+            s.query(StreamEvent).filter(StreamEvent.id < 3).delete()
+            s.commit()
+        got = self.collect(0, 1)
+        self.assertEqual(got[0][1], stream.EVENT_RESET)
+
+    def test_prune_keeps_recent(self):
+        self.publish("job", {})
+        with self.SessionLocal() as s:
+            s.add(StreamEvent(kind="job", payload_json="{}", created_at=datetime.now(timezone.utc) - timedelta(days=30)))
+            s.commit()
+            self.assertEqual(stream.prune_stream_events(s), 1)
+            s.commit()
+        self.assertEqual(len(self.events()), 1)
+
+    def test_event_stream_is_never_compressed(self):
+        self.assertFalse(compression.is_compressible("text/event-stream; charset=utf-8"))
+
+
+class TestPipelineDeltas(StreamTestCase):
+    def test_only_new_spikes_are_published(self):
+        today = date.today()
+        with self.SessionLocal() as s:
+            s.add(DailyMetric(date=today, country="UA", category="Armed Conflict", event_count=90,
+                              rolling_center=10.0, baseline_quality="ok", z_score=6.0))
+            s.commit()
+            detect_spikes(s)
+            s.commit()
+            detect_spikes(s)  # re-run: same spike, nothing new
+            s.commit()
+        published = self.events("spikes")
+        self.assertEqual(len(published), 1)
+        self.assertEqual(published[0][1]["spikes"][0]["country"], "UA")
+
+    def test_tier_changes_published_after_first_build(self):
+        today = date.today()
+        with self.SessionLocal() as s:
+            s.add(DailyMetric(date=today, country="UA", category="Armed Conflict", event_count=5,
+                              severity_index=30.0, risk_tier="low"))
+            s.commit()
+            refresh_country_summary(s)  # first build: no previous tiers, no event
+            s.commit()
+            s.query(DailyMetric).update({"risk_tier": "critical", "severity_index": 90.0})
+            s.commit()
+            refresh_country_summary(s)
+            s.commit()
+            self.assertEqual(s.get(CountrySummary, "UA").risk_tier, "critical")
+        published = self.events("risk_tier")
+        self.assertEqual(len(published), 1)
+        self.assertEqual(published[0][1]["changes"], [
+            {"country": "UA", "from": "low", "to": "critical", "severity_index": 90.0},
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
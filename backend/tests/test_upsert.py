@@ -0,0 +1,143 @@
+"""
+Dialect-aware UPSERT helpers (app/pipeline/upsert.py).
+Run from project root: python -m pytest backend/tests/test_upsert.py -v
+
+The cases run on the test backend (tests/_db.py: in-memory SQLite, or
+TEST_DATABASE_URL). Without a PostgreSQL server, the statements built for it
+are still compiled and checked.
+"""
+import sys
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.app.models import DailyMetric, Event, Spike
+from backend.app.pipeline.upsert import upsert_daily_metrics, upsert_events, upsert_spikes
+from backend.tests._db import make_engine
+
+
+def _event(i, category="Civil Unrest", **extra):
+    row = {
+        "id": f"ev{i}",
+        "ts": datetime(2025, 3, 1, i % 24),
+        "date": date(2025, 3, 1),
+        "country": "US",
+        "category": category,
+        "source": "valyu",
+    }
+    row.update(extra)
+    return row
+
+
+class TestUpsert(unittest.TestCase):
+    def setUp(self):
+        self.session = sessionmaker(bind=make_engine())()
+        self.addCleanup(self.session.close)
+
+    def test_events_insert_then_update_counts_new_only(self):
+        self.assertEqual(upsert_events(self.session, [_event(1), _event(2)]), 2)
+        n = upsert_events(
+            self.session,
+            [_event(2, category="Armed Conflict", country="FR"), _event(3)],
+            update_columns=("category",),
+        )
+        self.assertEqual(n, 1)
+        self.session.commit()
+        self.assertEqual(self.session.scalar(select(func.count()).select_from(Event)), 3)
+        ev2 = self.session.get(Event, "ev2")
+        self.assertEqual(ev2.category, "Armed Conflict")
+        self.assertEqual(ev2.country, "US")  # not in update_columns
+
+    def test_events_do_nothing_without_update_columns(self):
+        upsert_events(self.session, [_event(1)])
+        self.assertEqual(upsert_events(self.session, [_event(1, category="X")], update_columns=()), 0)
+        self.session.commit()
+        self.assertEqual(self.session.get(Event, "ev1").category, "Civil Unrest")
+
+    def test_events_chunked_batch(self):
+        rows = [_event(i) for i in range(6000)]
+        self.assertEqual(upsert_events(self.session, rows), 6000)
+        self.session.commit()
+        self.assertEqual(self.session.scalar(select(func.count()).select_from(Event)), 6000)
+
+    def test_daily_metrics_by_natural_key(self):
+        key = {"date": date(2025, 3, 1), "country": "US", "category": "Civil Unrest"}
+        upsert_daily_metrics(self.session, [{**key, "event_count": 3, "pipeline_version": "v1"}])
+        upsert_daily_metrics(
+            self.session,
+            [{**key, "event_count": 5, "pipeline_version": "v2"}],
+            update_columns=("event_count",),
+        )
+        self.session.commit()
+        rows = self.session.execute(select(DailyMetric)).scalars().all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].event_count, 5)
+        self.assertEqual(rows[0].pipeline_version, "v1")
+
+    def test_spikes_rerun_is_idempotent(self):
+        row = {
+            "date": date(2025, 3, 1),
+            "country": "US",
+            "category": "Civil Unrest",
+            "z_score": 3.1,
+            "baseline_method": "robust",
+            "baseline_window_days": 30,
+            "pipeline_version": "v1",
+        }
+        upsert_spikes(self.session, [row])
+        upsert_spikes(self.session, [{**row, "z_score": 4.2}])
+        self.session.commit()
+        spikes = self.session.execute(select(Spike)).scalars().all()
+        self.assertEqual(len(spikes), 1)
+        self.assertAlmostEqual(spikes[0].z_score, 4.2)
+
+
+class TestUpsertPostgresStatements(unittest.TestCase):
+    """The PostgreSQL ON CONFLICT statements, compiled without a server."""
+
+    def setUp(self):
+        self.dialect = postgresql.dialect()
+        self.session = mock.Mock(spec=Session)
+        self.session.get_bind.return_value.dialect = self.dialect
+        self.session.execute.return_value.all.return_value = []  # existing_keys: nothing stored yet
+
+    def sql(self):
+        return [str(c.args[0].compile(dialect=self.dialect)) for c in self.session.execute.call_args_list]
+
+    def test_events_and_event_text(self):
+        upsert_events(self.session, [_event(1, title="T")], update_columns=("category", "title"))
+        inserts = [s for s in self.sql() if s.startswith("INSERT")]
+        self.assertEqual(len(inserts), 2)
+        self.assertIn("INSERT INTO events", inserts[0])
+        self.assertIn("ON CONFLICT (id) DO UPDATE SET category = excluded.category", inserts[0])
+        self.assertIn("INSERT INTO event_text", inserts[1])
+        self.assertIn("ON CONFLICT (event_id) DO UPDATE SET title = excluded.title", inserts[1])
+
+    def test_spikes_conflict_on_the_unique_key(self):
+        upsert_spikes(self.session, [{"date": date(2025, 3, 1), "country": "US", "category": "X", "z_score": 3.0,
+                                      "baseline_method": "robust", "baseline_window_days": 30,
+                                      "pipeline_version": "v1"}])
+        (stmt,) = self.sql()
+        self.assertIn("ON CONFLICT (date, country, category, baseline_method, baseline_window_days, "
+                      "pipeline_version) DO UPDATE SET z_score = excluded.z_score", stmt)
+        constraint = next(c for c in Spike.__table__.constraints if c.name == "uq_spikes_baseline_version")
+        self.assertEqual(tuple(c.name for c in constraint.columns),
+                         ("date", "country", "category", "baseline_method", "baseline_window_days",
+                          "pipeline_version"))
+
+    def test_do_nothing_without_update_columns(self):
+        upsert_daily_metrics(self.session, [{"date": date(2025, 3, 1), "country": "US", "category": "X"}],
+                             update_columns=())
+        self.assertIn("ON CONFLICT (date, country, category) DO NOTHING", self.sql()[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Vector tiles: MVT encoding, and the countries/clusters/events layers of GET /tiles/{z}/{x}/{y}.mvt.
+Run from project root: python -m pytest backend/tests/test_vector_tiles.py -v
+"""
+import struct
+import sys
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+from unittest import mock
+
+# Project root on path so "backend.app" resolves
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.models import CountrySummary, Event
+from backend.app.pipeline.event_grid import backfill_grid_cells, refresh_event_grid, tile_xy
+from backend.app.routes import tiles
+from backend.app.vector_tiles import encode_tile
+from backend.tests._db import make_engine
+
+DAY = date(2024, 5, 1)
+
+
+def _fields(buf):
+    """(field number, value) pairs of a protobuf message (varint, 64-bit and length-delimited only)."""
+    i = 0
+    while i < len(buf):
+        key, i = _varint(buf, i)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            value, i = _varint(buf, i)
+        elif wire == 1:
+            value, i = struct.unpack("<d", buf[i:i + 8])[0], i + 8
+        else:
+            n, i = _varint(buf, i)
+            value, i = buf[i:i + n], i + n
+        yield field, value
+
+
+def _varint(buf, i):
+    shift = result = 0
+    while True:
+        b = buf[i]
+        i += 1
+        result |= (b & 0x7F) << shift
+        shift += 7
+        if not b & 0x80:
+            return result, i
+
+
+def _unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def decode(tile):
+    """{layer: [(px, py, attributes)]}"""
+    layers = {}
+    for _, layer in _fields(tile):
+        name, keys, values, features = None, [], [], []
+        for f, v in _fields(layer):
+            if f == 1:
+                name = v.decode()
+            elif f == 2:
+                features.append(dict((ff, vv) for ff, vv in _fields(v)))
+            elif f == 3:
+                keys.append(v.decode())
+            elif f == 4:
+                ((vf, vv),) = _fields(v)
+                values.append(vv.decode() if vf == 1 else _unzigzag(vv) if vf == 6 else vv)
+        out = []
+        for feat in features:
+            tags = []
+            i = 0
+            raw = feat.get(2, b"")
+            while i < len(raw):
+                t, i = _varint(raw, i)
+                tags.append(t)
+            geom = []
+            i = 0
+            while i < len(feat[4]):
+                g, i = _varint(feat[4], i)
+                geom.append(g)
+            attrs = {keys[tags[k]]: values[tags[k + 1]] for k in range(0, len(tags), 2)}
+            out.append((_unzigzag(geom[1]), _unzigzag(geom[2]), attrs))
+        layers[name] = out
+    return layers
+
+
+class TestEncoding(unittest.TestCase):
+    def test_round_trip(self):
+        tile = encode_tile({
+            "pts": [(10, -3, {"name": "a", "n": -7, "sev": 12.5, "flag": True, "skip": None}), (4095, 0, {"name": "a"})],
+            "empty": [],
+        })
+        self.assertEqual(decode(tile), {
+            "pts": [(10, -3, {"name": "a", "n": -7, "sev": 12.5, "flag": 1}), (4095, 0, {"name": "a"})],
+        })
+        self.assertEqual(encode_tile({"empty": []}), b"")
+
+
+class TestTileRoute(unittest.TestCase):
+    def setUp(self):
+        engine = make_engine()
+        self.session = sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+        self.session.execute(Event.__table__.insert(), [
+            {"id": i, "ts": datetime.combine(DAY, datetime.min.time()), "date": DAY, "country": "FR",
+             "lat": lat, "lon": lon, "severity_index": sev, "threat_level": "medium", "category": "Civil Unrest"}
+            for i, lat, lon, sev in (("p1", 48.85, 2.35, 30.0), ("p2", 48.86, 2.34, 80.0), ("c1", None, None, 50.0))
+        ])
+        self.session.add(CountrySummary(country="FR", lat=46.0, lon=2.0, has_data=True, risk_tier="high",
+                                        severity_index=55.0, event_count=3))
+        backfill_grid_cells(self.session)
+        refresh_event_grid(self.session, [DAY])
+        self.session.commit()
+
+    def tile(self, z, lat=48.85, lon=2.35):
+        x, y = tile_xy(lat, lon, z)
+        return decode(tiles.get_tile(z=z, x=x, y=y, date_param=DAY, db=self.session).body)
+
+    def test_low_zoom_serves_clusters_and_countries(self):
+        layers = self.tile(3)
+        self.assertEqual(sum(f[2]["count"] for f in layers["clusters"]), 3)
+        self.assertEqual(max(f[2]["max_severity"] for f in layers["clusters"]), 80.0)
+        self.assertEqual(layers["countries"][0][2]["risk_tier"], "high")
+        self.assertNotIn("events", layers)
+
+    def test_clusters_past_finest_level(self):
+        # Points start above the finest cluster level: tiles read the enclosing cell and clip
+        with mock.patch.object(tiles, "TILE_POINTS_MIN_ZOOM", 16):
+            self.assertEqual(sum(f[2]["count"] for f in self.tile(14, 48.855, 2.345)["clusters"]), 2)
+            self.assertNotIn("clusters", self.tile(15, 48.84, 2.29))  # same level-12 cell, centroid outside
+
+    def test_high_zoom_serves_events_most_severe_first(self):
+        layers = self.tile(12)
+        self.assertEqual([f[2]["id"] for f in layers["events"]], ["p2", "p1"])
+        self.assertEqual(layers["events"][0][2]["category"], "Civil Unrest")
+        with mock.patch.object(tiles, "TILE_MAX_POINTS", 1):
+            self.assertEqual([f[2]["id"] for f in self.tile(12)["events"]], ["p2"])
+        self.assertEqual([f[2]["id"] for f in self.tile(18, 46.0, 2.0)["events"]], ["c1"])  # centroid, clipped
+
+    def test_out_of_range_tile(self):
+        with self.assertRaises(HTTPException):
+            tiles.get_tile(z=2, x=4, y=0, date_param=DAY, db=self.session)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,6 +17,7 @@ import {
   getMap,
   getCombinedEvents,
   getMilitaryBases,
+  subscribeStream,
   type Metric,
   type Spike,
   type BriefResponse,
@@ -86,6 +87,16 @@ export default function App() {
     return () => { cancelled = true; };
   }, [setMapEventsInStore]);
 
+  // ── Live updates: refetch what a pushed change touches instead of polling ──
+  useEffect(() => subscribeStream((kind) => {
+    if (kind === 'spikes' || kind === 'reset') {
+      getSpikes({ limit: '200' }).then(setSpikes).catch(() => {});
+    }
+    if (kind === 'risk_tier' || kind === 'pipeline' || kind === 'reset') {
+      getMap().then(setMapData).catch(() => {});
+    }
+  }), []);
+
   // ── Brief data (lazy) ──
   useEffect(() => {
     if (tab !== 'brief') return;
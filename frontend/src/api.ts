@@ -10,6 +10,16 @@ async function fetchApi<T>(path: string, params?: Record<string, string>): Promi
   return res.json();
 }
 
+export type StreamEventKind = 'spikes' | 'risk_tier' | 'pipeline' | 'job' | 'reset';
+
+/** Subscribe to GET /stream (server-sent events); EventSource resumes with Last-Event-ID on reconnect. Returns unsubscribe. */
+export function subscribeStream(onEvent: (kind: StreamEventKind, data: unknown) => void): () => void {
+  const source = new EventSource(new URL('/stream', API_BASE).toString());
+  const kinds: StreamEventKind[] = ['spikes', 'risk_tier', 'pipeline', 'job', 'reset'];
+  kinds.forEach((kind) => source.addEventListener(kind, (e) => onEvent(kind, JSON.parse((e as MessageEvent).data))));
+  return () => source.close();
+}
+
 export interface Metric {
   date: string;
   country: string;
@@ -226,10 +236,13 @@ export interface CategoryBreakdown {
   total: number;
 }
 
+export type TrendGranularity = 'day' | 'week' | 'month';
+
 export interface SparklineData {
   country: string;
   dates: string[];
   values: (number | null)[];
+  granularity: TrendGranularity;
 }
 
 export interface TopMover {
@@ -241,8 +254,8 @@ export interface TopMover {
   event_count: number;
 }
 
-export async function getRiskDistribution(): Promise<RiskDistribution> {
-  return fetchApi<RiskDistribution>('/analytics/risk-distribution');
+export async function getRiskDistribution(days?: number): Promise<RiskDistribution> {
+  return fetchApi<RiskDistribution>('/analytics/risk-distribution', days ? { days: String(days) } : undefined);
 }
 
 export async function getRiskTiers(): Promise<RiskTiers> {
@@ -253,8 +266,10 @@ export async function getCategoryBreakdown(days?: number): Promise<CategoryBreak
   return fetchApi<CategoryBreakdown>('/analytics/category-breakdown', days ? { days: String(days) } : undefined);
 }
 
-export async function getSparklines(countries: string[]): Promise<SparklineData[]> {
-  return fetchApi<SparklineData[]>('/analytics/sparklines', { countries: countries.join(',') });
+export async function getSparklines(countries: string[], days?: number): Promise<SparklineData[]> {
+  const params: Record<string, string> = { countries: countries.join(',') };
+  if (days) params.days = String(days);
+  return fetchApi<SparklineData[]>('/analytics/sparklines', params);
 }
 
 export async function getTopMovers(limit?: number): Promise<TopMover[]> {
@@ -301,9 +316,55 @@ export interface CountryInsights {
   recent_news: CountryInsightsNews[];
   category_breakdown: Record<string, number>;
   related_countries: string[];
+  related_organizations: Array<{ name: string; value: string; mentions: number }>;
   metrics_history: Array<{ date: string; severity: number; events: number }>;
 }
 
 export async function getCountryInsights(countryCode: string): Promise<CountryInsights> {
   return fetchApi<CountryInsights>(`/countries/${encodeURIComponent(countryCode)}/insights`);
 }
+
+export interface MapCluster {
+  cell: string;
+  lat: number;
+  lon: number;
+  count: number;
+  max_severity: number | null;
+}
+
+export interface MapClustersResponse {
+  zoom: number;
+  level: number;
+  start: string;
+  end: string;
+  clusters: MapCluster[];
+}
+
+export async function getMapClusters(params: { bbox: string; zoom: string; date?: string }): Promise<MapClustersResponse> {
+  return fetchApi<MapClustersResponse>('/map/clusters', params as Record<string, string>);
+}
+
+/** Tile URL template for a Mapbox vector source (layers: countries, clusters, events). */
+export function getTileUrlTemplate(date?: string): string {
+  const url = `${API_BASE}/tiles/{z}/{x}/{y}.mvt`;
+  return date ? `${url}?date=${encodeURIComponent(date)}` : url;
+}
+
+export interface NetworkEdge {
+  source: string;
+  target: string;
+  weight: number;
+  mean_severity: number | null;
+  conflict_ratio: number;
+}
+
+export interface NetworkResponse {
+  start: string;
+  end: string;
+  nodes: Array<{ id: string; weight: number; degree: number }>;
+  edges: NetworkEdge[];
+}
+
+export async function getNetwork(params?: { start?: string; end?: string; days?: string; country?: string; k?: string }): Promise<NetworkResponse> {
+  return fetchApi<NetworkResponse>('/network', params as Record<string, string>);
+}